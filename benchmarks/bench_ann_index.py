@@ -0,0 +1,171 @@
+"""Benchmark recall and latency of ANN indexes against exact search.
+
+Builds a synthetic collection of random vectors directly in SQL, computes the
+exact top-k for a set of query vectors with index scans disabled, then builds a
+partial HNSW or IVFFlat index for the collection and reports recall@k and
+latency for each ``ef_search`` (HNSW) or ``probes`` (IVFFlat) value.
+
+Usage:
+    uv run python benchmarks/bench_ann_index.py --rows 100000 --method hnsw \
+        --m 16 --ef-construction 64 --search 20 40 100 200
+    uv run python benchmarks/bench_ann_index.py --method ivfflat --lists 300 \
+        --search 1 5 10 30
+
+Requires a reachable PostgreSQL configured through the usual POSTGRES_* variables.
+The synthetic collection and its index are deleted afterwards unless ``--keep``
+is given.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+
+from langconnect import config
+from langconnect.database.connection import close_db_pool, get_db_connection
+from langconnect.database.indexes import (
+    AnnIndexParams,
+    apply_search_settings,
+    build_ann_index,
+    drop_ann_index,
+    vector_distance_sql,
+)
+from langconnect.database.migrations import run_migrations
+
+SEARCH_SQL = f"""
+    SELECT e.id
+      FROM langchain_pg_embedding e
+     WHERE e.collection_id = $2
+     ORDER BY {vector_distance_sql("e.embedding", "$1")}
+     LIMIT $3
+"""
+
+
+async def _create_collection(rows: int) -> str:
+    collection_uuid = str(uuid.uuid4())
+    async with get_db_connection() as conn:
+        await conn.execute(
+            "INSERT INTO langchain_pg_collection (uuid, name, cmetadata) "
+            "VALUES ($1, $2, $3::json)",
+            collection_uuid,
+            f"tbl_bench_{uuid.uuid4().hex}",
+            json.dumps({"name": "ann benchmark", "owner_id": "benchmark"}),
+        )
+        start = time.perf_counter()
+        # The inner query references the outer row so Postgres evaluates it
+        # per row instead of once.
+        await conn.execute(
+            """
+            INSERT INTO langchain_pg_embedding (id, collection_id, embedding, document)
+            SELECT gen_random_uuid()::text,
+                   $1,
+                   (SELECT array_agg(random() - 0.5)::real[]
+                      FROM generate_series(1, $2) d
+                     WHERE d > g - g)::vector,
+                   'chunk ' || g
+              FROM generate_series(1, $3) g
+            """,
+            collection_uuid,
+            config.EMBEDDING_DIMENSIONS,
+            rows,
+        )
+        await conn.execute("ANALYZE langchain_pg_embedding")
+    print(f"inserted {rows} vectors in {time.perf_counter() - start:.1f}s")
+    return collection_uuid
+
+
+def _random_vector() -> str:
+    return "[" + ",".join(
+        f"{random.random() - 0.5:.6f}" for _ in range(config.EMBEDDING_DIMENSIONS)
+    ) + "]"
+
+
+async def _search(
+    queries: list[str], collection_uuid: str, k: int, exact: bool = False, **settings
+) -> tuple[list[set[str]], list[float]]:
+    results, timings = [], []
+    async with get_db_connection() as conn:
+        for query in queries:
+            async with conn.transaction():
+                if exact:
+                    await conn.execute("SET LOCAL enable_indexscan = off")
+                await apply_search_settings(conn, **settings)
+                start = time.perf_counter()
+                rows = await conn.fetch(SEARCH_SQL, query, collection_uuid, k)
+                timings.append((time.perf_counter() - start) * 1000)
+            results.append({row["id"] for row in rows})
+    return results, timings
+
+
+def _report(label: str, timings: list[float], recall: float) -> None:
+    quantiles = statistics.quantiles(timings, n=20)
+    print(
+        f"{label:<18} recall@k={recall:6.3f}  p50={statistics.median(timings):8.2f} ms"
+        f"  p95={quantiles[-1]:8.2f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--method", choices=["hnsw", "ivfflat"], default="hnsw")
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=64)
+    parser.add_argument("--lists", type=int, default=100)
+    parser.add_argument(
+        "--search",
+        type=int,
+        nargs="+",
+        default=None,
+        help="ef_search (hnsw) or probes (ivfflat) values to compare.",
+    )
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+    search_values = args.search or (
+        [20, 40, 100, 200] if args.method == "hnsw" else [1, 5, 10, 30]
+    )
+
+    await run_migrations()
+    collection_uuid = await _create_collection(args.rows)
+    try:
+        queries = [_random_vector() for _ in range(args.queries)]
+        truth, timings = await _search(queries, collection_uuid, args.k, exact=True)
+        _report("exact", timings, 1.0)
+
+        params = AnnIndexParams(
+            method=args.method,
+            m=args.m,
+            ef_construction=args.ef_construction,
+            lists=args.lists,
+        )
+        start = time.perf_counter()
+        await build_ann_index(collection_uuid, params)
+        print(f"built {args.method} index in {time.perf_counter() - start:.1f}s")
+
+        setting = "ef_search" if args.method == "hnsw" else "probes"
+        for value in search_values:
+            found, timings = await _search(
+                queries, collection_uuid, args.k, **{setting: value}
+            )
+            recall = statistics.mean(
+                len(f & t) / len(t) for f, t in zip(found, truth, strict=True) if t
+            )
+            _report(f"{setting}={value}", timings, recall)
+    finally:
+        if not args.keep:
+            await drop_ann_index(collection_uuid)
+            async with get_db_connection() as conn:
+                await conn.execute(
+                    "DELETE FROM langchain_pg_collection WHERE uuid = $1",
+                    collection_uuid,
+                )
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
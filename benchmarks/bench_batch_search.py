@@ -0,0 +1,149 @@
+"""Benchmark a multi-query fan-out: one search per query against one batch search.
+
+Fills a collection with ``--chunks`` chunks of random vectors, then runs
+``--rounds`` fan-outs of ``--queries`` fresh queries each (as the MCP
+``rag-prompt`` workflow does after ``multi_query``), with a simulated embeddings
+model that takes ``--latency`` seconds per request:
+
+- ``sequential``: one ``Collection.search`` after the other;
+- ``concurrent``: all ``Collection.search`` calls at once;
+- ``batch``: one ``Collection.search_batch`` call.
+
+Reports the median latency of a fan-out and embedding requests per fan-out.
+
+Usage:
+    uv run python benchmarks/bench_batch_search.py --chunks 20000 --queries 5 \
+        --search-type hybrid --latency 0.15
+
+Requires a reachable PostgreSQL configured through the usual POSTGRES_* variables.
+The synthetic collection is deleted afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from langconnect import config
+from langconnect.database.bulk import write_embeddings
+from langconnect.database.collections import Collection
+from langconnect.database.connection import close_db_pool, get_db_connection
+from langconnect.database.migrations import run_migrations
+
+OWNER = "benchmark"
+WORDS = "vector index search query chunk document embedding ranking recall".split()
+
+
+class SimulatedEmbeddings(DeterministicFakeEmbedding):
+    """Deterministic embeddings with the latency of a remote model."""
+
+    latency: float = 0.15
+    requests: int = 0
+
+    async def aembed_query(self, text: str) -> list[float]:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        return self.embed_query(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        return self.embed_documents(texts)
+
+
+async def _create_collection(chunks: int) -> str:
+    collection_uuid = str(uuid.uuid4())
+    async with get_db_connection() as conn:
+        await conn.execute(
+            "INSERT INTO langchain_pg_collection (uuid, name, cmetadata) "
+            "VALUES ($1, $2, $3::json)",
+            collection_uuid,
+            f"tbl_bench_{uuid.uuid4().hex}",
+            json.dumps({"name": "batch search benchmark", "owner_id": OWNER}),
+        )
+        rng = random.Random(0)
+        rows = [
+            (
+                str(uuid.uuid4()),
+                collection_uuid,
+                [rng.uniform(-1, 1) for _ in range(config.EMBEDDING_DIMENSIONS)],
+                " ".join(rng.choices(WORDS, k=30)),
+                json.dumps({"file_id": f"file_{n // 50}"}),
+            )
+            for n in range(chunks)
+        ]
+        await write_embeddings(conn, rows)
+    return collection_uuid
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument(
+        "--search-type", choices=["semantic", "keyword", "hybrid"], default="hybrid"
+    )
+    parser.add_argument("--latency", type=float, default=0.15)
+    args = parser.parse_args()
+
+    embeddings = SimulatedEmbeddings(
+        size=config.EMBEDDING_DIMENSIONS, latency=args.latency
+    )
+    config.DEFAULT_EMBEDDINGS = embeddings
+    await run_migrations()
+    collection_uuid = await _create_collection(args.chunks)
+    collection = Collection(collection_uuid, OWNER)
+    options = {"limit": 5, "search_type": args.search_type}
+
+    async def sequential(queries: list[str]) -> None:
+        for query in queries:
+            await collection.search(query, **options)
+
+    async def concurrent(queries: list[str]) -> None:
+        await asyncio.gather(*[collection.search(q, **options) for q in queries])
+
+    async def batch(queries: list[str]) -> None:
+        await collection.search_batch(queries, fuse=True, **options)
+
+    print(
+        f"{args.queries} queries per fan-out, {args.chunks} chunks, "
+        f"{args.search_type} search"
+    )
+    print(f"{'mode':<11} {'p50 ms':>8} {'requests':>9}")
+    try:
+        for mode, run in [
+            ("sequential", sequential),
+            ("concurrent", concurrent),
+            ("batch", batch),
+        ]:
+            latencies = []
+            embeddings.requests = 0
+            for round_number in range(args.rounds):
+                # Fresh queries, so the query embedding cache never hits.
+                queries = [
+                    f"{mode} {round_number} {n} {' '.join(random.choices(WORDS, k=3))}"
+                    for n in range(args.queries)
+                ]
+                start = time.perf_counter()
+                await run(queries)
+                latencies.append(time.perf_counter() - start)
+            print(
+                f"{mode:<11} {statistics.median(latencies) * 1000:>8.1f} "
+                f"{embeddings.requests / args.rounds:>9.1f}"
+            )
+    finally:
+        async with get_db_connection() as conn:
+            await conn.execute(
+                "DELETE FROM langchain_pg_collection WHERE uuid = $1", collection_uuid
+            )
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""Benchmark writing chunk rows: pipelined INSERTs against binary COPY.
+
+Writes ``--rows`` chunks (100k by default) with random vectors of
+``EMBEDDING_DIMENSIONS`` dimensions into a fresh collection, once with the
+``executemany`` INSERT path and once with the binary COPY path, and reports
+rows/s for each. Embedding is not part of the measurement.
+
+Usage:
+    uv run python benchmarks/bench_bulk_insert.py --rows 100000 --batch-size 5000
+
+Requires a reachable PostgreSQL configured through the usual POSTGRES_* variables.
+The synthetic collections are deleted afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from langconnect import config
+from langconnect.database.bulk import copy_embeddings, insert_embeddings
+from langconnect.database.connection import close_db_pool, get_db_connection
+from langconnect.database.migrations import run_migrations
+
+# Rows reuse a pool of vectors; 100k distinct 1536-d vectors as Python lists
+# would take several GB.
+DISTINCT_VECTORS = 1000
+
+
+async def _create_collection() -> str:
+    collection_uuid = str(uuid.uuid4())
+    async with get_db_connection() as conn:
+        await conn.execute(
+            "INSERT INTO langchain_pg_collection (uuid, name, cmetadata) "
+            "VALUES ($1, $2, $3::json)",
+            collection_uuid,
+            f"tbl_bench_{uuid.uuid4().hex}",
+            json.dumps({"name": "bulk insert benchmark", "owner_id": "benchmark"}),
+        )
+    return collection_uuid
+
+
+def _rows(collection_uuid: str, count: int) -> list:
+    rng = random.Random(0)
+    vectors = [
+        [rng.uniform(-1, 1) for _ in range(config.EMBEDDING_DIMENSIONS)]
+        for _ in range(DISTINCT_VECTORS)
+    ]
+    return [
+        (
+            str(uuid.uuid4()),
+            collection_uuid,
+            vectors[n % DISTINCT_VECTORS],
+            f"Synthetic chunk number {n} of the bulk insert benchmark. " * 10,
+            json.dumps({"file_id": f"file_{n // 100}", "source": f"{n // 100}.pdf"}),
+        )
+        for n in range(count)
+    ]
+
+
+async def _write(method: str, rows: list, batch_size: int) -> float:
+    async with get_db_connection() as conn:
+        start = time.perf_counter()
+        if method == "copy":
+            async with conn.transaction():
+                await copy_embeddings(conn, rows, batch_size=batch_size)
+        else:
+            await insert_embeddings(conn, rows)
+        return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=config.COPY_BATCH_SIZE)
+    parser.add_argument(
+        "--methods",
+        nargs="+",
+        choices=["executemany", "copy"],
+        default=["executemany", "copy"],
+    )
+    args = parser.parse_args()
+
+    await run_migrations()
+    print(f"{args.rows} rows, {config.EMBEDDING_DIMENSIONS} dimensions")
+    print(f"{'method':<12} {'seconds':>9} {'rows/s':>10}")
+    collections = []
+    try:
+        for method in args.methods:
+            collection_uuid = await _create_collection()
+            collections.append(collection_uuid)
+            rows = _rows(collection_uuid, args.rows)
+            elapsed = await _write(method, rows, args.batch_size)
+            print(f"{method:<12} {elapsed:>9.2f} {args.rows / elapsed:>10.0f}")
+    finally:
+        async with get_db_connection() as conn:
+            await conn.execute(
+                "DELETE FROM langchain_pg_collection WHERE uuid = ANY($1::uuid[])",
+                collections,
+            )
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
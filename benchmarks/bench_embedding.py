@@ -0,0 +1,139 @@
+"""Benchmark embedding throughput against batch size and concurrency.
+
+Embeds ``--texts`` chunks through ``EmbeddingScheduler`` against a local fake
+OpenAI-compatible embeddings API that answers each request after ``--latency``
+seconds and enforces a ``--server-tpm`` token quota per minute (requests over
+the quota get 429 with Retry-After). Reports texts/s, requests, and 429s for
+each concurrency level, i.e. how much concurrency helps and how the scheduler
+settles under the quota.
+
+Usage:
+    uv run python benchmarks/bench_embedding.py --texts 5000 --latency 0.2 \
+        --concurrency 1 2 4 8 --server-tpm 2000000
+
+No database or network access is needed.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain_openai import OpenAIEmbeddings
+
+from langconnect.embeddings import EmbeddingScheduler, estimate_tokens
+
+TEXT = "The quick brown fox jumps over the lazy dog while embeddings are computed. "
+
+
+class FakeAPI(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float, tokens_per_minute: float) -> None:
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.latency = latency
+        self.tokens_per_minute = tokens_per_minute
+        self.lock = threading.Lock()
+        self.window: deque[tuple[float, int]] = deque()
+
+    def admit(self, tokens: int) -> bool:
+        """Sliding one-minute token quota."""
+        if not self.tokens_per_minute:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            while self.window and self.window[0][0] < now - 60:
+                self.window.popleft()
+            if sum(t for _, t in self.window) + tokens > self.tokens_per_minute:
+                return False
+            self.window.append((now, tokens))
+            return True
+
+
+class Handler(BaseHTTPRequestHandler):
+    server: FakeAPI
+
+    def log_message(self, format, *args) -> None:  # noqa: A002
+        pass
+
+    def do_POST(self) -> None:  # noqa: N802
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        texts = body["input"]
+        time.sleep(self.server.latency)
+        if not self.server.admit(sum(estimate_tokens(t) for t in texts)):
+            self._send(429, {"error": {"message": "Rate limit reached"}}, "1")
+            return
+        data = [
+            {"object": "embedding", "index": i, "embedding": [0.0] * 8}
+            for i in range(len(texts))
+        ]
+        self._send(200, {"object": "list", "data": data, "model": body["model"]})
+
+    def _send(self, status: int, payload: dict, retry_after: str = "") -> None:
+        content = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        if retry_after:
+            self.send_header("Retry-After", retry_after)
+        self.end_headers()
+        self.wfile.write(content)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--batch-tokens", type=int, default=50000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--server-tpm", type=float, default=0)
+    parser.add_argument("--client-tpm", type=float, default=0)
+    args = parser.parse_args()
+    # Keep the per-request logs of the HTTP client out of the report.
+    logging.getLogger().setLevel(logging.WARNING)
+
+    texts = [f"{n} {TEXT * (1 + n % 8)}" for n in range(args.texts)]
+    print(f"{len(texts)} texts, ~{sum(map(estimate_tokens, texts))} tokens")
+    print(
+        f"{'concurrency':>11} {'seconds':>9} {'texts/s':>9} "
+        f"{'requests':>9} {'429s':>6}"
+    )
+    for concurrency in args.concurrency:
+        api = FakeAPI(args.latency, args.server_tpm)
+        thread = threading.Thread(target=api.serve_forever, daemon=True)
+        thread.start()
+        scheduler = EmbeddingScheduler(
+            OpenAIEmbeddings(
+                model="text-embedding-3-small",
+                api_key="benchmark",
+                base_url=f"http://127.0.0.1:{api.server_address[1]}/v1",
+                max_retries=0,
+                check_embedding_ctx_length=False,
+            ),
+            max_batch_tokens=args.batch_tokens,
+            max_batch_size=args.batch_size,
+            concurrency=concurrency,
+            tokens_per_minute=args.client_tpm,
+            max_retries=20,
+        )
+        try:
+            start = time.perf_counter()
+            await scheduler.embed(texts)
+            elapsed = time.perf_counter() - start
+        finally:
+            api.shutdown()
+            api.server_close()
+        stats = scheduler.stats()
+        print(
+            f"{concurrency:>11} {elapsed:>9.2f} {len(texts) / elapsed:>9.0f} "
+            f"{stats['requests']:>9} {stats['rate_limited']:>6}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""Benchmark keyword search with and without the stored tsvector column.
+
+Builds a synthetic collection (1M chunks by default) directly in SQL, then times
+the previous query, which tokenizes ``document`` with ``to_tsvector`` per row,
+against the query over the GIN-indexed ``document_tsv`` column.
+
+Usage:
+    uv run python benchmarks/bench_keyword_search.py --rows 1000000 --repeat 5
+
+Requires a reachable PostgreSQL configured through the usual POSTGRES_* variables.
+Run the server once (or ``CollectionsManager.setup()``) so migrations are applied.
+The synthetic collection is deleted afterwards unless ``--keep`` is given.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+from langconnect.database.connection import close_db_pool, get_db_connection
+from langconnect.database.migrations import run_migrations
+
+VOCABULARY = (
+    "vector index query postgres latency throughput embedding chunk document "
+    "collection search keyword hybrid ranking token parser memory cache worker "
+    "ingest batch cursor pagination filter metadata owner file upload stream "
+    "security vulnerability verification scanner report network kernel driver"
+).split()
+
+QUERIES = ["vector latency", "vulnerability scanner", "cursor pagination", "kernel"]
+
+OLD_QUERY = """
+    SELECT e.id, ts_rank(to_tsvector('english', e.document),
+                         plainto_tsquery('english', $1)) AS score
+      FROM langchain_pg_embedding e
+     WHERE e.collection_id = $2
+       AND to_tsvector('english', e.document) @@ plainto_tsquery('english', $1)
+     ORDER BY score DESC
+     LIMIT 10
+"""
+
+NEW_QUERY = """
+    SELECT e.id, ts_rank(e.document_tsv, plainto_tsquery('english', $1)) AS score
+      FROM langchain_pg_embedding e
+     WHERE e.collection_id = $2
+       AND e.document_tsv @@ plainto_tsquery('english', $1)
+     ORDER BY score DESC
+     LIMIT 10
+"""
+
+
+async def _create_collection(rows: int) -> str:
+    collection_uuid = str(uuid.uuid4())
+    async with get_db_connection() as conn:
+        await conn.execute(
+            "INSERT INTO langchain_pg_collection (uuid, name, cmetadata) "
+            "VALUES ($1, $2, $3::json)",
+            collection_uuid,
+            f"tbl_bench_{uuid.uuid4().hex}",
+            json.dumps({"name": "keyword benchmark", "owner_id": "benchmark"}),
+        )
+        start = time.perf_counter()
+        # 40 random words per chunk. The inner query references the outer row
+        # so Postgres evaluates it per row instead of once.
+        await conn.execute(
+            """
+            INSERT INTO langchain_pg_embedding (id, collection_id, document, cmetadata)
+            SELECT gen_random_uuid()::text,
+                   $1,
+                   (SELECT string_agg(($2::text[])[1 + floor(random() * $3)::int], ' ')
+                      FROM generate_series(1, 40) w
+                     WHERE w > g - g),
+                   jsonb_build_object('file_id', 'file_' || (g / 50))
+              FROM generate_series(1, $4) g
+            """,
+            collection_uuid,
+            VOCABULARY,
+            len(VOCABULARY),
+            rows,
+        )
+        await conn.execute("ANALYZE langchain_pg_embedding")
+    print(f"inserted {rows} chunks in {time.perf_counter() - start:.1f}s")
+    return collection_uuid
+
+
+async def _time_query(sql: str, collection_uuid: str, repeat: int) -> list[float]:
+    timings = []
+    async with get_db_connection() as conn:
+        for _ in range(repeat):
+            for query in QUERIES:
+                start = time.perf_counter()
+                await conn.fetch(sql, query, collection_uuid)
+                timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    await run_migrations()
+    collection_uuid = await _create_collection(args.rows)
+    try:
+        for label, sql in (("to_tsvector per row", OLD_QUERY), ("document_tsv", NEW_QUERY)):
+            timings = await _time_query(sql, collection_uuid, args.repeat)
+            print(
+                f"{label:<20} mean={statistics.mean(timings):9.1f} ms  "
+                f"p50={statistics.median(timings):9.1f} ms  max={max(timings):9.1f} ms"
+            )
+    finally:
+        if not args.keep:
+            async with get_db_connection() as conn:
+                await conn.execute(
+                    "DELETE FROM langchain_pg_collection WHERE uuid = $1",
+                    collection_uuid,
+                )
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
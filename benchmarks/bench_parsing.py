@@ -0,0 +1,154 @@
+"""Benchmark document parsing throughput against the number of parser processes.
+
+Parses and chunks a batch of mixed PDF and DOCX files concurrently through
+``ParserPool`` (as one ingestion job does) for each worker count, and reports
+files/s and MB/s. PDFs are split into slices of ``--pages-per-task`` pages.
+A worker count of 0 parses in threads of the current process, i.e. the
+throughput without a process pool.
+
+Usage:
+    uv run python benchmarks/bench_parsing.py --pdfs 8 --pages 100 --docx 8 \
+        --workers 0 1 2 4 8
+    uv run python benchmarks/bench_parsing.py --files docs/*.pdf docs/*.docx
+
+Without ``--files`` a synthetic batch is generated. No database is needed.
+"""
+
+import argparse
+import asyncio
+import io
+import mimetypes
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from langconnect.services.parser_pool import ParserPool
+
+DOCX_MIMETYPE = (
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+)
+LINE = "The quick brown fox jumps over the lazy dog while parsers count pages."
+
+
+def _make_pdf(pages: int, lines_per_page: int = 40) -> bytes:
+    """A minimal text-only PDF with the given number of pages."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b""]
+    kids = []
+    for page in range(pages):
+        text = "".join(
+            f"({LINE} {page}.{n}) Tj T* " for n in range(lines_per_page)
+        )
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {text}ET".encode()
+        content_num = len(objects) + 2
+        kids.append(f"{len(objects) + 1} 0 R")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Contents {content_num} 0 R "
+            f"/Resources << /Font << /F1 {{font}} 0 R >> >> >>".encode()
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+    font_num = len(objects) + 1
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+    objects = [obj.replace(b"{font}", str(font_num).encode()) for obj in objects]
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for num, obj in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (num, obj))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(
+        b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+        % (len(objects) + 1, xref)
+    )
+    return out.getvalue()
+
+
+def _make_docx(paragraphs: int) -> bytes:
+    import docx
+
+    document = docx.Document()
+    for n in range(paragraphs):
+        document.add_paragraph(f"{LINE} {n}")
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def _load_files(
+    args: argparse.Namespace, directory: str
+) -> list[tuple[str, str, str]]:
+    """(filename, content type, path) of the files to parse."""
+    if args.files:
+        return [
+            (
+                path.name,
+                mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+                str(path),
+            )
+            for path in map(Path, args.files)
+        ]
+    files = []
+    for suffix, content_type, count, contents in (
+        (".pdf", "application/pdf", args.pdfs, lambda: _make_pdf(args.pages)),
+        (".docx", DOCX_MIMETYPE, args.docx, lambda: _make_docx(args.pages * 40)),
+    ):
+        if not count:
+            continue
+        path = os.path.join(directory, f"bench{suffix}")
+        Path(path).write_bytes(contents())
+        files += [(f"bench_{n}{suffix}", content_type, path) for n in range(count)]
+    return files
+
+
+async def _run(pool: ParserPool, files: list[tuple[str, str, str]]) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[
+            pool.process(path, filename=filename, content_type=content_type)
+            for filename, content_type, path in files
+        ]
+    )
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", nargs="*", help="Parse these files instead.")
+    parser.add_argument("--pdfs", type=int, default=8)
+    parser.add_argument("--docx", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--pages-per-task", type=int, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = _load_files(args, directory)
+        megabytes = sum(os.path.getsize(path) for _, _, path in files) / 2**20
+        print(f"{len(files)} files, {megabytes:.1f} MB")
+        print(f"{'workers':>8} {'seconds':>9} {'files/s':>9} {'MB/s':>8}")
+        for workers in args.workers:
+            pool = ParserPool(workers, pages_per_task=args.pages_per_task)
+            try:
+                if workers:
+                    # Start the processes outside of the measurement.
+                    await _run(pool, files[:1] * workers)
+                elapsed = await _run(pool, files)
+            finally:
+                pool.shutdown()
+            print(
+                f"{workers:>8} {elapsed:>9.2f} {len(files) / elapsed:>9.2f} "
+                f"{megabytes / elapsed:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
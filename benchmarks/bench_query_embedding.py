@@ -0,0 +1,90 @@
+"""Benchmark search query embedding latency with the query embedding cache.
+
+Replays ``--searches`` searches whose queries are drawn from ``--distinct``
+queries with a Zipf-like popularity (as repeated UI searches and multi-query
+agents produce), ``--concurrency`` at a time, against a simulated model that
+takes ``--latency`` seconds per request. Reports model calls and the p50/p95
+latency of obtaining the query embedding, embedding every query directly and
+through ``QueryEmbeddingCache``.
+
+Usage:
+    uv run python benchmarks/bench_query_embedding.py --searches 2000 \
+        --distinct 200 --concurrency 20 --latency 0.15
+
+No database is needed.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from langconnect.embeddings import QueryEmbeddingCache
+
+
+class SimulatedEmbeddings(DeterministicFakeEmbedding):
+    """Deterministic embeddings with the latency of a remote model."""
+
+    latency: float = 0.15
+    calls: int = 0
+
+    async def aembed_query(self, text: str) -> list[float]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self.embed_query(text)
+
+
+async def _replay(embed, queries: list[str], concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def search(query: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await embed(query)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*[search(query) for query in queries])
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--searches", type=int, default=2000)
+    parser.add_argument("--distinct", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.15)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    weights = [1 / rank for rank in range(1, args.distinct + 1)]
+    queries = [
+        f"query number {n}"
+        for n in rng.choices(range(args.distinct), weights, k=args.searches)
+    ]
+
+    print(f"{args.searches} searches over {args.distinct} distinct queries")
+    print(f"{'mode':<8} {'calls':>7} {'p50 ms':>8} {'p95 ms':>8} {'seconds':>8}")
+    for mode in ("direct", "cached"):
+        embeddings = SimulatedEmbeddings(size=1536, latency=args.latency)
+        embed = (
+            embeddings.aembed_query
+            if mode == "direct"
+            else QueryEmbeddingCache(embeddings).embed
+        )
+        start = time.perf_counter()
+        latencies = await _replay(embed, queries, args.concurrency)
+        elapsed = time.perf_counter() - start
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(
+            f"{mode:<8} {embeddings.calls:>7} "
+            f"{statistics.median(latencies) * 1000:>8.1f} {p95 * 1000:>8.1f} "
+            f"{elapsed:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+"""Benchmark re-ingesting the same chunks with the embedding cache.
+
+Upserts ``--chunks`` synthetic chunks into a collection, then upserts the same
+texts again into a second collection (a re-upload), through ``Collection.upsert``.
+Embeddings come from a simulated model that takes ``--latency`` seconds per
+request. For each pass the benchmark reports the wall time, the texts and
+estimated tokens sent to the model, their cost at ``--price`` dollars per
+million tokens (text-embedding-3-small by default) and the cache hit ratio.
+``--restart`` clears the in-memory LRU between passes, so hits come from
+Postgres as they would in a new process.
+
+Usage:
+    uv run python benchmarks/bench_reingest.py --chunks 5000 --latency 0.3
+
+Requires a reachable PostgreSQL configured through the usual POSTGRES_* variables.
+The synthetic collections are deleted afterwards; cached embeddings of the
+simulated model are kept.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from langconnect import config
+from langconnect.database.collections import Collection, CollectionsManager
+from langconnect.database.connection import close_db_pool
+from langconnect.embeddings import EmbeddingCache, embedding_cache, estimate_tokens
+
+OWNER_ID = "benchmark"
+TEXT = "Chunks of re-uploaded files are embedded again unless the cache has them. "
+
+
+class SimulatedEmbeddings(DeterministicFakeEmbedding):
+    """Deterministic embeddings with the latency of a remote model."""
+
+    model: str = "benchmark-simulated"
+    latency: float = 0.3
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        await asyncio.sleep(self.latency)
+        return self.embed_documents(texts)
+
+
+async def _ingest(
+    cache: EmbeddingCache, documents: list[Document], price: float
+) -> None:
+    collection = await CollectionsManager(OWNER_ID).create(
+        f"reingest benchmark {uuid.uuid4().hex[:8]}"
+    )
+    cache.reset_stats()
+    requests_before = cache.scheduler.requests
+    tokens_before = cache.scheduler.tokens
+    start = time.perf_counter()
+    try:
+        await Collection(collection["uuid"], OWNER_ID).upsert(documents)
+        elapsed = time.perf_counter() - start
+    finally:
+        await CollectionsManager(OWNER_ID).delete(collection["uuid"])
+    stats = cache.stats()
+    tokens = cache.scheduler.tokens - tokens_before
+    print(
+        f"{elapsed:>9.2f} {stats['embedded']:>9} "
+        f"{cache.scheduler.requests - requests_before:>9} {tokens:>10} "
+        f"{tokens * price / 1e6:>9.4f} {stats['hit_ratio']:>7.1%}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--price", type=float, default=0.02)
+    parser.add_argument("--restart", action="store_true")
+    args = parser.parse_args()
+
+    config.DEFAULT_EMBEDDINGS = SimulatedEmbeddings(
+        size=config.EMBEDDING_DIMENSIONS, latency=args.latency
+    )
+    # Texts unique to this run, so the first pass starts with a cold cache.
+    run = uuid.uuid4().hex
+    documents = [
+        Document(page_content=f"{run} {n} {TEXT * (1 + n % 8)}")
+        for n in range(args.chunks)
+    ]
+    print(
+        f"{len(documents)} chunks, "
+        f"~{sum(estimate_tokens(d.page_content) for d in documents)} tokens"
+    )
+
+    await CollectionsManager.setup()
+    print(
+        f"{'pass':<10} {'seconds':>9} {'embedded':>9} {'requests':>9} "
+        f"{'tokens':>10} {'cost $':>9} {'hits':>7}"
+    )
+    try:
+        print(f"{'first':<10}", end=" ")
+        await _ingest(embedding_cache, documents, args.price)
+        if args.restart:
+            embedding_cache._memory.clear()
+        print(f"{'re-ingest':<10}", end=" ")
+        await _ingest(embedding_cache, documents, args.price)
+    finally:
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+"""Benchmark memory used to accept and ingest a batch of large uploads.
+
+Posts ``--files`` text files of ``--size-mb`` MB each to
+``POST /collections/{id}/documents`` through the ASGI app (files are streamed
+from disk by the client), then downloads and parses every queued file as an
+ingestion worker does, without embedding. Reports the peak of Python memory
+allocations (tracemalloc) in each phase next to the size of the batch: with
+uploads spooled to disk and stored part by part, the peaks stay a small
+fraction of the batch instead of a multiple of it. Allocations in parser worker
+processes are not traced; run with PARSER_PROCESSES=0 to include them.
+
+Usage:
+    uv run python benchmarks/bench_upload_memory.py --files 20 --size-mb 20
+
+Requires a reachable PostgreSQL configured through the usual POSTGRES_* variables.
+The synthetic collection and its job are deleted afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+
+from langconnect import config
+from langconnect.auth import AuthenticatedUser, resolve_user
+from langconnect.database import jobs
+from langconnect.database.connection import close_db_pool, get_db_connection
+from langconnect.database.migrations import run_migrations
+from langconnect.server import APP
+from langconnect.services.ingestion import _parse_file
+
+OWNER_ID = "benchmark"
+LINE = b"The quick brown fox jumps over the lazy dog. " * 20 + b"\n"
+
+
+def _make_files(directory: str, count: int, size_mb: float) -> list[str]:
+    paths = []
+    lines = int(size_mb * 2**20 / len(LINE))
+    for n in range(count):
+        path = os.path.join(directory, f"bench_{n}.txt")
+        with open(path, "wb") as f:
+            for _ in range(lines):
+                f.write(LINE)
+        paths.append(path)
+    return paths
+
+
+async def _create_collection() -> str:
+    collection_uuid = str(uuid.uuid4())
+    async with get_db_connection() as conn:
+        await conn.execute(
+            "INSERT INTO langchain_pg_collection (uuid, name, cmetadata) "
+            "VALUES ($1, $2, $3::json)",
+            collection_uuid,
+            f"tbl_bench_{uuid.uuid4().hex}",
+            json.dumps({"name": "upload benchmark", "owner_id": OWNER_ID}),
+        )
+    return collection_uuid
+
+
+def _peak_mb() -> float:
+    return tracemalloc.get_traced_memory()[1] / 2**20
+
+
+async def _upload(collection_uuid: str, paths: list[str]) -> str:
+    APP.dependency_overrides[resolve_user] = lambda: AuthenticatedUser(
+        OWNER_ID, OWNER_ID
+    )
+    handles = [open(path, "rb") for path in paths]
+    try:
+        transport = ASGITransport(app=APP)
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.post(
+                f"/collections/{collection_uuid}/documents",
+                files=[
+                    ("files", (os.path.basename(h.name), h, "text/plain"))
+                    for h in handles
+                ],
+                data={"enable_chunking": "false"},
+            )
+    finally:
+        for handle in handles:
+            handle.close()
+        APP.dependency_overrides.clear()
+    response.raise_for_status()
+    return response.json()["job_id"]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--size-mb", type=float, default=20)
+    args = parser.parse_args()
+    if args.size_mb * 2**20 > config.MAX_UPLOAD_FILE_SIZE:
+        parser.error("--size-mb exceeds MAX_UPLOAD_FILE_SIZE")
+    if args.files * args.size_mb * 2**20 > config.MAX_UPLOAD_REQUEST_SIZE:
+        parser.error("the batch exceeds MAX_UPLOAD_REQUEST_SIZE")
+
+    await run_migrations()
+    collection_uuid = await _create_collection()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = _make_files(directory, args.files, args.size_mb)
+            batch_mb = sum(os.path.getsize(p) for p in paths) / 2**20
+            print(f"{args.files} files, {batch_mb:.0f} MB")
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            job_id = await _upload(collection_uuid, paths)
+            print(
+                f"upload:  {time.perf_counter() - start:6.1f}s  "
+                f"peak {_peak_mb():7.1f} MB ({_peak_mb() / batch_mb:.2f}x batch)"
+            )
+
+            tracemalloc.reset_peak()
+            start = time.perf_counter()
+            params = {"chunk_size": 1000, "chunk_overlap": 0, "enable_chunking": False}
+            for position in await jobs.pending_file_positions(job_id):
+                _, documents = await _parse_file(job_id, position, params)
+                if isinstance(documents, Exception):
+                    raise documents
+                del documents
+            print(
+                f"parse:   {time.perf_counter() - start:6.1f}s  "
+                f"peak {_peak_mb():7.1f} MB ({_peak_mb() / batch_mb:.2f}x batch)"
+            )
+            tracemalloc.stop()
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"max RSS: {max_rss:.0f} MB")
+    finally:
+        async with get_db_connection() as conn:
+            await conn.execute(
+                "DELETE FROM langchain_pg_collection WHERE uuid = $1",
+                collection_uuid,
+            )
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""Benchmark the per-search cost of obtaining a PGVector store.
+
+Compares the previous behaviour (a new SQLAlchemy engine and PGVector per call)
+with the shared engine and LRU registry in ``langconnect.database.connection``.
+
+Usage:
+    uv run python benchmarks/bench_vectorstore_registry.py --iterations 50
+
+Requires a reachable PostgreSQL configured through the usual POSTGRES_* variables.
+No embeddings are computed, so any non-empty OPENAI_API_KEY will do.
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+
+from langchain_postgres.vectorstores import PGVector
+
+from langconnect import config
+from langconnect.database.connection import (
+    clear_vectorstores,
+    get_vectorstore,
+    get_vectorstore_engine,
+)
+
+
+def _uncached(table_id: str) -> PGVector:
+    """Previous code path: fresh engine and fresh PGVector on every call."""
+    return PGVector(
+        embeddings=config.DEFAULT_EMBEDDINGS,
+        collection_name=table_id,
+        connection=get_vectorstore_engine(),
+        use_jsonb=True,
+    )
+
+
+def _timed(fn, iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<22} mean={statistics.mean(timings):8.3f} ms  "
+        f"p50={statistics.median(timings):8.3f} ms  p95={p95:8.3f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    table_id = f"tbl_bench_{uuid.uuid4().hex}"
+    # Create the collection once so both paths measure lookups, not creation.
+    store = get_vectorstore(table_id)
+
+    try:
+        before = _timed(lambda: _uncached(table_id), args.iterations)
+        after = _timed(lambda: get_vectorstore(table_id), args.iterations)
+    finally:
+        store.delete_collection()
+        clear_vectorstores()
+
+    _report("per-call construction", before)
+    _report("shared registry", after)
+    print(
+        f"speedup: {statistics.mean(before) / max(statistics.mean(after), 1e-9):.0f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Administrative commands for a LangConnect database.
+
+Usage:
+    langconnect-admin index status [--collection UUID]
+    langconnect-admin index create [--collection UUID] [--method hnsw|ivfflat]
+                                   [--m 16] [--ef-construction 64] [--lists 100]
+    langconnect-admin index rebuild ...   (same options as create)
+    langconnect-admin index drop [--collection UUID]
+    langconnect-admin ingest-worker [--workers N]
+
+Without ``--collection`` the commands act on the index covering all
+collections. ``status`` without ``--collection`` lists every managed index.
+``ingest-worker`` processes queued document ingestion jobs until interrupted,
+for deployments that run ingestion apart from the API servers.
+Connection settings come from the usual POSTGRES_* variables.
+"""
+
+import argparse
+import asyncio
+import json
+import signal
+import sys
+
+from fastapi.exceptions import HTTPException
+
+from langconnect import config
+from langconnect.database.connection import close_db_pool
+from langconnect.database.indexes import (
+    AnnIndexParams,
+    build_ann_index,
+    drop_ann_index,
+    get_ann_index_status,
+    list_ann_indexes,
+)
+from langconnect.database.migrations import run_migrations
+from langconnect.services.ingestion import IngestWorkerPool
+from langconnect.services.parser_pool import parser_pool
+
+PROGRESS_INTERVAL_SECONDS = 5.0
+
+
+def _print(value) -> None:
+    print(json.dumps(value, indent=2, default=str))
+
+
+async def _report_progress(collection_id: str | None) -> None:
+    while True:
+        await asyncio.sleep(PROGRESS_INTERVAL_SECONDS)
+        progress = (await get_ann_index_status(collection_id))["progress"]
+        if progress:
+            done, total = progress["blocks_done"], progress["blocks_total"]
+            if not total:
+                done, total = progress["tuples_done"], progress["tuples_total"]
+            percent = f" {100 * done / total:.1f}%" if total else ""
+            print(f"{progress['phase']}{percent}", file=sys.stderr)
+
+
+async def _index(args: argparse.Namespace) -> int:
+    await run_migrations()
+    if args.action == "status":
+        if args.collection:
+            _print(await get_ann_index_status(args.collection))
+        else:
+            _print(await list_ann_indexes())
+        return 0
+
+    if args.action == "drop":
+        if not await drop_ann_index(args.collection):
+            print("No such index.", file=sys.stderr)
+            return 1
+        return 0
+
+    # create / rebuild: build_ann_index rebuilds an existing index in place.
+    status = await get_ann_index_status(args.collection)
+    if args.action == "create" and status["state"] == "ready":
+        print(f"Index {status['name']} already exists; use 'rebuild'.", file=sys.stderr)
+        return 1
+    params = AnnIndexParams(
+        method=args.method,
+        m=args.m,
+        ef_construction=args.ef_construction,
+        lists=args.lists,
+    )
+    reporter = asyncio.create_task(_report_progress(args.collection))
+    try:
+        await build_ann_index(args.collection, params)
+    finally:
+        reporter.cancel()
+    _print(await get_ann_index_status(args.collection))
+    return 0
+
+
+async def _ingest_worker(args: argparse.Namespace) -> int:
+    await run_migrations()
+    pool = IngestWorkerPool(args.workers, config.INGEST_POLL_INTERVAL_SECONDS)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    pool.start()
+    await stop.wait()
+    print("Stopping workers...", file=sys.stderr)
+    await pool.stop()
+    await asyncio.to_thread(parser_pool.shutdown)
+    return 0
+
+
+async def _run(args: argparse.Namespace) -> int:
+    try:
+        if args.command == "ingest-worker":
+            return await _ingest_worker(args)
+        return await _index(args)
+    except (HTTPException, ValueError) as e:
+        print(getattr(e, "detail", None) or str(e), file=sys.stderr)
+        return 1
+    finally:
+        await close_db_pool()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point of the ``langconnect-admin`` command."""
+    parser = argparse.ArgumentParser(
+        prog="langconnect-admin",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    index = commands.add_parser("index", help="Manage ANN (HNSW/IVFFlat) indexes.")
+    index.add_argument("action", choices=["status", "create", "rebuild", "drop"])
+    index.add_argument(
+        "--collection", help="Collection UUID for a partial index (default: all)."
+    )
+    index.add_argument("--method", choices=["hnsw", "ivfflat"], default="hnsw")
+    index.add_argument("--m", type=int, default=16)
+    index.add_argument("--ef-construction", type=int, default=64)
+    index.add_argument("--lists", type=int, default=100)
+
+    worker = commands.add_parser(
+        "ingest-worker", help="Process queued document ingestion jobs."
+    )
+    worker.add_argument(
+        "--workers",
+        type=int,
+        default=max(config.INGEST_WORKERS, 1),
+        help="Jobs processed concurrently (default: INGEST_WORKERS).",
+    )
+
+    args = parser.parse_args(argv)
+    sys.exit(asyncio.run(_run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from langconnect.api.auth import router as auth_router
 from langconnect.api.collections import router as collections_router
 from langconnect.api.documents import router as documents_router
+from langconnect.api.jobs import router as jobs_router
 
-__all__ = ["auth_router", "collections_router", "documents_router"]
+__all__ = ["auth_router", "collections_router", "documents_router", "jobs_router"]
@@ -3,14 +3,17 @@
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel, EmailStr
 from supabase import create_client
 
 from langconnect import config
-from langconnect.auth import resolve_user
+from langconnect.auth import USER_CACHE, resolve_user
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+optional_security = HTTPBearer(auto_error=False)
+
 
 class SignUpRequest(BaseModel):
     """Sign up request model."""
@@ -123,15 +126,20 @@ async def sign_in(request: SignInRequest) -> AuthResponse:
 
 
 @router.post("/signout")
-async def sign_out() -> dict[str, str]:
+async def sign_out(
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_security),
+) -> dict[str, str]:
     """Sign out the current user.
 
     Note: This endpoint is mainly for client-side cleanup.
-    The actual token invalidation happens on the Supabase side.
+    The actual token invalidation happens on the Supabase side. If a bearer
+    token is sent, it is also evicted from the server-side user cache.
 
     Returns:
         Success message
     """
+    if credentials is not None and credentials.credentials:
+        USER_CACHE.invalidate(credentials.credentials)
     return {"message": "Successfully signed out"}
 
 
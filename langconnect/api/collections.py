@@ -5,7 +5,19 @@ from fastapi import APIRouter, Depends, HTTPException, status
 
 from langconnect.auth import AuthenticatedUser, resolve_user
 from langconnect.database.collections import CollectionsManager
-from langconnect.models import CollectionCreate, CollectionResponse, CollectionUpdate
+from langconnect.database.indexes import (
+    AnnIndexParams,
+    drop_ann_index,
+    get_ann_index_status,
+    start_ann_index_build,
+)
+from langconnect.models import (
+    CollectionCreate,
+    CollectionResponse,
+    CollectionUpdate,
+    VectorIndexCreate,
+    VectorIndexStatus,
+)
 
 router = APIRouter(prefix="/collections", tags=["collections"])
 
@@ -81,3 +93,59 @@ async def collections_update(
         )
 
     return CollectionResponse(**updated_collection)
+
+
+async def _ensure_owned(user: AuthenticatedUser, collection_id: UUID) -> None:
+    if not await CollectionsManager(user.identity).get(str(collection_id)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Collection '{collection_id}' not found",
+        )
+
+
+@router.get("/{collection_id}/index", response_model=VectorIndexStatus)
+async def collections_index_get(
+    user: Annotated[AuthenticatedUser, Depends(resolve_user)],
+    collection_id: UUID,
+):
+    """Reports the state and build progress of the collection's ANN index."""
+    await _ensure_owned(user, collection_id)
+    return VectorIndexStatus(**await get_ann_index_status(str(collection_id)))
+
+
+@router.put(
+    "/{collection_id}/index",
+    response_model=VectorIndexStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def collections_index_build(
+    user: Annotated[AuthenticatedUser, Depends(resolve_user)],
+    collection_id: UUID,
+    index: VectorIndexCreate,
+):
+    """Builds or rebuilds an HNSW/IVFFlat index over the collection's embeddings.
+
+    The build runs in the background; poll GET on the same path for progress.
+    An existing index keeps serving searches until its replacement is ready.
+    """
+    await _ensure_owned(user, collection_id)
+    try:
+        params = AnnIndexParams(**index.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    start_ann_index_build(str(collection_id), params)
+    return VectorIndexStatus(**await get_ann_index_status(str(collection_id)))
+
+
+@router.delete("/{collection_id}/index", status_code=status.HTTP_204_NO_CONTENT)
+async def collections_index_drop(
+    user: Annotated[AuthenticatedUser, Depends(resolve_user)],
+    collection_id: UUID,
+):
+    """Drops the collection's ANN index; searches fall back to exact scans."""
+    await _ensure_owned(user, collection_id)
+    if not await drop_ann_index(str(collection_id)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Collection '{collection_id}' has no vector index",
+        )
@@ -1,26 +1,52 @@
 import logging
+import uuid
 from typing import Annotated, Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
-from langchain_core.documents import Document
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
 from pydantic import TypeAdapter, ValidationError
 
+from langconnect import config
 from langconnect.auth import AuthenticatedUser, resolve_user
-from langconnect.database.collections import Collection
+from langconnect.database.collections import Collection, CollectionsManager
+from langconnect.database.jobs import IngestJobsManager, get_job_chunk_ids
 from langconnect.models import (
+    BatchSearchQuery,
+    BatchSearchResult,
+    DocumentGroupPage,
+    DocumentPage,
     DocumentResponse,
+    FederatedSearchQuery,
+    FederatedSearchResult,
     SearchQuery,
     SearchResult,
     DocumentDelete,
+    DocumentMetadataUpdate,
+)
+from langconnect.services.ingestion import (
+    NO_DOCUMENTS_ERROR,
+    run_ingest_job,
+    worker_pool,
 )
-from langconnect.services import process_document
+from langconnect.uploads import upload_size
 
 # Create a TypeAdapter that enforces “list of dict”
 _metadata_adapter = TypeAdapter(list[dict[str, Any]])
 
 logger = logging.getLogger(__name__)
 
+MAX_FILE_SIZE = config.MAX_UPLOAD_FILE_SIZE
+
 router = APIRouter(tags=["documents"])
 
 
@@ -53,26 +79,75 @@ async def documents_bulk_delete(
     return {"success": True, "deleted_count": deleted_count}
 
 
-@router.post("/collections/{collection_id}/documents", response_model=dict[str, Any])
+@router.patch(
+    "/collections/{collection_id}/documents",
+    response_model=dict[str, Any],
+)
+async def documents_bulk_update_metadata(
+    user: Annotated[AuthenticatedUser, Depends(resolve_user)],
+    collection_id: UUID,
+    update_request: DocumentMetadataUpdate,
+):
+    """Merges a metadata patch into documents selected by IDs, file IDs or filter."""
+    collection = Collection(
+        collection_id=str(collection_id),
+        user_id=user.identity,
+    )
+
+    if (
+        not update_request.document_ids
+        and not update_request.file_ids
+        and not update_request.filter
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="Either document_ids, file_ids or filter must be provided.",
+        )
+    if not update_request.patch:
+        raise HTTPException(status_code=400, detail="patch must not be empty.")
+
+    updated_count = await collection.update_metadata(
+        update_request.patch,
+        document_ids=update_request.document_ids,
+        file_ids=update_request.file_ids,
+        filter=update_request.filter,
+    )
+    return {"success": True, "updated_count": updated_count}
+
+
+@router.post(
+    "/collections/{collection_id}/documents",
+    response_model=dict[str, Any],
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def documents_create(
     user: Annotated[AuthenticatedUser, Depends(resolve_user)],
     collection_id: UUID,
+    response: Response,
     files: list[UploadFile] = File(...),
     metadatas_json: str | None = Form(None),
     chunk_size: int = Form(1000),
     chunk_overlap: int = Form(200),
     enable_chunking: bool = Form(True),
+    wait: bool = Form(False),
 ):
-    """Processes and indexes (adds) new document files with optional metadata.
+    """Queues new document files with optional metadata for indexing.
+
+    The files are parsed, chunked, embedded and stored by a background worker.
+    The response (202) carries the job id; poll
+    ``/collections/{collection_id}/jobs/{job_id}`` for status and progress.
 
     Args:
         user: Authenticated user
         collection_id: UUID of the collection to add documents to
+        response: Used to answer 200 instead of 202 when ``wait`` is set
         files: List of files to upload
         metadatas_json: JSON string containing metadata for each file
         chunk_size: Maximum number of characters in each chunk (default: 1000)
         chunk_overlap: Number of overlapping characters between chunks (default: 200)
         enable_chunking: Whether to split documents into chunks (default: True)
+        wait: Process the files within the request and answer with the added
+            chunk ids (200), as before jobs existed (default: False)
     """
     # If no metadata JSON is provided, fill with None
     if not metadatas_json:
@@ -95,122 +170,133 @@ async def documents_create(
                 ),
             )
 
-    docs_to_index: list[Document] = []
-    processed_files_count = 0
+    files_to_queue: list[dict[str, Any]] = []
     failed_files = []
 
     # Pair files with their corresponding metadata
     for file, metadata in zip(files, metadatas, strict=False):
-        try:
-            # Check file size (limit to 50MB)
-            file_size = 0
-            file_content = await file.read()
-            file_size = len(file_content)
-
-            if file_size > 50 * 1024 * 1024:  # 50MB limit
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"File {file.filename} is too large ({file_size / 1024 / 1024:.1f}MB). Maximum size is 50MB.",
-                )
-
-            # Reset file position for processing
-            await file.seek(0)
-
-            # Pass metadata and chunk parameters to process_document
-            langchain_docs = await process_document(
-                file,
-                metadata=metadata,
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-                enable_chunking=enable_chunking,
+        # The upload was spooled while the request was parsed; it is copied
+        # into the job part by part rather than read into memory here.
+        file_size = upload_size(file)
+        if file_size > MAX_FILE_SIZE:
+            logger.error(
+                f"File {file.filename} is too large ({file_size / 1024 / 1024:.1f}MB). "
+                f"Maximum size is {MAX_FILE_SIZE / 1024 / 1024:.0f}MB."
             )
-            if langchain_docs:
-                docs_to_index.extend(langchain_docs)
-                processed_files_count += 1
-            else:
-                logger.info(
-                    f"Warning: File {file.filename} resulted "
-                    f"in no processable documents."
-                )
-                # Decide if this constitutes a failure
-                # failed_files.append(file.filename)
-
-        except Exception as proc_exc:
-            # Log the error and the file that caused it
-            logger.error(f"Error processing file {file.filename}: {proc_exc}")
-            logger.error(f"Error type: {type(proc_exc).__name__}")
-            logger.error(f"Error details: {str(proc_exc)}")
             failed_files.append(file.filename)
-            # Decide on behavior: continue processing others or fail fast?
-            # For now, let's collect failures and report them, but continue processing.
+            continue
+        files_to_queue.append(
+            {
+                "filename": file.filename,
+                "content_type": file.content_type,
+                "metadata": metadata,
+                "file": file,
+            }
+        )
 
-    # If after processing all files, none yielded documents, raise error
-    if not docs_to_index:
+    if not files_to_queue:
         error_detail = "Failed to process any documents from the provided files."
         if failed_files:
             error_detail += f" Files that failed processing: {', '.join(failed_files)}."
         raise HTTPException(status_code=400, detail=error_detail)
 
-    # If some files failed but others succeeded, proceed with adding successful ones
-    # but maybe inform the user about the failures.
-    try:
-        collection = Collection(
-            collection_id=str(collection_id),
-            user_id=user.identity,
-        )
-        added_ids = await collection.upsert(docs_to_index)
-        if not added_ids:
-            # This might indicate a problem with the vector store itself
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to add document(s) to vector store after processing.",
-            )
+    jobs_manager = IngestJobsManager(user.identity)
+    params = {
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "enable_chunking": enable_chunking,
+    }
 
-        # Construct response message
-        success_message = (
-            f"{len(added_ids)} document chunk(s) from "
-            f"{processed_files_count} file(s) added successfully."
-        )
+    if not wait:
+        job = await jobs_manager.create(str(collection_id), files_to_queue, params)
+        worker_pool.notify()
         response_data = {
             "success": True,
-            "message": success_message,
-            "added_chunk_ids": added_ids,
+            "message": f"{len(files_to_queue)} file(s) queued for ingestion.",
+            "job_id": job["id"],
+            "status": job["status"],
+            "status_url": f"/collections/{collection_id}/jobs/{job['id']}",
         }
-
         if failed_files:
             response_data["warnings"] = (
                 f"Processing failed for files: {', '.join(failed_files)}"
             )
-            # Consider if partial success should change the overall status/message
-
         return response_data
 
-    except HTTPException as http_exc:
-        # Reraise HTTPExceptions from add_documents_to_vectorstore or previous checks
-        raise http_exc
-    except Exception as add_exc:
-        # Handle exceptions during the vector store addition process
-        logger.info(f"Error adding documents to vector store: {add_exc}")
+    # Synchronous mode: run the job here rather than in a worker, with a
+    # single attempt so that errors are reported in this response.
+    worker_id = f"request:{uuid.uuid4()}"
+    job = await jobs_manager.create(
+        str(collection_id),
+        files_to_queue,
+        params,
+        max_attempts=1,
+        claimed_by=worker_id,
+    )
+    await run_ingest_job(job, worker_id)
+    job = await jobs_manager.get(str(collection_id), job["id"])
+    failed_files.extend(job["failed_files"])
+
+    if job["status"] != "succeeded":
+        if job["error"] == NO_DOCUMENTS_ERROR:
+            error_detail = NO_DOCUMENTS_ERROR
+            if failed_files:
+                error_detail += (
+                    f" Files that failed processing: {', '.join(failed_files)}."
+                )
+            raise HTTPException(status_code=400, detail=error_detail)
+        logger.info(f"Error adding documents to vector store: {job['error']}")
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to add documents to vector store: {add_exc!s}",
+            detail=f"Failed to add documents to vector store: {job['error']}",
+        )
+
+    added_ids = await get_job_chunk_ids(job["id"])
+    processed_files_count = job["files_done"] - len(job["failed_files"])
+    response.status_code = status.HTTP_200_OK
+    response_data = {
+        "success": True,
+        "message": (
+            f"{len(added_ids)} document chunk(s) from "
+            f"{processed_files_count} file(s) added successfully."
+        ),
+        "added_chunk_ids": added_ids,
+        "job_id": job["id"],
+    }
+    if failed_files:
+        response_data["warnings"] = (
+            f"Processing failed for files: {', '.join(failed_files)}"
         )
+    return response_data
+
+
+CURSOR_DESCRIPTION = (
+    "Opaque cursor for keyset pagination. Pass an empty value for the first "
+    "page, then the returned next_cursor. With a cursor the response is a page "
+    "object and offset is ignored; without one, a plain list paged by offset "
+    "is returned for compatibility."
+)
 
 
 @router.get(
-    "/collections/{collection_id}/documents", response_model=list[DocumentResponse]
+    "/collections/{collection_id}/documents",
+    response_model=list[DocumentResponse] | DocumentPage,
 )
 async def documents_list(
     user: Annotated[AuthenticatedUser, Depends(resolve_user)],
     collection_id: UUID,
     limit: int = Query(10, ge=1, le=3000),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
 ):
     """Lists documents within a specific collection."""
     collection = Collection(
         collection_id=str(collection_id),
         user_id=user.identity,
     )
+    if cursor is not None:
+        items, next_cursor = await collection.list_page(limit=limit, cursor=cursor)
+        return DocumentPage(items=items, next_cursor=next_cursor)
     return await collection.list(limit=limit, offset=offset)
 
 
@@ -248,6 +334,34 @@ async def documents_delete(
     return {"success": True}
 
 
+@router.post("/collections/search", response_model=list[FederatedSearchResult])
+async def collections_search(
+    user: Annotated[AuthenticatedUser, Depends(resolve_user)],
+    search_query: FederatedSearchQuery,
+):
+    """Search several collections, or all owned ones, with one ranked result list."""
+    if not search_query.query:
+        raise HTTPException(status_code=400, detail="Search query cannot be empty")
+
+    collection_ids = None
+    if search_query.collection_ids is not None:
+        collection_ids = [str(c) for c in search_query.collection_ids]
+
+    return await CollectionsManager(user.identity).search(
+        search_query.query,
+        collection_ids=collection_ids,
+        limit=search_query.limit or 10,
+        search_type=search_query.search_type,
+        filter=search_query.filter,
+        fusion=search_query.fusion,
+        semantic_weight=search_query.semantic_weight,
+        keyword_weight=search_query.keyword_weight,
+        rrf_k=search_query.rrf_k,
+        ef_search=search_query.ef_search,
+        probes=search_query.probes,
+    )
+
+
 @router.post(
     "/collections/{collection_id}/documents/search", response_model=list[SearchResult]
 )
@@ -270,38 +384,72 @@ async def documents_search(
         limit=search_query.limit or 10,
         search_type=search_query.search_type,
         filter=search_query.filter,
+        fusion=search_query.fusion,
+        semantic_weight=search_query.semantic_weight,
+        keyword_weight=search_query.keyword_weight,
+        rrf_k=search_query.rrf_k,
+        ef_search=search_query.ef_search,
+        probes=search_query.probes,
     )
     return results
 
 
+@router.post(
+    "/collections/{collection_id}/documents/search/batch",
+    response_model=BatchSearchResult,
+)
+async def documents_search_batch(
+    user: Annotated[AuthenticatedUser, Depends(resolve_user)],
+    collection_id: UUID,
+    search_query: BatchSearchQuery,
+):
+    """Run several searches within a collection in one request."""
+    if not all(search_query.queries):
+        raise HTTPException(status_code=400, detail="Search queries cannot be empty")
+
+    collection = Collection(
+        collection_id=str(collection_id),
+        user_id=user.identity,
+    )
+
+    results, fused = await collection.search_batch(
+        search_query.queries,
+        limit=search_query.limit or 10,
+        search_type=search_query.search_type,
+        filter=search_query.filter,
+        fusion=search_query.fusion,
+        semantic_weight=search_query.semantic_weight,
+        keyword_weight=search_query.keyword_weight,
+        rrf_k=search_query.rrf_k,
+        ef_search=search_query.ef_search,
+        probes=search_query.probes,
+        fuse=search_query.fuse,
+    )
+    return BatchSearchResult(results=results, fused=fused)
+
+
 @router.get(
-    "/collections/{collection_id}/document-groups", response_model=list[dict[str, Any]]
+    "/collections/{collection_id}/document-groups",
+    response_model=list[dict[str, Any]] | DocumentGroupPage,
 )
 async def document_groups_list(
     user: Annotated[AuthenticatedUser, Depends(resolve_user)],
     collection_id: UUID,
     limit: int = Query(20, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
 ):
-    """Lists document groups (original files) within a specific collection, aggregated by file_id."""
-    try:
-        logger.info(
-            f"Document groups request - collection_id: {collection_id}, user_id: {user.identity}, limit: {limit}, offset: {offset}"
-        )
-
-        collection = Collection(
-            collection_id=str(collection_id),
-            user_id=user.identity,
+    """Lists document groups (original files) within a collection, by file_id."""
+    collection = Collection(
+        collection_id=str(collection_id),
+        user_id=user.identity,
+    )
+    if cursor is not None:
+        items, next_cursor = await collection.document_groups_page(
+            limit=limit, cursor=cursor
         )
-
-        result = await collection.aggregate_document_groups(limit=limit, offset=offset)
-        logger.info(f"Document groups result count: {len(result)}")
-        return result
-
-    except Exception as e:
-        logger.error(f"Error in document_groups_list: {type(e).__name__}: {str(e)}")
-        logger.error(f"Error details: {e.__dict__}")
-        raise
+        return DocumentGroupPage(items=items, next_cursor=next_cursor)
+    return await collection.aggregate_document_groups(limit=limit, offset=offset)
 
 
 @router.patch("/collections/{collection_id}/documents/{document_id}/verification")
@@ -0,0 +1,75 @@
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, status
+
+from langconnect.auth import AuthenticatedUser, resolve_user
+from langconnect.database.jobs import IngestJobsManager
+from langconnect.models import IngestJobResponse
+from langconnect.services.ingestion import worker_pool
+
+router = APIRouter(tags=["jobs"])
+
+
+@router.get(
+    "/collections/{collection_id}/jobs", response_model=list[IngestJobResponse]
+)
+async def jobs_list(
+    user: Annotated[AuthenticatedUser, Depends(resolve_user)],
+    collection_id: UUID,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """Lists the ingestion jobs of a collection, most recent first."""
+    jobs = await IngestJobsManager(user.identity).list(
+        str(collection_id), limit=limit, offset=offset
+    )
+    return [IngestJobResponse(**job) for job in jobs]
+
+
+@router.get(
+    "/collections/{collection_id}/jobs/{job_id}", response_model=IngestJobResponse
+)
+async def jobs_get(
+    user: Annotated[AuthenticatedUser, Depends(resolve_user)],
+    collection_id: UUID,
+    job_id: UUID,
+):
+    """Retrieves the status and progress of an ingestion job."""
+    job = await IngestJobsManager(user.identity).get(str(collection_id), str(job_id))
+    return IngestJobResponse(**job)
+
+
+@router.post(
+    "/collections/{collection_id}/jobs/{job_id}/cancel",
+    response_model=IngestJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def jobs_cancel(
+    user: Annotated[AuthenticatedUser, Depends(resolve_user)],
+    collection_id: UUID,
+    job_id: UUID,
+):
+    """Cancels a queued job, or stops a running job before its next file."""
+    job = await IngestJobsManager(user.identity).cancel(
+        str(collection_id), str(job_id)
+    )
+    return IngestJobResponse(**job)
+
+
+@router.post(
+    "/collections/{collection_id}/jobs/{job_id}/retry",
+    response_model=IngestJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def jobs_retry(
+    user: Annotated[AuthenticatedUser, Depends(resolve_user)],
+    collection_id: UUID,
+    job_id: UUID,
+):
+    """Queues a failed job again for the files it has not ingested yet."""
+    job = await IngestJobsManager(user.identity).retry(
+        str(collection_id), str(job_id)
+    )
+    worker_pool.notify()
+    return IngestJobResponse(**job)
@@ -1,7 +1,13 @@
 """Auth to resolve user object."""
 
-from typing import Annotated
+import hashlib
+import threading
+import time
+from collections.abc import Callable
+from typing import Annotated, Any
 
+import httpx
+import jwt
 from fastapi import Depends
 from fastapi.exceptions import HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -10,6 +16,7 @@ from starlette.authentication import BaseUser
 from supabase import create_client
 
 from langconnect import config
+from langconnect.cache import CacheBackend, TTLCache, get_shared_backend
 
 security = HTTPBearer()
 
@@ -73,6 +80,282 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Asymmetric algorithms Supabase may use for JWKS-published signing keys.
+_JWKS_ALGORITHMS = {"RS256", "ES256", "EdDSA"}
+# Minimum delay between JWKS re-fetches triggered by an unknown key id, so a
+# stream of forged tokens cannot turn into a stream of JWKS requests.
+_JWKS_MIN_REFETCH_SECONDS = 30.0
+
+
+def _fetch_jwks(url: str) -> dict[str, Any]:
+    """Download a JWKS document."""
+    response = httpx.get(url, timeout=5.0)
+    response.raise_for_status()
+    return response.json()
+
+
+class SigningKeyCache:
+    """In-process cache of the Supabase JWKS, refreshed periodically.
+
+    Keys are re-fetched once ``refresh_seconds`` have passed, or early (rate
+    limited) when a token references a key id the cache does not know, which
+    is what happens right after Supabase rotates its signing key.
+
+    Only one thread downloads the JWKS at a time, and never under the lock.
+    Expired keys are refreshed in the background while requests keep using
+    them; an unknown key id is fetched by the request that needs it, while
+    other requests go on with the cached keys. Requests only wait for the
+    very first download.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        refresh_seconds: float,
+        fetch: Callable[[str], dict[str, Any]] = _fetch_jwks,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            jwks_url: URL of the JWKS document.
+            refresh_seconds: Maximum age of the cached keys.
+            fetch: Function downloading the JWKS; replaceable in tests.
+        """
+        self.jwks_url = jwks_url
+        self.refresh_seconds = refresh_seconds
+        self._fetch = fetch
+        # Replaced as a whole on refresh, never modified in place.
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at: float | None = None
+        self._refreshing = False
+        self._loaded = threading.Event()
+        self._lock = threading.Lock()
+
+    def get(self, kid: str | None) -> jwt.PyJWK | None:
+        """Return the signing key for ``kid``, or None if it is unknown."""
+        with self._lock:
+            keys = self._keys
+            now = time.monotonic()
+            expired = (
+                self._fetched_at is None
+                or now - self._fetched_at >= self.refresh_seconds
+            )
+            unknown = kid not in keys and (
+                self._fetched_at is None
+                or now - self._fetched_at >= _JWKS_MIN_REFETCH_SECONDS
+            )
+            refresh = (expired or unknown) and not self._refreshing
+            if refresh:
+                # Recorded now, and even if the download fails, so that an
+                # unreachable JWKS endpoint is not hammered on every request.
+                self._fetched_at = now
+                self._refreshing = True
+
+        if refresh and (unknown or not self._loaded.is_set()):
+            self._refresh()
+            keys = self._keys
+        elif refresh:
+            threading.Thread(target=self._refresh, daemon=True).start()
+        elif not self._loaded.is_set():
+            self._loaded.wait()
+            keys = self._keys
+        return keys.get(kid)
+
+    def _refresh(self) -> None:
+        try:
+            self._load()
+        finally:
+            with self._lock:
+                self._refreshing = False
+            self._loaded.set()
+
+    def _load(self) -> None:
+        try:
+            jwks = self._fetch(self.jwks_url)
+        except Exception as e:
+            logger.warning(f"Could not refresh JWKS from {self.jwks_url}: {e}")
+            return
+
+        keys = {}
+        for key_data in jwks.get("keys", []):
+            try:
+                key = jwt.PyJWK(key_data)
+            except jwt.PyJWTError as e:
+                logger.warning(f"Skipping unusable JWKS key: {e}")
+                continue
+            if key.key_id:
+                keys[key.key_id] = key
+        self._keys = keys
+        logger.info(f"Loaded {len(keys)} signing key(s) from JWKS.")
+
+
+_signing_key_cache: SigningKeyCache | None = None
+
+
+def get_signing_key_cache() -> SigningKeyCache | None:
+    """Return the process-wide JWKS cache, or None if no JWKS is configured."""
+    global _signing_key_cache
+    if _signing_key_cache is None and config.SUPABASE_JWKS_URL:
+        _signing_key_cache = SigningKeyCache(
+            config.SUPABASE_JWKS_URL, config.JWKS_REFRESH_SECONDS
+        )
+    return _signing_key_cache
+
+
+def verify_token_locally(token: str) -> AuthenticatedUser | None:
+    """Verify a Supabase access token without calling Supabase.
+
+    Checks the signature against the configured signing secret (HS256) or the
+    cached JWKS (asymmetric keys), plus expiry and audience. Revoked sessions
+    stay valid until the token expires, as with any stateless JWT check.
+
+    Returns:
+        The authenticated user, or None if no local key can verify the token
+        and the caller should fall back to the remote check.
+
+    Raises:
+        HTTPException: With status code 401 if the token is malformed, expired
+            or its signature does not match a known key.
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    algorithm = header.get("alg")
+    if algorithm == "HS256":
+        if not config.SUPABASE_JWT_SIGNING_SECRET:
+            return None
+        key: Any = config.SUPABASE_JWT_SIGNING_SECRET
+    elif algorithm in _JWKS_ALGORITHMS:
+        cache = get_signing_key_cache()
+        signing_key = cache.get(header.get("kid")) if cache else None
+        if signing_key is None:
+            return None
+        if signing_key.algorithm_name != algorithm:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        key = signing_key.key
+    else:
+        return None
+
+    try:
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=config.SUPABASE_JWT_AUDIENCE,
+            options={"require": ["exp", "sub"]},
+        )
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token has expired")
+    except jwt.PyJWTError as e:
+        logger.info(f"Local token verification failed: {e}")
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user_metadata = claims.get("user_metadata") or {}
+    return AuthenticatedUser(claims["sub"], user_metadata.get("name", "User"))
+
+
+def _token_key(token: str) -> str:
+    """Cache key for a bearer token; the raw token is never stored."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _token_expiry(token: str) -> float | None:
+    """Read ``exp`` from an already verified token."""
+    try:
+        claims = jwt.decode(token, options={"verify_signature": False})
+    except jwt.PyJWTError:
+        return None
+    exp = claims.get("exp")
+    return float(exp) if isinstance(exp, int | float) else None
+
+
+class UserCache:
+    """Cache of resolved users keyed by a SHA-256 hash of the bearer token.
+
+    An in-process TTL/LRU cache sits in front of an optional shared backend.
+    Entries expire at the configured TTL or at the token's ``exp``, whichever
+    comes first. Tokens without ``exp`` are never cached.
+    """
+
+    def __init__(self, local: TTLCache, shared: CacheBackend | None = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            local: In-process cache consulted first.
+            shared: Optional backend shared between workers.
+        """
+        self.local = local
+        self.shared = shared
+        self.shared_hits = 0
+
+    def get(self, token: str) -> AuthenticatedUser | None:
+        """Return the cached user for ``token``, if any."""
+        key = _token_key(token)
+        user = self.local.get(key)
+        if user is not None or self.shared is None:
+            return user
+
+        try:
+            data = self.shared.get(key)
+        except Exception as e:
+            logger.warning(f"Shared auth cache lookup failed: {e}")
+            return None
+        if not data:
+            return None
+        ttl = min(self.local.ttl, data["expires_at"] - time.time())
+        if ttl <= 0:
+            return None
+        user = AuthenticatedUser(data["user_id"], data["display_name"])
+        self.local.set(key, user, ttl)
+        self.shared_hits += 1
+        return user
+
+    def set(self, token: str, user: AuthenticatedUser) -> None:
+        """Cache ``user`` for ``token`` until the TTL or the token expires."""
+        expires_at = _token_expiry(token)
+        if expires_at is None:
+            return
+        ttl = min(self.local.ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+        key = _token_key(token)
+        self.local.set(key, user, ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(
+                    key,
+                    {
+                        "user_id": user.identity,
+                        "display_name": user.display_name,
+                        "expires_at": expires_at,
+                    },
+                    ttl,
+                )
+            except Exception as e:
+                logger.warning(f"Shared auth cache update failed: {e}")
+
+    def invalidate(self, token: str) -> None:
+        """Forget the user cached for ``token``."""
+        key = _token_key(token)
+        self.local.delete(key)
+        if self.shared is not None:
+            try:
+                self.shared.delete(key)
+            except Exception as e:
+                logger.warning(f"Shared auth cache invalidation failed: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters of the cache."""
+        return {**self.local.stats(), "shared_hits": self.shared_hits}
+
+
+USER_CACHE = UserCache(
+    TTLCache(config.AUTH_CACHE_MAXSIZE, config.AUTH_CACHE_TTL_SECONDS),
+    get_shared_backend(config.CACHE_REDIS_URL, "langconnect:auth:"),
+)
+
 
 def resolve_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
@@ -96,9 +379,22 @@ def resolve_user(
             status_code=401, detail="Invalid credentials or user not found"
         )
 
+    cached_user = USER_CACHE.get(credentials.credentials)
+    if cached_user is not None:
+        return cached_user
+
+    user = verify_token_locally(credentials.credentials)
+    if user is None:
+        user = _resolve_user_remotely(credentials.credentials)
+    USER_CACHE.set(credentials.credentials, user)
+    return user
+
+
+def _resolve_user_remotely(token: str) -> AuthenticatedUser:
+    """Resolve the user by asking Supabase to validate the token."""
     logger.info("Attempting to get current user from Supabase")
     try:
-        user = get_current_user(credentials.credentials)
+        user = get_current_user(token)
         logger.info(f"User resolved successfully: {user.id}")
         return AuthenticatedUser(user.id, user.user_metadata.get("name", "User"))
     except Exception as e:
@@ -0,0 +1,211 @@
+"""Small in-process caches with optional shared backends, and call coalescing."""
+
+import asyncio
+import copy
+import json
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Protocol, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CacheBackend(Protocol):
+    """A shared key/value store, e.g. Redis, used behind an in-process cache.
+
+    Values are JSON-serializable; implementations handle their own encoding.
+    """
+
+    def get(self, key: str) -> Any | None:
+        """Return the value for ``key`` or None if missing or expired."""
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+
+    def delete(self, key: str) -> None:
+        """Remove ``key`` if present."""
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a TTL."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries before the least recently used
+                one is evicted.
+            ttl: Default time-to-live of an entry, in seconds.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        """Store a value, optionally with a TTL shorter or longer than the default."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored entries, including expired ones."""
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls into one.
+
+    While a call for a key is running, callers with the same key await its
+    result instead of starting their own; nothing is kept once it completes.
+    Keys are tuples whose first item is a scope: ``forget`` detaches the running
+    calls of a scope, so that callers arriving after a write start a new call
+    rather than joining one that started before the write.
+
+    Every caller gets its own deep copy of the result, so one caller modifying
+    what it got cannot change what the others see.
+    """
+
+    def __init__(self) -> None:
+        """Initialize with no calls in flight."""
+        self._calls: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[tuple[Hashable, ...], asyncio.Future]
+        ] = weakref.WeakKeyDictionary()
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(
+        self, key: tuple[Hashable, ...], call: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Return the result of ``call()``, shared with concurrent calls of ``key``."""
+        calls = self._calls.setdefault(asyncio.get_running_loop(), {})
+        future = calls.get(key)
+        if future is None:
+            future = calls[key] = asyncio.ensure_future(call())
+            future.add_done_callback(lambda done: self._done(calls, key, done))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        # A cancelled caller must not cancel the call others wait on.
+        return copy.deepcopy(await asyncio.shield(future))
+
+    @staticmethod
+    def _done(
+        calls: dict[tuple[Hashable, ...], asyncio.Future],
+        key: tuple[Hashable, ...],
+        future: asyncio.Future,
+    ) -> None:
+        if calls.get(key) is future:
+            del calls[key]
+        if not future.cancelled():
+            # Retrieved here in case every caller was cancelled.
+            future.exception()
+
+    def forget(self, scope: Hashable) -> None:
+        """Let later callers of keys in ``scope`` start new calls.
+
+        Running calls are not cancelled; their current callers still get their
+        results.
+        """
+        for calls in self._calls.values():
+            for key in [key for key in calls if key[0] == scope]:
+                del calls[key]
+
+    def stats(self) -> dict[str, Any]:
+        """Return the number of calls made and of callers that joined one."""
+        return {"calls": self.calls, "coalesced": self.coalesced}
+
+
+class RedisCacheBackend:
+    """Shared cache backend on Redis. Requires the optional ``redis`` package."""
+
+    def __init__(self, url: str, prefix: str) -> None:
+        """Connect to Redis.
+
+        Args:
+            url: Redis connection URL, e.g. ``redis://localhost:6379/0``.
+            prefix: Namespace prepended to every key.
+        """
+        import redis
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Any | None:
+        """Return the decoded value for ``key`` or None."""
+        raw = self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a JSON-encoded value that expires after ``ttl`` seconds."""
+        self._client.set(
+            self.prefix + key, json.dumps(value), px=max(int(ttl * 1000), 1)
+        )
+
+    def delete(self, key: str) -> None:
+        """Remove ``key``."""
+        self._client.delete(self.prefix + key)
+
+
+def get_shared_backend(url: str, prefix: str) -> CacheBackend | None:
+    """Create the shared backend for ``url``, or None if unset or unavailable."""
+    if not url:
+        return None
+    try:
+        return RedisCacheBackend(url, prefix)
+    except ImportError:
+        logger.warning(
+            "A shared cache URL is configured but the 'redis' package is not "
+            "installed. Falling back to in-process caching only."
+        )
+        return None
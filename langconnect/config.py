@@ -1,4 +1,5 @@
 import json
+import os
 
 from langchain_core.embeddings import Embeddings
 from starlette.config import Config, undefined
@@ -14,6 +15,31 @@ else:
     SUPABASE_URL = env("SUPABASE_URL", cast=str, default=undefined)
     SUPABASE_KEY = env("SUPABASE_KEY", cast=str, default=undefined)
 
+# Local JWT verification. Tokens signed with HS256 are checked against the
+# project's JWT signing secret (not to be confused with SUPABASE_JWT_SECRET,
+# which the MCP servers use to hold a user's access token). Tokens signed with
+# asymmetric keys are checked against the project's JWKS. Tokens that cannot be
+# verified locally fall back to a remote check against Supabase.
+SUPABASE_JWT_SIGNING_SECRET = env("SUPABASE_JWT_SIGNING_SECRET", cast=str, default="")
+SUPABASE_JWKS_URL = env(
+    "SUPABASE_JWKS_URL",
+    cast=str,
+    default=(
+        f"{SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json"
+        if SUPABASE_URL
+        else ""
+    ),
+)
+SUPABASE_JWT_AUDIENCE = env("SUPABASE_JWT_AUDIENCE", cast=str, default="authenticated")
+JWKS_REFRESH_SECONDS = env("JWKS_REFRESH_SECONDS", cast=int, default="600")
+
+# Resolved users are cached by token hash. Entries never outlive the token's
+# own expiry. CACHE_REDIS_URL optionally shares caches across workers
+# (requires the 'redis' package).
+AUTH_CACHE_MAXSIZE = env("AUTH_CACHE_MAXSIZE", cast=int, default="10000")
+AUTH_CACHE_TTL_SECONDS = env("AUTH_CACHE_TTL_SECONDS", cast=float, default="300")
+CACHE_REDIS_URL = env("CACHE_REDIS_URL", cast=str, default="")
+
 
 def get_embeddings() -> Embeddings:
     """Get the embeddings instance based on the environment."""
@@ -25,6 +51,45 @@ def get_embeddings() -> Embeddings:
 DEFAULT_EMBEDDINGS = get_embeddings()
 DEFAULT_COLLECTION_NAME = "default_collection"
 
+# Dimension of DEFAULT_EMBEDDINGS. ANN indexes need a fixed dimension, so
+# embeddings are indexed and searched as vector(EMBEDDING_DIMENSIONS).
+EMBEDDING_DIMENSIONS = env("EMBEDDING_DIMENSIONS", cast=int, default="1536")
+# Optional maintenance_work_mem for ANN index builds, e.g. "2GB". HNSW builds
+# are much faster when the graph fits in memory.
+ANN_INDEX_MAINTENANCE_WORK_MEM = env(
+    "ANN_INDEX_MAINTENANCE_WORK_MEM", cast=str, default=""
+)
+
+# Documents are embedded in batches of at most EMBEDDING_BATCH_SIZE texts and
+# EMBEDDING_BATCH_TOKENS (estimated) tokens, EMBEDDING_CONCURRENCY requests at a
+# time per process. Set the quotas of the embeddings API to pace requests up
+# front (0 = unpaced); rate-limit responses are backed off from either way.
+EMBEDDING_BATCH_SIZE = env("EMBEDDING_BATCH_SIZE", cast=int, default="256")
+EMBEDDING_BATCH_TOKENS = env("EMBEDDING_BATCH_TOKENS", cast=int, default="50000")
+EMBEDDING_CONCURRENCY = env("EMBEDDING_CONCURRENCY", cast=int, default="4")
+EMBEDDING_REQUESTS_PER_MINUTE = env(
+    "EMBEDDING_REQUESTS_PER_MINUTE", cast=float, default="0"
+)
+EMBEDDING_TOKENS_PER_MINUTE = env(
+    "EMBEDDING_TOKENS_PER_MINUTE", cast=float, default="0"
+)
+EMBEDDING_MAX_RETRIES = env("EMBEDDING_MAX_RETRIES", cast=int, default="6")
+# Embeddings of chunk texts are cached in Postgres by model and content hash, so
+# re-ingested text is not embedded again. The most recent
+# EMBEDDING_CACHE_MEMORY_SIZE of them are also kept in memory.
+EMBEDDING_CACHE_ENABLED = env("EMBEDDING_CACHE_ENABLED", cast=bool, default="true")
+EMBEDDING_CACHE_MEMORY_SIZE = env(
+    "EMBEDDING_CACHE_MEMORY_SIZE", cast=int, default="2000"
+)
+# Recent search query embeddings, reused by repeated searches.
+QUERY_EMBEDDING_CACHE_SIZE = env("QUERY_EMBEDDING_CACHE_SIZE", cast=int, default="1000")
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = env(
+    "QUERY_EMBEDDING_CACHE_TTL_SECONDS", cast=float, default="3600"
+)
+# Recent search results (0 disables). Writes to a collection invalidate its
+# cached results, so the TTL only bounds how long unused entries are kept.
+SEARCH_CACHE_SIZE = env("SEARCH_CACHE_SIZE", cast=int, default="1000")
+SEARCH_CACHE_TTL_SECONDS = env("SEARCH_CACHE_TTL_SECONDS", cast=float, default="600")
 
 # Database configuration
 POSTGRES_HOST = env("POSTGRES_HOST", cast=str, default="localhost")
@@ -33,6 +98,66 @@ POSTGRES_USER = env("POSTGRES_USER", cast=str, default="langchain")
 POSTGRES_PASSWORD = env("POSTGRES_PASSWORD", cast=str, default="langchain")
 POSTGRES_DB = env("POSTGRES_DB", cast=str, default="langchain_test")
 
+# Upserts of at least COPY_UPSERT_THRESHOLD chunks are written with binary COPY,
+# COPY_BATCH_SIZE rows at a time (0 disables COPY).
+COPY_UPSERT_THRESHOLD = env("COPY_UPSERT_THRESHOLD", cast=int, default="1000")
+COPY_BATCH_SIZE = env("COPY_BATCH_SIZE", cast=int, default="5000")
+
+# Maximum number of PGVector instances kept in the process-wide registry
+VECTORSTORE_CACHE_SIZE = env("VECTORSTORE_CACHE_SIZE", cast=int, default="256")
+
+# Upload limits, in bytes. Multipart requests are rejected as soon as their body
+# exceeds MAX_UPLOAD_REQUEST_SIZE; larger files are streamed to disk while the
+# request is parsed, and files over MAX_UPLOAD_FILE_SIZE are skipped.
+MAX_UPLOAD_FILE_SIZE = env(
+    "MAX_UPLOAD_FILE_SIZE", cast=int, default=str(50 * 1024 * 1024)
+)
+MAX_UPLOAD_REQUEST_SIZE = env(
+    "MAX_UPLOAD_REQUEST_SIZE", cast=int, default=str(500 * 1024 * 1024)
+)
+
+# Background ingestion. Uploads are queued as jobs in the database and processed
+# by INGEST_WORKERS tasks per server process (0 disables the in-process workers,
+# e.g. when running `langconnect-admin ingest-worker` separately).
+INGEST_WORKERS = env("INGEST_WORKERS", cast=int, default="2")
+INGEST_MAX_ATTEMPTS = env("INGEST_MAX_ATTEMPTS", cast=int, default="3")
+INGEST_RETRY_BACKOFF_SECONDS = env(
+    "INGEST_RETRY_BACKOFF_SECONDS", cast=float, default="5"
+)
+INGEST_POLL_INTERVAL_SECONDS = env(
+    "INGEST_POLL_INTERVAL_SECONDS", cast=float, default="2"
+)
+# A running job without a heartbeat for this long is handed to another worker.
+INGEST_JOB_STALE_SECONDS = env("INGEST_JOB_STALE_SECONDS", cast=float, default="300")
+# Files of a job that are downloaded, parsed or waiting to be stored at once
+# (0 = as many as there are parser processes).
+INGEST_FILES_IN_FLIGHT = env("INGEST_FILES_IN_FLIGHT", cast=int, default="0")
+
+# Collection counters (documents, chunks, bytes, last update) are kept as
+# per-write deltas, folded every COLLECTION_STATS_COMPACT_INTERVAL_SECONDS by each
+# server process (0 disables the in-process compaction). In the "approximate"
+# COLLECTION_STATS_MODE, listing collections reads the folded counters only,
+# which may lag writes by about one interval; "exact" also sums the pending
+# deltas.
+COLLECTION_STATS_MODE = env("COLLECTION_STATS_MODE", cast=str, default="exact")
+COLLECTION_STATS_COMPACT_INTERVAL_SECONDS = env(
+    "COLLECTION_STATS_COMPACT_INTERVAL_SECONDS", cast=float, default="30"
+)
+
+# Parsing runs in PARSER_PROCESSES worker processes (0 parses in threads of the
+# server process). PARSER_MIMETYPE_LIMITS caps concurrent parses per mime type,
+# as a JSON object, e.g. {"application/pdf": 2}.
+PARSER_PROCESSES = env(
+    "PARSER_PROCESSES", cast=int, default=str(min(4, os.cpu_count() or 1))
+)
+PARSER_MIMETYPE_LIMITS = json.loads(
+    env("PARSER_MIMETYPE_LIMITS", cast=str, default="") or "{}"
+)
+# Files a parser process handles before it is replaced (0 = never).
+PARSER_MAX_TASKS_PER_CHILD = env("PARSER_MAX_TASKS_PER_CHILD", cast=int, default="50")
+# PDFs are extracted in slices of this many pages, in parallel.
+PDF_PAGES_PER_TASK = env("PDF_PAGES_PER_TASK", cast=int, default="20")
+
 # Read allowed origins from environment variable
 ALLOW_ORIGINS_JSON = env("ALLOW_ORIGINS", cast=str, default="")
 
@@ -0,0 +1,150 @@
+"""Writers of chunk rows into ``langchain_pg_embedding``.
+
+Small upserts are sent as one INSERT ... SELECT ... ON CONFLICT over arrays of
+the rows, with vectors in pgvector's text format. Large ones are copied with
+binary COPY into a temporary staging table, ``batch_size`` rows at a time, with
+vectors in pgvector's binary format, and merged into the table with one
+INSERT ... SELECT ... ON CONFLICT. This avoids formatting and parsing the text
+of every vector.
+
+Either way an upsert is a single statement, so the statement triggers on the
+table run once for it: they lock the files it touches in one pass, in key
+order, and record one counter delta per collection.
+"""
+
+import struct
+from collections.abc import Sequence
+
+import asyncpg
+
+from langconnect import config
+
+# (id, collection_id, embedding, document, cmetadata as JSON text)
+EmbeddingRow = tuple[str, str, Sequence[float], str, str]
+
+_STAGING_TABLE = "langconnect_embedding_staging"
+_COLUMNS = ["id", "collection_id", "embedding", "document", "cmetadata"]
+
+_UPSERT_CONFLICT = """
+    ON CONFLICT (id) DO UPDATE
+       SET embedding = EXCLUDED.embedding,
+           document  = EXCLUDED.document,
+           cmetadata = EXCLUDED.cmetadata
+"""
+
+
+def to_pgvector(embedding: Sequence[float]) -> str:
+    """Encode an embedding in pgvector's text input format."""
+    return "[" + ",".join(str(float(x)) for x in embedding) + "]"
+
+
+def encode_vector(embedding: Sequence[float]) -> bytes:
+    """Encode an embedding in pgvector's binary format.
+
+    Dimensions (int16), an unused int16, then float4 values, all big-endian.
+    """
+    return struct.pack(f">HH{len(embedding)}f", len(embedding), 0, *embedding)
+
+
+def decode_vector(data: bytes) -> list[float]:
+    """Decode a vector in pgvector's binary format."""
+    dimensions, _ = struct.unpack_from(">HH", data)
+    return list(struct.unpack_from(f">{dimensions}f", data, 4))
+
+
+async def write_embeddings(
+    conn: asyncpg.Connection, rows: list[EmbeddingRow]
+) -> None:
+    """Upsert chunk rows, with COPY from ``config.COPY_UPSERT_THRESHOLD`` rows."""
+    threshold = config.COPY_UPSERT_THRESHOLD
+    if threshold > 0 and len(rows) >= threshold:
+        async with conn.transaction():
+            await copy_embeddings(conn, rows, batch_size=config.COPY_BATCH_SIZE)
+    else:
+        await insert_embeddings(conn, rows)
+
+
+async def insert_embeddings(
+    conn: asyncpg.Connection, rows: list[EmbeddingRow]
+) -> None:
+    """Upsert chunk rows with one INSERT over arrays of their columns.
+
+    When an ID appears more than once, the last row wins.
+    """
+    rows = list({row[0]: row for row in rows}.values())
+    if not rows:
+        return
+    await conn.execute(
+        f"""
+        INSERT INTO langchain_pg_embedding
+               (id, collection_id, embedding, document, cmetadata)
+        SELECT id, collection_id, embedding::vector, document, cmetadata::jsonb
+          FROM unnest($1::varchar[], $2::uuid[], $3::text[], $4::varchar[],
+                      $5::text[])
+               AS r (id, collection_id, embedding, document, cmetadata)
+         ORDER BY id
+        {_UPSERT_CONFLICT}
+        """,
+        [row[0] for row in rows],
+        [row[1] for row in rows],
+        [to_pgvector(row[2]) for row in rows],
+        [row[3] for row in rows],
+        [row[4] for row in rows],
+    )
+
+
+async def copy_embeddings(
+    conn: asyncpg.Connection, rows: list[EmbeddingRow], *, batch_size: int
+) -> None:
+    """Upsert chunk rows through binary COPY. Must run inside a transaction.
+
+    When an ID appears more than once, the last row wins, as with
+    ``insert_embeddings``.
+    """
+    rows = list({row[0]: row for row in rows}.values())
+    schema = await conn.fetchval(
+        """
+        SELECT n.nspname
+          FROM pg_type t
+          JOIN pg_namespace n ON n.oid = t.typnamespace
+         WHERE t.typname = 'vector'
+        """
+    )
+    await conn.execute(
+        f"""
+        CREATE TEMP TABLE IF NOT EXISTS {_STAGING_TABLE} (
+            id            varchar,
+            collection_id uuid,
+            embedding     "{schema}".vector,
+            document      varchar,
+            cmetadata     jsonb
+        ) ON COMMIT DELETE ROWS
+        """
+    )
+    # The codec is only registered for the COPY: other statements on this
+    # pooled connection pass vectors as text.
+    await conn.set_type_codec(
+        "vector",
+        schema=schema,
+        encoder=encode_vector,
+        decoder=decode_vector,
+        format="binary",
+    )
+    try:
+        for start in range(0, len(rows), max(batch_size, 1)):
+            await conn.copy_records_to_table(
+                _STAGING_TABLE,
+                records=rows[start : start + batch_size],
+                columns=_COLUMNS,
+            )
+    finally:
+        await conn.reset_type_codec("vector", schema=schema)
+    await conn.execute(
+        f"""
+        INSERT INTO langchain_pg_embedding ({", ".join(_COLUMNS)})
+        SELECT {", ".join(_COLUMNS)} FROM {_STAGING_TABLE}
+         ORDER BY id
+        {_UPSERT_CONFLICT}
+        """
+    )
+    await conn.execute(f"TRUNCATE {_STAGING_TABLE}")
@@ -8,20 +8,80 @@ The current implementations are based on langchain-postgres PGVector class.
 Replace with your own implementation or favorite vectorstore if needed.
 """
 
+import asyncio
 import builtins
+import datetime
+import functools
 import json
 import logging
 import uuid
 from typing import Any, Literal, NotRequired, Optional, TypedDict, List, Dict
 
+import asyncpg
 from fastapi import status
 from fastapi.exceptions import HTTPException
 from langchain_core.documents import Document
 
-from langconnect.database.connection import get_db_connection, get_vectorstore
+from langconnect import config
+from langconnect.cache import SingleFlight
+from langconnect.database.bulk import to_pgvector, write_embeddings
+from langconnect.database.connection import (
+    get_db_connection,
+    get_vectorstore,
+    invalidate_vectorstore,
+)
+from langconnect.database.filters import (
+    InvalidFilterError,
+    MetadataFilter,
+    compile_metadata_filter,
+)
+from langconnect.database.indexes import (
+    apply_search_settings,
+    disable_index_scans,
+    drop_ann_index,
+    vector_distance_sql,
+)
+from langconnect.database.migrations import run_migrations
+from langconnect.database.pagination import decode_cursor, encode_cursor
+from langconnect.database.search_cache import search_result_cache
+from langconnect.embeddings import embedding_cache, query_embedding_cache
 
 logger = logging.getLogger(__name__)
 
+# Reads in flight, shared by identical concurrent calls. Keys start with the
+# user ID, whose reads are detached by each of their writes.
+coalesced_reads = SingleFlight()
+
+
+def _coalesced(method):
+    """Let identical concurrent calls of a read method share one query."""
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        key = (
+            self.user_id,
+            method.__qualname__,
+            getattr(self, "collection_id", None),
+            args,
+            tuple(sorted(kwargs.items())),
+        )
+        return await coalesced_reads.do(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
+
+
+def _detaches_reads(method):
+    """Make reads started after a write method returns run a new query."""
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            coalesced_reads.forget(self.user_id)
+
+    return wrapper
+
 
 class CollectionDetails(TypedDict):
     """TypedDict for collection details."""
@@ -29,10 +89,67 @@ class CollectionDetails(TypedDict):
     uuid: str
     name: str
     metadata: dict[str, Any]
+    document_count: NotRequired[int]
+    chunk_count: NotRequired[int]
+    total_bytes: NotRequired[int]
+    last_updated: NotRequired[datetime.datetime | None]
+    # Bumped by every write to the chunks; versions cached search results.
+    generation: NotRequired[int]
     # Temporary field used internally to workaround an issue with PGVector
     table_id: NotRequired[str]
 
 
+# Score expressions for hybrid fusion over the ``semantic`` (s) and ``keyword``
+# (k) CTEs. $5/$6 are the semantic/keyword weights; each CTE also carries its
+# reciprocal-rank score computed with the RRF offset $7.
+_HYBRID_FUSION_SCORES = {
+    # Cosine similarity and max-normalized ts_rank, combined by weight.
+    "weighted": (
+        "$5::float8 * COALESCE(1 - s.distance, 0)"
+        " + $6::float8 * COALESCE(k.rank_score / NULLIF(k.max_rank_score, 0), 0)"
+    ),
+    # Reciprocal rank fusion: only positions matter, not raw scores.
+    "rrf": (
+        "$5::float8 * COALESCE(s.rrf_score, 0)"
+        " + $6::float8 * COALESCE(k.rrf_score, 0)"
+    ),
+}
+
+
+def _format_search_row(row: asyncpg.Record) -> dict[str, Any]:
+    """Convert a search result row into the API result shape."""
+    return {
+        "id": str(row["id"]),
+        "page_content": row["document"],
+        "metadata": json.loads(row["cmetadata"]) if row["cmetadata"] else {},
+        "score": float(row["score"]),
+        "collection_id": str(row["collection_id"]),
+    }
+
+
+def _collection_scope_sql(scope: str | list[str], param: str) -> str:
+    """SQL condition restricting chunks to one collection or to a list of them.
+
+    A single collection keeps a plain equality, which per-collection ANN indexes
+    (partial indexes on ``collection_id = ...``) can serve.
+    """
+    if isinstance(scope, str):
+        return f"e.collection_id = {param}"
+    return f"e.collection_id = ANY({param}::uuid[])"
+
+
+def _fuse_result_lists(
+    result_lists: list[list[dict[str, Any]]], *, limit: int, rrf_k: int
+) -> list[dict[str, Any]]:
+    """Merge ranked result lists by reciprocal rank fusion, one entry per chunk."""
+    fused: dict[str, dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            entry = fused.setdefault(result["id"], {**result, "score": 0.0})
+            entry["score"] += 1.0 / (rrf_k + rank)
+    return sorted(fused.values(), key=lambda r: r["score"], reverse=True)[:limit]
+
+
 class CollectionsManager:
     """Use to create, delete, update, and list document collections."""
 
@@ -47,25 +164,52 @@ class CollectionsManager:
         For example, it could run SQL migrations to create the necessary tables.
         """
         logger.info("Starting database initialization...")
-        get_vectorstore()
+        await asyncio.to_thread(get_vectorstore)
+        await run_migrations()
         logger.info("Database initialization complete.")
 
+    @_coalesced
     async def list(
         self,
     ) -> list[CollectionDetails]:
-        """List all collections owned by the given user, ordered by logical name."""
+        """List all collections owned by the given user, ordered by logical name.
+
+        Counts come from the per-collection counters rather than the chunks, so
+        this reads one row per collection (plus, in the exact stats mode, the
+        counter deltas not folded yet).
+        """
+        if config.COLLECTION_STATS_MODE == "approximate":
+            pending = """
+                SELECT NULL::bigint AS documents, NULL::bigint AS chunks,
+                       NULL::bigint AS bytes, NULL::timestamptz AS updated_at
+            """
+        else:
+            pending = """
+                SELECT SUM(d.documents) AS documents,
+                       SUM(d.chunks) AS chunks,
+                       SUM(d.bytes) AS bytes,
+                       MAX(d.updated_at) AS updated_at
+                  FROM langconnect_collection_stats_deltas d
+                 WHERE d.collection_id = c.uuid
+            """
         async with get_db_connection() as conn:
             records = await conn.fetch(
-                """
-                SELECT 
-                    c.uuid, 
+                f"""
+                SELECT
+                    c.uuid,
                     c.cmetadata,
-                    COUNT(DISTINCT e.cmetadata->>'file_id') AS document_count,
-                    COUNT(e.id) AS chunk_count
+                    COALESCE(s.document_count, 0) + COALESCE(p.documents, 0)
+                        AS document_count,
+                    COALESCE(s.chunk_count, 0) + COALESCE(p.chunks, 0)
+                        AS chunk_count,
+                    COALESCE(s.total_bytes, 0) + COALESCE(p.bytes, 0)
+                        AS total_bytes,
+                    GREATEST(s.last_updated, p.updated_at) AS last_updated
                 FROM langchain_pg_collection c
-                LEFT JOIN langchain_pg_embedding e ON c.uuid = e.collection_id
-                WHERE c.cmetadata->>'owner_id' = $1
-                GROUP BY c.uuid
+                LEFT JOIN langconnect_collection_stats s
+                       ON s.collection_id = c.uuid
+                LEFT JOIN LATERAL ({pending}) p ON true
+                WHERE c.owner_id = $1
                 ORDER BY c.cmetadata->>'name';
                 """,
                 self.user_id,
@@ -82,6 +226,8 @@ class CollectionsManager:
                     "metadata": metadata,
                     "document_count": r["document_count"],
                     "chunk_count": r["chunk_count"],
+                    "total_bytes": r["total_bytes"],
+                    "last_updated": r["last_updated"],
                 }
             )
         return result
@@ -90,14 +236,24 @@ class CollectionsManager:
         self,
         collection_id: str,
     ) -> CollectionDetails | None:
-        """Fetch a single collection by UUID, ensuring the user owns it."""
+        """Fetch a single collection by UUID, ensuring the user owns it.
+
+        Identical concurrent calls share one query.
+        """
+        return await coalesced_reads.do(
+            (self.user_id, "CollectionsManager.get", collection_id),
+            lambda: self._get(collection_id),
+        )
+
+    async def _get(self, collection_id: str) -> CollectionDetails | None:
+        """Fetch a single collection with a query of its own."""
         async with get_db_connection() as conn:
             rec = await conn.fetchrow(
                 """
-                SELECT uuid, name, cmetadata
+                SELECT uuid, name, cmetadata, generation
                   FROM langchain_pg_collection
                  WHERE uuid = $1
-                   AND cmetadata->>'owner_id' = $2;
+                   AND owner_id = $2;
                 """,
                 collection_id,
                 self.user_id,
@@ -113,8 +269,10 @@ class CollectionsManager:
             "name": name,
             "metadata": metadata,
             "table_id": rec["name"],
+            "generation": rec["generation"],
         }
 
+    @_detaches_reads
     async def create(
         self,
         collection_name: str,
@@ -138,8 +296,11 @@ class CollectionsManager:
         # Use hex string and prefix to avoid leading digits/hyphens
         table_id = f"tbl_{uuid.uuid4().hex}"
 
-        # triggers PGVector to create both the vectorstore and DB entry
-        get_vectorstore(table_id, collection_metadata=metadata)
+        # triggers PGVector to create both the vectorstore and DB entry.
+        # PGVector is synchronous, so keep it off the event loop.
+        await asyncio.to_thread(
+            get_vectorstore, table_id, collection_metadata=metadata
+        )
 
         # Fetch the newly created table.
         async with get_db_connection() as conn:
@@ -148,7 +309,7 @@ class CollectionsManager:
                 SELECT uuid, name, cmetadata
                   FROM langchain_pg_collection
                  WHERE name = $1
-                   AND cmetadata->>'owner_id' = $2;
+                   AND owner_id = $2;
                 """,
                 table_id,
                 self.user_id,
@@ -159,6 +320,7 @@ class CollectionsManager:
         name = metadata.pop("name")
         return {"uuid": str(rec["uuid"]), "name": name, "metadata": metadata}
 
+    @_detaches_reads
     async def update(
         self,
         collection_id: str,
@@ -208,7 +370,7 @@ class CollectionsManager:
                     UPDATE langchain_pg_collection
                        SET cmetadata = $1::jsonb
                      WHERE uuid = $2
-                       AND cmetadata->>'owner_id' = $3
+                       AND owner_id = $3
                     RETURNING uuid, cmetadata;
                     """,
                     metadata_json,
@@ -229,7 +391,7 @@ class CollectionsManager:
                              true
                            )
                      WHERE uuid = $2
-                       AND cmetadata->>'owner_id' = $3
+                       AND owner_id = $3
                     RETURNING uuid, cmetadata;
                     """,
                     name,
@@ -252,6 +414,7 @@ class CollectionsManager:
             "metadata": full_meta,
         }
 
+    @_detaches_reads
     async def delete(
         self,
         collection_id: str,
@@ -261,16 +424,94 @@ class CollectionsManager:
         Raises 404 if no such collection.
         """
         async with get_db_connection() as conn:
-            result = await conn.execute(
+            rows = await conn.fetch(
                 """
                 DELETE FROM langchain_pg_collection
                  WHERE uuid = $1
-                   AND cmetadata->>'owner_id' = $2;
+                   AND owner_id = $2
+                RETURNING name;
                 """,
                 collection_id,
                 self.user_id,
             )
-        return int(result.split()[-1])
+        for row in rows:
+            invalidate_vectorstore(row["name"])
+        if rows:
+            # A partial ANN index of the collection would only index nothing now.
+            await drop_ann_index(collection_id)
+        return len(rows)
+
+    async def search(
+        self,
+        query: str,
+        *,
+        collection_ids: Optional[builtins.list[str]] = None,
+        limit: int = 4,
+        search_type: Literal["semantic", "keyword", "hybrid"] = "semantic",
+        filter: Optional[dict[str, Any]] = None,
+        fusion: Literal["weighted", "rrf"] = "weighted",
+        semantic_weight: float = 0.7,
+        keyword_weight: float = 0.3,
+        rrf_k: int = 60,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+    ) -> builtins.list[dict[str, Any]]:
+        """Search several collections of the user at once.
+
+        The query is embedded once and searched with a single SQL statement
+        over ``collection_id = ANY(...)``, so results are ranked globally. A
+        per-collection ANN index cannot serve that statement; a global one can.
+        Other arguments are those of ``Collection.search``.
+
+        Args:
+            collection_ids: UUIDs of the collections to search, all of which
+                the user must own. Defaults to every collection of the user.
+
+        Returns:
+            Search results, each with the ``collection_id`` it was found in.
+        """
+        metadata_filter = Collection._compile_search(search_type, fusion, filter)
+        requested = None
+        if collection_ids is not None:
+            requested = {str(uuid.UUID(str(c))) for c in collection_ids}
+        async with get_db_connection() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT uuid
+                  FROM langchain_pg_collection
+                 WHERE owner_id = $1
+                   AND ($2::uuid[] IS NULL OR uuid = ANY($2::uuid[]))
+                """,
+                self.user_id,
+                None if requested is None else sorted(requested),
+            )
+        scope = [str(row["uuid"]) for row in rows]
+        if requested is not None and len(scope) < len(requested):
+            missing = min(requested.difference(scope))
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Collection '{missing}' not found",
+            )
+        if not scope:
+            return []
+
+        query_vector = None
+        if search_type != "keyword":
+            query_vector = await query_embedding_cache.embed(query)
+        return await Collection._search_one(
+            scope,
+            query,
+            query_vector,
+            limit,
+            metadata_filter,
+            search_type=search_type,
+            fusion=fusion,
+            semantic_weight=semantic_weight,
+            keyword_weight=keyword_weight,
+            rrf_k=rrf_k,
+            ef_search=ef_search,
+            probes=probes,
+        )
 
 
 class Collection:
@@ -284,20 +525,71 @@ class Collection:
         self.collection_id = collection_id
         self.user_id = user_id
 
-    async def _get_details_or_raise(self) -> dict[str, Any]:
-        """Get collection details if it exists, otherwise raise an error."""
-        details = await CollectionsManager(self.user_id).get(self.collection_id)
+    async def _get_details_or_raise(self, *, coalesce: bool = True) -> dict[str, Any]:
+        """Get collection details if it exists, otherwise raise an error.
+
+        Args:
+            coalesce: Share the query with identical reads in flight. Without it,
+                the details are read after any write committed before the call.
+        """
+        manager = CollectionsManager(self.user_id)
+        if coalesce:
+            details = await manager.get(self.collection_id)
+        else:
+            details = await manager._get(self.collection_id)
         if not details:
             raise HTTPException(status_code=404, detail="Collection not found")
         return details
 
+    async def _bump_generation(self, conn: asyncpg.Connection) -> None:
+        """Invalidate the collection's cached search results.
+
+        Call last in the transaction of a write, so that the collection row is
+        only locked while the write commits.
+        """
+        await conn.execute(
+            """
+            UPDATE langchain_pg_collection
+               SET generation = generation + 1
+             WHERE uuid = $1
+            """,
+            self.collection_id,
+        )
+
+    @_detaches_reads
     async def upsert(self, documents: list[Document]) -> list[str]:
-        """Add one or more documents to the collection."""
+        """Add one or more documents to the collection.
+
+        Embeddings are computed with the async embeddings API (in concurrent,
+        rate-limited batches, skipping texts found in the embedding cache) and
+        rows are written through the asyncpg pool (with binary COPY for large
+        upserts), so the event loop is never blocked.
+        """
         details = await self._get_details_or_raise()
-        store = get_vectorstore(collection_name=details["table_id"])
-        added_ids = store.add_documents(documents)
+        if not documents:
+            return []
+
+        vectors = await embedding_cache.embed(
+            [doc.page_content for doc in documents]
+        )
+        added_ids = [doc.id or str(uuid.uuid4()) for doc in documents]
+
+        rows = [
+            (
+                doc_id,
+                details["uuid"],
+                vector,
+                doc.page_content,
+                json.dumps(doc.metadata or {}),
+            )
+            for doc_id, doc, vector in zip(added_ids, documents, vectors, strict=True)
+        ]
+        async with get_db_connection() as conn, conn.transaction():
+            await write_embeddings(conn, rows)
+            await self._bump_generation(conn)
         return added_ids
 
+    @_detaches_reads
     async def delete(
         self,
         *,
@@ -310,7 +602,7 @@ class Collection:
             file_id: Deletes all chunks from a specific file
             document_id: Deletes a specific chunk/document
         """
-        async with get_db_connection() as conn:
+        async with get_db_connection() as conn, conn.transaction():
             if document_id:
                 # Delete specific document by ID
                 delete_sql = """
@@ -318,7 +610,7 @@ class Collection:
                     USING langchain_pg_collection AS lpc
                     WHERE lpe.collection_id = lpc.uuid
                       AND lpc.uuid = $1
-                      AND lpc.cmetadata->>'owner_id' = $2
+                      AND lpc.owner_id = $2
                       AND lpe.id = $3
                 """
                 result = await conn.execute(
@@ -338,8 +630,8 @@ class Collection:
                     USING langchain_pg_collection AS lpc
                     WHERE lpe.collection_id   = lpc.uuid
                       AND lpc.uuid             = $1
-                      AND lpc.cmetadata->>'owner_id' = $2
-                      AND lpe.cmetadata->>'file_id'   = $3
+                      AND lpc.owner_id = $2
+                      AND lpe.file_id           = $3
                 """
                 result = await conn.execute(
                     delete_sql,
@@ -352,11 +644,14 @@ class Collection:
             else:
                 raise ValueError("Either file_id or document_id must be provided")
 
+            if deleted_count:
+                await self._bump_generation(conn)
             # For now if deleted count is 0, let's verify that the collection exists.
             if deleted_count == 0:
                 await self._get_details_or_raise()
         return True
 
+    @_detaches_reads
     async def delete_many(
         self,
         *,
@@ -368,7 +663,7 @@ class Collection:
             raise ValueError("Either document_ids or file_ids must be provided.")
 
         deleted_count = 0
-        async with get_db_connection() as conn:
+        async with get_db_connection() as conn, conn.transaction():
             if document_ids:
                 result = await conn.execute(
                     """
@@ -376,7 +671,7 @@ class Collection:
                     USING langchain_pg_collection AS lpc
                     WHERE lpe.collection_id = lpc.uuid
                       AND lpc.uuid = $1
-                      AND lpc.cmetadata->>'owner_id' = $2
+                      AND lpc.owner_id = $2
                       AND lpe.id = ANY($3::text[])
                     """,
                     self.collection_id,
@@ -392,8 +687,8 @@ class Collection:
                     USING langchain_pg_collection AS lpc
                     WHERE lpe.collection_id = lpc.uuid
                       AND lpc.uuid = $1
-                      AND lpc.cmetadata->>'owner_id' = $2
-                      AND lpe.cmetadata->>'file_id' = ANY($3::text[])
+                      AND lpc.owner_id = $2
+                      AND lpe.file_id = ANY($3::text[])
                     """,
                     self.collection_id,
                     self.user_id,
@@ -401,8 +696,11 @@ class Collection:
                 )
                 deleted_count += int(result.split()[-1])
 
+            if deleted_count:
+                await self._bump_generation(conn)
         return deleted_count
 
+    @_coalesced
     async def list(self, *, limit: int = 10, offset: int = 0) -> list[dict[str, Any]]:
         """List all document chunks in this collection."""
         async with get_db_connection() as conn:
@@ -415,8 +713,8 @@ class Collection:
                   JOIN langchain_pg_collection lpc
                     ON lpe.collection_id = lpc.uuid
                  WHERE lpc.uuid = $1
-                   AND lpc.cmetadata->>'owner_id' = $2
-                 ORDER BY lpe.cmetadata->>'file_id', lpe.id
+                   AND lpc.owner_id = $2
+                 ORDER BY lpe.file_id, lpe.id
                  LIMIT  $3
                 OFFSET $4
                 """,
@@ -426,20 +724,7 @@ class Collection:
                 offset,
             )
 
-        docs: list[dict[str, Any]] = []
-        for r in rows:
-            metadata = json.loads(r["cmetadata"]) if r["cmetadata"] else {}
-            docs.append(
-                {
-                    "id": str(r["id"]),
-                    "content": r["document"],
-                    "metadata": metadata,
-                    "collection_id": str(self.collection_id),
-                    # For compatibility with UI expecting 'page_content'
-                    "page_content": r["document"],
-                }
-            )
-
+        docs = [self._format_document(r) for r in rows]
         if not docs:
             # For now, if no documents, let's check that the collection exists.
             # It may make sense to consider this a 200 OK with empty list.
@@ -448,6 +733,83 @@ class Collection:
             await self._get_details_or_raise()
         return docs
 
+    @_coalesced
+    async def list_page(
+        self, *, limit: int = 10, cursor: Optional[str] = None
+    ) -> tuple[builtins.list[dict[str, Any]], Optional[str]]:
+        """List document chunks after ``cursor``, in the order of ``list``.
+
+        Pages seek on the (collection_id, file_id, id) index. Chunks without a
+        file_id come last, as with ``list``.
+
+        Returns:
+            The chunks of the page and the cursor of the next page, or None
+            after the last page.
+        """
+        select = """
+            SELECT lpe.id, lpe.document, lpe.cmetadata, lpe.file_id
+              FROM langchain_pg_embedding lpe
+              JOIN langchain_pg_collection lpc
+                ON lpe.collection_id = lpc.uuid
+             WHERE lpc.uuid = $1
+               AND lpc.owner_id = $2
+        """
+        args: builtins.list[Any] = [self.collection_id, self.user_id, limit + 1]
+        if not cursor:
+            query = f"{select} ORDER BY lpe.file_id, lpe.id LIMIT $3"
+        else:
+            file_id, last_id = decode_cursor("documents", cursor)
+            if file_id is None:
+                query = f"""
+                    {select} AND lpe.file_id IS NULL AND lpe.id > $4
+                     ORDER BY lpe.id
+                     LIMIT $3
+                """
+                args.append(last_id)
+            else:
+                # A row comparison seeks in the index; chunks without a
+                # file_id sort after every file and are read separately.
+                query = f"""
+                    SELECT * FROM (
+                        ({select} AND (lpe.file_id, lpe.id) > ($4, $5)
+                          ORDER BY lpe.file_id, lpe.id
+                          LIMIT $3)
+                        UNION ALL
+                        ({select} AND lpe.file_id IS NULL
+                          ORDER BY lpe.id
+                          LIMIT $3)
+                    ) page
+                     ORDER BY file_id, id
+                     LIMIT $3
+                """
+                args += [file_id, last_id]
+
+        async with get_db_connection() as conn:
+            rows = await conn.fetch(query, *args)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(
+                "documents", [rows[-1]["file_id"], str(rows[-1]["id"])]
+            )
+        docs = [self._format_document(r) for r in rows]
+        if not docs:
+            await self._get_details_or_raise()
+        return docs, next_cursor
+
+    def _format_document(self, row: asyncpg.Record) -> dict[str, Any]:
+        metadata = json.loads(row["cmetadata"]) if row["cmetadata"] else {}
+        return {
+            "id": str(row["id"]),
+            "content": row["document"],
+            "metadata": metadata,
+            "collection_id": str(self.collection_id),
+            # For compatibility with UI expecting 'page_content'
+            "page_content": row["document"],
+        }
+
+    @_coalesced
     async def get(self, document_id: str) -> dict[str, Any]:
         """Fetch a single chunk by its UUID, verifying collection ownership."""
         async with get_db_connection() as conn:
@@ -458,7 +820,7 @@ class Collection:
                   JOIN langchain_pg_collection c
                     ON e.collection_id = c.uuid
                  WHERE e.id = $1
-                   AND c.cmetadata->>'owner_id' = $2
+                   AND c.owner_id = $2
                    AND c.uuid = $3
                 """,
                 document_id,
@@ -477,52 +839,72 @@ class Collection:
 
     async def update_document(self, document_id: str, updates: dict[str, Any]) -> bool:
         """Update a document's metadata."""
-        async with get_db_connection() as conn:
-            # Get current document to verify ownership
-            current = await conn.fetchrow(
-                """
-                SELECT e.cmetadata
-                  FROM langchain_pg_embedding e
-                  JOIN langchain_pg_collection c
-                    ON e.collection_id = c.uuid
-                 WHERE e.id = $1
-                   AND c.cmetadata->>'owner_id' = $2
-                   AND c.uuid = $3
-                """,
-                document_id,
-                self.user_id,
-                self.collection_id,
-            )
+        return await self.update_metadata(updates, document_ids=[document_id]) > 0
 
-            if not current:
-                return False
+    @_detaches_reads
+    async def update_metadata(
+        self,
+        patch: dict[str, Any],
+        *,
+        document_ids: Optional[builtins.list[str]] = None,
+        file_ids: Optional[builtins.list[str]] = None,
+        filter: Optional[dict[str, Any]] = None,
+    ) -> int:
+        """Merge ``patch`` into the metadata of many chunks in one statement.
 
-            # Merge current metadata with updates
-            current_metadata = (
-                json.loads(current["cmetadata"]) if current["cmetadata"] else {}
-            )
-            updated_metadata = {**current_metadata, **updates}
+        Top-level keys of ``patch`` replace those of each chunk's metadata.
+        Chunks are selected by ID or file ID (either matches) and, if given,
+        by a metadata filter; a filter alone selects all chunks matching it.
 
-            # Update the document
-            await conn.execute(
-                """
-                UPDATE langchain_pg_embedding
-                   SET cmetadata = $4
-                 WHERE id = $1
-                   AND collection_id = $2
-                   AND EXISTS (
-                       SELECT 1 FROM langchain_pg_collection c
-                       WHERE c.uuid = $2
-                         AND c.cmetadata->>'owner_id' = $3
-                   )
+        Returns:
+            The number of chunks updated.
+        """
+        if not document_ids and not file_ids and not filter:
+            raise ValueError(
+                "Either document_ids, file_ids or filter must be provided."
+            )
+        try:
+            metadata_filter = compile_metadata_filter(filter)
+        except InvalidFilterError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        args: builtins.list[Any] = [
+            self.collection_id,
+            self.user_id,
+            json.dumps(patch),
+        ]
+        selectors = []
+        if document_ids:
+            args.append(document_ids)
+            selectors.append(f"e.id = ANY(${len(args)}::text[])")
+        if file_ids:
+            args.append(file_ids)
+            selectors.append(f"e.file_id = ANY(${len(args)}::text[])")
+        selection = " OR ".join(selectors) or "TRUE"
+        predicate = metadata_filter.render(len(args) + 1)
+        args.extend(metadata_filter.params)
+
+        async with get_db_connection() as conn, conn.transaction():
+            result = await conn.execute(
+                f"""
+                UPDATE langchain_pg_embedding AS e
+                   SET cmetadata = e.cmetadata || $3::jsonb
+                  FROM langchain_pg_collection AS c
+                 WHERE e.collection_id = c.uuid
+                   AND c.uuid = $1
+                   AND c.owner_id = $2
+                   AND ({selection})
+                   AND {predicate}
                 """,
-                document_id,
-                self.collection_id,
-                self.user_id,
-                json.dumps(updated_metadata),
+                *args,
             )
-
-            return True
+            updated = int(result.split()[-1])
+            if updated:
+                await self._bump_generation(conn)
+        if not updated:
+            # Tell an empty selection apart from a missing collection.
+            await self._get_details_or_raise()
+        return updated
 
     async def search(
         self,
@@ -531,6 +913,12 @@ class Collection:
         limit: int = 4,
         search_type: Literal["semantic", "keyword", "hybrid"] = "semantic",
         filter: Optional[dict[str, Any]] = None,
+        fusion: Literal["weighted", "rrf"] = "weighted",
+        semantic_weight: float = 0.7,
+        keyword_weight: float = 0.3,
+        rrf_k: int = 60,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
     ) -> builtins.list[dict[str, Any]]:
         """Run a search in the collection.
 
@@ -538,274 +926,434 @@ class Collection:
             query: The search query string
             limit: Maximum number of results to return
             search_type: Type of search - "semantic", "keyword", or "hybrid"
-            filter: Optional metadata filter to apply to results
+            filter: Optional metadata filter, applied inside the SQL query. See
+                ``langconnect.database.filters`` for the supported operators.
+            fusion: How hybrid search merges the two rankings - "weighted"
+                (weighted sum of normalized scores) or "rrf" (reciprocal rank fusion)
+            semantic_weight: Weight of the semantic ranking in hybrid search
+            keyword_weight: Weight of the keyword ranking in hybrid search
+            rrf_k: Rank offset used by reciprocal rank fusion
+            ef_search: HNSW candidate list size for this query (higher is more
+                accurate and slower). Only used when an HNSW index exists.
+            probes: Number of IVFFlat lists to scan for this query. Only used
+                when an IVFFlat index exists.
 
         Returns:
-            List of search results with id, page_content, metadata, and score
+            List of search results with id, page_content, metadata, and score.
+            Results are served from ``search_result_cache`` until the next write
+            to the collection.
         """
+        metadata_filter = self._compile_search(search_type, fusion, filter)
+        # The generation keying cached results must not predate the call.
+        details = await self._get_details_or_raise(coalesce=False)
+        cache_key = None
+        if search_result_cache.enabled:
+            cache_key = search_result_cache.key(
+                details["uuid"],
+                details["generation"],
+                {
+                    "query": query,
+                    "limit": limit,
+                    "search_type": search_type,
+                    "filter": filter,
+                    "fusion": fusion,
+                    "semantic_weight": semantic_weight,
+                    "keyword_weight": keyword_weight,
+                    "rrf_k": rrf_k,
+                    "ef_search": ef_search,
+                    "probes": probes,
+                },
+            )
+            cached = await search_result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        query_vector = None
+        if search_type != "keyword":
+            query_vector = await query_embedding_cache.embed(query)
+        results = await self._search_one(
+            details["uuid"],
+            query,
+            query_vector,
+            limit,
+            metadata_filter,
+            search_type=search_type,
+            fusion=fusion,
+            semantic_weight=semantic_weight,
+            keyword_weight=keyword_weight,
+            rrf_k=rrf_k,
+            ef_search=ef_search,
+            probes=probes,
+        )
+        if cache_key is not None:
+            await search_result_cache.set(cache_key, results)
+        return results
+
+    async def search_batch(
+        self,
+        queries: builtins.list[str],
+        *,
+        limit: int = 4,
+        search_type: Literal["semantic", "keyword", "hybrid"] = "semantic",
+        filter: Optional[dict[str, Any]] = None,
+        fusion: Literal["weighted", "rrf"] = "weighted",
+        semantic_weight: float = 0.7,
+        keyword_weight: float = 0.3,
+        rrf_k: int = 60,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        fuse: bool = False,
+    ) -> tuple[
+        builtins.list[builtins.list[dict[str, Any]]],
+        Optional[builtins.list[dict[str, Any]]],
+    ]:
+        """Run several searches in the collection at once.
+
+        The queries share one ownership check and one embeddings request, and
+        their SQL runs concurrently on separate pool connections. Arguments
+        are those of ``search``, applied to every query.
+
+        Args:
+            fuse: Also merge the result lists into one, with each chunk once,
+                ranked by reciprocal rank fusion (offset ``rrf_k``) across the
+                queries and cut to ``limit``.
+
+        Returns:
+            The results of each query, in order, and the fused results (None
+            unless ``fuse``).
+        """
+        metadata_filter = self._compile_search(search_type, fusion, filter)
+        details = await self._get_details_or_raise()
+        if search_type == "keyword":
+            query_vectors: builtins.list[Optional[builtins.list[float]]] = [
+                None
+            ] * len(queries)
+        else:
+            query_vectors = await query_embedding_cache.embed_many(queries)
+        results = await asyncio.gather(
+            *[
+                self._search_one(
+                    details["uuid"],
+                    query,
+                    query_vector,
+                    limit,
+                    metadata_filter,
+                    search_type=search_type,
+                    fusion=fusion,
+                    semantic_weight=semantic_weight,
+                    keyword_weight=keyword_weight,
+                    rrf_k=rrf_k,
+                    ef_search=ef_search,
+                    probes=probes,
+                )
+                for query, query_vector in zip(queries, query_vectors, strict=True)
+            ]
+        )
+        fused = _fuse_result_lists(results, limit=limit, rrf_k=rrf_k) if fuse else None
+        return results, fused
+
+    @staticmethod
+    def _compile_search(
+        search_type: str, fusion: str, filter: Optional[dict[str, Any]]
+    ) -> MetadataFilter:
+        """Validate search arguments and compile the metadata filter."""
         if search_type not in ["semantic", "keyword", "hybrid"]:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid search type: {search_type}. Must be 'semantic', 'keyword', or 'hybrid'.",
             )
 
-        details = await self._get_details_or_raise()
-
-        # Helper function to apply metadata filter
-        def apply_metadata_filter(
-            results: list[dict[str, Any]], filter_dict: dict[str, Any]
-        ) -> list[dict[str, Any]]:
-            """Apply metadata filter to search results."""
-            if not filter_dict:
-                return results
-
-            filtered_results = []
-            for result in results:
-                result_metadata = result.get("metadata", {})
-                # Check if all filter conditions are met
-                match = True
-                for key, value in filter_dict.items():
-                    if key not in result_metadata or result_metadata[key] != value:
-                        match = False
-                        break
-                if match:
-                    filtered_results.append(result)
-            return filtered_results
-
-        if search_type == "semantic":
-            # Current semantic search implementation
-            store = get_vectorstore(collection_name=details["table_id"])
-            # Get more results initially if filter is applied
-            k = limit * 3 if filter else limit
-            results = store.similarity_search_with_score(query, k=k)
-
-            # Convert to standard format
-            formatted_results = [
-                {
-                    "id": doc.id,
-                    "page_content": doc.page_content,
-                    "metadata": doc.metadata,
-                    "score": score,
-                }
-                for doc, score in results
-            ]
+        if fusion not in _HYBRID_FUSION_SCORES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid fusion method: {fusion}. Must be 'weighted' or 'rrf'.",
+            )
 
-            # Apply metadata filter
-            filtered_results = apply_metadata_filter(formatted_results, filter)
+        try:
+            return compile_metadata_filter(filter)
+        except InvalidFilterError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-            # Return only the requested limit
-            return filtered_results[:limit]
+    @staticmethod
+    async def _search_one(
+        scope: str | builtins.list[str],
+        query: str,
+        query_vector: Optional[builtins.list[float]],
+        limit: int,
+        metadata_filter: MetadataFilter,
+        *,
+        search_type: str,
+        fusion: str,
+        semantic_weight: float,
+        keyword_weight: float,
+        rrf_k: int,
+        ef_search: Optional[int],
+        probes: Optional[int],
+    ) -> builtins.list[dict[str, Any]]:
+        """Run one search over ``scope``, a collection UUID or a list of them.
 
+        The caller checks ownership; ``query_vector`` is unused by keyword search.
+        """
         if search_type == "keyword":
             # Full-text search using PostgreSQL
-            # Get more results initially if filter is applied
-            search_limit = limit * 3 if filter else limit
-
             async with get_db_connection() as conn:
-                rows = await conn.fetch(
-                    """
-                    SELECT e.id as id,
-                           e.document as page_content,
-                           e.cmetadata as metadata,
-                           ts_rank(to_tsvector('english', e.document), 
-                                  plainto_tsquery('english', $1)) as score
-                    FROM langchain_pg_embedding e
-                    JOIN langchain_pg_collection c ON e.collection_id = c.uuid
-                    WHERE c.uuid = $2
-                      AND c.cmetadata->>'owner_id' = $3
-                      AND to_tsvector('english', e.document) @@ plainto_tsquery('english', $1)
-                    ORDER BY score DESC
-                    LIMIT $4
-                    """,
-                    query,
-                    self.collection_id,
-                    self.user_id,
-                    search_limit,
+                return await Collection._keyword_search(
+                    conn, scope, query, limit, metadata_filter
                 )
 
-            formatted_results = [
-                {
-                    "id": str(row["id"]),
-                    "page_content": row["page_content"],
-                    "metadata": json.loads(row["metadata"]) if row["metadata"] else {},
-                    "score": float(row["score"]),
-                }
-                for row in rows
-            ]
-
-            # Apply metadata filter
-            filtered_results = apply_metadata_filter(formatted_results, filter)
-
-            # Return only the requested limit
-            return filtered_results[:limit]
-
-        # hybrid
-        # Get semantic search results
-        store = get_vectorstore(collection_name=details["table_id"])
-        semantic_results = store.similarity_search_with_score(query, k=limit * 2)
-
-        # Get keyword search results
-        async with get_db_connection() as conn:
-            keyword_rows = await conn.fetch(
-                """
-                    SELECT e.id as id,
-                           e.document as page_content,
-                           e.cmetadata as metadata,
-                           ts_rank(to_tsvector('english', e.document), 
-                                  plainto_tsquery('english', $1)) as score
-                    FROM langchain_pg_embedding e
-                    JOIN langchain_pg_collection c ON e.collection_id = c.uuid
-                    WHERE c.uuid = $2
-                      AND c.cmetadata->>'owner_id' = $3
-                      AND to_tsvector('english', e.document) @@ plainto_tsquery('english', $1)
-                    ORDER BY score DESC
-                    LIMIT $4
-                    """,
-                query,
-                self.collection_id,
-                self.user_id,
-                limit * 2,
+        if search_type == "semantic":
+            search = functools.partial(
+                Collection._semantic_search,
+                scope=scope,
+                query_vector=query_vector,
+                limit=limit,
+                metadata_filter=metadata_filter,
             )
-
-        # Combine and deduplicate results
-        combined_results = {}
-
-        # Add semantic results with normalized scores
-        max_semantic_score = max((score for _, score in semantic_results), default=1.0)
-        for doc, score in semantic_results:
-            normalized_score = (
-                score / max_semantic_score if max_semantic_score > 0 else 0
+        else:
+            search = functools.partial(
+                Collection._hybrid_search,
+                scope=scope,
+                query=query,
+                query_vector=query_vector,
+                limit=limit,
+                metadata_filter=metadata_filter,
+                fusion=fusion,
+                semantic_weight=semantic_weight,
+                keyword_weight=keyword_weight,
+                rrf_k=rrf_k,
             )
-            combined_results[doc.id] = {
-                "id": doc.id,
-                "page_content": doc.page_content,
-                "metadata": doc.metadata,
-                "semantic_score": normalized_score,
-                "keyword_score": 0,
-                "combined_score": normalized_score * 0.7,  # 70% weight for semantic
-            }
-
-        # Add keyword results with normalized scores
-        if keyword_rows:
-            max_keyword_score = max(
-                (float(row["score"]) for row in keyword_rows), default=1.0
+        async with get_db_connection() as conn, conn.transaction():
+            iterative = await apply_search_settings(
+                conn, ef_search=ef_search, probes=probes
             )
-            for row in keyword_rows:
-                doc_id = str(row["id"])
-                normalized_score = (
-                    float(row["score"]) / max_keyword_score
-                    if max_keyword_score > 0
-                    else 0
-                )
-
-                if doc_id in combined_results:
-                    # Document exists, update scores
-                    combined_results[doc_id]["keyword_score"] = normalized_score
-                    combined_results[doc_id]["combined_score"] = (
-                        combined_results[doc_id]["semantic_score"] * 0.7
-                        + normalized_score * 0.3  # 30% weight for keyword
-                    )
-                else:
-                    # New document from keyword search
-                    combined_results[doc_id] = {
-                        "id": doc_id,
-                        "page_content": row["page_content"],
-                        "metadata": (
-                            json.loads(row["metadata"]) if row["metadata"] else {}
-                        ),
-                        "semantic_score": 0,
-                        "keyword_score": normalized_score,
-                        "combined_score": normalized_score * 0.3,
-                    }
-
-        # Convert combined results to list format
-        all_results = [
-            {
-                "id": result["id"],
-                "page_content": result["page_content"],
-                "metadata": result["metadata"],
-                "score": result["combined_score"],
-            }
-            for result in combined_results.values()
-        ]
+            results = await search(conn)
+            if len(results) < limit and not iterative:
+                # Without iterative scans, a filtered index scan can stop short
+                # of the limit although more rows match: search exactly.
+                await disable_index_scans(conn)
+                results = await search(conn)
+        return results
 
-        # Apply metadata filter
-        filtered_results = apply_metadata_filter(all_results, filter)
-
-        # Sort by combined score and return top results
-        sorted_results = sorted(
-            filtered_results, key=lambda x: x["score"], reverse=True
-        )[:limit]
+    @staticmethod
+    async def _semantic_search(
+        conn: asyncpg.Connection,
+        scope: str | builtins.list[str],
+        query_vector: builtins.list[float],
+        limit: int,
+        metadata_filter: MetadataFilter,
+    ) -> builtins.list[dict[str, Any]]:
+        """Nearest neighbours by cosine distance (lower score is closer)."""
+        distance = vector_distance_sql("e.embedding", "$1", len(query_vector))
+        rows = await conn.fetch(
+            f"""
+            SELECT e.id,
+                   e.collection_id,
+                   e.document,
+                   e.cmetadata,
+                   {distance} AS score
+              FROM langchain_pg_embedding e
+             WHERE {_collection_scope_sql(scope, "$2")}
+               AND {metadata_filter.render(4)}
+             ORDER BY score
+             LIMIT $3
+            """,
+            to_pgvector(query_vector),
+            scope,
+            limit,
+            *metadata_filter.params,
+        )
+        # An iterative IVFFlat scan returns rows in relaxed order.
+        rows.sort(key=lambda row: row["score"])
+        return [_format_search_row(row) for row in rows]
 
-        return sorted_results
+    @staticmethod
+    async def _keyword_search(
+        conn: asyncpg.Connection,
+        scope: str | builtins.list[str],
+        query: str,
+        limit: int,
+        metadata_filter: MetadataFilter,
+    ) -> builtins.list[dict[str, Any]]:
+        """Full-text matches ranked by ts_rank (higher score is better)."""
+        rows = await conn.fetch(
+            f"""
+            SELECT e.id,
+                   e.collection_id,
+                   e.document,
+                   e.cmetadata,
+                   ts_rank(e.document_tsv, plainto_tsquery('english', $1)) as score
+            FROM langchain_pg_embedding e
+            WHERE {_collection_scope_sql(scope, "$2")}
+              AND e.document_tsv @@ plainto_tsquery('english', $1)
+              AND {metadata_filter.render(4)}
+            ORDER BY score DESC
+            LIMIT $3
+            """,
+            query,
+            scope,
+            limit,
+            *metadata_filter.params,
+        )
+        return [_format_search_row(row) for row in rows]
 
+    @staticmethod
+    async def _hybrid_search(
+        conn: asyncpg.Connection,
+        scope: str | builtins.list[str],
+        query: str,
+        query_vector: builtins.list[float],
+        limit: int,
+        metadata_filter: MetadataFilter,
+        *,
+        fusion: Literal["weighted", "rrf"],
+        semantic_weight: float,
+        keyword_weight: float,
+        rrf_k: int,
+    ) -> builtins.list[dict[str, Any]]:
+        """Fuse the semantic and keyword top-k in a single statement."""
+        filter_sql = metadata_filter.render(9)
+        scope_sql = _collection_scope_sql(scope, "$2")
+        distance = vector_distance_sql("e.embedding", "$1", len(query_vector))
+        rows = await conn.fetch(
+            f"""
+            WITH semantic_top AS (
+                SELECT e.id, {distance} AS distance
+                  FROM langchain_pg_embedding e
+                 WHERE {scope_sql}
+                   AND {filter_sql}
+                 ORDER BY distance
+                 LIMIT $4
+            ),
+            semantic AS (
+                SELECT id,
+                       distance,
+                       1.0 / ($7::int + row_number() OVER (ORDER BY distance))
+                           AS rrf_score
+                  FROM semantic_top
+            ),
+            keyword_top AS (
+                SELECT e.id,
+                       ts_rank(e.document_tsv, plainto_tsquery('english', $3)) AS rank_score
+                  FROM langchain_pg_embedding e
+                 WHERE {scope_sql}
+                   AND e.document_tsv @@ plainto_tsquery('english', $3)
+                   AND {filter_sql}
+                 ORDER BY rank_score DESC
+                 LIMIT $4
+            ),
+            keyword AS (
+                SELECT id,
+                       rank_score,
+                       MAX(rank_score) OVER () AS max_rank_score,
+                       1.0 / ($7::int + row_number() OVER (ORDER BY rank_score DESC))
+                           AS rrf_score
+                  FROM keyword_top
+            ),
+            fused AS (
+                SELECT COALESCE(s.id, k.id) AS id,
+                       {_HYBRID_FUSION_SCORES[fusion]} AS score
+                  FROM semantic s
+                  FULL OUTER JOIN keyword k ON s.id = k.id
+            )
+            SELECT e.id, e.collection_id, e.document, e.cmetadata, f.score
+              FROM fused f
+              JOIN langchain_pg_embedding e ON e.id = f.id
+             ORDER BY f.score DESC
+             LIMIT $8
+            """,
+            to_pgvector(query_vector),
+            scope,
+            query,
+            # Candidate pool per ranking before fusion.
+            limit * 2,
+            semantic_weight,
+            keyword_weight,
+            rrf_k,
+            limit,
+            *metadata_filter.params,
+        )
+        return [_format_search_row(row) for row in rows]
+
+    @_coalesced
     async def aggregate_document_groups(
         self, limit: int = 20, offset: int = 0
     ) -> List[Dict[str, Any]]:
-        """Aggregate document groups by file_id, returning chunk count, total chars, and metadata."""
-        try:
-            logger.info(
-                f"Aggregate document groups - collection_id: {self.collection_id}, user_id: {self.user_id}, limit: {limit}, offset: {offset}"
-            )
+        """List document groups (files) with their chunk count and total chars.
 
-            async with get_db_connection() as conn:
-                # 먼저 컬렉션이 존재하는지 확인
-                collection_exists = await conn.fetchval(
-                    "SELECT COUNT(*) FROM langchain_pg_collection WHERE uuid = $1 AND cmetadata->>'owner_id' = $2",
-                    self.collection_id,
-                    self.user_id,
-                )
-                logger.info(f"Collection exists: {collection_exists}")
+        Reads the per-file summaries kept up to date by triggers on the chunk
+        table, most recently updated first.
+        """
+        rows = await self._fetch_document_groups("TRUE", [limit], offset=offset)
+        return [self._format_document_group(row) for row in rows]
 
-                # 임베딩 개수 확인
-                embedding_count = await conn.fetchval(
-                    "SELECT COUNT(*) FROM langchain_pg_embedding WHERE collection_id = $1",
-                    self.collection_id,
-                )
-                logger.info(f"Embedding count: {embedding_count}")
+    @_coalesced
+    async def document_groups_page(
+        self, *, limit: int = 20, cursor: Optional[str] = None
+    ) -> tuple[List[Dict[str, Any]], Optional[str]]:
+        """Page of document groups after ``cursor``, newest first.
 
-                rows = await conn.fetch(
-                    """
-                    SELECT
-                        e.cmetadata->>'file_id' AS file_id,
-                        MIN(e.cmetadata->>'source') AS source,
-                        MIN(e.cmetadata->>'created_at') AS created_at,
-                        COUNT(*) AS chunk_count,
-                        COALESCE(SUM(LENGTH(COALESCE(e.document, ''))), 0) AS total_chars
-                    FROM langchain_pg_embedding e
-                    JOIN langchain_pg_collection c ON e.collection_id = c.uuid
-                    WHERE c.uuid = $1
-                      AND c.cmetadata->>'owner_id' = $2
-                      AND e.cmetadata->>'file_id' IS NOT NULL
-                    GROUP BY e.cmetadata->>'file_id'
-                    ORDER BY MAX(e.cmetadata->>'created_at') DESC NULLS LAST
-                    LIMIT $3 OFFSET $4
-                    """,
-                    self.collection_id,
-                    self.user_id,
-                    limit,
-                    offset,
+        Returns:
+            The groups of the page and the cursor of the next page, or None
+            after the last page.
+        """
+        if not cursor:
+            rows = await self._fetch_document_groups("TRUE", [limit + 1])
+        else:
+            last_created_at, file_id = decode_cursor("document_groups", cursor)
+            try:
+                last_created_at = datetime.datetime.fromisoformat(last_created_at)
+            except (TypeError, ValueError):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid pagination cursor.",
                 )
+            rows = await self._fetch_document_groups(
+                "(g.last_created_at, g.file_id) < ($4, $5)",
+                [limit + 1, last_created_at, file_id],
+            )
 
-                logger.info(f"Query returned {len(rows)} rows")
-
-                result = [
-                    {
-                        "file_id": row["file_id"],
-                        "source": row["source"],
-                        "created_at": row["created_at"],
-                        "chunk_count": row["chunk_count"],
-                        "total_chars": row["total_chars"],
-                    }
-                    for row in rows
-                ]
-
-                logger.info(f"Returning {len(result)} document groups")
-                return result
-
-        except Exception as e:
-            logger.error(
-                f"Error in aggregate_document_groups: {type(e).__name__}: {str(e)}"
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(
+                "document_groups",
+                [rows[-1]["last_created_at"], rows[-1]["file_id"]],
             )
-            logger.error(f"Error details: {e.__dict__}")
-            raise
+        return [self._format_document_group(row) for row in rows], next_cursor
+
+    async def _fetch_document_groups(
+        self, seek: str, args: builtins.list[Any], *, offset: int = 0
+    ) -> builtins.list[asyncpg.Record]:
+        """Groups newest first; ``args`` start at $3 with the row limit."""
+        async with get_db_connection() as conn:
+            return await conn.fetch(
+                f"""
+                SELECT g.file_id,
+                       g.source,
+                       g.created_at,
+                       g.last_created_at,
+                       g.chunk_count,
+                       g.total_chars
+                  FROM langconnect_document_groups g
+                  JOIN langchain_pg_collection c ON g.collection_id = c.uuid
+                 WHERE c.uuid = $1
+                   AND c.owner_id = $2
+                   AND {seek}
+                 ORDER BY g.last_created_at DESC, g.file_id DESC
+                 LIMIT $3 OFFSET {int(offset)}
+                """,
+                self.collection_id,
+                self.user_id,
+                *args,
+            )
+
+    @staticmethod
+    def _format_document_group(row: asyncpg.Record) -> dict[str, Any]:
+        return {
+            "file_id": row["file_id"],
+            "source": row["source"],
+            # A string, as when it was read from cmetadata.created_at.
+            "created_at": row["created_at"].isoformat(),
+            "chunk_count": row["chunk_count"],
+            "total_chars": row["total_chars"],
+        }
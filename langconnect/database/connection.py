@@ -1,4 +1,6 @@
 import logging
+import threading
+from collections import OrderedDict
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from typing import Any, Optional, Union
@@ -63,9 +65,45 @@ def get_vectorstore_engine(
     return engine
 
 
+_engine: Engine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_shared_vectorstore_engine() -> Engine:
+    """Get the process-wide sync SQLAlchemy engine used by PGVector.
+
+    The engine owns a connection pool, so it is created once and reused by every
+    vector store instead of opening a new pool per request.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = get_vectorstore_engine()
+                logger.info("Shared vector store engine created.")
+    return _engine
+
+
+def dispose_vectorstore_engine() -> None:
+    """Dispose the shared engine and forget all cached vector stores."""
+    global _engine
+    clear_vectorstores()
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+
+
 DBConnection = Union[sqlalchemy.engine.Engine, str]
 
 
+# LRU registry of PGVector instances keyed by collection table id. Building a
+# PGVector runs extension/table/collection checks against the database, so the
+# instances are kept around and only rebuilt after eviction or invalidation.
+_vectorstores: OrderedDict[str, PGVector] = OrderedDict()
+_vectorstores_lock = threading.Lock()
+
+
 def get_vectorstore(
     collection_name: str = config.DEFAULT_COLLECTION_NAME,
     embeddings: Embeddings = config.DEFAULT_EMBEDDINGS,
@@ -74,15 +112,69 @@ def get_vectorstore(
 ) -> PGVector:
     """Initializes and returns a PGVector store for a specific collection,
     using an existing engine or creating one from connection parameters.
+
+    Stores built on the shared engine with the default embeddings are cached in
+    a bounded LRU registry keyed by ``collection_name``. Stores for a custom
+    engine or embeddings are always built fresh.
     """
-    if engine is None:
-        engine = get_vectorstore_engine()
+    if engine is not None or embeddings is not config.DEFAULT_EMBEDDINGS:
+        return _build_vectorstore(
+            collection_name,
+            embeddings,
+            engine or get_shared_vectorstore_engine(),
+            collection_metadata,
+        )
 
-    store = PGVector(
+    with _vectorstores_lock:
+        store = _vectorstores.get(collection_name)
+        if store is not None:
+            _vectorstores.move_to_end(collection_name)
+            return store
+
+    store = _build_vectorstore(
+        collection_name,
+        embeddings,
+        get_shared_vectorstore_engine(),
+        collection_metadata,
+    )
+
+    with _vectorstores_lock:
+        # Another request may have built the same store concurrently; keep the
+        # first one so every caller shares a single instance.
+        existing = _vectorstores.get(collection_name)
+        if existing is not None:
+            _vectorstores.move_to_end(collection_name)
+            return existing
+        _vectorstores[collection_name] = store
+        while len(_vectorstores) > config.VECTORSTORE_CACHE_SIZE:
+            evicted, _ = _vectorstores.popitem(last=False)
+            logger.debug(f"Evicted vector store {evicted!r} from registry.")
+    return store
+
+
+def invalidate_vectorstore(collection_name: str) -> None:
+    """Drop a cached vector store, e.g. after its collection was deleted."""
+    with _vectorstores_lock:
+        _vectorstores.pop(collection_name, None)
+
+
+def clear_vectorstores() -> None:
+    """Drop every cached vector store."""
+    with _vectorstores_lock:
+        _vectorstores.clear()
+
+
+def _build_vectorstore(
+    collection_name: str,
+    embeddings: Embeddings,
+    engine: Union[DBConnection, Engine, AsyncEngine],
+    collection_metadata: Optional[dict[str, Any]],
+) -> PGVector:
+    """Construct a PGVector store bound to the given engine."""
+    return PGVector(
         embeddings=embeddings,
         collection_name=collection_name,
         connection=engine,
         use_jsonb=True,
         collection_metadata=collection_metadata,
     )
-    return store
@@ -0,0 +1,40 @@
+"""Persistent cache of chunk embeddings in ``langconnect_embedding_cache``.
+
+Rows are keyed by the embedding model and the SHA-256 of the normalized chunk
+text (see ``langconnect.embeddings.content_hash``), and are shared by all
+collections and users: an embedding is a function of the text alone.
+"""
+
+from langconnect.database.connection import get_db_connection
+
+
+async def lookup(model: str, hashes: list[bytes]) -> dict[bytes, list[float]]:
+    """Return the cached embeddings of ``hashes`` that exist, by hash."""
+    if not hashes:
+        return {}
+    async with get_db_connection() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT content_hash, embedding
+              FROM langconnect_embedding_cache
+             WHERE model = $1 AND content_hash = ANY($2::bytea[])
+            """,
+            model,
+            hashes,
+        )
+    return {bytes(row["content_hash"]): list(row["embedding"]) for row in rows}
+
+
+async def store(model: str, embeddings: dict[bytes, list[float]]) -> None:
+    """Cache embeddings by hash. Existing entries are left as they are."""
+    if not embeddings:
+        return
+    async with get_db_connection() as conn:
+        await conn.executemany(
+            """
+            INSERT INTO langconnect_embedding_cache (model, content_hash, embedding)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (model, content_hash) DO NOTHING
+            """,
+            [(model, digest, vector) for digest, vector in embeddings.items()],
+        )
@@ -0,0 +1,148 @@
+"""Compile search metadata filters into SQL predicates over JSONB metadata.
+
+Filters are plain dicts, as accepted by ``SearchQuery.filter``:
+
+* ``{"source": "a.pdf", "verified": True}`` matches documents whose metadata
+  contains all of the given key/value pairs. Equality conditions on scalars are
+  merged into one ``cmetadata @> $n::jsonb`` containment check, which the GIN
+  index on ``cmetadata`` can serve. Lists and objects must match exactly
+  (containment would also match supersets), so they are compared with ``=``.
+* ``{"page": {"$gte": 3, "$lt": 10}}`` applies operators to a single key.
+  Supported operators are ``$eq``, ``$ne``, ``$gt``, ``$gte``, ``$lt``, ``$lte``,
+  ``$in``, ``$nin`` and ``$exists``.
+* ``{"$or": [{...}, {...}]}`` and ``{"$and": [...]}`` combine sub-filters.
+
+Keys and values are always passed as query parameters, never interpolated.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+_COMPARISONS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+_OPERATORS = {"$eq", "$ne", "$in", "$nin", "$exists", *_COMPARISONS}
+_LOGICAL = {"$and": " AND ", "$or": " OR "}
+
+
+class InvalidFilterError(ValueError):
+    """Raised when a metadata filter cannot be compiled."""
+
+
+@dataclass(frozen=True)
+class MetadataFilter:
+    """A compiled filter: a SQL template plus its positional parameters.
+
+    The template uses ``{0}``, ``{1}``, ... for parameters so that it can be
+    spliced into statements whose own parameters come first.
+    """
+
+    template: str = "TRUE"
+    params: list[Any] = field(default_factory=list)
+
+    def render(self, first_param: int) -> str:
+        """Return the SQL predicate with parameters numbered from ``first_param``."""
+        return self.template.format(
+            *(f"${first_param + i}" for i in range(len(self.params)))
+        )
+
+
+def compile_metadata_filter(
+    filter: dict[str, Any] | None, *, column: str = "e.cmetadata"
+) -> MetadataFilter:
+    """Compile a metadata filter dict into a SQL predicate on ``column``."""
+    if not filter:
+        return MetadataFilter()
+    compiler = _Compiler(column)
+    return MetadataFilter(compiler.compile(filter), compiler.params)
+
+
+class _Compiler:
+    def __init__(self, column: str) -> None:
+        self.column = column
+        self.params: list[Any] = []
+
+    def _param(self, value: Any) -> str:
+        self.params.append(value)
+        return "{%d}" % (len(self.params) - 1)
+
+    def compile(self, filter: dict[str, Any]) -> str:
+        if not isinstance(filter, dict) or not filter:
+            raise InvalidFilterError("Filter must be a non-empty object.")
+
+        clauses: list[str] = []
+        contained: dict[str, Any] = {}
+        for key, value in filter.items():
+            if not isinstance(key, str):
+                raise InvalidFilterError(f"Filter keys must be strings: {key!r}")
+            if key in _LOGICAL:
+                clauses.append(self._logical(key, value))
+            elif key.startswith("$"):
+                raise InvalidFilterError(f"Unsupported filter operator: {key}")
+            elif isinstance(value, dict) and any(k.startswith("$") for k in value):
+                clauses.extend(self._field(key, value))
+            elif isinstance(value, dict | list):
+                clauses.extend(self._field(key, {"$eq": value}))
+            else:
+                contained[key] = value
+
+        if contained:
+            clauses.insert(
+                0, f"{self.column} @> {self._param(_dumps(contained))}::jsonb"
+            )
+        return " AND ".join(clauses)
+
+    def _logical(self, operator: str, value: Any) -> str:
+        if not isinstance(value, list) or not value:
+            raise InvalidFilterError(f"{operator} expects a non-empty list of filters.")
+        parts = [f"({self.compile(sub)})" for sub in value]
+        return "(" + _LOGICAL[operator].join(parts) + ")"
+
+    def _field(self, key: str, operators: dict[str, Any]) -> list[str]:
+        clauses = []
+        key_ref = self._param(key)
+        field_ref = f"({self.column} -> {key_ref}::text)"
+        for operator, value in operators.items():
+            if operator not in _OPERATORS:
+                raise InvalidFilterError(f"Unsupported filter operator: {operator}")
+
+            if operator == "$eq":
+                clauses.append(f"{field_ref} = {self._param(_dumps(value))}::jsonb")
+            elif operator == "$ne":
+                clauses.append(
+                    f"{field_ref} IS DISTINCT FROM {self._param(_dumps(value))}::jsonb"
+                )
+            elif operator in _COMPARISONS:
+                if isinstance(value, bool) or not isinstance(value, int | float | str):
+                    raise InvalidFilterError(
+                        f"{operator} expects a number or a string, got {value!r}"
+                    )
+                ref = self._param(_dumps(value))
+                # jsonb orders values of different types by type first, so
+                # only compare against values of the same JSON type.
+                clauses.append(
+                    f"({field_ref} {_COMPARISONS[operator]} {ref}::jsonb"
+                    f" AND jsonb_typeof{field_ref} = jsonb_typeof({ref}::jsonb))"
+                )
+            elif operator in ("$in", "$nin"):
+                if not isinstance(value, list):
+                    raise InvalidFilterError(f"{operator} expects a list of values.")
+                ref = self._param([_dumps(v) for v in value])
+                if operator == "$in":
+                    clauses.append(f"{field_ref} = ANY({ref}::jsonb[])")
+                else:
+                    clauses.append(
+                        f"({field_ref} IS NULL OR NOT {field_ref} = ANY({ref}::jsonb[]))"
+                    )
+            else:  # $exists
+                if not isinstance(value, bool):
+                    raise InvalidFilterError("$exists expects true or false.")
+                exists = f"{self.column} ? {key_ref}::text"
+                clauses.append(exists if value else f"NOT ({exists})")
+        return clauses
+
+
+def _dumps(value: Any) -> str:
+    try:
+        return json.dumps(value, allow_nan=False)
+    except (TypeError, ValueError) as e:
+        raise InvalidFilterError(f"Filter value is not valid JSON: {value!r}") from e
@@ -0,0 +1,374 @@
+"""Approximate nearest neighbour (ANN) indexes over embeddings.
+
+PGVector creates ``langchain_pg_embedding`` without any vector index, so every
+semantic search is an exact scan. This module manages pgvector HNSW and IVFFlat
+indexes on that table, either one index over all collections or a partial index
+per collection (``WHERE collection_id = ...``), which keeps large collections
+fast without having to filter a shared graph.
+
+The ``embedding`` column has no fixed dimension, which pgvector indexes require,
+so indexes are built on ``embedding::vector(EMBEDDING_DIMENSIONS)`` and searches
+compare against the same expression (see ``vector_distance_sql``). Queries of
+another dimension, from collections embedded with another model, are compared
+without the cast and therefore always scan exactly.
+
+An index scan only visits ``hnsw.ef_search`` candidates (or ``ivfflat.probes``
+lists); rows filtered out by the collection or metadata conditions afterwards
+are not replaced, so a filtered search can return fewer than its limit. With
+pgvector 0.8 or later, searches enable iterative index scans, which keep
+scanning until the limit is reached (up to ``hnsw.max_scan_tuples``).
+
+Indexes are built with ``CREATE INDEX CONCURRENTLY``, so ingestion and search
+keep working while they build. Rebuilding builds a replacement next to the
+existing index and swaps it in once it is ready.
+"""
+
+import asyncio
+import logging
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, Literal, Optional
+
+from fastapi import status
+from fastapi.exceptions import HTTPException
+
+from langconnect import config
+from langconnect.database.connection import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+ANN_INDEX_PREFIX = "ix_langconnect_ann_"
+_GLOBAL_INDEX_SUFFIX = "all"
+_REBUILD_SUFFIX = "_new"
+
+# In-process builds started through ``start_ann_index_build``, keyed by index
+# name, and the error of the last failed build of each index.
+_builds: dict[str, asyncio.Task] = {}
+_build_errors: dict[str, str] = {}
+
+# Whether the database's pgvector supports iterative index scans, read once.
+_iterative_scans: Optional[bool] = None
+
+
+@dataclass(frozen=True)
+class AnnIndexParams:
+    """Build parameters of an ANN index.
+
+    ``m`` and ``ef_construction`` apply to HNSW, ``lists`` to IVFFlat. The
+    defaults are pgvector's own.
+    """
+
+    method: Literal["hnsw", "ivfflat"] = "hnsw"
+    m: int = 16
+    ef_construction: int = 64
+    lists: int = 100
+
+    def __post_init__(self) -> None:
+        """Validate the parameters against pgvector's limits."""
+        if self.method == "hnsw":
+            if not 2 <= self.m <= 100:
+                raise ValueError("m must be between 2 and 100.")
+            if not 4 <= self.ef_construction <= 1000:
+                raise ValueError("ef_construction must be between 4 and 1000.")
+            if self.ef_construction < 2 * self.m:
+                raise ValueError("ef_construction must be at least twice m.")
+        elif self.method == "ivfflat":
+            if not 1 <= self.lists <= 32768:
+                raise ValueError("lists must be between 1 and 32768.")
+        else:
+            raise ValueError(f"Unsupported index method: {self.method}")
+
+    def storage_parameters(self) -> str:
+        """Return the ``WITH (...)`` options for this method."""
+        if self.method == "hnsw":
+            return f"m = {int(self.m)}, ef_construction = {int(self.ef_construction)}"
+        return f"lists = {int(self.lists)}"
+
+
+def ann_index_name(collection_id: Optional[str] = None) -> str:
+    """Name of the partial index of ``collection_id``, or of the global index."""
+    if collection_id is None:
+        return ANN_INDEX_PREFIX + _GLOBAL_INDEX_SUFFIX
+    # Parsing also guarantees the id is safe to splice into DDL.
+    return ANN_INDEX_PREFIX + uuid.UUID(str(collection_id)).hex
+
+
+def vector_expression(column: str = "embedding") -> str:
+    """The indexed expression: the embedding cast to the configured dimension."""
+    return f"({column}::vector({int(config.EMBEDDING_DIMENSIONS)}))"
+
+
+def vector_distance_sql(
+    column: str, param: str, dimensions: Optional[int] = None
+) -> str:
+    """Cosine distance between ``column`` and a query vector parameter.
+
+    Written against the same expression as the ANN indexes so the planner can
+    use them for ``ORDER BY`` distance. A query vector of ``dimensions`` other
+    than ``EMBEDDING_DIMENSIONS`` is compared without the cast, which would
+    fail on its collection's embeddings, and so without the indexes.
+    """
+    if dimensions is not None and dimensions != config.EMBEDDING_DIMENSIONS:
+        return f"{column} <=> {param}::vector"
+    return (
+        f"{vector_expression(column)} <=> "
+        f"{param}::vector({int(config.EMBEDDING_DIMENSIONS)})"
+    )
+
+
+def create_index_sql(
+    name: str, collection_id: Optional[str], params: AnnIndexParams
+) -> str:
+    """The ``CREATE INDEX CONCURRENTLY`` statement for an ANN index."""
+    sql = (
+        f"CREATE INDEX CONCURRENTLY {name} ON langchain_pg_embedding "
+        f"USING {params.method} ({vector_expression()} vector_cosine_ops) "
+        f"WITH ({params.storage_parameters()})"
+    )
+    if collection_id is not None:
+        sql += f" WHERE collection_id = '{uuid.UUID(str(collection_id))}'::uuid"
+    return sql
+
+
+async def _supports_iterative_scans(conn: Any) -> bool:
+    global _iterative_scans
+    if _iterative_scans is None:
+        version = await conn.fetchval(
+            "SELECT extversion FROM pg_extension WHERE extname = 'vector'"
+        )
+        try:
+            major, minor = (int(part) for part in version.split(".")[:2])
+        except (AttributeError, ValueError):
+            _iterative_scans = False
+        else:
+            _iterative_scans = (major, minor) >= (0, 8)
+    return _iterative_scans
+
+
+async def apply_search_settings(
+    conn: Any,
+    *,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+) -> bool:
+    """Configure the current transaction for an ANN search.
+
+    ``ef_search`` (HNSW) and ``probes`` (IVFFlat) trade speed for recall.
+    Custom plans are forced because a generic plan of a prepared statement
+    cannot prove that ``collection_id = $n`` matches a partial index predicate.
+    Iterative index scans are enabled where pgvector supports them: in strict
+    order for HNSW, and in relaxed order for IVFFlat, which has no other, so
+    results must be sorted again.
+
+    Returns whether iterative scans were enabled, i.e. whether a filtered
+    index scan returns up to its limit.
+    """
+    settings = {"plan_cache_mode": "force_custom_plan"}
+    iterative = await _supports_iterative_scans(conn)
+    if iterative:
+        settings["hnsw.iterative_scan"] = "strict_order"
+        settings["ivfflat.iterative_scan"] = "relaxed_order"
+    if ef_search is not None:
+        settings["hnsw.ef_search"] = str(int(ef_search))
+    if probes is not None:
+        settings["ivfflat.probes"] = str(int(probes))
+    calls = ", ".join(
+        f"set_config(${2 * i + 1}, ${2 * i + 2}, true)" for i in range(len(settings))
+    )
+    await conn.execute(
+        f"SELECT {calls}", *(v for item in settings.items() for v in item)
+    )
+    return iterative
+
+
+async def disable_index_scans(conn: Any) -> None:
+    """Make the rest of the current transaction search exactly."""
+    await conn.execute("SELECT set_config('enable_indexscan', 'off', true)")
+
+
+def _parse_reloptions(options: Optional[list[str]]) -> dict[str, int]:
+    parsed = {}
+    for option in options or []:
+        key, _, value = option.partition("=")
+        parsed[key] = int(value) if value.isdigit() else value
+    return parsed
+
+
+async def get_ann_index_status(collection_id: Optional[str] = None) -> dict[str, Any]:
+    """Describe the ANN index of a collection (or the global one).
+
+    ``state`` is one of ``missing``, ``building``, ``ready``, ``invalid`` (a
+    build was interrupted) or ``failed`` (the last build in this worker failed,
+    see ``error``). ``progress`` is reported from ``pg_stat_progress_create_index``
+    while a build runs, in any worker.
+    """
+    name = ann_index_name(collection_id)
+    names = [name, name + _REBUILD_SUFFIX]
+    async with get_db_connection() as conn:
+        indexes = {
+            row["name"]: row
+            for row in await conn.fetch(
+                """
+                SELECT c.relname AS name,
+                       am.amname AS method,
+                       c.reloptions,
+                       i.indisvalid AS valid,
+                       pg_relation_size(c.oid) AS size_bytes
+                  FROM pg_index i
+                  JOIN pg_class c ON c.oid = i.indexrelid
+                  JOIN pg_am am ON am.oid = c.relam
+                 WHERE i.indrelid = 'langchain_pg_embedding'::regclass
+                   AND c.relname = ANY($1::text[])
+                """,
+                names,
+            )
+        }
+        progress = await conn.fetchrow(
+            """
+            SELECT p.phase,
+                   p.blocks_done,
+                   p.blocks_total,
+                   p.tuples_done,
+                   p.tuples_total
+              FROM pg_stat_progress_create_index p
+              JOIN pg_class c ON c.oid = p.index_relid
+             WHERE c.relname = ANY($1::text[])
+            """,
+            names,
+        )
+
+    current = indexes.get(name)
+    task = _builds.get(name)
+    building = progress is not None or (task is not None and not task.done())
+    if building:
+        state = "building"
+    elif name in _build_errors:
+        state = "failed"
+    elif current is None:
+        state = "missing"
+    else:
+        state = "ready" if current["valid"] else "invalid"
+
+    return {
+        "name": name,
+        "collection_id": collection_id,
+        "state": state,
+        "method": current["method"] if current else None,
+        "parameters": _parse_reloptions(current["reloptions"]) if current else {},
+        "size_bytes": current["size_bytes"] if current else None,
+        "progress": dict(progress) if progress else None,
+        "error": _build_errors.get(name),
+    }
+
+
+async def list_ann_indexes() -> list[dict[str, Any]]:
+    """List every ANN index managed by LangConnect."""
+    async with get_db_connection() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT c.relname AS name
+              FROM pg_index i
+              JOIN pg_class c ON c.oid = i.indexrelid
+             WHERE i.indrelid = 'langchain_pg_embedding'::regclass
+               AND c.relname LIKE $1
+               AND c.relname NOT LIKE $2
+             ORDER BY c.relname
+            """,
+            ANN_INDEX_PREFIX + "%",
+            "%" + _REBUILD_SUFFIX,
+        )
+    statuses = []
+    for row in rows:
+        suffix = row["name"][len(ANN_INDEX_PREFIX) :]
+        collection_id = (
+            None if suffix == _GLOBAL_INDEX_SUFFIX else str(uuid.UUID(hex=suffix))
+        )
+        statuses.append(await get_ann_index_status(collection_id))
+    return statuses
+
+
+async def build_ann_index(
+    collection_id: Optional[str] = None,
+    params: AnnIndexParams = AnnIndexParams(),
+) -> None:
+    """Create the ANN index, or rebuild it if it already exists.
+
+    Runs until the build is complete. Use ``start_ann_index_build`` to build in
+    the background of the API server.
+    """
+    name = ann_index_name(collection_id)
+    replacement = name + _REBUILD_SUFFIX
+    async with get_db_connection() as conn:
+        if config.ANN_INDEX_MAINTENANCE_WORK_MEM:
+            # Session setting; asyncpg resets it when the connection is released.
+            await conn.execute(
+                "SELECT set_config('maintenance_work_mem', $1, false)",
+                config.ANN_INDEX_MAINTENANCE_WORK_MEM,
+            )
+        # Leftover of an interrupted rebuild.
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {replacement}")
+        existing_valid = await conn.fetchval(
+            """
+            SELECT i.indisvalid
+              FROM pg_index i
+              JOIN pg_class c ON c.oid = i.indexrelid
+             WHERE c.relname = $1
+            """,
+            name,
+        )
+        if existing_valid is False:
+            # An interrupted build leaves an invalid index behind that is never
+            # used for queries; replace it outright.
+            await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            existing_valid = None
+
+        target = replacement if existing_valid else name
+        logger.info(f"Building {params.method} index {target}: {asdict(params)}")
+        await conn.execute(create_index_sql(target, collection_id, params))
+
+        if target == replacement:
+            async with conn.transaction():
+                await conn.execute(f"DROP INDEX {name}")
+                await conn.execute(f"ALTER INDEX {replacement} RENAME TO {name}")
+        logger.info(f"Index {name} is ready.")
+
+
+def start_ann_index_build(
+    collection_id: Optional[str] = None,
+    params: AnnIndexParams = AnnIndexParams(),
+) -> None:
+    """Start ``build_ann_index`` as a background task of the running loop."""
+    name = ann_index_name(collection_id)
+    task = _builds.get(name)
+    if task is not None and not task.done():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An index build is already running for this collection.",
+        )
+    _build_errors.pop(name, None)
+    task = asyncio.create_task(build_ann_index(collection_id, params))
+    _builds[name] = task
+
+    def _on_done(done: asyncio.Task) -> None:
+        if _builds.get(name) is done:
+            del _builds[name]
+        if not done.cancelled() and done.exception() is not None:
+            error = done.exception()
+            logger.error(f"Building index {name} failed: {error}")
+            _build_errors[name] = str(error)
+
+    task.add_done_callback(_on_done)
+
+
+async def drop_ann_index(collection_id: Optional[str] = None) -> bool:
+    """Drop the ANN index, cancelling an in-process build. Returns whether one existed."""
+    name = ann_index_name(collection_id)
+    task = _builds.pop(name, None)
+    if task is not None and not task.done():
+        task.cancel()
+    _build_errors.pop(name, None)
+    async with get_db_connection() as conn:
+        existed = await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", name)
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}{_REBUILD_SUFFIX}")
+    return bool(existed)
@@ -0,0 +1,621 @@
+"""DB-backed queue of document ingestion jobs.
+
+A job holds the files of one ``documents_create`` request in
+``langconnect_ingest_job_files`` until a worker has parsed, embedded and stored
+them. File contents are stored in parts of ``FILE_PART_SIZE`` bytes in
+``langconnect_ingest_job_file_parts``. Workers claim jobs with ``FOR UPDATE SKIP LOCKED``, so any number of
+workers, in any number of processes, can share the queue.
+
+Job statuses: ``queued`` -> ``running`` -> ``succeeded`` | ``failed`` |
+``cancelled``. A running job whose worker stops sending heartbeats is picked up
+again by another worker. Failed attempts are retried with exponential backoff
+until ``max_attempts`` is reached.
+
+The worker that claimed a job holds it (``locked_by``) until the job ends or is
+taken over. Every update a worker makes checks that it still does, and raises
+``LeaseLostError`` otherwise, so a worker that was taken over never records
+progress alongside the new one.
+"""
+
+import json
+import logging
+import uuid
+from typing import Any, BinaryIO, Optional
+
+import asyncpg
+from fastapi import status
+from fastapi.exceptions import HTTPException
+
+from langconnect import config
+from langconnect.database.connection import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+FILE_PART_SIZE = 1024 * 1024
+
+
+class LeaseLostError(Exception):
+    """The worker no longer holds the job: it was reclaimed, or ended elsewhere."""
+
+
+_JOB_COLUMNS = """
+    id, collection_id, owner_id, status, params, attempts, max_attempts,
+    cancel_requested, files_total, files_done, chunks_added, failed_files,
+    error, created_at, started_at, finished_at
+"""
+
+
+def _format_job(row: asyncpg.Record) -> dict[str, Any]:
+    job = dict(row)
+    job["id"] = str(job["id"])
+    job["collection_id"] = str(job["collection_id"])
+    job["params"] = json.loads(job["params"]) if job["params"] else {}
+    job["failed_files"] = json.loads(job["failed_files"]) if job["failed_files"] else []
+    return job
+
+
+class IngestJobsManager:
+    """Create, inspect and cancel the ingestion jobs of a user."""
+
+    def __init__(self, user_id: str) -> None:
+        """Initialize the jobs manager with a user ID."""
+        self.user_id = user_id
+
+    async def create(
+        self,
+        collection_id: str,
+        files: list[dict[str, Any]],
+        params: dict[str, Any],
+        *,
+        max_attempts: Optional[int] = None,
+        claimed_by: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Queue a job for ``files`` in a collection the user owns.
+
+        Args:
+            collection_id: Target collection.
+            files: One dict per file with ``filename``, ``content_type``,
+                ``metadata`` and ``file``, an object with an async
+                ``read(size)`` such as ``UploadFile``. Files are copied one
+                part at a time.
+            params: Processing parameters (chunk size, overlap, chunking flag).
+            max_attempts: Attempts before the job fails; defaults to
+                ``INGEST_MAX_ATTEMPTS``.
+            claimed_by: Create the job already running under this worker id,
+                so that the caller processes it itself instead of a worker.
+        """
+        job_id = uuid.uuid4()
+        async with get_db_connection() as conn, conn.transaction():
+            row = await conn.fetchrow(
+                f"""
+                INSERT INTO langconnect_ingest_jobs
+                       (id, collection_id, owner_id, status, params, max_attempts,
+                        files_total, locked_by, heartbeat_at, attempts, started_at)
+                SELECT $1, c.uuid, $3, $4, $5::jsonb, $6, $7, $8,
+                       CASE WHEN $8::text IS NULL THEN NULL ELSE now() END,
+                       CASE WHEN $8::text IS NULL THEN 0 ELSE 1 END,
+                       CASE WHEN $8::text IS NULL THEN NULL ELSE now() END
+                  FROM langchain_pg_collection c
+                 WHERE c.uuid = $2
+                   AND c.owner_id = $3
+                RETURNING {_JOB_COLUMNS}
+                """,
+                job_id,
+                collection_id,
+                self.user_id,
+                "queued" if claimed_by is None else "running",
+                json.dumps(params),
+                max_attempts or config.INGEST_MAX_ATTEMPTS,
+                len(files),
+                claimed_by,
+            )
+            if not row:
+                raise HTTPException(status_code=404, detail="Collection not found")
+            for position, file in enumerate(files):
+                await conn.execute(
+                    """
+                    INSERT INTO langconnect_ingest_job_files
+                           (job_id, position, filename, content_type, metadata,
+                            file_id)
+                    VALUES ($1, $2, $3, $4, $5::jsonb, $6)
+                    """,
+                    job_id,
+                    position,
+                    file["filename"],
+                    file["content_type"],
+                    json.dumps(file["metadata"]) if file["metadata"] else None,
+                    str(uuid.uuid4()),
+                )
+                await _write_file_parts(conn, job_id, position, file["file"])
+        return _format_job(row)
+
+    async def get(self, collection_id: str, job_id: str) -> dict[str, Any]:
+        """Fetch a job of the user, raising 404 if it does not exist."""
+        async with get_db_connection() as conn:
+            row = await conn.fetchrow(
+                f"""
+                SELECT {_JOB_COLUMNS}
+                  FROM langconnect_ingest_jobs
+                 WHERE id = $1
+                   AND collection_id = $2
+                   AND owner_id = $3
+                """,
+                job_id,
+                collection_id,
+                self.user_id,
+            )
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+            )
+        return _format_job(row)
+
+    async def list(
+        self, collection_id: str, *, limit: int = 20, offset: int = 0
+    ) -> list[dict[str, Any]]:
+        """List the jobs of a collection, most recent first."""
+        async with get_db_connection() as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT {_JOB_COLUMNS}
+                  FROM langconnect_ingest_jobs
+                 WHERE collection_id = $1
+                   AND owner_id = $2
+                 ORDER BY created_at DESC
+                 LIMIT $3 OFFSET $4
+                """,
+                collection_id,
+                self.user_id,
+                limit,
+                offset,
+            )
+        return [_format_job(row) for row in rows]
+
+    async def cancel(self, collection_id: str, job_id: str) -> dict[str, Any]:
+        """Cancel a job.
+
+        A queued job is cancelled immediately. A running job is flagged and
+        stops before its next file; chunks already stored are kept.
+        """
+        async with get_db_connection() as conn:
+            row = await conn.fetchrow(
+                f"""
+                UPDATE langconnect_ingest_jobs
+                   SET cancel_requested = true,
+                       status = CASE WHEN status = 'queued'
+                                     THEN 'cancelled' ELSE status END,
+                       finished_at = CASE WHEN status = 'queued'
+                                          THEN now() ELSE finished_at END
+                 WHERE id = $1
+                   AND collection_id = $2
+                   AND owner_id = $3
+                   AND status IN ('queued', 'running')
+                RETURNING {_JOB_COLUMNS}
+                """,
+                job_id,
+                collection_id,
+                self.user_id,
+            )
+        if not row:
+            job = await self.get(collection_id, job_id)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Job is already {job['status']}.",
+            )
+        if row["status"] == "cancelled":
+            await _clear_file_data(job_id)
+        return _format_job(row)
+
+    async def retry(self, collection_id: str, job_id: str) -> dict[str, Any]:
+        """Queue a failed job again for the files it has not ingested yet."""
+        async with get_db_connection() as conn:
+            row = await conn.fetchrow(
+                f"""
+                UPDATE langconnect_ingest_jobs j
+                   SET status = 'queued',
+                       attempts = 0,
+                       run_after = now(),
+                       cancel_requested = false,
+                       error = NULL,
+                       finished_at = NULL
+                 WHERE id = $1
+                   AND collection_id = $2
+                   AND owner_id = $3
+                   AND status = 'failed'
+                   AND EXISTS (
+                       SELECT 1
+                         FROM langconnect_ingest_job_files f
+                         JOIN langconnect_ingest_job_file_parts p
+                           ON p.job_id = f.job_id AND p.position = f.position
+                        WHERE f.job_id = j.id
+                          AND f.status = 'pending'
+                   )
+                RETURNING {_JOB_COLUMNS}
+                """,
+                job_id,
+                collection_id,
+                self.user_id,
+            )
+        if not row:
+            job = await self.get(collection_id, job_id)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Job is {job['status']} and has no files left to retry.",
+            )
+        return _format_job(row)
+
+
+# Worker-side operations. These are not scoped to a user: the job row carries
+# the owner that its documents are written for.
+
+
+async def claim_next_job(worker_id: str) -> Optional[dict[str, Any]]:
+    """Atomically take the next runnable job, or None if the queue is empty.
+
+    Runnable jobs are queued jobs whose backoff has elapsed and running jobs
+    whose worker has stopped sending heartbeats.
+    """
+    async with get_db_connection() as conn:
+        row = await conn.fetchrow(
+            f"""
+            UPDATE langconnect_ingest_jobs
+               SET status = 'running',
+                   locked_by = $1,
+                   heartbeat_at = now(),
+                   attempts = attempts + 1,
+                   started_at = COALESCE(started_at, now())
+             WHERE id = (
+                   SELECT id
+                     FROM langconnect_ingest_jobs
+                    WHERE (status = 'queued' AND run_after <= now())
+                       OR (status = 'running'
+                           AND heartbeat_at < now() - make_interval(secs => $2)
+                           AND attempts < max_attempts)
+                    ORDER BY run_after
+                    LIMIT 1
+                      FOR UPDATE SKIP LOCKED
+             )
+            RETURNING {_JOB_COLUMNS}
+            """,
+            worker_id,
+            config.INGEST_JOB_STALE_SECONDS,
+        )
+    return _format_job(row) if row else None
+
+
+async def fail_stale_jobs() -> int:
+    """Fail running jobs whose worker vanished on their last attempt."""
+    async with get_db_connection() as conn:
+        result = await conn.execute(
+            """
+            UPDATE langconnect_ingest_jobs
+               SET status = 'failed',
+                   error = 'The worker processing this job stopped responding.',
+                   locked_by = NULL,
+                   finished_at = now()
+             WHERE status = 'running'
+               AND heartbeat_at < now() - make_interval(secs => $1)
+               AND attempts >= max_attempts
+            """,
+            config.INGEST_JOB_STALE_SECONDS,
+        )
+    return int(result.split()[-1])
+
+
+async def heartbeat(job_id: str, worker_id: str) -> bool:
+    """Record that the job is alive. Returns whether cancellation was requested.
+
+    Raises:
+        LeaseLostError: If ``worker_id`` no longer holds the job.
+    """
+    async with get_db_connection() as conn:
+        cancel_requested = await conn.fetchval(
+            """
+            UPDATE langconnect_ingest_jobs
+               SET heartbeat_at = now()
+             WHERE id = $1
+               AND locked_by = $2
+               AND status = 'running'
+            RETURNING cancel_requested
+            """,
+            job_id,
+            worker_id,
+        )
+    if cancel_requested is None:
+        raise LeaseLostError(job_id)
+    return cancel_requested
+
+
+async def pending_file_positions(job_id: str) -> list[int]:
+    """Positions of the files of a job that still have to be processed."""
+    async with get_db_connection() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT position
+              FROM langconnect_ingest_job_files
+             WHERE job_id = $1
+               AND status = 'pending'
+             ORDER BY position
+            """,
+            job_id,
+        )
+    return [row["position"] for row in rows]
+
+
+async def get_job_file(job_id: str, position: int) -> dict[str, Any]:
+    """Load the description of one file of a job, without its contents."""
+    async with get_db_connection() as conn:
+        row = await conn.fetchrow(
+            """
+            SELECT position, filename, content_type, metadata, file_id
+              FROM langconnect_ingest_job_files
+             WHERE job_id = $1
+               AND position = $2
+            """,
+            job_id,
+            position,
+        )
+    file = dict(row)
+    file["metadata"] = json.loads(file["metadata"]) if file["metadata"] else None
+    return file
+
+
+async def download_job_file(job_id: str, position: int, target: BinaryIO) -> int:
+    """Write the contents of a job file to ``target``, one part at a time.
+
+    Returns the number of bytes written.
+    """
+    size = 0
+    async with get_db_connection() as conn, conn.transaction():
+        async for row in conn.cursor(
+            """
+            SELECT data
+              FROM langconnect_ingest_job_file_parts
+             WHERE job_id = $1
+               AND position = $2
+             ORDER BY part
+            """,
+            job_id,
+            position,
+            prefetch=1,
+        ):
+            target.write(row["data"])
+            size += len(row["data"])
+    return size
+
+
+async def complete_job_file(
+    job_id: str, worker_id: str, position: int, chunk_ids: list[str]
+) -> None:
+    """Mark a file as ingested and advance the job's progress.
+
+    Raises:
+        LeaseLostError: If ``worker_id`` no longer holds the job, or the file
+            was already recorded; nothing is changed then.
+    """
+    async with get_db_connection() as conn, conn.transaction():
+        await _advance_job(
+            conn,
+            job_id,
+            worker_id,
+            "chunks_added = chunks_added + $3",
+            len(chunk_ids),
+        )
+        await _record_job_file(
+            conn, job_id, position, "status = 'done', chunk_ids = $3", chunk_ids
+        )
+        await _delete_file_parts(conn, job_id, position)
+
+
+async def fail_job_file(
+    job_id: str, worker_id: str, position: int, filename: str, error: str
+) -> None:
+    """Mark a file that cannot be processed; the job continues with the rest.
+
+    Raises:
+        LeaseLostError: As for ``complete_job_file``.
+    """
+    async with get_db_connection() as conn, conn.transaction():
+        await _advance_job(
+            conn,
+            job_id,
+            worker_id,
+            "failed_files = failed_files || jsonb_build_array($3::text)",
+            filename,
+        )
+        await _record_job_file(
+            conn, job_id, position, "status = 'failed', error = $3", error
+        )
+        await _delete_file_parts(conn, job_id, position)
+
+
+async def _advance_job(
+    conn: asyncpg.Connection, job_id: str, worker_id: str, update: str, value: Any
+) -> None:
+    # Locks the job row, so the lease cannot change hands before the
+    # transaction commits.
+    result = await conn.execute(
+        f"""
+        UPDATE langconnect_ingest_jobs
+           SET files_done = files_done + 1,
+               {update},
+               heartbeat_at = now()
+         WHERE id = $1
+           AND locked_by = $2
+           AND status = 'running'
+        """,
+        job_id,
+        worker_id,
+        value,
+    )
+    if result == "UPDATE 0":
+        raise LeaseLostError(job_id)
+
+
+async def _record_job_file(
+    conn: asyncpg.Connection, job_id: str, position: int, update: str, value: Any
+) -> None:
+    result = await conn.execute(
+        f"""
+        UPDATE langconnect_ingest_job_files
+           SET {update}
+         WHERE job_id = $1
+           AND position = $2
+           AND status = 'pending'
+        """,
+        job_id,
+        position,
+        value,
+    )
+    if result == "UPDATE 0":
+        raise LeaseLostError(job_id)
+
+
+async def get_job_chunk_ids(job_id: str) -> list[str]:
+    """Ids of all chunks stored by a job, in file order."""
+    async with get_db_connection() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT chunk_ids
+              FROM langconnect_ingest_job_files
+             WHERE job_id = $1
+             ORDER BY position
+            """,
+            job_id,
+        )
+    return [chunk_id for row in rows for chunk_id in row["chunk_ids"]]
+
+
+async def finish_job(
+    job_id: str, worker_id: str, status: str, error: Optional[str] = None
+) -> None:
+    """Move a job to a final status.
+
+    File payloads are released, except for failed jobs, which keep the files
+    they did not get to so that they can be retried.
+
+    Raises:
+        LeaseLostError: If ``worker_id`` no longer holds the job.
+    """
+    async with get_db_connection() as conn:
+        result = await conn.execute(
+            """
+            UPDATE langconnect_ingest_jobs
+               SET status = $3,
+                   error = $4,
+                   locked_by = NULL,
+                   finished_at = now()
+             WHERE id = $1
+               AND locked_by = $2
+               AND status = 'running'
+            """,
+            job_id,
+            worker_id,
+            status,
+            error,
+        )
+    if result == "UPDATE 0":
+        raise LeaseLostError(job_id)
+    if status != "failed":
+        await _clear_file_data(job_id)
+
+
+async def retry_or_fail_job(
+    job_id: str, worker_id: str, error: str
+) -> Optional[str]:
+    """After a failed attempt, queue the job again with backoff or fail it.
+
+    Returns the job's new status, or None if ``worker_id`` no longer holds it.
+    """
+    async with get_db_connection() as conn:
+        return await conn.fetchval(
+            """
+            UPDATE langconnect_ingest_jobs
+               SET status = CASE WHEN attempts < max_attempts
+                                 THEN 'queued' ELSE 'failed' END,
+                   run_after = now() + make_interval(
+                       secs => $4 * power(2, GREATEST(attempts - 1, 0))
+                   ),
+                   finished_at = CASE WHEN attempts < max_attempts
+                                      THEN NULL ELSE now() END,
+                   locked_by = NULL,
+                   error = $3
+             WHERE id = $1
+               AND locked_by = $2
+               AND status = 'running'
+            RETURNING status
+            """,
+            job_id,
+            worker_id,
+            error,
+            config.INGEST_RETRY_BACKOFF_SECONDS,
+        )
+
+
+async def release_job(job_id: str, worker_id: str) -> None:
+    """Hand a job that was interrupted by a shutdown back to the queue."""
+    async with get_db_connection() as conn:
+        await conn.execute(
+            """
+            UPDATE langconnect_ingest_jobs
+               SET status = 'queued',
+                   attempts = GREATEST(attempts - 1, 0),
+                   run_after = now(),
+                   locked_by = NULL
+             WHERE id = $1
+               AND locked_by = $2
+               AND status = 'running'
+            """,
+            job_id,
+            worker_id,
+        )
+
+
+async def _write_file_parts(
+    conn: asyncpg.Connection, job_id: uuid.UUID, position: int, file: Any
+) -> None:
+    # Part 0 is always written, so that an empty file still has contents.
+    part = 0
+    while True:
+        data = await file.read(FILE_PART_SIZE)
+        if part and not data:
+            return
+        await conn.execute(
+            """
+            INSERT INTO langconnect_ingest_job_file_parts
+                   (job_id, position, part, data)
+            VALUES ($1, $2, $3, $4)
+            """,
+            job_id,
+            position,
+            part,
+            data,
+        )
+        if len(data) < FILE_PART_SIZE:
+            return
+        part += 1
+
+
+async def _delete_file_parts(
+    conn: asyncpg.Connection, job_id: str, position: int
+) -> None:
+    await conn.execute(
+        """
+        DELETE FROM langconnect_ingest_job_file_parts
+         WHERE job_id = $1
+           AND position = $2
+        """,
+        job_id,
+        position,
+    )
+
+
+async def _clear_file_data(job_id: str) -> None:
+    async with get_db_connection() as conn:
+        await conn.execute(
+            """
+            DELETE FROM langconnect_ingest_job_file_parts
+             WHERE job_id = $1
+            """,
+            job_id,
+        )
@@ -0,0 +1,836 @@
+"""Versioned schema migrations applied on top of the tables created by PGVector.
+
+PGVector creates ``langchain_pg_collection`` and ``langchain_pg_embedding``
+itself, so anything LangConnect needs beyond that (extra columns, indexes,
+triggers, tables) is applied here at startup, after the vector store has been
+initialized.
+
+Each migration has a version number and runs at most once per database, in its
+own transaction. Applied versions are recorded in ``langconnect_schema_migrations``.
+New migrations must be appended with the next version number; never edit or
+reorder a migration that has shipped.
+
+``langchain_pg_embedding`` can be far too large to rewrite, or to lock for an
+index build, while the server starts. Migrations that touch it add plain
+nullable columns, filled for new rows by triggers, in their transaction; then
+fill existing rows in batches that commit one by one (``backfills``) and build
+their indexes with ``CREATE INDEX CONCURRENTLY`` (``indexes``). Such a migration
+is recorded only once all of that is done, so one that was interrupted resumes
+on the next start; its statements must therefore be safe to run again.
+"""
+
+import logging
+from typing import NamedTuple
+
+import asyncpg
+
+from langconnect.database.connection import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# Rows per backfill batch, each committed on its own.
+_BACKFILL_BATCH_SIZE = 5000
+
+# Arbitrary key for the advisory lock that serializes concurrent migrators
+# (e.g. several uvicorn workers starting at once).
+_MIGRATION_LOCK_KEY = 0x6C616E67636F6E6E
+
+MIGRATIONS_TABLE = "langconnect_schema_migrations"
+
+
+class Migration(NamedTuple):
+    """A numbered group of SQL statements applied atomically.
+
+    Each backfill statement updates one batch of rows: ``$1`` is the last key of
+    the previous batch as text (NULL for the first batch) and ``$2`` the batch
+    size. It returns the last key of its batch, or NULL once no rows are left.
+    Indexes are given as ``(name, definition)``, the definition following
+    ``CREATE INDEX name``.
+    """
+
+    version: int
+    description: str
+    statements: list[str]
+    backfills: list[str] = []
+    indexes: list[tuple[str, str]] = []
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(
+        1,
+        "stored tsvector column for keyword and hybrid search",
+        [
+            # Pre-computed tsvector, so queries no longer re-tokenize every
+            # document in the collection. Kept by a trigger rather than
+            # generated, since adding a generated column rewrites the table.
+            """
+            ALTER TABLE langchain_pg_embedding
+              ADD COLUMN IF NOT EXISTS document_tsv tsvector
+            """,
+            """
+            CREATE OR REPLACE FUNCTION langconnect_embedding_set_document_tsv()
+            RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                NEW.document_tsv := to_tsvector(
+                    'english', COALESCE(NEW.document, '')
+                );
+                RETURN NEW;
+            END;
+            $$
+            """,
+            """
+            DROP TRIGGER IF EXISTS langconnect_embedding_document_tsv
+                ON langchain_pg_embedding
+            """,
+            """
+            CREATE TRIGGER langconnect_embedding_document_tsv
+                BEFORE INSERT OR UPDATE OF document ON langchain_pg_embedding
+                FOR EACH ROW EXECUTE FUNCTION langconnect_embedding_set_document_tsv()
+            """,
+        ],
+        backfills=[
+            """
+            WITH batch AS (
+                SELECT id
+                  FROM langchain_pg_embedding
+                 WHERE $1::text IS NULL OR id > $1
+                 ORDER BY id
+                 LIMIT $2
+            ), filled AS (
+                UPDATE langchain_pg_embedding e
+                   SET document_tsv = to_tsvector('english', COALESCE(e.document, ''))
+                  FROM batch
+                 WHERE e.id = batch.id
+                   AND e.document_tsv IS NULL
+            )
+            SELECT id::text FROM batch ORDER BY id DESC LIMIT 1
+            """,
+        ],
+        indexes=[
+            (
+                "ix_langchain_pg_embedding_document_tsv",
+                "ON langchain_pg_embedding USING gin (document_tsv)",
+            ),
+        ],
+    ),
+    Migration(
+        2,
+        "indexed owner_id, file_id and created_at columns",
+        [
+            # Copies of cmetadata fields, kept by triggers on every insert and
+            # on every update of cmetadata so they cannot drift from it.
+            """
+            ALTER TABLE langchain_pg_collection
+              ADD COLUMN IF NOT EXISTS owner_id text
+            """,
+            """
+            CREATE OR REPLACE FUNCTION langconnect_collection_set_owner_id()
+            RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                NEW.owner_id := NEW.cmetadata->>'owner_id';
+                RETURN NEW;
+            END;
+            $$
+            """,
+            """
+            DROP TRIGGER IF EXISTS langconnect_collection_owner_id
+                ON langchain_pg_collection
+            """,
+            """
+            CREATE TRIGGER langconnect_collection_owner_id
+                BEFORE INSERT OR UPDATE OF cmetadata ON langchain_pg_collection
+                FOR EACH ROW EXECUTE FUNCTION langconnect_collection_set_owner_id()
+            """,
+            """
+            ALTER TABLE langchain_pg_embedding
+              ADD COLUMN IF NOT EXISTS file_id text
+            """,
+            """
+            CREATE OR REPLACE FUNCTION langconnect_embedding_set_file_id()
+            RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                NEW.file_id := NEW.cmetadata->>'file_id';
+                RETURN NEW;
+            END;
+            $$
+            """,
+            """
+            DROP TRIGGER IF EXISTS langconnect_embedding_file_id
+                ON langchain_pg_embedding
+            """,
+            """
+            CREATE TRIGGER langconnect_embedding_file_id
+                BEFORE INSERT OR UPDATE OF cmetadata ON langchain_pg_embedding
+                FOR EACH ROW EXECUTE FUNCTION langconnect_embedding_set_file_id()
+            """,
+            # created_at honours a client-supplied cmetadata.created_at and
+            # otherwise records the insertion time. Parsing depends on the
+            # DateStyle and TimeZone settings, so the function is STABLE and
+            # only used by the trigger and the backfill, never in an index.
+            """
+            CREATE OR REPLACE FUNCTION langconnect_try_timestamptz(value text)
+            RETURNS timestamptz
+            LANGUAGE plpgsql STABLE AS $$
+            BEGIN
+                RETURN value::timestamptz;
+            EXCEPTION WHEN others THEN
+                RETURN NULL;
+            END;
+            $$
+            """,
+            # now() is evaluated once for the default of existing rows, so
+            # adding the column does not rewrite the table.
+            """
+            ALTER TABLE langchain_pg_embedding
+              ADD COLUMN IF NOT EXISTS created_at timestamptz NOT NULL DEFAULT now()
+            """,
+            """
+            CREATE OR REPLACE FUNCTION langconnect_embedding_set_created_at()
+            RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                NEW.created_at := COALESCE(
+                    langconnect_try_timestamptz(NEW.cmetadata->>'created_at'),
+                    now()
+                );
+                RETURN NEW;
+            END;
+            $$
+            """,
+            """
+            DROP TRIGGER IF EXISTS langconnect_embedding_created_at
+                ON langchain_pg_embedding
+            """,
+            """
+            CREATE TRIGGER langconnect_embedding_created_at
+                BEFORE INSERT ON langchain_pg_embedding
+                FOR EACH ROW EXECUTE FUNCTION langconnect_embedding_set_created_at()
+            """,
+        ],
+        backfills=[
+            """
+            WITH batch AS (
+                SELECT uuid
+                  FROM langchain_pg_collection
+                 WHERE $1::text IS NULL OR uuid > $1::uuid
+                 ORDER BY uuid
+                 LIMIT $2
+            ), filled AS (
+                UPDATE langchain_pg_collection c
+                   SET owner_id = c.cmetadata->>'owner_id'
+                  FROM batch
+                 WHERE c.uuid = batch.uuid
+                   AND c.owner_id IS DISTINCT FROM c.cmetadata->>'owner_id'
+            )
+            SELECT uuid::text FROM batch ORDER BY uuid DESC LIMIT 1
+            """,
+            """
+            WITH batch AS (
+                SELECT id,
+                       cmetadata->>'file_id' AS file_id,
+                       langconnect_try_timestamptz(cmetadata->>'created_at')
+                           AS created_at
+                  FROM langchain_pg_embedding
+                 WHERE $1::text IS NULL OR id > $1
+                 ORDER BY id
+                 LIMIT $2
+            ), filled AS (
+                UPDATE langchain_pg_embedding e
+                   SET file_id = batch.file_id,
+                       created_at = COALESCE(batch.created_at, e.created_at)
+                  FROM batch
+                 WHERE e.id = batch.id
+                   AND (e.file_id IS DISTINCT FROM batch.file_id
+                        OR e.created_at IS DISTINCT FROM
+                           COALESCE(batch.created_at, e.created_at))
+            )
+            SELECT id::text FROM batch ORDER BY id DESC LIMIT 1
+            """,
+        ],
+        indexes=[
+            (
+                "ix_langchain_pg_collection_owner_id",
+                "ON langchain_pg_collection (owner_id)",
+            ),
+            (
+                "ix_langchain_pg_embedding_collection_file",
+                "ON langchain_pg_embedding (collection_id, file_id, id)",
+            ),
+            (
+                "ix_langchain_pg_embedding_collection_created_at",
+                "ON langchain_pg_embedding (collection_id, created_at)",
+            ),
+        ],
+    ),
+    Migration(
+        3,
+        "ingestion job queue",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS langconnect_ingest_jobs (
+                id               uuid PRIMARY KEY,
+                collection_id    uuid NOT NULL
+                                 REFERENCES langchain_pg_collection (uuid)
+                                 ON DELETE CASCADE,
+                owner_id         text NOT NULL,
+                status           text NOT NULL DEFAULT 'queued',
+                params           jsonb NOT NULL DEFAULT '{}',
+                attempts         integer NOT NULL DEFAULT 0,
+                max_attempts     integer NOT NULL,
+                run_after        timestamptz NOT NULL DEFAULT now(),
+                locked_by        text,
+                heartbeat_at     timestamptz,
+                cancel_requested boolean NOT NULL DEFAULT false,
+                files_total      integer NOT NULL,
+                files_done       integer NOT NULL DEFAULT 0,
+                chunks_added     integer NOT NULL DEFAULT 0,
+                failed_files     jsonb NOT NULL DEFAULT '[]',
+                error            text,
+                created_at       timestamptz NOT NULL DEFAULT now(),
+                started_at       timestamptz,
+                finished_at      timestamptz
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS ix_langconnect_ingest_jobs_queued
+                ON langconnect_ingest_jobs (run_after)
+             WHERE status = 'queued'
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS ix_langconnect_ingest_jobs_collection
+                ON langconnect_ingest_jobs (collection_id, created_at DESC)
+            """,
+            # Uploaded files wait here until a worker has ingested them; the
+            # payload is cleared once the file is done or the job finishes.
+            """
+            CREATE TABLE IF NOT EXISTS langconnect_ingest_job_files (
+                job_id       uuid NOT NULL
+                             REFERENCES langconnect_ingest_jobs (id)
+                             ON DELETE CASCADE,
+                position     integer NOT NULL,
+                filename     text,
+                content_type text,
+                metadata     jsonb,
+                file_id      text NOT NULL,
+                data         bytea,
+                status       text NOT NULL DEFAULT 'pending',
+                chunk_ids    text[] NOT NULL DEFAULT '{}',
+                error        text,
+                PRIMARY KEY (job_id, position)
+            )
+            """,
+        ],
+    ),
+    Migration(
+        4,
+        "store queued files in parts",
+        [
+            # Files are written and read one part at a time, so neither the
+            # API nor the workers hold a whole upload in memory.
+            """
+            CREATE TABLE IF NOT EXISTS langconnect_ingest_job_file_parts (
+                job_id   uuid NOT NULL,
+                position integer NOT NULL,
+                part     integer NOT NULL,
+                data     bytea NOT NULL,
+                PRIMARY KEY (job_id, position, part),
+                FOREIGN KEY (job_id, position)
+                    REFERENCES langconnect_ingest_job_files (job_id, position)
+                    ON DELETE CASCADE
+            )
+            """,
+            """
+            INSERT INTO langconnect_ingest_job_file_parts
+                   (job_id, position, part, data)
+            SELECT job_id, position, 0, data
+              FROM langconnect_ingest_job_files
+             WHERE data IS NOT NULL
+            """,
+            """
+            ALTER TABLE langconnect_ingest_job_files DROP COLUMN IF EXISTS data
+            """,
+        ],
+    ),
+    Migration(
+        5,
+        "embedding cache",
+        [
+            # Embeddings of chunk texts, by embedding model and SHA-256 of the
+            # normalized text, reused when the same text is ingested again.
+            """
+            CREATE TABLE IF NOT EXISTS langconnect_embedding_cache (
+                model        text NOT NULL,
+                content_hash bytea NOT NULL,
+                embedding    real[] NOT NULL,
+                created_at   timestamptz NOT NULL DEFAULT now(),
+                PRIMARY KEY (model, content_hash)
+            )
+            """,
+        ],
+    ),
+    Migration(
+        6,
+        "per-file document group summaries",
+        [
+            # Blocks chunk writes until the triggers below are in place, so
+            # none is missed between the summaries' backfill and the triggers.
+            # (CREATE TRIGGER takes this lock anyway, but only after the
+            # backfill has read the table.)
+            "LOCK TABLE langchain_pg_embedding IN SHARE ROW EXCLUSIVE MODE",
+            # One row per (collection, file_id), kept in step with the chunks
+            # by the triggers below, so listing document groups is an index
+            # read instead of an aggregate over every chunk of the collection.
+            """
+            CREATE TABLE IF NOT EXISTS langconnect_document_groups (
+                collection_id   uuid NOT NULL
+                                REFERENCES langchain_pg_collection (uuid)
+                                ON DELETE CASCADE,
+                file_id         text NOT NULL,
+                source          text,
+                chunk_count     bigint NOT NULL,
+                total_chars     bigint NOT NULL,
+                created_at      timestamptz NOT NULL,
+                last_created_at timestamptz NOT NULL,
+                PRIMARY KEY (collection_id, file_id)
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS ix_langconnect_document_groups_recent
+                ON langconnect_document_groups
+                   (collection_id, last_created_at, file_id)
+            """,
+            """
+            INSERT INTO langconnect_document_groups
+            SELECT collection_id,
+                   file_id,
+                   MIN(cmetadata->>'source'),
+                   COUNT(*),
+                   SUM(LENGTH(COALESCE(document, ''))),
+                   MIN(created_at),
+                   MAX(created_at)
+              FROM langchain_pg_embedding
+             WHERE file_id IS NOT NULL
+             GROUP BY collection_id, file_id
+            ON CONFLICT DO NOTHING
+            """,
+            # Statement-level triggers see every row a statement wrote through
+            # transition tables, so a bulk insert or delete touches each file
+            # summary once. Inserts add their counts to the summary. Updates
+            # and deletes recount the files they touched, since minimums and
+            # maximums cannot be decremented.
+            #
+            # Every change to a summary first takes a transaction-level
+            # advisory lock on its (collection, file_id), in key order. A
+            # recount therefore waits for concurrent writers of the file to
+            # commit and, in READ COMMITTED, its query sees their chunks; a
+            # writer that has not inserted yet adds its counts after the
+            # recount. (A REPEATABLE READ writer could recount from a stale
+            # snapshot; LangConnect only writes chunks in READ COMMITTED.)
+            """
+            CREATE OR REPLACE FUNCTION langconnect_document_group_recount(
+                p_collection_id uuid, p_file_id text
+            )
+            RETURNS void
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                PERFORM pg_advisory_xact_lock(
+                    hashtext(p_collection_id::text), hashtext(p_file_id)
+                );
+                INSERT INTO langconnect_document_groups AS g
+                SELECT collection_id,
+                       file_id,
+                       MIN(cmetadata->>'source'),
+                       COUNT(*),
+                       SUM(LENGTH(COALESCE(document, ''))),
+                       MIN(created_at),
+                       MAX(created_at)
+                  FROM langchain_pg_embedding
+                 WHERE collection_id = p_collection_id
+                   AND file_id = p_file_id
+                 GROUP BY collection_id, file_id
+                ON CONFLICT (collection_id, file_id) DO UPDATE
+                   SET source = EXCLUDED.source,
+                       chunk_count = EXCLUDED.chunk_count,
+                       total_chars = EXCLUDED.total_chars,
+                       created_at = EXCLUDED.created_at,
+                       last_created_at = EXCLUDED.last_created_at;
+                IF NOT FOUND THEN
+                    DELETE FROM langconnect_document_groups
+                     WHERE collection_id = p_collection_id
+                       AND file_id = p_file_id;
+                END IF;
+            END;
+            $$
+            """,
+            """
+            CREATE OR REPLACE FUNCTION langconnect_document_groups_sync()
+            RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            DECLARE
+                k record;
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    FOR k IN
+                        SELECT collection_id,
+                               file_id,
+                               MIN(cmetadata->>'source') AS source,
+                               COUNT(*) AS chunk_count,
+                               SUM(LENGTH(COALESCE(document, ''))) AS total_chars,
+                               MIN(created_at) AS created_at,
+                               MAX(created_at) AS last_created_at
+                          FROM new_rows
+                         WHERE file_id IS NOT NULL
+                         GROUP BY collection_id, file_id
+                         ORDER BY collection_id, file_id
+                    LOOP
+                        PERFORM pg_advisory_xact_lock(
+                            hashtext(k.collection_id::text), hashtext(k.file_id)
+                        );
+                        INSERT INTO langconnect_document_groups AS g
+                        VALUES (k.collection_id, k.file_id, k.source,
+                                k.chunk_count, k.total_chars,
+                                k.created_at, k.last_created_at)
+                        ON CONFLICT (collection_id, file_id) DO UPDATE
+                           SET source = LEAST(g.source, EXCLUDED.source),
+                               chunk_count = g.chunk_count + EXCLUDED.chunk_count,
+                               total_chars = g.total_chars + EXCLUDED.total_chars,
+                               created_at = LEAST(g.created_at, EXCLUDED.created_at),
+                               last_created_at = GREATEST(
+                                   g.last_created_at, EXCLUDED.last_created_at
+                               );
+                    END LOOP;
+                ELSIF TG_OP = 'DELETE' THEN
+                    FOR k IN
+                        SELECT DISTINCT collection_id, file_id
+                          FROM old_rows
+                         WHERE file_id IS NOT NULL
+                         ORDER BY collection_id, file_id
+                    LOOP
+                        PERFORM langconnect_document_group_recount(
+                            k.collection_id, k.file_id
+                        );
+                    END LOOP;
+                ELSE
+                    -- Metadata-only updates leave the summaries as they are.
+                    FOR k IN
+                        WITH changed AS (
+                            SELECT o.collection_id AS old_collection_id,
+                                   o.file_id AS old_file_id,
+                                   n.collection_id AS new_collection_id,
+                                   n.file_id AS new_file_id
+                              FROM old_rows o
+                              JOIN new_rows n USING (id)
+                             WHERE (o.collection_id, o.file_id, o.document,
+                                    o.cmetadata->>'source', o.created_at)
+                                   IS DISTINCT FROM
+                                   (n.collection_id, n.file_id, n.document,
+                                    n.cmetadata->>'source', n.created_at)
+                        )
+                        SELECT old_collection_id AS collection_id,
+                               old_file_id AS file_id
+                          FROM changed
+                         WHERE old_file_id IS NOT NULL
+                         UNION
+                        SELECT new_collection_id, new_file_id
+                          FROM changed
+                         WHERE new_file_id IS NOT NULL
+                         ORDER BY collection_id, file_id
+                    LOOP
+                        PERFORM langconnect_document_group_recount(
+                            k.collection_id, k.file_id
+                        );
+                    END LOOP;
+                END IF;
+                RETURN NULL;
+            END;
+            $$
+            """,
+            """
+            DROP TRIGGER IF EXISTS langconnect_document_groups_insert
+                ON langchain_pg_embedding
+            """,
+            """
+            CREATE TRIGGER langconnect_document_groups_insert
+                AFTER INSERT ON langchain_pg_embedding
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION langconnect_document_groups_sync()
+            """,
+            """
+            DROP TRIGGER IF EXISTS langconnect_document_groups_update
+                ON langchain_pg_embedding
+            """,
+            """
+            CREATE TRIGGER langconnect_document_groups_update
+                AFTER UPDATE ON langchain_pg_embedding
+                REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION langconnect_document_groups_sync()
+            """,
+            """
+            DROP TRIGGER IF EXISTS langconnect_document_groups_delete
+                ON langchain_pg_embedding
+            """,
+            """
+            CREATE TRIGGER langconnect_document_groups_delete
+                AFTER DELETE ON langchain_pg_embedding
+                REFERENCING OLD TABLE AS old_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION langconnect_document_groups_sync()
+            """,
+        ],
+    ),
+    Migration(
+        7,
+        "per-collection counters",
+        [
+            # As in migration 6: no chunk write may land between the backfill
+            # of the counters and the triggers that keep them.
+            "LOCK TABLE langchain_pg_embedding IN SHARE ROW EXCLUSIVE MODE",
+            # Counters of each collection, as of the last compaction.
+            """
+            CREATE TABLE IF NOT EXISTS langconnect_collection_stats (
+                collection_id  uuid PRIMARY KEY
+                               REFERENCES langchain_pg_collection (uuid)
+                               ON DELETE CASCADE,
+                document_count bigint NOT NULL DEFAULT 0,
+                chunk_count    bigint NOT NULL DEFAULT 0,
+                total_bytes    bigint NOT NULL DEFAULT 0,
+                last_updated   timestamptz
+            )
+            """,
+            # Writes append their changes here rather than updating the
+            # counters row, which would serialize every concurrent write to
+            # the collection until commit. Compaction folds these rows into
+            # langconnect_collection_stats. No foreign key: deleting a
+            # collection cascades to its chunks, whose triggers still record
+            # deltas after the collection row is gone; compaction drops them.
+            """
+            CREATE TABLE IF NOT EXISTS langconnect_collection_stats_deltas (
+                id            bigserial PRIMARY KEY,
+                collection_id uuid NOT NULL,
+                documents     bigint NOT NULL DEFAULT 0,
+                chunks        bigint NOT NULL DEFAULT 0,
+                bytes         bigint NOT NULL DEFAULT 0,
+                updated_at    timestamptz NOT NULL DEFAULT now()
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS ix_langconnect_collection_stats_deltas_collection
+                ON langconnect_collection_stats_deltas (collection_id)
+            """,
+            """
+            INSERT INTO langconnect_collection_stats
+                   (collection_id, document_count, chunk_count, total_bytes,
+                    last_updated)
+            SELECT c.uuid,
+                   (SELECT COUNT(*)
+                      FROM langconnect_document_groups g
+                     WHERE g.collection_id = c.uuid),
+                   COUNT(e.id),
+                   COALESCE(SUM(OCTET_LENGTH(e.document)), 0),
+                   MAX(e.created_at)
+              FROM langchain_pg_collection c
+              LEFT JOIN langchain_pg_embedding e ON e.collection_id = c.uuid
+             GROUP BY c.uuid
+            ON CONFLICT DO NOTHING
+            """,
+            # Chunks and bytes, once per statement and collection.
+            """
+            CREATE OR REPLACE FUNCTION langconnect_collection_stats_chunks()
+            RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO langconnect_collection_stats_deltas
+                           (collection_id, chunks, bytes)
+                    SELECT collection_id,
+                           COUNT(*),
+                           COALESCE(SUM(OCTET_LENGTH(document)), 0)
+                      FROM new_rows
+                     GROUP BY collection_id;
+                ELSIF TG_OP = 'DELETE' THEN
+                    INSERT INTO langconnect_collection_stats_deltas
+                           (collection_id, chunks, bytes)
+                    SELECT collection_id,
+                           -COUNT(*),
+                           -COALESCE(SUM(OCTET_LENGTH(document)), 0)
+                      FROM old_rows
+                     GROUP BY collection_id;
+                ELSE
+                    -- Transition tables rule out UPDATE OF column lists, so
+                    -- updates that change no count (metadata edits, most
+                    -- re-ingested chunks) are dropped here instead.
+                    INSERT INTO langconnect_collection_stats_deltas
+                           (collection_id, chunks, bytes)
+                    SELECT collection_id, SUM(chunks), SUM(bytes)
+                      FROM (
+                            SELECT collection_id,
+                                   1 AS chunks,
+                                   COALESCE(OCTET_LENGTH(document), 0) AS bytes
+                              FROM new_rows
+                             UNION ALL
+                            SELECT collection_id,
+                                   -1,
+                                   -COALESCE(OCTET_LENGTH(document), 0)
+                              FROM old_rows
+                           ) changes
+                     GROUP BY collection_id
+                    HAVING SUM(chunks) <> 0 OR SUM(bytes) <> 0;
+                END IF;
+                RETURN NULL;
+            END;
+            $$
+            """,
+            """
+            DROP TRIGGER IF EXISTS langconnect_collection_stats_insert
+                ON langchain_pg_embedding
+            """,
+            """
+            CREATE TRIGGER langconnect_collection_stats_insert
+                AFTER INSERT ON langchain_pg_embedding
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION langconnect_collection_stats_chunks()
+            """,
+            """
+            DROP TRIGGER IF EXISTS langconnect_collection_stats_update
+                ON langchain_pg_embedding
+            """,
+            """
+            CREATE TRIGGER langconnect_collection_stats_update
+                AFTER UPDATE ON langchain_pg_embedding
+                REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION langconnect_collection_stats_chunks()
+            """,
+            """
+            DROP TRIGGER IF EXISTS langconnect_collection_stats_delete
+                ON langchain_pg_embedding
+            """,
+            """
+            CREATE TRIGGER langconnect_collection_stats_delete
+                AFTER DELETE ON langchain_pg_embedding
+                REFERENCING OLD TABLE AS old_rows
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION langconnect_collection_stats_chunks()
+            """,
+            # Documents are the files of the collection: one per document
+            # group summary.
+            """
+            CREATE OR REPLACE FUNCTION langconnect_collection_stats_documents()
+            RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO langconnect_collection_stats_deltas
+                           (collection_id, documents)
+                    VALUES (NEW.collection_id, 1);
+                ELSE
+                    INSERT INTO langconnect_collection_stats_deltas
+                           (collection_id, documents)
+                    VALUES (OLD.collection_id, -1);
+                END IF;
+                RETURN NULL;
+            END;
+            $$
+            """,
+            """
+            DROP TRIGGER IF EXISTS langconnect_collection_stats_documents
+                ON langconnect_document_groups
+            """,
+            """
+            CREATE TRIGGER langconnect_collection_stats_documents
+                AFTER INSERT OR DELETE ON langconnect_document_groups
+                FOR EACH ROW EXECUTE FUNCTION langconnect_collection_stats_documents()
+            """,
+        ],
+    ),
+    Migration(
+        8,
+        "collection generation for the search result cache",
+        [
+            # Bumped by every write to the collection's chunks, in the write's
+            # own transaction; cached search results are keyed by it.
+            """
+            ALTER TABLE langchain_pg_collection
+              ADD COLUMN IF NOT EXISTS generation bigint NOT NULL DEFAULT 0
+            """,
+        ],
+    ),
+]
+
+
+async def run_migrations() -> None:
+    """Apply all pending migrations, in version order."""
+    async with get_db_connection() as conn:
+        # Session-level lock: each migration commits on its own, and another
+        # worker waiting here re-reads the applied versions once it gets in.
+        await conn.execute("SELECT pg_advisory_lock($1)", _MIGRATION_LOCK_KEY)
+        try:
+            await conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+                    version     integer PRIMARY KEY,
+                    description text NOT NULL,
+                    applied_at  timestamptz NOT NULL DEFAULT now()
+                )
+                """
+            )
+            applied = {
+                row["version"]
+                for row in await conn.fetch(f"SELECT version FROM {MIGRATIONS_TABLE}")
+            }
+            for migration in MIGRATIONS:
+                if migration.version in applied:
+                    continue
+                online = bool(migration.backfills or migration.indexes)
+                async with conn.transaction():
+                    for statement in migration.statements:
+                        await conn.execute(statement)
+                    if not online:
+                        await _record_migration(conn, migration)
+                if online:
+                    for statement in migration.backfills:
+                        await _backfill(conn, statement)
+                    for name, definition in migration.indexes:
+                        await _create_index_concurrently(conn, name, definition)
+                    await _record_migration(conn, migration)
+                logger.info(
+                    f"Applied migration {migration.version}: {migration.description}"
+                )
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", _MIGRATION_LOCK_KEY)
+
+
+async def _record_migration(conn: asyncpg.Connection, migration: Migration) -> None:
+    await conn.execute(
+        f"INSERT INTO {MIGRATIONS_TABLE} (version, description) VALUES ($1, $2)",
+        migration.version,
+        migration.description,
+    )
+
+
+async def _backfill(conn: asyncpg.Connection, statement: str) -> None:
+    """Run a backfill statement batch by batch, outside any transaction."""
+    last_key = None
+    batches = 0
+    while True:
+        last_key = await conn.fetchval(statement, last_key, _BACKFILL_BATCH_SIZE)
+        if last_key is None:
+            break
+        batches += 1
+    logger.info(f"Backfilled {batches} batch(es).")
+
+
+async def _create_index_concurrently(
+    conn: asyncpg.Connection, name: str, definition: str
+) -> None:
+    # An interrupted build leaves an invalid index behind, which IF NOT EXISTS
+    # would keep; drop it first.
+    valid = await conn.fetchval(
+        "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)", name
+    )
+    if valid is False:
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    await conn.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}")
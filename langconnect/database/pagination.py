@@ -0,0 +1,40 @@
+"""Opaque cursors for keyset pagination.
+
+A cursor holds the sort key of the last row of a page, so the next page starts
+with an index seek past that row instead of re-reading and discarding every
+row before it as OFFSET does. Cursors are URL-safe base64 of a small JSON
+payload, tagged with the listing they belong to.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+from typing import Any
+
+from fastapi import status
+from fastapi.exceptions import HTTPException
+
+
+def encode_cursor(kind: str, key: list[Any]) -> str:
+    """Encode the sort key of the last row of a page of ``kind``."""
+    values = [v.isoformat() if isinstance(v, datetime.datetime) else v for v in key]
+    payload = json.dumps({"k": kind, "v": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(kind: str, cursor: str) -> list[Any]:
+    """Decode a cursor produced by ``encode_cursor`` for the same ``kind``.
+
+    Raises a 400 error for malformed cursors or cursors of another listing.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["k"] == kind and isinstance(payload["v"], list):
+            return payload["v"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        pass
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor."
+    )
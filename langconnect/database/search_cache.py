@@ -0,0 +1,105 @@
+"""Cache of search results, invalidated by writes to the collection.
+
+Every write to a collection's chunks (upsert, delete, metadata update) bumps
+``langchain_pg_collection.generation`` in the write's own transaction (see
+migration 8), and results are cached under the generation read by the search's
+ownership check. A search that starts after a write has committed therefore
+never sees results cached before it; entries of older generations are simply
+never read again and age out of the cache.
+
+An in-process TTL/LRU cache sits in front of an optional shared backend, like
+the auth cache. Results are copied in and out of the in-process cache, so
+callers may modify the results they get.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+from typing import Any
+
+from langconnect import config
+from langconnect.cache import CacheBackend, TTLCache, get_shared_backend
+from langconnect.embeddings import embedding_model_key
+
+logger = logging.getLogger(__name__)
+
+
+class SearchResultCache:
+    """Search results keyed by collection generation and search parameters."""
+
+    def __init__(self, local: TTLCache, shared: CacheBackend | None = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            local: In-process cache consulted first (maxsize 0 disables it).
+            shared: Optional backend shared between workers.
+        """
+        self.local = local
+        self.shared = shared
+        self.shared_hits = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether results are cached at all."""
+        return self.local.maxsize > 0 and self.local.ttl > 0
+
+    @staticmethod
+    def key(collection_id: str, generation: int, params: dict[str, Any]) -> str:
+        """Key of the results of a search with ``params`` in a collection.
+
+        The embeddings model is part of the key, since query vectors depend on it.
+        """
+        params = {**params, "model": embedding_model_key(config.DEFAULT_EMBEDDINGS)}
+        digest = hashlib.sha256(
+            json.dumps(params, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        return f"{collection_id}:{generation}:{digest}"
+
+    async def get(self, key: str) -> list[dict[str, Any]] | None:
+        """Return the cached results for ``key``, if any."""
+        results = self.local.get(key)
+        if results is not None or self.shared is None:
+            return copy.deepcopy(results)
+
+        try:
+            results = await asyncio.to_thread(self.shared.get, key)
+        except Exception as e:
+            logger.warning(f"Shared search cache lookup failed: {e}")
+            return None
+        if results is None:
+            return None
+        self.local.set(key, copy.deepcopy(results))
+        self.shared_hits += 1
+        return results
+
+    async def set(self, key: str, results: list[dict[str, Any]]) -> None:
+        """Cache the results of a search."""
+        self.local.set(key, copy.deepcopy(results))
+        if self.shared is not None:
+            try:
+                await asyncio.to_thread(self.shared.set, key, results, self.local.ttl)
+            except Exception as e:
+                logger.warning(f"Shared search cache update failed: {e}")
+
+    def clear(self) -> None:
+        """Drop locally cached results and reset the counters."""
+        self.local.clear()
+        self.shared_hits = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters; shared hits are counted as local misses."""
+        stats = self.local.stats()
+        lookups = stats["hits"] + stats["misses"]
+        stats["shared_hits"] = self.shared_hits
+        stats["hit_ratio"] = (
+            (stats["hits"] + self.shared_hits) / lookups if lookups else 0.0
+        )
+        return stats
+
+
+search_result_cache = SearchResultCache(
+    TTLCache(config.SEARCH_CACHE_SIZE, config.SEARCH_CACHE_TTL_SECONDS),
+    get_shared_backend(config.CACHE_REDIS_URL, "langconnect:search:"),
+)
@@ -0,0 +1,108 @@
+"""Per-collection counters: documents, chunks, bytes and last update.
+
+Triggers on the chunk and document group tables append each write's changes
+to ``langconnect_collection_stats_deltas`` (see migration 7). Compaction folds
+those rows into ``langconnect_collection_stats``; it runs periodically in each
+server process, and only one compaction runs at a time across processes.
+"""
+
+import asyncio
+import logging
+
+from langconnect import config
+from langconnect.database.connection import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key of the advisory lock held while compacting.
+_COMPACTION_LOCK_KEY = 0x6C63737461747300
+
+
+async def compact_collection_stats() -> int:
+    """Fold pending counter deltas into the counters.
+
+    Returns the number of deltas folded, or 0 if another compaction is running.
+    """
+    async with get_db_connection() as conn:
+        async with conn.transaction():
+            locked = await conn.fetchval(
+                "SELECT pg_try_advisory_xact_lock($1)", _COMPACTION_LOCK_KEY
+            )
+            if not locked:
+                return 0
+            # Deltas of deleted collections are dropped by the join.
+            return await conn.fetchval(
+                """
+                WITH folded AS (
+                    DELETE FROM langconnect_collection_stats_deltas
+                    RETURNING collection_id, documents, chunks, bytes, updated_at
+                ), totals AS (
+                    SELECT collection_id,
+                           SUM(documents) AS documents,
+                           SUM(chunks) AS chunks,
+                           SUM(bytes) AS bytes,
+                           MAX(updated_at) AS updated_at
+                      FROM folded
+                     GROUP BY collection_id
+                ), applied AS (
+                    INSERT INTO langconnect_collection_stats AS s
+                           (collection_id, document_count, chunk_count,
+                            total_bytes, last_updated)
+                    SELECT t.collection_id, t.documents, t.chunks, t.bytes,
+                           t.updated_at
+                      FROM totals t
+                      JOIN langchain_pg_collection c ON c.uuid = t.collection_id
+                     ORDER BY t.collection_id
+                    ON CONFLICT (collection_id) DO UPDATE
+                       SET document_count = s.document_count
+                                            + EXCLUDED.document_count,
+                           chunk_count = s.chunk_count + EXCLUDED.chunk_count,
+                           total_bytes = s.total_bytes + EXCLUDED.total_bytes,
+                           last_updated = GREATEST(
+                               s.last_updated, EXCLUDED.last_updated
+                           )
+                )
+                SELECT COUNT(*) FROM folded
+                """
+            )
+
+
+class CollectionStatsCompactor:
+    """An asyncio task that compacts the collection counters periodically."""
+
+    def __init__(self, interval: float) -> None:
+        """Initialize the compactor.
+
+        Args:
+            interval: Seconds between compactions (0 disables the task).
+        """
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start the compaction task on the running event loop."""
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the compaction task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await compact_collection_stats()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Collection stats compaction error")
+            await asyncio.sleep(self.interval)
+
+
+stats_compactor = CollectionStatsCompactor(
+    config.COLLECTION_STATS_COMPACT_INTERVAL_SECONDS
+)
@@ -0,0 +1,637 @@
+"""Batched, concurrent and rate-limit aware embedding of documents.
+
+``EmbeddingScheduler`` splits the texts of an upsert into batches bounded by an
+estimated token budget and a number of inputs, and embeds several batches
+concurrently. Configured request and token quotas are paced with token
+buckets. A rate-limit response (HTTP 429) pauses every batch for the
+``Retry-After`` delay (or an exponential backoff), and halves the number of
+concurrent requests. The concurrency then grows back one request at a time
+while requests succeed.
+
+The scheduler is shared by the process, so concurrent ingestion jobs draw from
+the same quota.
+
+``EmbeddingCache`` sits in front of the scheduler: texts already embedded with
+the same model, found by the SHA-256 of their normalized text in an in-memory
+LRU and then in Postgres, are not sent to the embeddings API again.
+
+``QueryEmbeddingCache`` keeps recent search query embeddings in memory, and
+lets concurrent searches for the same query share one embeddings request.
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+import time
+import unicodedata
+import weakref
+from array import array
+from collections import deque
+from typing import Any, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from langconnect import config
+from langconnect.cache import TTLCache
+from langconnect.database import embedding_cache as embedding_cache_db
+
+logger = logging.getLogger(__name__)
+
+# Successful requests needed before the concurrency grows back by one after it
+# was reduced by a rate-limit response.
+_RECOVERY_STREAK = 8
+# Window of the recent throughput reported by ``stats``.
+_THROUGHPUT_WINDOW_SECONDS = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-bound estimate of the tokens of ``text``.
+
+    One token per 3 bytes of UTF-8: conservative for English (about 4
+    characters per token) and close for Korean and other multi-byte scripts.
+    """
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def batch_texts(
+    texts: list[str], max_tokens: int, max_size: int
+) -> list[list[int]]:
+    """Group the indexes of ``texts`` into batches within both budgets.
+
+    A text larger than ``max_tokens`` on its own gets a batch of its own.
+    """
+    batches: list[list[int]] = []
+    current: list[int] = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (
+            current_tokens + tokens > max_tokens or len(current) >= max_size
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def rate_limit_delay(error: BaseException) -> Optional[float]:
+    """If ``error`` is a rate-limit (429) response, the delay it asks for.
+
+    Returns None for other errors, and 0.0 for a 429 without ``Retry-After``.
+    Works with the errors of the OpenAI client and of httpx.
+    """
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(
+        response, "status_code", None
+    )
+    if status != 429:
+        return None
+    headers = getattr(response, "headers", None) or {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value:
+            try:
+                return max(float(value) * scale, 0.0)
+            except ValueError:
+                pass
+    return 0.0
+
+
+class TokenBucket:
+    """Paces consumption to ``rate`` units per second, with bursts of ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` units now; return how long to wait before using them.
+
+        Amounts larger than the capacity are allowed and simply wait longer.
+        Reservations are honoured in order, since the bucket may go negative.
+        """
+        self._refill()
+        self._tokens -= amount
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class _LoopState:
+    """Per-event-loop synchronization of the scheduler."""
+
+    def __init__(self) -> None:
+        self.condition = asyncio.Condition()
+        self.in_flight = 0
+
+
+class EmbeddingScheduler:
+    """Embeds documents in concurrent, token-budgeted and rate-limited batches."""
+
+    def __init__(
+        self,
+        embeddings: Optional[Embeddings] = None,
+        *,
+        max_batch_tokens: int = 50_000,
+        max_batch_size: int = 256,
+        concurrency: int = 4,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_retries: int = 6,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            embeddings: Embeddings model whose ``aembed_documents`` embeds one
+                batch. Defaults to ``config.DEFAULT_EMBEDDINGS``, looked up on
+                every call.
+            max_batch_tokens: Estimated tokens per request.
+            max_batch_size: Texts per request.
+            concurrency: Maximum number of requests in flight.
+            requests_per_minute: Request quota to pace to (0 = unpaced).
+            tokens_per_minute: Token quota to pace to (0 = unpaced).
+            max_retries: Retries of a batch after rate-limit or transient
+                errors before the upsert fails.
+            backoff_base: First retry delay in seconds, doubled on every retry.
+            backoff_max: Upper bound of a retry delay.
+        """
+        self.embeddings = embeddings
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.concurrency = max(concurrency, 1)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._request_bucket = (
+            TokenBucket(requests_per_minute / 60, max(requests_per_minute / 60, 1))
+            if requests_per_minute > 0
+            else None
+        )
+        self._token_bucket = (
+            TokenBucket(tokens_per_minute / 60, max(tokens_per_minute / 60, 1))
+            if tokens_per_minute > 0
+            else None
+        )
+        self._limit = self.concurrency
+        self._success_streak = 0
+        self._paused_until = 0.0
+        self._states: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, _LoopState
+        ] = weakref.WeakKeyDictionary()
+        self._recent: deque[tuple[float, int, int]] = deque()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Reset the counters reported by ``stats``."""
+        self.requests = 0
+        self.texts = 0
+        self.tokens = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+        self.request_seconds = 0.0
+        self._recent.clear()
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState()
+        return state
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        """Embed ``texts``, returning the vectors in the same order."""
+        if not texts:
+            return []
+        vectors: list[Optional[list[float]]] = [None] * len(texts)
+        batches = batch_texts(texts, self.max_batch_tokens, self.max_batch_size)
+
+        async def run(indexes: list[int]) -> None:
+            batch = [texts[i] for i in indexes]
+            for i, vector in zip(indexes, await self._embed_batch(batch), strict=True):
+                vectors[i] = vector
+
+        tasks = [asyncio.create_task(run(indexes)) for indexes in batches]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return vectors  # type: ignore[return-value]
+
+    async def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        tokens = sum(estimate_tokens(text) for text in batch)
+        attempt = 0
+        while True:
+            await self._acquire(tokens)
+            start = time.monotonic()
+            try:
+                embeddings = self.embeddings or config.DEFAULT_EMBEDDINGS
+                vectors = await embeddings.aembed_documents(batch)
+            except Exception as e:
+                await self._release()
+                delay = rate_limit_delay(e)
+                if attempt >= self.max_retries or (
+                    delay is None and not _is_transient(e)
+                ):
+                    self.failures += 1
+                    raise
+                attempt += 1
+                self.retries += 1
+                backoff = min(self.backoff_base * 2 ** (attempt - 1), self.backoff_max)
+                if delay is not None:
+                    self._on_rate_limited(max(delay, backoff))
+                    logger.warning(
+                        f"Embedding request rate limited; concurrency now "
+                        f"{self._limit}, retry {attempt}/{self.max_retries}."
+                    )
+                else:
+                    logger.warning(
+                        f"Embedding request failed ({type(e).__name__}: {e}); "
+                        f"retry {attempt}/{self.max_retries}."
+                    )
+                    # Jitter spreads out batches that failed together.
+                    await asyncio.sleep(backoff * (0.5 + random.random() / 2))
+                continue
+            await self._release()
+            self._on_success(len(batch), tokens, time.monotonic() - start)
+            return vectors
+
+    async def _acquire(self, tokens: int) -> None:
+        state = self._state()
+        async with state.condition:
+            await state.condition.wait_for(lambda: state.in_flight < self._limit)
+            state.in_flight += 1
+        # Pacing happens after taking a slot, so that reservations are made in
+        # the order requests will be sent.
+        wait = max(self._paused_until - time.monotonic(), 0.0)
+        if self._request_bucket:
+            wait = max(wait, self._request_bucket.reserve(1))
+        if self._token_bucket:
+            wait = max(wait, self._token_bucket.reserve(tokens))
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except BaseException:
+                await self._release()
+                raise
+
+    async def _release(self) -> None:
+        state = self._state()
+        async with state.condition:
+            state.in_flight -= 1
+            state.condition.notify_all()
+
+    def _on_rate_limited(self, delay: float) -> None:
+        self.rate_limited += 1
+        self._success_streak = 0
+        self._limit = max(self._limit // 2, 1)
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    def _on_success(self, texts: int, tokens: int, seconds: float) -> None:
+        self.requests += 1
+        self.texts += texts
+        self.tokens += tokens
+        self.request_seconds += seconds
+        now = time.monotonic()
+        self._recent.append((now, texts, tokens))
+        while self._recent and self._recent[0][0] < now - _THROUGHPUT_WINDOW_SECONDS:
+            self._recent.popleft()
+        if self._limit < self.concurrency:
+            self._success_streak += 1
+            if self._success_streak >= _RECOVERY_STREAK:
+                self._success_streak = 0
+                self._limit += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return request counters, current concurrency and recent throughput."""
+        now = time.monotonic()
+        recent = [
+            entry
+            for entry in self._recent
+            if entry[0] >= now - _THROUGHPUT_WINDOW_SECONDS
+        ]
+        span = (
+            max(now - recent[0][0], 1.0) if recent else _THROUGHPUT_WINDOW_SECONDS
+        )
+        return {
+            "requests": self.requests,
+            "texts": self.texts,
+            "estimated_tokens": self.tokens,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "failures": self.failures,
+            "concurrency": self._limit,
+            "max_concurrency": self.concurrency,
+            "avg_request_seconds": (
+                self.request_seconds / self.requests if self.requests else 0.0
+            ),
+            "recent_texts_per_second": sum(e[1] for e in recent) / span,
+            "recent_tokens_per_second": sum(e[2] for e in recent) / span,
+        }
+
+
+def _is_transient(error: BaseException) -> bool:
+    """Whether a non-429 error is worth retrying (timeouts, 5xx, connections)."""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(
+        response, "status_code", None
+    )
+    if isinstance(status, int):
+        return status >= 500 or status == 408
+    name = type(error).__name__
+    return isinstance(error, (TimeoutError, ConnectionError)) or name in {
+        "APIConnectionError",
+        "APITimeoutError",
+        "ConnectError",
+        "ReadTimeout",
+        "RemoteProtocolError",
+    }
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC with runs of whitespace collapsed, as used for cache keys."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def content_hash(text: str) -> bytes:
+    """SHA-256 of the normalized text."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+
+
+def embedding_model_key(embeddings: Embeddings) -> str:
+    """Identify the model (and output dimensions) an embeddings instance uses."""
+    model = getattr(embeddings, "model", None) or getattr(
+        embeddings, "model_name", None
+    )
+    key = f"{type(embeddings).__name__}:{model}" if model else type(embeddings).__name__
+    dimensions = getattr(embeddings, "dimensions", None)
+    return f"{key}:{dimensions}" if dimensions else key
+
+
+class EmbeddingCache:
+    """Embeds texts through a scheduler, reusing embeddings of identical texts.
+
+    Texts are looked up by model and content hash in an in-memory LRU, then in
+    bulk in Postgres. Only the remaining distinct texts are embedded, and their
+    embeddings are written to both. Cache errors are logged and never fail an
+    upsert.
+    """
+
+    def __init__(
+        self,
+        scheduler: EmbeddingScheduler,
+        *,
+        memory_size: int = 2000,
+        enabled: bool = True,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            scheduler: Scheduler that embeds cache misses.
+            memory_size: Embeddings kept in the in-memory LRU (0 disables it).
+            enabled: Whether to use the cache at all.
+        """
+        self.scheduler = scheduler
+        self.enabled = enabled
+        # Vectors are kept as float32 arrays, about 6KB per 1536 dimensions.
+        self._memory = TTLCache(maxsize=memory_size, ttl=float("inf"))
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Reset the counters reported by ``stats``."""
+        self.texts = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.embedded = 0
+        self._memory.hits = self._memory.misses = 0
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        """Embed ``texts``, returning the vectors in the same order."""
+        if not self.enabled or not texts:
+            return await self.scheduler.embed(texts)
+        model = embedding_model_key(
+            self.scheduler.embeddings or config.DEFAULT_EMBEDDINGS
+        )
+        hashes = [content_hash(text) for text in texts]
+        # First text of every distinct hash.
+        first: dict[bytes, str] = {}
+        for digest, text in zip(hashes, texts):
+            first.setdefault(digest, text)
+
+        found: dict[bytes, list[float]] = {}
+        for digest in first:
+            vector = self._memory.get(model + digest.hex())
+            if vector is not None:
+                found[digest] = vector.tolist()
+        self.memory_hits += len(found)
+
+        missing = [digest for digest in first if digest not in found]
+        try:
+            stored = await embedding_cache_db.lookup(model, missing)
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            stored = {}
+        self.db_hits += len(stored)
+        found.update(stored)
+
+        missing = [digest for digest in missing if digest not in stored]
+        if missing:
+            vectors = await self.scheduler.embed([first[d] for d in missing])
+            embedded = dict(zip(missing, vectors, strict=True))
+            self.embedded += len(missing)
+            found.update(embedded)
+            try:
+                await embedding_cache_db.store(model, embedded)
+            except Exception as e:
+                logger.warning(f"Embedding cache update failed: {e}")
+        for digest in (*stored, *missing):
+            self._memory.set(model + digest.hex(), array("f", found[digest]))
+
+        self.texts += len(texts)
+        return [found[digest] for digest in hashes]
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit counters; repeated texts within one upsert count as hits."""
+        return {
+            "enabled": self.enabled,
+            "texts": self.texts,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "embedded": self.embedded,
+            "hit_ratio": 1 - self.embedded / self.texts if self.texts else 0.0,
+            "memory_size": len(self._memory),
+            "memory_maxsize": self._memory.maxsize,
+        }
+
+
+class QueryEmbeddingCache:
+    """LRU + TTL cache of query embeddings with single-flight requests.
+
+    Queries are keyed by model and the hash of the normalized query. While a
+    query is being embedded, other searches for it wait for the same request
+    instead of sending their own.
+    """
+
+    def __init__(
+        self,
+        embeddings: Optional[Embeddings] = None,
+        *,
+        maxsize: int = 1000,
+        ttl: float = 3600,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            embeddings: Embeddings model whose ``aembed_query`` embeds a query.
+                Defaults to ``config.DEFAULT_EMBEDDINGS``, looked up on every
+                call.
+            maxsize: Query embeddings kept (0 disables caching, requests are
+                still coalesced).
+            ttl: Seconds a query embedding is reused for.
+        """
+        self.embeddings = embeddings
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, asyncio.Future]
+        ] = weakref.WeakKeyDictionary()
+        self._batches: set[asyncio.Task] = set()
+        self.coalesced = 0
+
+    async def embed(self, query: str) -> list[float]:
+        """Return the embedding of a search query."""
+        embeddings = self.embeddings or config.DEFAULT_EMBEDDINGS
+        key = f"{embedding_model_key(embeddings)}:{content_hash(query).hex()}"
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached.tolist()
+
+        loop = asyncio.get_running_loop()
+        in_flight = self._in_flight.setdefault(loop, {})
+        future = in_flight.get(key)
+        if future is None:
+            future = in_flight[key] = asyncio.ensure_future(
+                self._embed(embeddings, key, query)
+            )
+            future.add_done_callback(lambda _: in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # A cancelled search must not cancel the request other searches wait on.
+        return list(await asyncio.shield(future))
+
+    async def embed_many(self, queries: list[str]) -> list[list[float]]:
+        """Return the embeddings of several search queries, in order.
+
+        Queries that are neither cached nor being embedded are sent together in
+        one ``aembed_documents`` request. Models may embed documents and queries
+        differently, so these vectors are cached apart from those of ``embed``.
+        """
+        embeddings = self.embeddings or config.DEFAULT_EMBEDDINGS
+        model = embedding_model_key(embeddings)
+        loop = asyncio.get_running_loop()
+        in_flight = self._in_flight.setdefault(loop, {})
+        keys = [f"{model}:documents:{content_hash(query).hex()}" for query in queries]
+        vectors: dict[str, list[float]] = {}
+        waiting: dict[str, asyncio.Future] = {}
+        missing: dict[str, str] = {}
+        for key, query in zip(keys, queries):
+            if key in vectors or key in waiting:
+                continue
+            cached = self._cache.get(key)
+            if cached is not None:
+                vectors[key] = cached.tolist()
+            elif key in in_flight:
+                self.coalesced += 1
+                waiting[key] = in_flight[key]
+            else:
+                future = waiting[key] = in_flight[key] = loop.create_future()
+                future.add_done_callback(lambda _, key=key: in_flight.pop(key, None))
+                missing[key] = query
+        if missing:
+            # The loop only keeps weak references to tasks.
+            task = asyncio.ensure_future(
+                self._embed_many(
+                    embeddings, missing, {key: waiting[key] for key in missing}
+                )
+            )
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+        # A cancelled search must not cancel the requests others wait on.
+        results = await asyncio.gather(*map(asyncio.shield, waiting.values()))
+        vectors.update(zip(waiting, map(list, results)))
+        return [vectors[key] for key in keys]
+
+    async def _embed(self, embeddings: Embeddings, key: str, query: str) -> list[float]:
+        vector = await embeddings.aembed_query(query)
+        self._cache.set(key, array("f", vector))
+        return vector
+
+    async def _embed_many(
+        self,
+        embeddings: Embeddings,
+        queries: dict[str, str],
+        futures: dict[str, asyncio.Future],
+    ) -> None:
+        try:
+            result = await embeddings.aembed_documents(list(queries.values()))
+            # A model returning fewer vectors than queries fails every waiter.
+            vectors = dict(zip(queries, result, strict=True))
+        except asyncio.CancelledError:
+            for future in futures.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, vector in vectors.items():
+            self._cache.set(key, array("f", vector))
+            futures[key].set_result(vector)
+
+    def clear(self) -> None:
+        """Drop cached embeddings and reset the counters."""
+        self._cache.clear()
+        self.coalesced = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters; coalesced misses did not embed again."""
+        stats = self._cache.stats()
+        stats["coalesced"] = self.coalesced
+        stats["embedded"] = stats["misses"] - self.coalesced
+        return stats
+
+
+embedding_scheduler = EmbeddingScheduler(
+    max_batch_tokens=config.EMBEDDING_BATCH_TOKENS,
+    max_batch_size=config.EMBEDDING_BATCH_SIZE,
+    concurrency=config.EMBEDDING_CONCURRENCY,
+    requests_per_minute=config.EMBEDDING_REQUESTS_PER_MINUTE,
+    tokens_per_minute=config.EMBEDDING_TOKENS_PER_MINUTE,
+    max_retries=config.EMBEDDING_MAX_RETRIES,
+)
+
+embedding_cache = EmbeddingCache(
+    embedding_scheduler,
+    memory_size=config.EMBEDDING_CACHE_MEMORY_SIZE,
+    enabled=config.EMBEDDING_CACHE_ENABLED,
+)
+
+query_embedding_cache = QueryEmbeddingCache(
+    maxsize=config.QUERY_EMBEDDING_CACHE_SIZE,
+    ttl=config.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+)
@@ -2,24 +2,46 @@ from langconnect.models.collection import (
     CollectionCreate,
     CollectionResponse,
     CollectionUpdate,
+    VectorIndexCreate,
+    VectorIndexStatus,
 )
 from langconnect.models.document import (
+    BatchSearchQuery,
+    BatchSearchResult,
     DocumentCreate,
+    DocumentGroupPage,
+    DocumentPage,
     DocumentResponse,
     DocumentUpdate,
+    FederatedSearchQuery,
+    FederatedSearchResult,
+    SearchOptions,
     SearchQuery,
     SearchResult,
     DocumentDelete,
+    DocumentMetadataUpdate,
 )
+from langconnect.models.job import IngestJobResponse
 
 __all__ = [
     "CollectionCreate",
     "CollectionResponse",
     "CollectionUpdate",
+    "VectorIndexCreate",
+    "VectorIndexStatus",
+    "BatchSearchQuery",
+    "BatchSearchResult",
     "DocumentCreate",
+    "DocumentGroupPage",
+    "DocumentPage",
     "DocumentResponse",
     "DocumentUpdate",
+    "FederatedSearchQuery",
+    "FederatedSearchResult",
+    "SearchOptions",
     "SearchQuery",
     "SearchResult",
     "DocumentDelete",
+    "DocumentMetadataUpdate",
+    "IngestJobResponse",
 ]
@@ -1,5 +1,5 @@
 import datetime
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
@@ -40,6 +40,12 @@ class CollectionResponse(BaseModel):
     )
     document_count: int = Field(0, description="The number of documents in the collection.")
     chunk_count: int = Field(0, description="The number of chunks in the collection.")
+    total_bytes: int = Field(
+        0, description="The size of the chunk texts in the collection, in bytes."
+    )
+    last_updated: datetime.datetime | None = Field(
+        None, description="When chunks of the collection last changed."
+    )
 
     class Config:
         # Allows creating model from dict like
@@ -47,6 +53,51 @@ class CollectionResponse(BaseModel):
         from_attributes = True
 
 
+class VectorIndexCreate(BaseModel):
+    """Schema for building or rebuilding a collection's ANN index."""
+
+    method: Literal["hnsw", "ivfflat"] = Field(
+        "hnsw", description="pgvector index method."
+    )
+    m: int = Field(
+        16, ge=2, le=100, description="HNSW: max connections per graph node."
+    )
+    ef_construction: int = Field(
+        64,
+        ge=4,
+        le=1000,
+        description="HNSW: candidate list size while building. At least 2 * m.",
+    )
+    lists: int = Field(
+        100, ge=1, le=32768, description="IVFFlat: number of inverted lists."
+    )
+
+
+class VectorIndexProgress(BaseModel):
+    """Progress of a running index build, from pg_stat_progress_create_index."""
+
+    phase: str
+    blocks_done: int
+    blocks_total: int
+    tuples_done: int
+    tuples_total: int
+
+
+class VectorIndexStatus(BaseModel):
+    """Schema for the state of a collection's ANN index."""
+
+    name: str = Field(..., description="Name of the index in PostgreSQL.")
+    collection_id: str | None = Field(
+        None, description="Collection covered by the index; null for all collections."
+    )
+    state: Literal["missing", "building", "ready", "invalid", "failed"]
+    method: str | None = None
+    parameters: dict[str, Any] = Field(default_factory=dict)
+    size_bytes: int | None = None
+    progress: VectorIndexProgress | None = None
+    error: str | None = None
+
+
 # =====================
 # Document Schemas
 # =====================
@@ -1,4 +1,6 @@
 from typing import Any, Literal, Optional
+from uuid import UUID
+
 from pydantic import BaseModel, Field
 
 class DocumentCreate(BaseModel):
@@ -20,11 +22,94 @@ class DocumentResponse(BaseModel):
     updated_at: str | None = None
 
 
-class SearchQuery(BaseModel):
-    query: str
+class DocumentPage(BaseModel):
+    items: list[DocumentResponse]
+    next_cursor: str | None = Field(
+        None, description="Cursor of the next page; null after the last page."
+    )
+
+
+class DocumentGroupPage(BaseModel):
+    items: list[dict[str, Any]]
+    next_cursor: str | None = Field(
+        None, description="Cursor of the next page; null after the last page."
+    )
+
+
+class SearchOptions(BaseModel):
     limit: int | None = 10
-    filter: dict[str, Any] | None = None
+    filter: dict[str, Any] | None = Field(
+        None,
+        description=(
+            "Metadata filter applied in the database. Plain key/value pairs must "
+            "all match; a key may also map to operators such as $eq, $ne, $gt, "
+            "$gte, $lt, $lte, $in, $nin and $exists. Combine filters with $and "
+            "and $or."
+        ),
+    )
     search_type: Literal["semantic", "keyword", "hybrid"] = "semantic"
+    fusion: Literal["weighted", "rrf"] = Field(
+        "weighted",
+        description=(
+            "How hybrid search merges rankings: 'weighted' sums normalized "
+            "scores, 'rrf' uses reciprocal rank fusion."
+        ),
+    )
+    semantic_weight: float = Field(
+        0.7, ge=0, description="Weight of the semantic ranking in hybrid search."
+    )
+    keyword_weight: float = Field(
+        0.3, ge=0, description="Weight of the keyword ranking in hybrid search."
+    )
+    rrf_k: int = Field(
+        60, ge=1, description="Rank offset for reciprocal rank fusion."
+    )
+    ef_search: int | None = Field(
+        None,
+        ge=1,
+        le=1000,
+        description=(
+            "HNSW candidate list size for this query. Higher values improve "
+            "recall at the cost of latency."
+        ),
+    )
+    probes: int | None = Field(
+        None,
+        ge=1,
+        description=(
+            "Number of IVFFlat lists scanned for this query. Higher values "
+            "improve recall at the cost of latency."
+        ),
+    )
+
+
+class SearchQuery(SearchOptions):
+    query: str
+
+
+class FederatedSearchQuery(SearchQuery):
+    collection_ids: list[UUID] | None = Field(
+        None,
+        min_length=1,
+        description=(
+            "Collections to search, all of which must be owned by the user. "
+            "Omit to search every collection of the user."
+        ),
+    )
+
+
+class BatchSearchQuery(SearchOptions):
+    queries: list[str] = Field(
+        ..., min_length=1, max_length=32, description="Queries to search for."
+    )
+    fuse: bool = Field(
+        False,
+        description=(
+            "Also return the results of all queries merged into one list, with "
+            "each document once, ranked by reciprocal rank fusion (offset rrf_k) "
+            "and cut to limit."
+        ),
+    )
 
 
 class SearchResult(BaseModel):
@@ -33,6 +118,38 @@ class SearchResult(BaseModel):
     metadata: dict[str, Any] | None = None
     score: float
 
+
+class FederatedSearchResult(SearchResult):
+    collection_id: str
+
+
+class BatchSearchResult(BaseModel):
+    results: list[list[SearchResult]] = Field(
+        ..., description="Results of each query, in the order of the queries."
+    )
+    fused: list[SearchResult] | None = Field(
+        None, description="Fused results, when requested with fuse."
+    )
+
 class DocumentDelete(BaseModel):
     document_ids: Optional[list[str]] = Field(None, description="List of document IDs to delete.")
     file_ids: Optional[list[str]] = Field(None, description="List of file IDs to delete all associated documents.")
+
+
+class DocumentMetadataUpdate(BaseModel):
+    document_ids: Optional[list[str]] = Field(None, description="List of document IDs to update.")
+    file_ids: Optional[list[str]] = Field(None, description="List of file IDs whose documents are updated.")
+    filter: Optional[dict[str, Any]] = Field(
+        None,
+        description=(
+            "Metadata filter, in the syntax of search filters, that documents "
+            "must also match. On its own it selects every matching document."
+        ),
+    )
+    patch: dict[str, Any] = Field(
+        ...,
+        description=(
+            "Metadata keys to set. Each top-level key replaces the document's "
+            "value for that key; other keys are kept."
+        ),
+    )
@@ -0,0 +1,38 @@
+import datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field, computed_field
+
+# =====================
+# Ingestion Job Schemas
+# =====================
+
+
+class IngestJobResponse(BaseModel):
+    """Schema for the state of a background ingestion job."""
+
+    id: str = Field(..., description="The unique identifier of the job.")
+    collection_id: str = Field(..., description="The collection being ingested into.")
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    params: dict[str, Any] = Field(
+        default_factory=dict, description="Chunking parameters of the upload."
+    )
+    attempts: int = Field(0, description="Attempts started so far.")
+    max_attempts: int = Field(..., description="Attempts before the job fails.")
+    cancel_requested: bool = False
+    files_total: int = Field(..., description="Number of uploaded files.")
+    files_done: int = Field(0, description="Files processed, successfully or not.")
+    chunks_added: int = Field(0, description="Chunks stored so far.")
+    failed_files: list[str] = Field(
+        default_factory=list, description="Files that could not be processed."
+    )
+    error: str | None = Field(None, description="Error of the last failed attempt.")
+    created_at: datetime.datetime
+    started_at: datetime.datetime | None = None
+    finished_at: datetime.datetime | None = None
+
+    @computed_field
+    @property
+    def progress(self) -> float:
+        """Fraction of files processed, between 0 and 1."""
+        return self.files_done / self.files_total if self.files_total else 1.0
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from collections.abc import AsyncGenerator
@@ -6,9 +7,26 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from langconnect.api import auth_router, collections_router, documents_router
-from langconnect.config import ALLOWED_ORIGINS
-from langconnect.database.collections import CollectionsManager
+from langconnect.api import (
+    auth_router,
+    collections_router,
+    documents_router,
+    jobs_router,
+)
+from langconnect.auth import USER_CACHE
+from langconnect.config import ALLOWED_ORIGINS, MAX_UPLOAD_REQUEST_SIZE
+from langconnect.database.collections import CollectionsManager, coalesced_reads
+from langconnect.database.connection import close_db_pool, dispose_vectorstore_engine
+from langconnect.database.search_cache import search_result_cache
+from langconnect.database.stats import stats_compactor
+from langconnect.embeddings import (
+    embedding_cache,
+    embedding_scheduler,
+    query_embedding_cache,
+)
+from langconnect.services.ingestion import worker_pool
+from langconnect.services.parser_pool import parser_pool
+from langconnect.uploads import UploadSizeLimitMiddleware
 
 # Configure NLTK data path
 try:
@@ -39,8 +57,15 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Lifespan context manager for FastAPI application."""
     logger.info("App is starting up. Creating background worker...")
     await CollectionsManager.setup()
+    worker_pool.start()
+    stats_compactor.start()
     yield
     logger.info("App is shutting down. Stopping background worker...")
+    await stats_compactor.stop()
+    await worker_pool.stop()
+    await asyncio.to_thread(parser_pool.shutdown)
+    await close_db_pool()
+    dispose_vectorstore_engine()
 
 
 APP = FastAPI(
@@ -50,6 +75,10 @@ APP = FastAPI(
     lifespan=lifespan,
 )
 
+# Reject oversized uploads while they stream in. Added before CORS so that the
+# 413 responses still carry CORS headers.
+APP.add_middleware(UploadSizeLimitMiddleware, max_size=MAX_UPLOAD_REQUEST_SIZE)
+
 # Add CORS middleware
 APP.add_middleware(
     CORSMiddleware,
@@ -63,6 +92,7 @@ APP.add_middleware(
 APP.include_router(auth_router)
 APP.include_router(collections_router)
 APP.include_router(documents_router)
+APP.include_router(jobs_router)
 
 
 @APP.get("/health")
@@ -71,6 +101,19 @@ async def health_check() -> dict:
     return {"status": "ok"}
 
 
+@APP.get("/metrics")
+async def metrics() -> dict:
+    """Cache counters, coalesced reads and embedding throughput of this worker."""
+    return {
+        "auth_cache": USER_CACHE.stats(),
+        "embeddings": embedding_scheduler.stats(),
+        "embedding_cache": embedding_cache.stats(),
+        "query_embedding_cache": query_embedding_cache.stats(),
+        "search_cache": search_result_cache.stats(),
+        "coalesced_reads": coalesced_reads.stats(),
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
 
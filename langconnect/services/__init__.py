@@ -1,6 +1,7 @@
 from langconnect.services.document_processor import (
     SUPPORTED_MIMETYPES,
+    process_contents,
     process_document,
 )
 
-__all__ = ["SUPPORTED_MIMETYPES", "process_document"]
+__all__ = ["SUPPORTED_MIMETYPES", "process_contents", "process_document"]
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import uuid
 
@@ -42,18 +43,37 @@ async def process_document(
     chunk_overlap: int = 200,
     enable_chunking: bool = True,
 ) -> list[Document]:
-    """Process an uploaded file into LangChain documents."""
-    # Generate a unique ID for this file processing instance
-    file_id = uuid.uuid4()
-
-    contents = await file.read()
-
-    # Determine the actual mime type
-    mime_type = file.content_type or "text/plain"
+    """Process an uploaded file into LangChain documents.
+
+    Parsing runs in the parser process pool, so it does not block the event
+    loop.
+    """
+    # Imported here: the parser pool imports this module.
+    from langconnect.services.parser_pool import parser_pool
+    from langconnect.uploads import remove_file, spool_upload
+
+    path = await spool_upload(file)
+    try:
+        return await parser_pool.process(
+            path,
+            filename=file.filename,
+            content_type=file.content_type,
+            metadata=metadata,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            enable_chunking=enable_chunking,
+        )
+    finally:
+        remove_file(path)
+
+
+def resolve_mimetype(content_type: str | None, filename: str | None) -> str:
+    """Determine the parser mime type of an upload."""
+    mime_type = content_type or "text/plain"
 
     # Handle application/octet-stream by checking file extension
-    if mime_type == "application/octet-stream" and file.filename:
-        filename_lower = file.filename.lower()
+    if mime_type == "application/octet-stream" and filename:
+        filename_lower = filename.lower()
         if filename_lower.endswith(".md") or filename_lower.endswith(".markdown"):
             mime_type = "text/markdown"
         elif filename_lower.endswith(".txt"):
@@ -66,17 +86,93 @@ async def process_document(
             mime_type = "application/msword"
         elif filename_lower.endswith(".docx"):
             mime_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    return mime_type
+
+
+def parse_contents(
+    contents: bytes,
+    *,
+    filename: str | None = None,
+    content_type: str | None = None,
+) -> list[Document]:
+    """Parse the raw contents of a file into documents (one per page for PDFs).
+
+    This is the CPU-heavy step; it is a plain function so that it can run in a
+    worker process.
+    """
+    blob = Blob(data=contents, mimetype=resolve_mimetype(content_type, filename))
+    return MIMETYPE_BASED_PARSER.parse(blob)
 
-    blob = Blob(data=contents, mimetype=mime_type)
 
-    docs = MIMETYPE_BASED_PARSER.parse(blob)
+def parse_file(
+    path: str,
+    *,
+    filename: str | None = None,
+    content_type: str | None = None,
+) -> list[Document]:
+    """Parse the file at ``path``; parsers read it from disk as they need it."""
+    blob = Blob.from_path(path, mime_type=resolve_mimetype(content_type, filename))
+    return MIMETYPE_BASED_PARSER.parse(blob)
+
+
+def count_pdf_pages(path: str) -> int:
+    """Number of pages of the PDF file at ``path``."""
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def parse_pdf_pages(path: str, start: int, stop: int) -> list[Document]:
+    """Extract the text of pages ``start`` to ``stop`` (exclusive) of a PDF.
+
+    Produces the same page documents as ``PDFPlumberParser``, for a slice of
+    the file, so that one PDF can be extracted by several processes. ``page``
+    in the metadata is zero-based, as with ``PDFPlumberParser``.
+    """
+    import pdfplumber
+
+    docs = []
+    with pdfplumber.open(path) as pdf:
+        total_pages = len(pdf.pages)
+        for page in pdf.pages[start:stop]:
+            docs.append(
+                Document(
+                    page_content=page.extract_text() or "",
+                    metadata={
+                        "page": page.page_number - 1,
+                        "total_pages": total_pages,
+                    },
+                )
+            )
+            # Release the page's parsed layout before moving to the next one.
+            page.close()
+    return docs
+
+
+def chunk_documents(
+    docs: list[Document],
+    *,
+    metadata: dict | None = None,
+    chunk_size: int = 2000,
+    chunk_overlap: int = 200,
+    enable_chunking: bool = True,
+    file_id: str | None = None,
+) -> list[Document]:
+    """Combine parsed documents and split them into chunks.
+
+    ``file_id`` identifies the file in the chunk metadata; a new one is
+    generated when omitted.
+    """
+    # Generate a unique ID for this file processing instance
+    file_id = file_id or str(uuid.uuid4())
 
     # Combine content from all documents (pages)
     content = "\n\n".join([doc.page_content for doc in docs])
 
     # Set base metadata
-    base_metadata = metadata or {}
-    base_metadata["file_id"] = str(file_id)
+    base_metadata = dict(metadata or {})
+    base_metadata["file_id"] = file_id
     base_metadata["enable_chunking"] = enable_chunking
 
     # Process based on chunking preference
@@ -88,6 +184,49 @@ async def process_document(
         return process_without_chunking(content, base_metadata)
 
 
+def chunk_page(
+    page: Document,
+    *,
+    metadata: dict | None,
+    chunk_size: int,
+    chunk_overlap: int,
+    file_id: str,
+) -> list[Document]:
+    """Split a single page into chunks that keep the page's number."""
+    page_metadata = dict(metadata or {})
+    page_metadata["file_id"] = file_id
+    page_metadata["enable_chunking"] = True
+    for key in ("page", "total_pages"):
+        if key in page.metadata:
+            page_metadata[key] = page.metadata[key]
+    return process_with_chunking(
+        page.page_content, page_metadata, chunk_size, chunk_overlap
+    )
+
+
+def process_contents(
+    contents: bytes,
+    *,
+    filename: str | None = None,
+    content_type: str | None = None,
+    metadata: dict | None = None,
+    chunk_size: int = 2000,
+    chunk_overlap: int = 200,
+    enable_chunking: bool = True,
+    file_id: str | None = None,
+) -> list[Document]:
+    """Parse and chunk the raw contents of a file in the calling thread."""
+    docs = parse_contents(contents, filename=filename, content_type=content_type)
+    return chunk_documents(
+        docs,
+        metadata=metadata,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        enable_chunking=enable_chunking,
+        file_id=file_id,
+    )
+
+
 def process_without_chunking(content: str, metadata: dict) -> list[Document]:
     """Process documents without chunking - store as one chunk."""
     doc = Document(
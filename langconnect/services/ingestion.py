@@ -0,0 +1,267 @@
+"""Background processing of queued ingestion jobs.
+
+``run_ingest_job`` parses, chunks, embeds and stores the files of one job.
+``IngestWorkerPool`` runs a number of worker tasks that take jobs off the queue
+in ``langconnect.database.jobs``; the API server starts one pool per process,
+and ``langconnect-admin ingest-worker`` runs a standalone one.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import tempfile
+from typing import Any, Optional
+
+from fastapi.exceptions import HTTPException
+from langchain_core.documents import Document
+
+from langconnect import config
+from langconnect.database import jobs
+from langconnect.database.collections import Collection
+from langconnect.services.parser_pool import parser_pool
+from langconnect.uploads import remove_file
+
+logger = logging.getLogger(__name__)
+
+NO_DOCUMENTS_ERROR = "Failed to process any documents from the provided files."
+
+
+async def _heartbeat_until_done(
+    job_id: str, worker_id: str, cancel: asyncio.Event
+) -> None:
+    interval = max(config.INGEST_JOB_STALE_SECONDS / 3, 1.0)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if await jobs.heartbeat(job_id, worker_id):
+                cancel.set()
+        except jobs.LeaseLostError:
+            # The attempt stops before its next file, when finishing the job
+            # as cancelled reports the lost lease.
+            cancel.set()
+            return
+
+
+async def _parse_file(
+    job_id: str, position: int, params: dict[str, Any]
+) -> tuple[dict[str, Any], list[Document] | Exception]:
+    """Load, parse and chunk one file. Parse errors are returned, not raised.
+
+    The file is written to a temporary file, part by part, and parsed from
+    there.
+    """
+    file = await jobs.get_job_file(job_id, position)
+    suffix = os.path.splitext(file["filename"] or "")[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as target:
+        path = target.name
+        try:
+            await jobs.download_job_file(job_id, position, target)
+        except BaseException:
+            target.close()
+            remove_file(path)
+            raise
+    try:
+        documents = await parser_pool.process(
+            path,
+            filename=file["filename"],
+            content_type=file["content_type"],
+            metadata=file["metadata"],
+            chunk_size=params["chunk_size"],
+            chunk_overlap=params["chunk_overlap"],
+            enable_chunking=params["enable_chunking"],
+            file_id=file["file_id"],
+        )
+    except Exception as e:
+        return file, e
+    finally:
+        remove_file(path)
+    return file, documents
+
+
+async def _parse_in_slot(
+    slots: asyncio.Semaphore, job_id: str, position: int, params: dict[str, Any]
+) -> tuple[dict[str, Any], list[Document] | Exception]:
+    """Parse a file once a slot is free. The caller releases the slot."""
+    await slots.acquire()
+    return await _parse_file(job_id, position, params)
+
+
+async def run_ingest_job(job: dict[str, Any], worker_id: str) -> Optional[str]:
+    """Process the pending files of a job claimed by ``worker_id``.
+
+    The files are parsed concurrently in the parser pool and stored as each one
+    finishes. At most ``config.INGEST_FILES_IN_FLIGHT`` files are downloaded,
+    parsed or waiting to be stored at a time, which bounds both the pool
+    connections held by downloads and the parsed chunks held in memory. A file
+    that cannot be parsed is recorded as failed and skipped.
+    Any other error (embeddings API, database) ends the attempt; the job is
+    then queued again with backoff, or failed once its attempts are exhausted.
+
+    Returns the job's final status, or None if another worker took the job
+    over; the attempt then stops without touching the job.
+    """
+    job_id = job["id"]
+    params = job["params"]
+    collection = Collection(job["collection_id"], job["owner_id"])
+    cancel = asyncio.Event()
+    if job["cancel_requested"]:
+        cancel.set()
+    heartbeat = asyncio.create_task(
+        _heartbeat_until_done(job_id, worker_id, cancel)
+    )
+    slots = asyncio.Semaphore(
+        config.INGEST_FILES_IN_FLIGHT or max(parser_pool.processes, 1)
+    )
+    parsing: list[asyncio.Task] = []
+    try:
+        parsing = [
+            asyncio.create_task(_parse_in_slot(slots, job_id, position, params))
+            for position in await jobs.pending_file_positions(job_id)
+        ]
+        for parsed in asyncio.as_completed(parsing):
+            file, documents = await parsed
+            # The next file is downloaded and parsed while this one is stored.
+            slots.release()
+            if cancel.is_set() or await jobs.heartbeat(job_id, worker_id):
+                await jobs.finish_job(job_id, worker_id, "cancelled")
+                return "cancelled"
+
+            position = file["position"]
+            if isinstance(documents, Exception):
+                logger.error(f"Error processing file {file['filename']}: {documents}")
+                await jobs.fail_job_file(
+                    job_id, worker_id, position, file["filename"], str(documents)
+                )
+                continue
+
+            if not documents:
+                logger.info(
+                    f"Warning: File {file['filename']} resulted "
+                    f"in no processable documents."
+                )
+                await jobs.complete_job_file(job_id, worker_id, position, [])
+                continue
+
+            # An earlier attempt may have stored this file before it could
+            # record it as done. Attempts are reset by a release or a retry, so
+            # they cannot tell a first run apart.
+            await collection.delete_many(file_ids=[file["file_id"]])
+            chunk_ids = await collection.upsert(documents)
+            try:
+                await jobs.complete_job_file(job_id, worker_id, position, chunk_ids)
+            except jobs.LeaseLostError:
+                # The worker that took the job over stores this file itself.
+                await collection.delete_many(document_ids=chunk_ids)
+                raise
+
+        current = await jobs.IngestJobsManager(job["owner_id"]).get(
+            job["collection_id"], job_id
+        )
+        if current["chunks_added"] == 0:
+            await jobs.finish_job(job_id, worker_id, "failed", NO_DOCUMENTS_ERROR)
+            return "failed"
+        await jobs.finish_job(job_id, worker_id, "succeeded")
+        return "succeeded"
+    except jobs.LeaseLostError:
+        logger.warning(f"Ingestion job {job_id} was taken over by another worker.")
+        return None
+    except HTTPException as e:
+        # The collection is gone or no longer owned by the job's user.
+        try:
+            await jobs.finish_job(job_id, worker_id, "failed", str(e.detail))
+        except jobs.LeaseLostError:
+            return None
+        return "failed"
+    except asyncio.CancelledError:
+        await asyncio.shield(jobs.release_job(job_id, worker_id))
+        raise
+    except Exception as e:
+        logger.exception(f"Ingestion job {job_id} failed")
+        return await jobs.retry_or_fail_job(
+            job_id, worker_id, f"{type(e).__name__}: {e}"
+        )
+    finally:
+        heartbeat.cancel()
+        for task in parsing:
+            task.cancel()
+
+
+class IngestWorkerPool:
+    """A set of asyncio tasks that process ingestion jobs from the queue."""
+
+    def __init__(self, workers: int, poll_interval: float) -> None:
+        """Initialize the pool.
+
+        Args:
+            workers: Number of jobs processed concurrently by this process.
+            poll_interval: Seconds between queue checks while idle.
+        """
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._work(f"{self._prefix}:{n}"))
+            for n in range(self.workers)
+        ]
+        if self.workers:
+            logger.info(f"Started {self.workers} ingestion worker(s).")
+
+    def notify(self) -> None:
+        """Wake idle workers, e.g. right after a job was queued."""
+        self._wakeup.set()
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Stop taking jobs and wait for running ones, cancelling after ``timeout``.
+
+        Cancelled jobs are released back to the queue.
+        """
+        self._stopping = True
+        self._wakeup.set()
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+    async def run_once(self, worker_id: Optional[str] = None) -> bool:
+        """Claim and process one job. Returns False if the queue was empty."""
+        worker_id = worker_id or f"{self._prefix}:once"
+        job = await jobs.claim_next_job(worker_id)
+        if job is None:
+            return False
+        await run_ingest_job(job, worker_id)
+        return True
+
+    async def _work(self, worker_id: str) -> None:
+        while not self._stopping:
+            # Cleared before checking the queue so that a job queued while
+            # the check runs still wakes this worker.
+            self._wakeup.clear()
+            try:
+                await jobs.fail_stale_jobs()
+                if await self.run_once(worker_id):
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Ingestion worker error")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+worker_pool = IngestWorkerPool(
+    config.INGEST_WORKERS, config.INGEST_POLL_INTERVAL_SECONDS
+)
@@ -0,0 +1,231 @@
+"""Document parsing in a pool of worker processes.
+
+Parsers such as PDFPlumber are pure Python and CPU bound: run on the event
+loop (or in a thread, which still holds the GIL) a large PDF stalls every other
+request. ``ParserPool`` runs ``parse_file`` in a ``ProcessPoolExecutor``
+instead, and caps how many files of each mime type are parsed at once so that a
+batch of PDFs cannot take every worker away from cheap text files. Large PDFs
+are split into page ranges extracted by several workers, and chunked page by
+page as the ranges come back.
+
+Files are passed to the workers by path: uploads are already on disk, and a
+path is cheap to send to another process where the contents are not.
+"""
+
+import asyncio
+import functools
+import itertools
+import logging
+import multiprocessing
+import uuid
+import weakref
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Optional, TypeVar
+
+from langchain_core.documents.base import Document
+
+from langconnect import config
+from langconnect.services.document_processor import (
+    chunk_documents,
+    chunk_page,
+    count_pdf_pages,
+    parse_file,
+    parse_pdf_pages,
+    resolve_mimetype,
+)
+
+logger = logging.getLogger(__name__)
+
+PDF_MIMETYPE = "application/pdf"
+
+T = TypeVar("T")
+
+
+class ParserPool:
+    """Parses files in worker processes with per-mime-type concurrency limits."""
+
+    def __init__(
+        self,
+        processes: int,
+        mimetype_limits: Optional[dict[str, int]] = None,
+        max_tasks_per_child: Optional[int] = None,
+        pages_per_task: int = 20,
+    ) -> None:
+        """Initialize the pool. Worker processes start on first use.
+
+        Args:
+            processes: Number of worker processes. 0 parses in threads of the
+                current process instead, which keeps the event loop free but
+                not the GIL.
+            mimetype_limits: Maximum number of files of a mime type parsed
+                concurrently. Other mime types are limited by ``processes``.
+            max_tasks_per_child: Files a worker parses before it is replaced,
+                bounding the memory a leaky parser can hold on to.
+            pages_per_task: PDF pages extracted by a worker in one task.
+        """
+        self.processes = processes
+        self.mimetype_limits = dict(mimetype_limits or {})
+        self.max_tasks_per_child = max_tasks_per_child
+        self.pages_per_task = max(pages_per_task, 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Semaphores belong to an event loop; tests and the admin CLI may use
+        # the module-level pool from more than one loop.
+        self._semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]
+        ] = weakref.WeakKeyDictionary()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # "spawn" rather than fork: the server process runs threads (the
+            # asyncio default executor, HTTP clients) that fork does not copy
+            # safely.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=self.max_tasks_per_child,
+            )
+            logger.info(f"Started parser pool with {self.processes} process(es).")
+        return self._executor
+
+    def _semaphore(self, mimetype: str) -> asyncio.Semaphore:
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if mimetype not in semaphores:
+            limit = self.mimetype_limits.get(mimetype) or max(self.processes, 1)
+            semaphores[mimetype] = asyncio.Semaphore(limit)
+        return semaphores[mimetype]
+
+    async def _run(self, mimetype: str, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func(*args)`` in a worker under the limit of ``mimetype``."""
+        async with self._semaphore(mimetype):
+            if self.processes <= 0:
+                return await asyncio.to_thread(func, *args)
+            executor = self._get_executor()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    executor, func, *args
+                )
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for running out of memory on a
+                # huge file). Later files get a fresh pool.
+                if self._executor is executor:
+                    self._executor = None
+                    executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    async def parse(
+        self,
+        path: str,
+        *,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> list[Document]:
+        """Parse the file at ``path`` without blocking the event loop."""
+        # partial() of a function in document_processor keeps the workers from
+        # importing this module and the app config.
+        return await self._run(
+            resolve_mimetype(content_type, filename),
+            functools.partial(
+                parse_file,
+                path,
+                filename=filename,
+                content_type=content_type,
+            ),
+        )
+
+    async def iter_pdf_pages(self, path: str) -> AsyncIterator[Document]:
+        """Yield the pages of a PDF file in order, extracted in parallel.
+
+        The page range is split into slices of ``pages_per_task`` pages that
+        are extracted by as many workers as the PDF limit allows. Only those
+        slices are held in memory at a time, however long the document.
+        """
+        total = await self._run(PDF_MIMETYPE, count_pdf_pages, path)
+        slices = iter(
+            [
+                (start, min(start + self.pages_per_task, total))
+                for start in range(0, total, self.pages_per_task)
+            ]
+        )
+        window = self.mimetype_limits.get(PDF_MIMETYPE) or max(self.processes, 1)
+
+        def submit(start: int, stop: int) -> asyncio.Task:
+            return asyncio.create_task(
+                self._run(PDF_MIMETYPE, parse_pdf_pages, path, start, stop)
+            )
+
+        pending = deque(submit(*pages) for pages in itertools.islice(slices, window))
+        try:
+            while pending:
+                pages = await pending.popleft()
+                next_slice = next(slices, None)
+                if next_slice:
+                    pending.append(submit(*next_slice))
+                for page in pages:
+                    yield page
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def process(
+        self,
+        path: str,
+        *,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        metadata: Optional[dict] = None,
+        chunk_size: int = 2000,
+        chunk_overlap: int = 200,
+        enable_chunking: bool = True,
+        file_id: Optional[str] = None,
+    ) -> list[Document]:
+        """Parse and chunk the file at ``path``.
+
+        The pool counterpart of ``process_contents``.
+
+        PDFs are chunked page by page as the pages are extracted, so chunks
+        carry their page number and the text of the whole document is never
+        held as one string.
+        """
+        file_id = file_id or str(uuid.uuid4())
+        mimetype = resolve_mimetype(content_type, filename)
+        if mimetype != PDF_MIMETYPE or not enable_chunking:
+            docs = await self.parse(path, filename=filename, content_type=content_type)
+            return await asyncio.to_thread(
+                chunk_documents,
+                docs,
+                metadata=metadata,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                enable_chunking=enable_chunking,
+                file_id=file_id,
+            )
+
+        chunks = []
+        async for page in self.iter_pdf_pages(path):
+            chunks.extend(
+                chunk_page(
+                    page,
+                    metadata=metadata,
+                    chunk_size=chunk_size,
+                    chunk_overlap=chunk_overlap,
+                    file_id=file_id,
+                )
+            )
+        return chunks
+
+    def shutdown(self) -> None:
+        """Stop the worker processes. The pool restarts them if used again."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+parser_pool = ParserPool(
+    config.PARSER_PROCESSES,
+    config.PARSER_MIMETYPE_LIMITS,
+    config.PARSER_MAX_TASKS_PER_CHILD or None,
+    config.PDF_PAGES_PER_TASK,
+)
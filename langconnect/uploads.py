@@ -0,0 +1,105 @@
+"""Streaming handling of uploaded files.
+
+Starlette spools multipart file parts to temporary files (in memory up to 1MB,
+on disk beyond), but reads a request body of any size. ``UploadSizeLimitMiddleware``
+counts the body as it arrives and rejects the request as soon as it crosses the
+limit, before the rest is received. ``spool_upload`` copies an upload to a named
+temporary file piece by piece, so that parsers can be given a path.
+"""
+
+import os
+import shutil
+import tempfile
+from typing import BinaryIO
+
+from fastapi import UploadFile
+from fastapi.exceptions import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """Reject multipart requests whose body exceeds ``max_size`` bytes."""
+
+    def __init__(self, app: ASGIApp, max_size: int) -> None:
+        """Initialize the middleware. A ``max_size`` of 0 disables the limit."""
+        self.app = app
+        self.max_size = max_size
+
+    def _detail(self) -> str:
+        return f"Upload exceeds the maximum request size of {self.max_size} bytes."
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.max_size <= 0:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_size:
+            response = JSONResponse(
+                {"detail": self._detail()},
+                status_code=413,
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def receive_limited() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    # Raised while the form is parsed; FastAPI turns it into
+                    # the response without reading the rest of the body.
+                    raise HTTPException(
+                        status_code=413,
+                        detail=self._detail(),
+                    )
+            return message
+
+        await self.app(scope, receive_limited, send)
+
+
+def upload_size(file: UploadFile) -> int:
+    """Size of an upload in bytes, without reading it."""
+    if file.size is not None:
+        return file.size
+    position = file.file.tell()
+    size = file.file.seek(0, os.SEEK_END)
+    file.file.seek(position)
+    return size
+
+
+def _copy(source: BinaryIO, suffix: str) -> str:
+    source.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as target:
+        shutil.copyfileobj(source, target, COPY_BUFFER_SIZE)
+    return target.name
+
+
+async def spool_upload(file: UploadFile) -> str:
+    """Copy an upload to a named temporary file and return its path.
+
+    The caller removes the file. The copy runs in a thread, one buffer at a
+    time.
+    """
+    suffix = os.path.splitext(file.filename or "")[1]
+    return await run_in_threadpool(_copy, file.file, suffix)
+
+
+def remove_file(path: str) -> None:
+    """Remove a temporary file, ignoring one that is already gone."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
@@ -26,7 +26,7 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 # Create FastMCP server
 mcp = FastMCP(
     name="langconnect-rag-mcp",
-    instructions="This server provides vector search tools that can be used to search for documents in a collection. Call list_collections() to get a list of available collections. Call get_collection(collection_id) to get details of a specific collection. Call search_documents(collection_id, query, limit, search_type, filter_json) to search for documents in a collection. Call list_documents(collection_id, limit) to list individual chunks in a collection. Call list_document_groups(collection_id, limit) to list original documents grouped by file. Call add_documents(collection_id, text) to add a text document to a collection. Call delete_document(collection_id, document_id) to delete a document from a collection. Call get_health_status() to check the health status of the server.",
+    instructions="This server provides vector search tools that can be used to search for documents in a collection. Call list_collections() to get a list of available collections. Call get_collection(collection_id) to get details of a specific collection. Call search_documents(collection_id, query, limit, search_type, filter_json) to search for documents in a collection, or search_documents_batch(collection_id, queries_json, limit, search_type, filter_json) to search for several queries at once. Call search_collections(query, collection_ids_json, limit, search_type, filter_json) to search several collections, or all of them, at once. Call list_documents(collection_id, limit) to list individual chunks in a collection. Call list_document_groups(collection_id, limit) to list original documents grouped by file. Call add_documents(collection_id, text) to add a text document to a collection. Call delete_document(collection_id, document_id) to delete a document from a collection. Call get_health_status() to check the health status of the server.",
 )
 
 
@@ -36,9 +36,9 @@ def get_instructions() -> str:
     """Provides instructions on how to use the LangConnect RAG MCP server."""
     return """
 Follow the guidelines step-by-step to find the answer.
-1. Use `list_collections` to list up collections and find right **Collection ID** for user's request.
+1. Use `list_collections` to list up collections and find right **Collection ID** for user's request. If it is unclear which collection holds the answer, use `search_collections` to search all of them at once.
 2. Use `multi_query` to generate at least 3 sub-questions which are related to original user's request.
-3. Search all queries generated from previous step(`multi_query`) and find useful documents from collection.
+3. Search all queries generated from previous step(`multi_query`) at once with `search_documents_batch` and find useful documents from collection.
 4. Use searched documents to answer the question."""
 
 
@@ -58,9 +58,9 @@ You must use search tool to answer the question.
 
 #Search Guidelines:
 Follow the guidelines step-by-step to find the answer.
-1. Use `list_collections` to list up collections and find right **Collection ID** for user's request.
+1. Use `list_collections` to list up collections and find right **Collection ID** for user's request. If it is unclear which collection holds the answer, use `search_collections` to search all of them at once.
 2. Use `multi_query` to generate at least 3 sub-questions which are related to original user's request.
-3. Search all queries generated from previous step(`multi_query`) and find useful documents from collection.
+3. Search all queries generated from previous step(`multi_query`) at once with `search_documents_batch` and find useful documents from collection.
 4. Use searched documents to answer the question.
 
 ---
@@ -181,6 +181,129 @@ async def search_documents(
     return output
 
 
+@mcp.tool
+async def search_documents_batch(
+    collection_id: str,
+    queries_json: str,
+    limit: int = 5,
+    search_type: str = "semantic",
+    filter_json: Optional[str] = None,
+) -> str:
+    """Search documents in a collection for several queries at once, e.g. those from multi_query().
+
+    All queries are searched in a single request, which is much faster than calling
+    search_documents() once per query. The results of all queries are merged, each
+    document appears once, and documents found by several queries rank higher.
+
+    Args:
+        collection_id: The unique identifier of the collection to search in.
+        queries_json: JSON array of query strings, such as the output of multi_query().
+                      Example: '["what is X?", "how does X work?"]'
+        limit: Maximum number of merged documents to return. Default is 5.
+        search_type: "semantic", "keyword" or "hybrid", as in search_documents().
+        filter_json: Optional JSON string containing metadata filters, as in search_documents().
+    """
+    try:
+        queries = json.loads(queries_json)
+    except json.JSONDecodeError:
+        return "Error: Invalid JSON in queries parameter"
+    if not isinstance(queries, list) or not queries:
+        return "Error: queries must be a non-empty JSON array of strings"
+
+    search_data = {
+        "queries": queries,
+        "limit": limit,
+        "search_type": search_type,
+        "fuse": True,
+    }
+
+    if filter_json:
+        try:
+            search_data["filter"] = json.loads(filter_json)
+        except json.JSONDecodeError:
+            return "Error: Invalid JSON in filter parameter"
+
+    response = await client.request(
+        "POST",
+        f"/collections/{collection_id}/documents/search/batch",
+        json=search_data,
+    )
+    results = response.get("fused") or []
+
+    if not results:
+        return "No results found."
+
+    output = f'<search_results type="{search_type}" queries="{len(queries)}">\n'
+    for result in results:
+        output += "  <document>\n"
+        output += f"    <content>{result.get('page_content', '')}</content>\n"
+        output += f"    <metadata>{json.dumps(result.get('metadata', {}), ensure_ascii=False)}</metadata>\n"
+        output += f"    <score>{result.get('score', 0):.4f}</score>\n"
+        output += f"    <id>{result.get('id', 'Unknown')}</id>\n"
+        output += "  </document>\n"
+    output += "</search_results>"
+
+    return output
+
+
+@mcp.tool
+async def search_collections(
+    query: str,
+    collection_ids_json: Optional[str] = None,
+    limit: int = 5,
+    search_type: str = "semantic",
+    filter_json: Optional[str] = None,
+) -> str:
+    """Search several collections at once, or all of them, when it is unclear which collection holds the answer.
+
+    The collections are searched in a single request and the results are ranked together.
+    Each result carries the ID of the collection it was found in.
+
+    Args:
+        query: The search query string, as in search_documents().
+        collection_ids_json: Optional JSON array of collection IDs to search, from list_collections().
+                             Example: '["<collection id>", "<collection id>"]'
+                             Omit it to search every collection.
+        limit: Maximum number of documents to return across all collections. Default is 5.
+        search_type: "semantic", "keyword" or "hybrid", as in search_documents().
+        filter_json: Optional JSON string containing metadata filters, as in search_documents().
+    """
+    search_data = {"query": query, "limit": limit, "search_type": search_type}
+
+    if collection_ids_json:
+        try:
+            collection_ids = json.loads(collection_ids_json)
+        except json.JSONDecodeError:
+            return "Error: Invalid JSON in collection_ids parameter"
+        if not isinstance(collection_ids, list) or not collection_ids:
+            return "Error: collection_ids must be a non-empty JSON array of collection IDs"
+        search_data["collection_ids"] = collection_ids
+
+    if filter_json:
+        try:
+            search_data["filter"] = json.loads(filter_json)
+        except json.JSONDecodeError:
+            return "Error: Invalid JSON in filter parameter"
+
+    results = await client.request("POST", "/collections/search", json=search_data)
+
+    if not results:
+        return "No results found."
+
+    output = f'<search_results type="{search_type}">\n'
+    for result in results:
+        output += "  <document>\n"
+        output += f"    <content>{result.get('page_content', '')}</content>\n"
+        output += f"    <metadata>{json.dumps(result.get('metadata', {}), ensure_ascii=False)}</metadata>\n"
+        output += f"    <score>{result.get('score', 0):.4f}</score>\n"
+        output += f"    <id>{result.get('id', 'Unknown')}</id>\n"
+        output += f"    <collection_id>{result.get('collection_id', 'Unknown')}</collection_id>\n"
+        output += "  </document>\n"
+    output += "</search_results>"
+
+    return output
+
+
 @mcp.tool
 async def list_collections() -> str:
     """List all available document collections.
@@ -433,6 +556,8 @@ async def add_documents(
         "chunk_size": str(chunk_size),
         "chunk_overlap": str(chunk_overlap),
         "enable_chunking": str(enable_chunking),
+        # Ingest within the request so that the created chunks can be reported
+        "wait": "true",
     }
 
     # Remove Content-Type for multipart
@@ -544,6 +669,8 @@ async def upload_local_file(
         "chunk_size": str(chunk_size),
         "chunk_overlap": str(chunk_overlap),
         "enable_chunking": str(enable_chunking),
+        # Ingest within the request so that the created chunks can be reported
+        "wait": "true",
     }
 
     # Prepare headers for multipart upload
@@ -394,6 +394,8 @@ async def add_documents(
         "chunk_size": str(chunk_size),
         "chunk_overlap": str(chunk_overlap),
         "enable_chunking": str(enable_chunking),
+        # Ingest within the request so that the created chunks can be reported
+        "wait": "true",
     }
 
     # Remove Content-Type for multipart
@@ -505,6 +507,8 @@ async def upload_local_file(
         "chunk_size": str(chunk_size),
         "chunk_overlap": str(chunk_overlap),
         "enable_chunking": str(enable_chunking),
+        # Ingest within the request so that the created chunks can be reported
+        "wait": "true",
     }
 
     # Prepare headers for multipart upload
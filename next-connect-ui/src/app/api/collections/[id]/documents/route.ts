@@ -30,7 +30,8 @@ export async function POST(request: Request, { params }: { params: Promise<{ id:
     // Use the Axios function to upload FormData
     const response = await uploadFormData(`/collections/${id}/documents`, formData)
 
-    return NextResponse.json({ success: true, data: response }, { status: 201 })
+    // The backend queues the files as an ingestion job and returns it (202).
+    return NextResponse.json({ success: true, data: response }, { status: 202 })
   } catch (error: any) {
     return NextResponse.json({ 
       success: false, 
@@ -0,0 +1,22 @@
+import { NextResponse } from "next/server"
+import { serverFetchAPI } from "@/lib/api"
+
+export async function GET(
+  request: Request,
+  { params }: { params: Promise<{ id: string; jobId: string }> }
+) {
+  const { id, jobId } = await params
+
+  try {
+    const response = await serverFetchAPI(`/collections/${id}/jobs/${jobId}`, {
+      method: "GET",
+    })
+
+    return NextResponse.json({ success: true, data: response }, { status: 200 })
+  } catch (error: any) {
+    return NextResponse.json({
+      success: false,
+      message: error.message || 'Failed to fetch ingestion job'
+    }, { status: 500 })
+  }
+}
@@ -29,6 +29,14 @@ interface Collection {
   name: string
 }
 
+interface IngestJob {
+  status: "queued" | "running" | "succeeded" | "failed" | "cancelled"
+  failed_files: string[]
+  error: string | null
+}
+
+const JOB_POLL_INTERVAL_MS = 2000
+
 interface UploadDocumentModalProps {
   open: boolean
   onOpenChange: (open: boolean) => void
@@ -109,6 +117,28 @@ export function UploadDocumentModal({
     form.setValue("metadata", JSON.stringify(newMetadata, null, 2))
   }
 
+  async function waitForJob(collectionId: string, jobId: string): Promise<IngestJob> {
+    const toastId = toast.loading(t('documents.messages.uploadProcessing'))
+    try {
+      while (true) {
+        const response = await fetch(`/api/collections/${collectionId}/jobs/${jobId}`)
+        const result = await response.json()
+
+        if (!result.success) {
+          throw new Error(result.message || t('documents.messages.uploadError'))
+        }
+
+        const job: IngestJob = result.data
+        if (job.status !== 'queued' && job.status !== 'running') {
+          return job
+        }
+        await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS))
+      }
+    } finally {
+      toast.dismiss(toastId)
+    }
+  }
+
   async function onSubmit(values: z.infer<typeof formSchema>) {
     if (files.length === 0) {
       toast.error(t('documents.messages.uploadRequireFiles'))
@@ -141,7 +171,23 @@ export function UploadDocumentModal({
         throw new Error(result.message || t('documents.messages.uploadError'))
       }
 
-      toast.success(t('documents.messages.uploadSuccess'))
+      // The files are ingested in the background: wait for the job to finish.
+      const job = await waitForJob(values.collectionId, result.data.job_id)
+
+      if (job.status === 'cancelled') {
+        throw new Error(t('documents.messages.uploadCancelled'))
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.error || t('documents.messages.uploadError'))
+      }
+
+      if (job.failed_files.length > 0) {
+        toast.warning(t('documents.messages.uploadPartial'), {
+          description: job.failed_files.join(', '),
+        })
+      } else {
+        toast.success(t('documents.messages.uploadSuccess'))
+      }
       
       onOpenChange(false)
       form.reset()
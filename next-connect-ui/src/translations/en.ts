@@ -100,6 +100,9 @@ export const en = {
       uploadSuccess: 'Document uploaded successfully',
       uploadError: 'Failed to upload document',
       uploadRequireFiles: 'Please select files to upload',
+      uploadProcessing: 'Processing uploaded documents...',
+      uploadCancelled: 'The upload was cancelled',
+      uploadPartial: 'Some files could not be processed',
       deleteSuccess: 'Document deleted successfully',
       deleteError: 'Failed to delete document',
       fetchError: 'Failed to fetch documents',
@@ -100,6 +100,9 @@ export const ko = {
       uploadSuccess: '문서가 성공적으로 업로드되었습니다',
       uploadError: '문서 업로드 실패',
       uploadRequireFiles: '업로드할 파일을 선택하세요',
+      uploadProcessing: '업로드한 문서를 처리하는 중...',
+      uploadCancelled: '업로드가 취소되었습니다',
+      uploadPartial: '일부 파일을 처리하지 못했습니다',
       deleteSuccess: '문서가 성공적으로 삭제되었습니다',
       deleteError: '문서 삭제 실패',
       fetchError: '문서 조회 실패',
@@ -170,3 +170,54 @@ async def test_multi_query_no_key():
     data = json.loads(out)
     assert "error" in data
     monkeypatch.undo()
+
+
+async def test_search_documents_batch(monkeypatch):
+    sent = {}
+
+    async def dummy_request(method, endpoint, **kwargs):
+        sent.update(endpoint=endpoint, **kwargs)
+        return {
+            "results": [[], []],
+            "fused": [{"page_content": "Hi", "metadata": {}, "score": 0.03, "id": "d1"}],
+        }
+
+    monkeypatch.setattr(mcp_mod.client, "request", dummy_request)
+    xml = await mcp_mod.search_documents_batch("col", '["q1", "q2"]', limit=3)
+    assert sent["endpoint"] == "/collections/col/documents/search/batch"
+    assert sent["json"]["queries"] == ["q1", "q2"]
+    assert sent["json"]["fuse"] is True
+    assert 'queries="2"' in xml
+    assert "<id>d1</id>" in xml
+
+
+async def test_search_documents_batch_bad_queries():
+    out = await mcp_mod.search_documents_batch("col", "notjson")
+    assert "Error: Invalid JSON in queries parameter" in out
+    out = await mcp_mod.search_documents_batch("col", "[]")
+    assert "non-empty" in out
+
+
+async def test_search_collections(monkeypatch):
+    sent = {}
+
+    async def dummy_request(method, endpoint, **kwargs):
+        sent.update(endpoint=endpoint, **kwargs)
+        return [
+            {
+                "page_content": "Hi",
+                "metadata": {},
+                "score": 0.2,
+                "id": "d1",
+                "collection_id": "c2",
+            }
+        ]
+
+    monkeypatch.setattr(mcp_mod.client, "request", dummy_request)
+    xml = await mcp_mod.search_collections("qry", '["c1", "c2"]')
+    assert sent["endpoint"] == "/collections/search"
+    assert sent["json"]["collection_ids"] == ["c1", "c2"]
+    assert "<collection_id>c2</collection_id>" in xml
+
+    await mcp_mod.search_collections("qry")
+    assert "collection_ids" not in sent["json"]
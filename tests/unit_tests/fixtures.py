@@ -1,10 +1,15 @@
+import io
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
+from fastapi import UploadFile
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from starlette.datastructures import Headers
 
 from langconnect import config
-from langconnect.database.connection import get_vectorstore
+from langconnect.database.connection import clear_vectorstores, get_vectorstore
+from langconnect.database.migrations import MIGRATIONS_TABLE, run_migrations
 from langconnect.server import APP
 
 
@@ -20,7 +25,20 @@ def reset_db() -> None:
             "Attempting to run unit tests with a non-localhost database. "
             "Please set the host to 'localhost' before running tests."
         )
+    clear_vectorstores()
     vectorstore = get_vectorstore()
+    # Drop the tables created by migrations (some reference PGVector's tables)
+    # and forget applied migrations so they run again on the fresh tables.
+    with vectorstore._engine.begin() as conn:
+        conn.execute(
+            text(
+                "DROP TABLE IF EXISTS langconnect_ingest_job_file_parts, "
+                "langconnect_ingest_job_files, langconnect_embedding_cache, "
+                "langconnect_document_groups, langconnect_collection_stats, "
+                "langconnect_collection_stats_deltas, "
+                f"langconnect_ingest_jobs, {MIGRATIONS_TABLE}"
+            )
+        )
     # Drop table
     vectorstore.drop_tables()
     # Re-create
@@ -36,8 +54,19 @@ async def get_async_test_client() -> AsyncGenerator[AsyncClient, None]:
         raise_app_exceptions=True,
     )
     reset_db()
+    await run_migrations()
     async_client = AsyncClient(base_url=url, transport=transport)
     try:
         yield async_client
     finally:
         await async_client.aclose()
+
+
+def make_upload(content: bytes, filename: str, content_type: str) -> UploadFile:
+    """An in-memory upload, as FastAPI passes it to the endpoint."""
+    return UploadFile(
+        io.BytesIO(content),
+        size=len(content),
+        filename=filename,
+        headers=Headers({"content-type": content_type}),
+    )
@@ -0,0 +1,94 @@
+"""Concurrency tests for the async vector store path."""
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from langconnect import config
+from tests.unit_tests.fixtures import get_async_test_client
+
+USER_1_HEADERS = {
+    "Authorization": "Bearer user1",
+}
+
+INGEST_DELAY_SECONDS = 2.0
+
+
+class SlowEmbeddings(DeterministicFakeEmbedding):
+    """Fake embeddings where document embedding takes a long time.
+
+    The sync method blocks the calling thread, the async one only yields to the
+    event loop. If the server used the sync path, every request on the loop
+    would stall for the whole ingest.
+    """
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(INGEST_DELAY_SECONDS)
+        return super().embed_documents(texts)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        await asyncio.sleep(INGEST_DELAY_SECONDS)
+        return super().embed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return self.embed_query(text)
+
+
+@pytest.fixture
+def slow_embeddings(monkeypatch):
+    embeddings = SlowEmbeddings(size=1536)
+    monkeypatch.setattr(config, "DEFAULT_EMBEDDINGS", embeddings)
+    return embeddings
+
+
+async def _search_latency(client, collection_id: str) -> float:
+    start = time.perf_counter()
+    response = await client.post(
+        f"/collections/{collection_id}/documents/search",
+        json={"query": "latency probe", "limit": 5},
+        headers=USER_1_HEADERS,
+    )
+    assert response.status_code == 200
+    return time.perf_counter() - start
+
+
+async def test_search_latency_stays_flat_during_ingest(slow_embeddings) -> None:
+    """A large ingest must not stall searches running on the same event loop."""
+    async with get_async_test_client() as client:
+        create_col = await client.post(
+            "/collections",
+            json={"name": "async_ingest_col", "metadata": {}},
+            headers=USER_1_HEADERS,
+        )
+        assert create_col.status_code == 201
+        collection_id = create_col.json()["uuid"]
+
+        baseline = max(
+            [await _search_latency(client, collection_id) for _ in range(5)]
+        )
+
+        large_file = b"A paragraph about vector search.\n\n" * 20_000
+        ingest = asyncio.create_task(
+            client.post(
+                f"/collections/{collection_id}/documents",
+                files=[("files", ("large.txt", large_file, "text/plain"))],
+                data={"wait": "true"},
+                headers=USER_1_HEADERS,
+            )
+        )
+        # Let the ingest reach the embedding step before probing.
+        await asyncio.sleep(0.2)
+
+        during = []
+        while not ingest.done():
+            during.append(await _search_latency(client, collection_id))
+            await asyncio.sleep(0.05)
+
+        response = await ingest
+        assert response.status_code == 200
+        assert during, "ingest finished before any search was issued"
+        # Searches keep completing while the ingest waits on embeddings.
+        assert len(during) > 5
+        assert max(during) < baseline + INGEST_DELAY_SECONDS / 2
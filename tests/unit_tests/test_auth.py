@@ -0,0 +1,184 @@
+"""Unit tests for local JWT verification against a fake JWKS."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.exceptions import HTTPException
+from jwt.algorithms import RSAAlgorithm
+
+from langconnect import auth, config
+
+HS256_SECRET = "super-secret-jwt-signing-key-for-tests"
+
+
+def _make_rsa_key(kid: str):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return private_key, jwk
+
+
+def _token(key, algorithm="RS256", kid="key-1", **overrides) -> str:
+    claims = {
+        "sub": "user-123",
+        "aud": "authenticated",
+        "exp": int(time.time()) + 3600,
+        "user_metadata": {"name": "Ada"},
+        **overrides,
+    }
+    headers = {"kid": kid} if kid else None
+    return jwt.encode(claims, key, algorithm=algorithm, headers=headers)
+
+
+class FakeJWKS:
+    """Stand-in for the JWKS endpoint that counts downloads."""
+
+    def __init__(self, *jwks):
+        self.keys = list(jwks)
+        self.calls = 0
+
+    def __call__(self, url: str) -> dict:
+        self.calls += 1
+        return {"keys": self.keys}
+
+
+@pytest.fixture
+def rsa_key():
+    return _make_rsa_key("key-1")
+
+
+@pytest.fixture
+def fake_jwks(monkeypatch, rsa_key):
+    _, jwk = rsa_key
+    fetch = FakeJWKS(jwk)
+    cache = auth.SigningKeyCache("https://example.test/jwks", 600, fetch=fetch)
+    monkeypatch.setattr(auth, "_signing_key_cache", cache)
+    monkeypatch.setattr(config, "SUPABASE_JWT_SIGNING_SECRET", "")
+    return fetch
+
+
+def test_valid_rs256_token_is_verified_locally(fake_jwks, rsa_key):
+    private_key, _ = rsa_key
+
+    user = auth.verify_token_locally(_token(private_key))
+
+    assert user.identity == "user-123"
+    assert user.display_name == "Ada"
+    assert fake_jwks.calls == 1
+
+
+def test_jwks_is_cached_between_requests(fake_jwks, rsa_key):
+    private_key, _ = rsa_key
+
+    for _ in range(5):
+        auth.verify_token_locally(_token(private_key))
+
+    assert fake_jwks.calls == 1
+
+
+def test_expired_token_is_rejected(fake_jwks, rsa_key):
+    private_key, _ = rsa_key
+
+    with pytest.raises(HTTPException) as exc:
+        auth.verify_token_locally(_token(private_key, exp=int(time.time()) - 10))
+    assert exc.value.status_code == 401
+
+
+def test_wrong_audience_is_rejected(fake_jwks, rsa_key):
+    private_key, _ = rsa_key
+
+    with pytest.raises(HTTPException):
+        auth.verify_token_locally(_token(private_key, aud="anon"))
+
+
+def test_forged_signature_is_rejected(fake_jwks):
+    other_key, _ = _make_rsa_key("key-1")
+
+    with pytest.raises(HTTPException):
+        auth.verify_token_locally(_token(other_key))
+
+
+def test_unknown_kid_falls_back_to_remote(fake_jwks):
+    other_key, _ = _make_rsa_key("key-2")
+
+    assert auth.verify_token_locally(_token(other_key, kid="key-2")) is None
+
+
+def test_unknown_kid_refetch_is_rate_limited(fake_jwks, monkeypatch):
+    other_key, other_jwk = _make_rsa_key("key-2")
+    token = _token(other_key, kid="key-2")
+    assert auth.verify_token_locally(token) is None
+
+    # Key rotation: the new key is published, but the refetch only happens
+    # once the minimum refetch delay has passed.
+    fake_jwks.keys.append(other_jwk)
+    assert auth.verify_token_locally(token) is None
+    assert fake_jwks.calls == 1
+
+    monkeypatch.setattr(auth, "_JWKS_MIN_REFETCH_SECONDS", 0.0)
+    assert auth.verify_token_locally(token).identity == "user-123"
+    assert fake_jwks.calls == 2
+
+
+def test_hs256_token_uses_signing_secret(fake_jwks, monkeypatch):
+    monkeypatch.setattr(config, "SUPABASE_JWT_SIGNING_SECRET", HS256_SECRET)
+
+    user = auth.verify_token_locally(_token(HS256_SECRET, algorithm="HS256", kid=None))
+
+    assert user.identity == "user-123"
+
+
+def test_hs256_without_secret_falls_back_to_remote(fake_jwks):
+    token = _token(HS256_SECRET, algorithm="HS256", kid=None)
+
+    assert auth.verify_token_locally(token) is None
+
+
+def test_malformed_token_is_rejected(fake_jwks):
+    with pytest.raises(HTTPException):
+        auth.verify_token_locally("not-a-jwt")
+
+
+def test_expired_keys_are_refreshed_in_the_background(rsa_key):
+    _, jwk = rsa_key
+    release = threading.Event()
+    fetch = FakeJWKS(jwk)
+
+    def slow_fetch(url: str) -> dict:
+        if fetch.calls:
+            release.wait(5)
+        return fetch(url)
+
+    cache = auth.SigningKeyCache("https://example.test/jwks", 0, fetch=slow_fetch)
+    assert cache.get("key-1") is not None
+
+    # The download is stuck, yet lookups keep using the cached keys.
+    for _ in range(3):
+        assert cache.get("key-1") is not None
+    release.set()
+    assert fetch.calls == 1
+    for _ in range(50):
+        if fetch.calls == 2:
+            break
+        time.sleep(0.01)
+    assert fetch.calls == 2
+
+
+def test_first_load_is_shared(rsa_key):
+    _, jwk = rsa_key
+    fetch = FakeJWKS(jwk)
+
+    def slow_fetch(url: str) -> dict:
+        time.sleep(0.1)
+        return fetch(url)
+
+    cache = auth.SigningKeyCache("https://example.test/jwks", 600, fetch=slow_fetch)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        keys = list(pool.map(cache.get, ["key-1"] * 4))
+
+    assert all(key is not None for key in keys)
+    assert fetch.calls == 1
@@ -0,0 +1,93 @@
+"""Tests for searching a collection with several queries at once."""
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from langconnect import config
+from langconnect.database.collections import _fuse_result_lists
+from tests.unit_tests.fixtures import get_async_test_client
+
+USER_1_HEADERS = {
+    "Authorization": "Bearer user1",
+}
+
+
+def _result(doc_id: str) -> dict:
+    return {"id": doc_id, "page_content": doc_id, "metadata": {}, "score": 0.1}
+
+
+def test_fused_results_are_deduplicated_and_ranked_by_rrf() -> None:
+    fused = _fuse_result_lists(
+        [
+            [_result("a"), _result("b"), _result("c")],
+            [_result("b"), _result("d")],
+        ],
+        limit=3,
+        rrf_k=60,
+    )
+
+    assert [r["id"] for r in fused] == ["b", "a", "d"]
+    assert fused[0]["score"] == pytest.approx(1 / 62 + 1 / 61)
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    monkeypatch.setattr(
+        config, "DEFAULT_EMBEDDINGS", DeterministicFakeEmbedding(size=1536)
+    )
+
+
+async def test_batch_search(fake_embeddings) -> None:
+    async with get_async_test_client() as client:
+        response = await client.post(
+            "/collections", json={"name": "batch_col"}, headers=USER_1_HEADERS
+        )
+        collection_id = response.json()["uuid"]
+        url = f"/collections/{collection_id}/documents"
+        for name, text in [
+            ("cats.txt", b"cats purr and sleep"),
+            ("dogs.txt", b"dogs bark and fetch"),
+        ]:
+            response = await client.post(
+                url,
+                files=[("files", (name, text, "text/plain"))],
+                data={"wait": "true"},
+                headers=USER_1_HEADERS,
+            )
+            assert response.status_code == 200
+
+        for search_type in ("semantic", "keyword", "hybrid"):
+            response = await client.post(
+                f"{url}/search/batch",
+                json={
+                    "queries": ["cats purr", "dogs bark", "cats purr"],
+                    "search_type": search_type,
+                    "limit": 2,
+                    "fuse": True,
+                },
+                headers=USER_1_HEADERS,
+            )
+            assert response.status_code == 200
+            body = response.json()
+            assert len(body["results"]) == 3
+            single = await client.post(
+                f"{url}/search",
+                json={"query": "dogs bark", "search_type": search_type, "limit": 2},
+                headers=USER_1_HEADERS,
+            )
+            assert [r["id"] for r in body["results"][1]] == [
+                r["id"] for r in single.json()
+            ]
+            fused_ids = [r["id"] for r in body["fused"]]
+            assert len(fused_ids) == len(set(fused_ids)) <= 2
+
+        response = await client.post(
+            f"{url}/search/batch",
+            json={"queries": ["cats", ""]},
+            headers=USER_1_HEADERS,
+        )
+        assert response.status_code == 400
+        response = await client.post(
+            f"{url}/search/batch", json={"queries": []}, headers=USER_1_HEADERS
+        )
+        assert response.status_code == 422
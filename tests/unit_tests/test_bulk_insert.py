@@ -0,0 +1,74 @@
+"""Tests for writing chunk rows with binary COPY."""
+
+import struct
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from langconnect import config
+from langconnect.database.bulk import decode_vector, encode_vector
+from langconnect.database.collections import Collection, CollectionsManager
+from langconnect.database.connection import get_db_connection
+from tests.unit_tests.fixtures import get_async_test_client
+
+
+def test_vector_binary_format():
+    """Vectors are encoded as pgvector's binary send format."""
+    data = encode_vector([1.0, -2.5, 0.125])
+
+    assert data[:4] == struct.pack(">HH", 3, 0)
+    assert len(data) == 4 + 3 * 4
+    assert decode_vector(data) == [1.0, -2.5, 0.125]
+
+
+@pytest.fixture
+def copy_everything(monkeypatch):
+    """Use COPY for any upsert, in batches of 3 rows."""
+    monkeypatch.setattr(config, "COPY_UPSERT_THRESHOLD", 1)
+    monkeypatch.setattr(config, "COPY_BATCH_SIZE", 3)
+    monkeypatch.setattr(
+        config, "DEFAULT_EMBEDDINGS", DeterministicFakeEmbedding(size=1536)
+    )
+
+
+async def test_copy_upsert_round_trips_rows(copy_everything) -> None:
+    """Rows written with COPY match the executemany path, duplicates included."""
+    async with get_async_test_client():
+        details = await CollectionsManager("user1").create("copy_col")
+        collection = Collection(details["uuid"], "user1")
+        documents = [
+            Document(id=f"doc-{n}", page_content=f"chunk {n}", metadata={"n": n})
+            for n in range(7)
+        ]
+        # The same ID twice: the last row wins.
+        documents.append(
+            Document(id="doc-0", page_content="chunk 0 again", metadata={"n": 70})
+        )
+
+        ids = await collection.upsert(documents)
+
+        async with get_db_connection() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT id, document, cmetadata->>'n' AS n, embedding::text AS vector
+                  FROM langchain_pg_embedding
+                 WHERE collection_id = $1
+                 ORDER BY id
+                """,
+                details["uuid"],
+            )
+        assert len(ids) == 8
+        assert [row["id"] for row in rows] == [f"doc-{n}" for n in range(7)]
+        assert rows[0]["document"] == "chunk 0 again"
+        assert rows[0]["n"] == "70"
+        expected = config.DEFAULT_EMBEDDINGS.embed_query("chunk 1")
+        stored = [float(x) for x in rows[1]["vector"].strip("[]").split(",")]
+        assert stored == pytest.approx(expected, rel=1e-6)
+
+        # Updating through COPY again, and searching on the pooled connections
+        # afterwards, still works with vectors passed as text.
+        await collection.upsert([Document(id="doc-1", page_content="updated")])
+        results = await collection.search("updated", limit=1)
+        assert results[0]["id"] == "doc-1"
+        assert results[0]["page_content"] == "updated"
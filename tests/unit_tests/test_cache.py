@@ -0,0 +1,209 @@
+"""Unit tests for the in-process caches."""
+
+import asyncio
+import time
+
+import jwt
+import pytest
+
+from langconnect.auth import AuthenticatedUser, UserCache
+from langconnect.cache import SingleFlight, TTLCache
+
+
+class FakeBackend:
+    """Dict-backed stand-in for a shared cache backend."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ttl):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+def _token(exp: float | None) -> str:
+    claims = {"sub": "user-1"}
+    if exp is not None:
+        claims["exp"] = int(exp)
+    return jwt.encode(claims, "secret-used-only-for-encoding-tests", algorithm="HS256")
+
+
+def test_ttl_cache_counts_hits_and_misses():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "hit_ratio": 0.5,
+        "size": 1,
+        "maxsize": 10,
+    }
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1, ttl=0.01)
+
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_user_cache_keys_by_token_hash():
+    cache = UserCache(TTLCache(maxsize=10, ttl=60))
+    token = _token(time.time() + 3600)
+    cache.set(token, AuthenticatedUser("user-1", "Ada"))
+
+    assert cache.get(token).identity == "user-1"
+    assert token not in cache.local._data
+
+
+def test_user_cache_ttl_never_outlives_token():
+    cache = UserCache(TTLCache(maxsize=10, ttl=3600))
+    token = _token(time.time() + 1)
+    cache.set(token, AuthenticatedUser("user-1", "Ada"))
+
+    expires_at, _ = next(iter(cache.local._data.values()))
+    assert expires_at <= time.monotonic() + 1
+
+
+def test_user_cache_skips_expired_and_unbounded_tokens():
+    cache = UserCache(TTLCache(maxsize=10, ttl=60))
+    cache.set(_token(time.time() - 5), AuthenticatedUser("user-1", "Ada"))
+    cache.set(_token(None), AuthenticatedUser("user-1", "Ada"))
+
+    assert len(cache.local) == 0
+
+
+def test_user_cache_reads_through_shared_backend():
+    backend = FakeBackend()
+    token = _token(time.time() + 3600)
+    UserCache(TTLCache(maxsize=10, ttl=60), backend).set(
+        token, AuthenticatedUser("user-1", "Ada")
+    )
+
+    other_worker = UserCache(TTLCache(maxsize=10, ttl=60), backend)
+    user = other_worker.get(token)
+
+    assert user.identity == "user-1"
+    assert user.display_name == "Ada"
+    assert other_worker.stats()["shared_hits"] == 1
+    # Now served from the local cache.
+    other_worker.get(token)
+    assert other_worker.stats()["hits"] == 1
+
+
+def test_user_cache_invalidate():
+    backend = FakeBackend()
+    cache = UserCache(TTLCache(maxsize=10, ttl=60), backend)
+    token = _token(time.time() + 3600)
+    cache.set(token, AuthenticatedUser("user-1", "Ada"))
+
+    cache.invalidate(token)
+
+    assert cache.get(token) is None
+    assert backend.data == {}
+
+
+class CountingCall:
+    """Async call that counts its runs and waits a moment before returning."""
+
+    def __init__(self, result="result", error: str = ""):
+        self.result = result
+        self.error = error
+        self.runs = 0
+
+    async def __call__(self):
+        self.runs += 1
+        await asyncio.sleep(0.01)
+        if self.error:
+            raise RuntimeError(self.error)
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_concurrent_identical_calls():
+    flight = SingleFlight()
+    call = CountingCall()
+
+    results = await asyncio.gather(
+        *[flight.do(("user-1", "get", "a"), call) for _ in range(5)],
+        flight.do(("user-1", "get", "b"), call),
+    )
+
+    assert results == ["result"] * 6
+    assert call.runs == 2
+    assert flight.stats() == {"calls": 2, "coalesced": 4}
+    # Nothing is kept once the call is done.
+    await flight.do(("user-1", "get", "a"), call)
+    assert call.runs == 3
+
+
+@pytest.mark.asyncio
+async def test_single_flight_callers_get_their_own_copy():
+    flight = SingleFlight()
+    call = CountingCall(result=[{"id": "a", "metadata": {}}])
+
+    first, second = await asyncio.gather(
+        flight.do(("user-1", "list"), call), flight.do(("user-1", "list"), call)
+    )
+    first[0]["metadata"]["seen"] = True
+    first.append({"id": "b"})
+
+    assert second == [{"id": "a", "metadata": {}}]
+    assert call.result == [{"id": "a", "metadata": {}}]
+    assert call.runs == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_forget_starts_a_new_call():
+    flight = SingleFlight()
+    call = CountingCall()
+
+    first = asyncio.ensure_future(flight.do(("user-1", "list"), call))
+    await asyncio.sleep(0)
+    flight.forget("user-2")
+    joined = asyncio.ensure_future(flight.do(("user-1", "list"), call))
+    await asyncio.sleep(0)
+    flight.forget("user-1")
+    fresh = asyncio.ensure_future(flight.do(("user-1", "list"), call))
+
+    await asyncio.gather(first, joined, fresh)
+    assert call.runs == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_errors_and_cancellation():
+    flight = SingleFlight()
+    call = CountingCall(error="boom")
+
+    cancelled = asyncio.ensure_future(flight.do(("user-1", "get"), call))
+    waiter = asyncio.ensure_future(flight.do(("user-1", "get"), call))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await waiter
+    assert cancelled.cancelled()
+    assert call.runs == 1
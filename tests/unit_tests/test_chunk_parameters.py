@@ -33,7 +33,11 @@ async def test_documents_create_with_custom_chunk_size() -> None:
         resp = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
-            data={"chunk_size": str(small_chunk_size), "chunk_overlap": "0"},
+            data={
+                "wait": "true",
+                "chunk_size": str(small_chunk_size),
+                "chunk_overlap": "0",
+            },
             headers=USER_1_HEADERS,
         )
         assert resp.status_code == 200
@@ -79,7 +83,11 @@ async def test_documents_create_with_custom_chunk_overlap() -> None:
         resp = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
-            data={"chunk_size": str(chunk_size), "chunk_overlap": str(chunk_overlap)},
+            data={
+                "wait": "true",
+                "chunk_size": str(chunk_size),
+                "chunk_overlap": str(chunk_overlap),
+            },
             headers=USER_1_HEADERS,
         )
         assert resp.status_code == 200
@@ -114,6 +122,7 @@ async def test_documents_create_with_default_chunk_parameters() -> None:
         resp = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
+            data={"wait": "true"},
             headers=USER_1_HEADERS,
         )
         assert resp.status_code == 200
@@ -157,7 +166,11 @@ async def test_documents_create_with_large_chunk_size() -> None:
         resp = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
-            data={"chunk_size": str(large_chunk_size), "chunk_overlap": "0"},
+            data={
+                "wait": "true",
+                "chunk_size": str(large_chunk_size),
+                "chunk_overlap": "0",
+            },
             headers=USER_1_HEADERS,
         )
         assert resp.status_code == 200
@@ -213,6 +226,7 @@ async def test_documents_create_with_multiple_files_and_custom_chunks() -> None:
             f"/collections/{collection_id}/documents",
             files=files,
             data={
+                "wait": "true",
                 "metadatas_json": metadata_json,
                 "chunk_size": str(chunk_size),
                 "chunk_overlap": str(chunk_overlap),
@@ -269,7 +283,7 @@ async def test_documents_create_with_zero_overlap() -> None:
         resp = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
-            data={"chunk_size": str(chunk_size), "chunk_overlap": "0"},
+            data={"wait": "true", "chunk_size": str(chunk_size), "chunk_overlap": "0"},
             headers=USER_1_HEADERS,
         )
         assert resp.status_code == 200
@@ -316,7 +330,7 @@ async def test_documents_create_with_edge_case_parameters() -> None:
         resp = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
-            data={"chunk_size": "100", "chunk_overlap": "100"},
+            data={"wait": "true", "chunk_size": "100", "chunk_overlap": "100"},
             headers=USER_1_HEADERS,
         )
         assert resp.status_code == 200
@@ -325,7 +339,7 @@ async def test_documents_create_with_edge_case_parameters() -> None:
         resp2 = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
-            data={"chunk_size": "10", "chunk_overlap": "5"},
+            data={"wait": "true", "chunk_size": "10", "chunk_overlap": "5"},
             headers=USER_1_HEADERS,
         )
         assert resp2.status_code == 200
@@ -1,62 +1,130 @@
 """Simple tests for chunk parameters without database dependency."""
 
+import os
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from fastapi import UploadFile
+from fastapi import Response
+from langchain_core.documents import Document
 
 from langconnect.api.documents import documents_create
+from langconnect.database import jobs
 from langconnect.services.document_processor import process_document
+from langconnect.services.ingestion import run_ingest_job
+from tests.unit_tests.fixtures import make_upload
 
 
 @pytest.mark.asyncio
 async def test_documents_create_passes_chunk_params():
-    """Test that the API endpoint correctly passes chunk parameters to process_document."""
+    """Test that the API endpoint queues the job with the given chunk parameters."""
     # Mock dependencies
     mock_user = MagicMock()
     mock_user.identity = "test_user"
 
     # Create mock file
     file_content = b"Test content for chunking"
-    mock_file = MagicMock(spec=UploadFile)
-    mock_file.read = AsyncMock(return_value=file_content)
-    mock_file.filename = "test.txt"
-    mock_file.content_type = "text/plain"
-
-    # Mock the Collection class
-    with patch("langconnect.api.documents.Collection") as MockCollection:
-        # Setup mock collection instance
+    mock_file = make_upload(file_content, "test.txt", "text/plain")
+
+    # Mock the jobs manager so that no database is needed
+    with (
+        patch("langconnect.api.documents.IngestJobsManager") as MockJobs,
+        patch("langconnect.api.documents.worker_pool"),
+    ):
+        mock_jobs_instance = MagicMock()
+        mock_jobs_instance.create = AsyncMock(
+            return_value={"id": "job-1", "status": "queued"}
+        )
+        MockJobs.return_value = mock_jobs_instance
+
+        # Call the API endpoint with custom chunk parameters
+        result = await documents_create(
+            user=mock_user,
+            collection_id="test-collection-id",
+            response=Response(),
+            files=[mock_file],
+            metadatas_json=None,
+            chunk_size=500,
+            chunk_overlap=100,
+            enable_chunking=True,
+            wait=False,
+        )
+
+        # Verify the job was queued with the correct parameters
+        mock_jobs_instance.create.assert_called_once()
+        _, files, params = mock_jobs_instance.create.call_args.args
+
+        # Check that chunk parameters were passed correctly
+        assert params["chunk_size"] == 500
+        assert params["chunk_overlap"] == 100
+        assert files[0]["file"] is mock_file
+
+        # Verify accepted response
+        assert result["success"] is True
+        assert result["job_id"] == "job-1"
+
+
+@pytest.mark.asyncio
+async def test_ingest_job_passes_chunk_params():
+    """Test that the worker parses queued files with the job's chunk parameters."""
+    job = {
+        "id": "job-1",
+        "collection_id": "test-collection-id",
+        "owner_id": "test_user",
+        "attempts": 1,
+        "cancel_requested": False,
+        "params": {"chunk_size": 500, "chunk_overlap": 100, "enable_chunking": True},
+    }
+    queued_file = {
+        "position": 0,
+        "filename": "test.txt",
+        "content_type": "text/plain",
+        "metadata": None,
+        "file_id": "file-1",
+    }
+    parsed_contents = []
+
+    async def download(job_id, position, target):
+        target.write(b"Test content for chunking")
+
+    async def process(path, **kwargs):
+        with open(path, "rb") as f:
+            parsed_contents.append(f.read())
+        return [Document(page_content="Test content for chunking")]
+
+    with (
+        patch("langconnect.services.ingestion.jobs") as mock_jobs,
+        patch("langconnect.services.ingestion.Collection") as MockCollection,
+        patch("langconnect.services.ingestion.parser_pool") as mock_parser_pool,
+    ):
+        mock_jobs.LeaseLostError = jobs.LeaseLostError
+        mock_jobs.pending_file_positions = AsyncMock(return_value=[0])
+        mock_jobs.heartbeat = AsyncMock(return_value=False)
+        mock_jobs.get_job_file = AsyncMock(return_value=queued_file)
+        mock_jobs.download_job_file = download
+        mock_jobs.complete_job_file = AsyncMock()
+        mock_jobs.finish_job = AsyncMock()
+        mock_jobs.IngestJobsManager.return_value.get = AsyncMock(
+            return_value={"chunks_added": 2}
+        )
         mock_collection_instance = MagicMock()
         mock_collection_instance.upsert = AsyncMock(return_value=["doc1", "doc2"])
+        mock_collection_instance.delete_many = AsyncMock()
         MockCollection.return_value = mock_collection_instance
+        mock_parser_pool.processes = 1
+        mock_parser_pool.process = AsyncMock(side_effect=process)
 
-        # Mock process_document to verify it receives correct parameters
-        with patch("langconnect.api.documents.process_document") as mock_process:
-            # Setup mock return value
-            mock_docs = [MagicMock(metadata={"file_id": "test_id"})]
-            mock_process.return_value = mock_docs
-
-            # Call the API endpoint with custom chunk parameters
-            result = await documents_create(
-                user=mock_user,
-                collection_id="test-collection-id",
-                files=[mock_file],
-                metadatas_json=None,
-                chunk_size=500,
-                chunk_overlap=100,
-            )
-
-            # Verify process_document was called with correct parameters
-            mock_process.assert_called_once()
-            call_args = mock_process.call_args
-
-            # Check that chunk parameters were passed correctly
-            assert call_args.kwargs["chunk_size"] == 500
-            assert call_args.kwargs["chunk_overlap"] == 100
+        assert await run_ingest_job(job, "worker-1") == "succeeded"
 
-            # Verify successful response
-            assert result["success"] is True
-            assert result["added_chunk_ids"] == ["doc1", "doc2"]
+        # The parser was given the downloaded file, which is removed afterwards.
+        assert parsed_contents == [b"Test content for chunking"]
+        call_args = mock_parser_pool.process.call_args
+        assert not os.path.exists(call_args.args[0])
+        assert call_args.kwargs["chunk_size"] == 500
+        assert call_args.kwargs["chunk_overlap"] == 100
+        assert call_args.kwargs["file_id"] == "file-1"
+        mock_jobs.complete_job_file.assert_called_once_with(
+            "job-1", "worker-1", 0, ["doc1", "doc2"]
+        )
 
 
 @pytest.mark.asyncio
@@ -65,17 +133,11 @@ async def test_process_document_respects_chunk_params():
     # Create a long text that will be split differently based on chunk_size
     long_text = "A" * 500 + "B" * 500 + "C" * 500  # 1500 characters total
 
-    mock_file = MagicMock(spec=UploadFile)
-    mock_file.read = AsyncMock(return_value=long_text.encode())
-    mock_file.filename = "long_test.txt"
-    mock_file.content_type = "text/plain"
+    mock_file = make_upload(long_text.encode(), "long_test.txt", "text/plain")
 
     # Test with default parameters (chunk_size=1000)
     docs_default = await process_document(mock_file)
 
-    # Reset the mock
-    mock_file.read = AsyncMock(return_value=long_text.encode())
-
     # Test with smaller chunk size
     docs_small = await process_document(mock_file, chunk_size=300, chunk_overlap=0)
 
@@ -98,10 +160,7 @@ async def test_chunk_overlap_behavior():
     # Create content where we can verify overlap
     content = "0123456789" * 5  # 50 characters
 
-    mock_file = MagicMock(spec=UploadFile)
-    mock_file.read = AsyncMock(return_value=content.encode())
-    mock_file.filename = "overlap_test.txt"
-    mock_file.content_type = "text/plain"
+    mock_file = make_upload(content.encode(), "overlap_test.txt", "text/plain")
 
     # Process with overlap
     docs = await process_document(mock_file, chunk_size=20, chunk_overlap=5)
@@ -119,32 +178,33 @@ async def test_api_default_chunk_params():
     mock_user = MagicMock()
     mock_user.identity = "test_user"
 
-    mock_file = MagicMock(spec=UploadFile)
-    mock_file.read = AsyncMock(return_value=b"Test content")
-    mock_file.filename = "test.txt"
-    mock_file.content_type = "text/plain"
-
-    with patch("langconnect.api.documents.Collection") as MockCollection:
-        # Setup mock collection instance
-        mock_collection_instance = MagicMock()
-        mock_collection_instance.upsert = AsyncMock(return_value=["doc1"])
-        MockCollection.return_value = mock_collection_instance
-
-        with patch("langconnect.api.documents.process_document") as mock_process:
-            mock_process.return_value = [MagicMock(metadata={"file_id": "test"})]
-
-            # Call without specifying chunk parameters
-            # This simulates form data without chunk_size and chunk_overlap
-            await documents_create(
-                user=mock_user,
-                collection_id="test-id",
-                files=[mock_file],
-                metadatas_json=None,
-                chunk_size=1000,  # Default value from Form(1000)
-                chunk_overlap=200,  # Default value from Form(200)
-            )
-
-            # Verify defaults were used
-            call_args = mock_process.call_args
-            assert call_args.kwargs["chunk_size"] == 1000
-            assert call_args.kwargs["chunk_overlap"] == 200
+    mock_file = make_upload(b"Test content", "test.txt", "text/plain")
+
+    with (
+        patch("langconnect.api.documents.IngestJobsManager") as MockJobs,
+        patch("langconnect.api.documents.worker_pool"),
+    ):
+        mock_jobs_instance = MagicMock()
+        mock_jobs_instance.create = AsyncMock(
+            return_value={"id": "job-1", "status": "queued"}
+        )
+        MockJobs.return_value = mock_jobs_instance
+
+        # Call without specifying chunk parameters
+        # This simulates form data without chunk_size and chunk_overlap
+        await documents_create(
+            user=mock_user,
+            collection_id="test-id",
+            response=Response(),
+            files=[mock_file],
+            metadatas_json=None,
+            chunk_size=1000,  # Default value from Form(1000)
+            chunk_overlap=200,  # Default value from Form(200)
+            enable_chunking=True,
+            wait=False,
+        )
+
+        # Verify defaults were used
+        _, _, params = mock_jobs_instance.create.call_args.args
+        assert params["chunk_size"] == 1000
+        assert params["chunk_overlap"] == 200
@@ -0,0 +1,196 @@
+"""Tests for the per-collection counters shown when listing collections."""
+
+import asyncio
+import json
+
+from langconnect import config
+from langconnect.database.bulk import insert_embeddings
+from langconnect.database.connection import get_db_connection
+from langconnect.database.stats import compact_collection_stats
+from tests.unit_tests.fixtures import get_async_test_client
+
+USER_1_HEADERS = {
+    "Authorization": "Bearer user1",
+}
+
+
+async def _create_collection(client, name: str = "stats_col") -> str:
+    response = await client.post(
+        "/collections",
+        json={"name": name, "metadata": {}},
+        headers=USER_1_HEADERS,
+    )
+    assert response.status_code == 201
+    return response.json()["uuid"]
+
+
+async def _write(collection_id: str, file_id: str, texts: list[str]) -> None:
+    metadata = json.dumps({"file_id": file_id})
+    async with get_db_connection() as conn:
+        await conn.executemany(
+            """
+            INSERT INTO langchain_pg_embedding (id, collection_id, document, cmetadata)
+            VALUES ($1, $2, $3, $4::jsonb)
+            """,
+            [
+                (f"{file_id}-{n}", collection_id, text, metadata)
+                for n, text in enumerate(texts)
+            ],
+        )
+
+
+async def _listed(client, collection_id: str) -> dict:
+    response = await client.get("/collections", headers=USER_1_HEADERS)
+    assert response.status_code == 200
+    return next(c for c in response.json() if c["uuid"] == collection_id)
+
+
+async def test_counters_follow_writes_in_exact_mode() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client)
+        await _write(collection_id, "file-a", ["abc", "déjà"])
+        await _write(collection_id, "file-b", ["xyz"])
+
+        listed = await _listed(client, collection_id)
+        assert listed["document_count"] == 2
+        assert listed["chunk_count"] == 3
+        assert listed["total_bytes"] == 3 + 6 + 3
+        assert listed["last_updated"] is not None
+
+        assert await compact_collection_stats() > 0
+        assert await _listed(client, collection_id) == listed
+
+        async with get_db_connection() as conn:
+            await conn.execute(
+                "DELETE FROM langchain_pg_embedding WHERE file_id = 'file-a'"
+            )
+            await conn.execute(
+                "UPDATE langchain_pg_embedding SET document = 'longer text'"
+            )
+        listed = await _listed(client, collection_id)
+        assert listed["document_count"] == 1
+        assert listed["chunk_count"] == 1
+        assert listed["total_bytes"] == len("longer text")
+
+
+async def test_upsert_records_one_delta_per_collection() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client)
+        vector = [0.0] * config.EMBEDDING_DIMENSIONS
+        rows = [
+            (
+                f"chunk-{n}",
+                collection_id,
+                vector,
+                "text",
+                json.dumps({"file_id": f"file-{n % 3}"}),
+            )
+            for n in range(9)
+        ]
+        async with get_db_connection() as conn:
+            await insert_embeddings(conn, rows)
+            deltas = await conn.fetch(
+                """
+                SELECT chunks, bytes
+                  FROM langconnect_collection_stats_deltas
+                 WHERE collection_id = $1
+                   AND chunks <> 0
+                """,
+                collection_id,
+            )
+        assert [tuple(delta) for delta in deltas] == [(9, 9 * len("text"))]
+
+
+async def test_metadata_updates_record_no_delta() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client)
+        await _write(collection_id, "file-a", ["abc", "def"])
+        async with get_db_connection() as conn:
+            before = await conn.fetchval(
+                "SELECT COUNT(*) FROM langconnect_collection_stats_deltas"
+            )
+            await conn.execute(
+                """
+                UPDATE langchain_pg_embedding
+                   SET cmetadata = cmetadata || '{"verified": true}'
+                 WHERE collection_id = $1
+                """,
+                collection_id,
+            )
+            after = await conn.fetchval(
+                "SELECT COUNT(*) FROM langconnect_collection_stats_deltas"
+            )
+        assert after == before
+        assert (await _listed(client, collection_id))["chunk_count"] == 2
+
+
+async def test_approximate_mode_reads_folded_counters(monkeypatch) -> None:
+    monkeypatch.setattr(config, "COLLECTION_STATS_MODE", "approximate")
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client)
+        await _write(collection_id, "file-a", ["abc"])
+
+        assert (await _listed(client, collection_id))["chunk_count"] == 0
+        await compact_collection_stats()
+        listed = await _listed(client, collection_id)
+        assert listed["chunk_count"] == 1
+        assert listed["document_count"] == 1
+
+
+async def test_compaction_drops_deltas_of_deleted_collections() -> None:
+    async with get_async_test_client() as client:
+        kept = await _create_collection(client, "kept")
+        deleted = await _create_collection(client, "deleted")
+        await _write(kept, "file-a", ["abc"])
+        await _write(deleted, "file-b", ["abc"])
+        response = await client.delete(
+            f"/collections/{deleted}", headers=USER_1_HEADERS
+        )
+        assert response.status_code == 204
+
+        await compact_collection_stats()
+        async with get_db_connection() as conn:
+            pending = await conn.fetchval(
+                "SELECT COUNT(*) FROM langconnect_collection_stats_deltas"
+            )
+        assert pending == 0
+        assert (await _listed(client, kept))["chunk_count"] == 1
+
+
+async def test_counters_match_chunks_under_concurrent_writes() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client)
+
+        async def ingest(worker: int) -> None:
+            for batch in range(5):
+                file_id = f"w{worker}-f{batch}"
+                await _write(collection_id, file_id, ["some text"] * 10)
+                if batch % 2:
+                    async with get_db_connection() as conn:
+                        await conn.execute(
+                            "DELETE FROM langchain_pg_embedding WHERE file_id = $1",
+                            file_id,
+                        )
+
+        async def compact() -> None:
+            for _ in range(10):
+                await compact_collection_stats()
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*[ingest(worker) for worker in range(6)], compact())
+
+        listed = await _listed(client, collection_id)
+        async with get_db_connection() as conn:
+            expected = await conn.fetchrow(
+                """
+                SELECT COUNT(DISTINCT file_id) AS documents,
+                       COUNT(*) AS chunks,
+                       SUM(OCTET_LENGTH(document)) AS bytes
+                  FROM langchain_pg_embedding
+                 WHERE collection_id = $1
+                """,
+                collection_id,
+            )
+        assert listed["document_count"] == expected["documents"] == 18
+        assert listed["chunk_count"] == expected["chunks"]
+        assert listed["total_bytes"] == expected["bytes"]
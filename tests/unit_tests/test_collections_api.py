@@ -1,5 +1,7 @@
+import asyncio
 from uuid import UUID
 
+from langconnect.database.collections import CollectionsManager, coalesced_reads
 from tests.unit_tests.fixtures import get_async_test_client
 
 USER_1_HEADERS = {
@@ -368,3 +370,28 @@ async def test_ownership() -> None:
             f"/collections/{collection_id}", headers=USER_1_HEADERS
         )
         assert r5.status_code == 204
+
+
+async def test_concurrent_reads_share_queries() -> None:
+    """Identical concurrent reads share one query; writes are seen right away."""
+    async with get_async_test_client() as client:
+        response = await client.post(
+            "/collections", json={"name": "first"}, headers=USER_1_HEADERS
+        )
+        collection_id = response.json()["uuid"]
+        manager = CollectionsManager("user1")
+        before = coalesced_reads.stats()
+
+        details = await asyncio.gather(*[manager.get(collection_id) for _ in range(5)])
+
+        assert all(d["uuid"] == collection_id for d in details)
+        after = coalesced_reads.stats()
+        assert after["calls"] - before["calls"] == 1
+        assert after["coalesced"] - before["coalesced"] == 4
+
+        listing = asyncio.ensure_future(manager.list())
+        await asyncio.sleep(0)
+        await manager.create("second")
+        listed = await manager.list()
+        assert len(await listing) in (1, 2)
+        assert sorted(c["name"] for c in listed) == ["first", "second"]
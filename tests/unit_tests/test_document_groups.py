@@ -0,0 +1,220 @@
+"""Tests for the per-file document group summaries kept by triggers."""
+
+import asyncio
+import json
+import random
+
+from langconnect import config
+from langconnect.database.bulk import insert_embeddings
+from langconnect.database.connection import get_db_connection
+from tests.unit_tests.fixtures import get_async_test_client
+
+USER_1_HEADERS = {
+    "Authorization": "Bearer user1",
+}
+
+_INSERT_CHUNKS = """
+    INSERT INTO langchain_pg_embedding (id, collection_id, document, cmetadata)
+    VALUES ($1, $2, $3, $4::jsonb)
+    ON CONFLICT (id) DO UPDATE
+       SET document = EXCLUDED.document,
+           cmetadata = EXCLUDED.cmetadata
+"""
+
+_RECOUNT = """
+    SELECT file_id,
+           MIN(cmetadata->>'source') AS source,
+           COUNT(*) AS chunk_count,
+           SUM(LENGTH(COALESCE(document, ''))) AS total_chars,
+           MIN(created_at) AS created_at,
+           MAX(created_at) AS last_created_at
+      FROM langchain_pg_embedding
+     WHERE collection_id = $1
+       AND file_id IS NOT NULL
+     GROUP BY file_id
+     ORDER BY file_id
+"""
+
+_SUMMARIES = """
+    SELECT file_id, source, chunk_count, total_chars, created_at, last_created_at
+      FROM langconnect_document_groups
+     WHERE collection_id = $1
+     ORDER BY file_id
+"""
+
+
+def _chunk(chunk_id: str, file_id: str, text: str, **metadata) -> tuple:
+    return (
+        chunk_id,
+        text,
+        json.dumps({"file_id": file_id, "source": f"{file_id}.txt", **metadata}),
+    )
+
+
+def _totals(summary) -> tuple:
+    return summary["file_id"], summary["chunk_count"], summary["total_chars"]
+
+
+async def _create_collection(client) -> str:
+    response = await client.post(
+        "/collections",
+        json={"name": "groups_col", "metadata": {}},
+        headers=USER_1_HEADERS,
+    )
+    assert response.status_code == 201
+    return response.json()["uuid"]
+
+
+async def _write(collection_id: str, chunks: list[tuple]) -> None:
+    async with get_db_connection() as conn:
+        await conn.executemany(
+            _INSERT_CHUNKS,
+            [(chunk_id, collection_id, text, meta) for chunk_id, text, meta in chunks],
+        )
+
+
+async def _assert_summaries_match_chunks(collection_id: str) -> list:
+    async with get_db_connection() as conn:
+        expected = await conn.fetch(_RECOUNT, collection_id)
+        actual = await conn.fetch(_SUMMARIES, collection_id)
+    assert [dict(row) for row in actual] == [dict(row) for row in expected]
+    return actual
+
+
+async def test_summaries_follow_inserts_updates_and_deletes() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client)
+        await _write(
+            collection_id,
+            [_chunk(f"a-{i}", "file-a", "x" * (i + 1)) for i in range(3)]
+            + [_chunk("b-0", "file-b", "yy", created_at="2024-01-01T00:00:00Z")]
+            + [("loose", "no file", "{}")],
+        )
+        summaries = await _assert_summaries_match_chunks(collection_id)
+        assert [_totals(s) for s in summaries] == [
+            ("file-a", 3, 6),
+            ("file-b", 1, 2),
+        ]
+
+        # Re-ingesting a chunk with new content, and moving one to another file.
+        await _write(
+            collection_id,
+            [_chunk("a-0", "file-a", "zzzz"), _chunk("a-2", "file-b", "moved")],
+        )
+        summaries = await _assert_summaries_match_chunks(collection_id)
+        assert [_totals(s) for s in summaries] == [
+            ("file-a", 2, 6),
+            ("file-b", 2, 7),
+        ]
+
+        async with get_db_connection() as conn:
+            await conn.execute(
+                "DELETE FROM langchain_pg_embedding WHERE id = ANY($1::text[])",
+                ["a-0", "a-1"],
+            )
+        summaries = await _assert_summaries_match_chunks(collection_id)
+        assert [s["file_id"] for s in summaries] == ["file-b"]
+        assert summaries[0]["created_at"].year == 2024
+
+        response = await client.get(
+            f"/collections/{collection_id}/document-groups", headers=USER_1_HEADERS
+        )
+        assert response.status_code == 200
+        assert [g["file_id"] for g in response.json()] == ["file-b"]
+        assert response.json()[0]["created_at"] == "2024-01-01T00:00:00+00:00"
+
+        response = await client.delete(
+            f"/collections/{collection_id}", headers=USER_1_HEADERS
+        )
+        assert response.status_code == 204
+        async with get_db_connection() as conn:
+            remaining = await conn.fetchval(
+                "SELECT COUNT(*) FROM langconnect_document_groups"
+            )
+        assert remaining == 0
+
+
+async def test_metadata_only_updates_keep_summaries() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client)
+        await _write(
+            collection_id, [_chunk(f"a-{i}", "file-a", "abc") for i in range(3)]
+        )
+        async with get_db_connection() as conn:
+            await conn.execute(
+                """
+                UPDATE langchain_pg_embedding
+                   SET cmetadata = cmetadata || '{"verified": true}'
+                 WHERE collection_id = $1
+                """,
+                collection_id,
+            )
+        summaries = await _assert_summaries_match_chunks(collection_id)
+        assert summaries[0]["chunk_count"] == 3
+
+
+async def test_summaries_are_consistent_under_concurrent_ingest_and_delete() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client)
+        files = [f"file-{n}" for n in range(4)]
+        rng = random.Random(0)
+
+        async def ingest(worker: int) -> None:
+            # Like uploads, each write holds the chunks of one file.
+            for batch in range(5):
+                file_id = rng.choice(files)
+                chunks = [
+                    _chunk(
+                        f"w{worker}-b{batch}-{i}",
+                        file_id,
+                        "text " * rng.randint(1, 20),
+                    )
+                    for i in range(20)
+                ]
+                await _write(collection_id, chunks)
+
+        async def delete(worker: int) -> None:
+            for _ in range(5):
+                await asyncio.sleep(0)
+                async with get_db_connection() as conn:
+                    await conn.execute(
+                        """
+                        DELETE FROM langchain_pg_embedding
+                         WHERE collection_id = $1
+                           AND file_id = $2
+                           AND id LIKE $3
+                        """,
+                        collection_id,
+                        rng.choice(files),
+                        f"w{worker}-%",
+                    )
+
+        await asyncio.gather(
+            *[ingest(worker) for worker in range(6)],
+            *[delete(worker) for worker in range(6)],
+        )
+        await _assert_summaries_match_chunks(collection_id)
+
+
+async def test_upserts_of_several_files_in_any_order_do_not_deadlock() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client)
+        files = [f"file-{n}" for n in range(4)]
+        vector = [0.0] * config.EMBEDDING_DIMENSIONS
+
+        async def upsert(worker: int) -> None:
+            # Each upsert writes every file, half of them in reverse order.
+            order = files[::-1] if worker % 2 else files
+            rows = []
+            for file_id in order:
+                chunk_id, text, meta = _chunk(f"w{worker}-{file_id}", file_id, "text")
+                rows.append((chunk_id, collection_id, vector, text, meta))
+            for _ in range(5):
+                async with get_db_connection() as conn, conn.transaction():
+                    await insert_embeddings(conn, rows)
+
+        await asyncio.gather(*[upsert(worker) for worker in range(6)])
+        summaries = await _assert_summaries_match_chunks(collection_id)
+        assert [_totals(s) for s in summaries] == [
+            (file_id, 6, 6 * len("text")) for file_id in files
+        ]
@@ -1,12 +1,11 @@
 """Unit tests for document processor with chunk parameters."""
 
-from unittest.mock import AsyncMock, MagicMock
-
 import pytest
 from fastapi import UploadFile
 from langchain_core.documents import Document
 
 from langconnect.services.document_processor import process_document
+from tests.unit_tests.fixtures import make_upload
 
 
 @pytest.mark.asyncio
@@ -14,10 +13,7 @@ async def test_process_document_with_default_chunk_params():
     """Test document processing with default chunk parameters."""
     # Create a mock UploadFile
     content = b"This is a test document. " * 50  # About 1250 characters
-    file = MagicMock(spec=UploadFile)
-    file.read = AsyncMock(return_value=content)
-    file.filename = "test.txt"
-    file.content_type = "text/plain"
+    file = make_upload(content, "test.txt", "text/plain")
 
     # Process document with default parameters
     documents = await process_document(file)
@@ -40,10 +36,7 @@ async def test_process_document_with_default_chunk_params():
 async def test_process_document_with_custom_chunk_size():
     """Test document processing with custom chunk_size."""
     content = b"ABCDEFGHIJ" * 30  # 300 characters
-    file = MagicMock(spec=UploadFile)
-    file.read = AsyncMock(return_value=content)
-    file.filename = "test.txt"
-    file.content_type = "text/plain"
+    file = make_upload(content, "test.txt", "text/plain")
 
     # Process with small chunk size
     documents = await process_document(file, chunk_size=50, chunk_overlap=0)
@@ -59,10 +52,7 @@ async def test_process_document_with_custom_chunk_size():
 async def test_process_document_with_custom_overlap():
     """Test document processing with custom chunk_overlap."""
     content = b"0123456789" * 10  # 100 characters
-    file = MagicMock(spec=UploadFile)
-    file.read = AsyncMock(return_value=content)
-    file.filename = "test.txt"
-    file.content_type = "text/plain"
+    file = make_upload(content, "test.txt", "text/plain")
 
     # Process with overlap
     documents = await process_document(file, chunk_size=20, chunk_overlap=10)
@@ -82,10 +72,7 @@ async def test_process_document_with_custom_overlap():
 async def test_process_document_with_metadata():
     """Test document processing with metadata."""
     content = b"Document with metadata"
-    file = MagicMock(spec=UploadFile)
-    file.read = AsyncMock(return_value=content)
-    file.filename = "metadata_test.txt"
-    file.content_type = "text/plain"
+    file = make_upload(content, "metadata_test.txt", "text/plain")
 
     metadata = {"author": "test_user", "category": "test"}
 
@@ -104,10 +91,7 @@ async def test_process_document_with_metadata():
 async def test_process_document_large_chunk_size():
     """Test with chunk_size larger than content."""
     content = b"Short content"
-    file = MagicMock(spec=UploadFile)
-    file.read = AsyncMock(return_value=content)
-    file.filename = "short.txt"
-    file.content_type = "text/plain"
+    file = make_upload(content, "short.txt", "text/plain")
 
     # Process with very large chunk size
     documents = await process_document(file, chunk_size=5000)
@@ -120,10 +104,7 @@ async def test_process_document_large_chunk_size():
 async def test_process_document_markdown_file():
     """Test processing markdown files."""
     content = b"# Title\n\nThis is a **markdown** document.\n\n- Item 1\n- Item 2"
-    file = MagicMock(spec=UploadFile)
-    file.read = AsyncMock(return_value=content)
-    file.filename = "test.md"
-    file.content_type = "text/markdown"
+    file = make_upload(content, "test.md", "text/markdown")
 
     documents = await process_document(file, chunk_size=100, chunk_overlap=20)
 
@@ -140,15 +121,9 @@ async def test_process_document_with_file_id_generation():
     content = b"Test content"
 
     # Process same content twice
-    file1 = MagicMock(spec=UploadFile)
-    file1.read = AsyncMock(return_value=content)
-    file1.filename = "test.txt"
-    file1.content_type = "text/plain"
+    file1 = make_upload(content, "test.txt", "text/plain")
 
-    file2 = MagicMock(spec=UploadFile)
-    file2.read = AsyncMock(return_value=content)
-    file2.filename = "test.txt"
-    file2.content_type = "text/plain"
+    file2 = make_upload(content, "test.txt", "text/plain")
 
     docs1 = await process_document(file1)
     docs2 = await process_document(file2)
@@ -166,10 +141,7 @@ async def test_process_document_with_file_id_generation():
 async def test_process_document_empty_file():
     """Test processing empty file."""
     content = b""
-    file = MagicMock(spec=UploadFile)
-    file.read = AsyncMock(return_value=content)
-    file.filename = "empty.txt"
-    file.content_type = "text/plain"
+    file = make_upload(content, "empty.txt", "text/plain")
 
     documents = await process_document(file)
 
@@ -182,10 +154,7 @@ async def test_process_document_empty_file():
 async def test_process_document_octet_stream_with_extension():
     """Test processing files with application/octet-stream mimetype."""
     content = b"Markdown content with unknown mimetype"
-    file = MagicMock(spec=UploadFile)
-    file.read = AsyncMock(return_value=content)
-    file.filename = "test.md"
-    file.content_type = "application/octet-stream"
+    file = make_upload(content, "test.md", "application/octet-stream")
 
     documents = await process_document(file)
 
@@ -38,6 +38,7 @@ async def test_documents_create_and_list_and_delete_and_search() -> None:
         resp = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
+            data={"wait": "true"},
             headers=USER_1_HEADERS,
         )
         assert resp.status_code == 200
@@ -125,7 +126,7 @@ async def test_documents_create_with_invalid_metadata_json() -> None:
         resp = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
-            data={"metadatas_json": "not-a-json"},
+            data={"wait": "true", "metadatas_json": "not-a-json"},
             headers=USER_1_HEADERS,
         )
         assert resp.status_code == 400
@@ -171,6 +172,7 @@ async def test_documents_in_nonexistent_collection() -> None:
         upload_resp = await client.post(
             f"/collections/{no_such_collection}/documents",
             files=files,
+            data={"wait": "true"},
             headers=USER_1_HEADERS,
         )
         assert upload_resp.status_code == 404
@@ -219,7 +221,7 @@ async def test_documents_create_with_valid_text_file_and_metadata() -> None:
         response = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
-            data={"metadatas_json": metadata_json},
+            data={"wait": "true", "metadatas_json": metadata_json},
             headers=USER_1_HEADERS,
         )
 
@@ -273,6 +275,7 @@ async def test_documents_create_with_valid_text_file_without_metadata() -> None:
         response = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
+            data={"wait": "true"},
             headers=USER_1_HEADERS,
         )
 
@@ -318,6 +321,7 @@ async def test_documents_create_with_empty_file() -> None:
         response = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
+            data={"wait": "true"},
             headers=USER_1_HEADERS,
         )
 
@@ -352,7 +356,7 @@ async def test_documents_create_with_invalid_metadata_format() -> None:
         response = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
-            data={"metadatas_json": invalid_metadata},
+            data={"wait": "true", "metadatas_json": invalid_metadata},
             headers=USER_1_HEADERS,
         )
 
@@ -363,7 +367,7 @@ async def test_documents_create_with_invalid_metadata_format() -> None:
         response = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
-            data={"metadatas_json": invalid_metadata_not_list},
+            data={"wait": "true", "metadatas_json": invalid_metadata_not_list},
             headers=USER_1_HEADERS,
         )
 
@@ -382,6 +386,7 @@ async def test_documents_create_with_non_existent_collection() -> None:
         response = await client.post(
             f"/collections/{uuid}/documents",
             files=files,
+            data={"wait": "true"},
             headers=USER_1_HEADERS,
         )
 
@@ -414,6 +419,7 @@ async def test_documents_create_with_multiple_files():
         response = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
+            data={"wait": "true"},
             headers=USER_1_HEADERS,
         )
 
@@ -466,7 +472,7 @@ async def test_documents_create_with_mismatched_metadata():
         response = await client.post(
             f"/collections/{collection_id}/documents",
             files=files,
-            data={"metadatas_json": metadata_json},
+            data={"wait": "true", "metadatas_json": metadata_json},
             headers=USER_1_HEADERS,
         )
 
@@ -494,7 +500,7 @@ async def test_documents_bulk_delete() -> None:
         await client.post(
             f"/collections/{collection_id}/documents",
             files=files1,
-            data={"metadatas_json": meta1},
+            data={"wait": "true", "metadatas_json": meta1},
             headers=USER_1_HEADERS,
         )
 
@@ -503,7 +509,7 @@ async def test_documents_bulk_delete() -> None:
         await client.post(
             f"/collections/{collection_id}/documents",
             files=files2,
-            data={"metadatas_json": meta2},
+            data={"wait": "true", "metadatas_json": meta2},
             headers=USER_1_HEADERS,
         )
 
@@ -546,3 +552,81 @@ async def test_documents_bulk_delete() -> None:
         list_resp_after_file_delete = await client.get(f"/collections/{collection_id}/documents", headers=USER_1_HEADERS)
         assert list_resp_after_file_delete.json() == []
 
+
+
+async def test_documents_bulk_update_metadata() -> None:
+    """Test patching the metadata of documents by IDs, file IDs and filter."""
+    async with get_async_test_client() as client:
+        create_col = await client.post(
+            "/collections", json={"name": "bulk_patch_col"}, headers=USER_1_HEADERS
+        )
+        assert create_col.status_code == 201
+        collection_id = create_col.json()["uuid"]
+        url = f"/collections/{collection_id}/documents"
+
+        for name in ("file1.txt", "file2.txt", "file3.txt"):
+            response = await client.post(
+                url,
+                files=[("files", (name, f"content of {name}".encode(), "text/plain"))],
+                data={
+                    "wait": "true",
+                    "metadatas_json": json.dumps([{"source": name, "rank": 1}]),
+                },
+                headers=USER_1_HEADERS,
+            )
+            assert response.status_code == 200
+
+        docs = (await client.get(f"{url}?limit=100", headers=USER_1_HEADERS)).json()
+        assert len(docs) == 3
+        by_source = {doc["metadata"]["source"]: doc for doc in docs}
+
+        # By document ID and file ID at once.
+        response = await client.patch(
+            url,
+            json={
+                "document_ids": [by_source["file1.txt"]["id"]],
+                "file_ids": [by_source["file2.txt"]["metadata"]["file_id"]],
+                "patch": {"verified": True, "rank": 2},
+            },
+            headers=USER_1_HEADERS,
+        )
+        assert response.status_code == 200
+        assert response.json() == {"success": True, "updated_count": 2}
+
+        # By filter only.
+        response = await client.patch(
+            url,
+            json={"filter": {"rank": 1}, "patch": {"vulnerable": True}},
+            headers=USER_1_HEADERS,
+        )
+        assert response.json()["updated_count"] == 1
+
+        docs = (await client.get(f"{url}?limit=100", headers=USER_1_HEADERS)).json()
+        metadata = {doc["metadata"]["source"]: doc["metadata"] for doc in docs}
+        assert metadata["file1.txt"]["verified"] is True
+        assert metadata["file1.txt"]["rank"] == 2
+        assert metadata["file2.txt"]["verified"] is True
+        assert "verified" not in metadata["file3.txt"]
+        assert metadata["file3.txt"]["vulnerable"] is True
+        # Other keys are kept.
+        assert metadata["file3.txt"]["file_id"] == by_source["file3.txt"]["metadata"][
+            "file_id"
+        ]
+
+        # Nothing selected, and other users' collections.
+        response = await client.patch(
+            url, json={"patch": {"verified": True}}, headers=USER_1_HEADERS
+        )
+        assert response.status_code == 400
+        response = await client.patch(
+            url,
+            json={"document_ids": ["missing"], "patch": {"verified": True}},
+            headers=USER_1_HEADERS,
+        )
+        assert response.json()["updated_count"] == 0
+        response = await client.patch(
+            url,
+            json={"filter": {"rank": 2}, "patch": {"verified": False}},
+            headers=USER_2_HEADERS,
+        )
+        assert response.status_code == 404
@@ -0,0 +1,124 @@
+"""Tests for the content-hash embedding cache."""
+
+from collections.abc import Iterator
+from unittest.mock import patch
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from langconnect.embeddings import (
+    EmbeddingCache,
+    EmbeddingScheduler,
+    content_hash,
+    embedding_model_key,
+)
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Deterministic embeddings that record every text sent to the model."""
+
+    model: str = "fake"
+    calls: list[list[str]] = []
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return self.embed_documents(texts)
+
+
+@pytest.fixture
+def fake_db() -> Iterator[dict[tuple[str, bytes], list[float]]]:
+    """Replace the Postgres table with a dict."""
+    rows: dict[tuple[str, bytes], list[float]] = {}
+
+    async def lookup(model, hashes):
+        return {h: rows[model, h] for h in hashes if (model, h) in rows}
+
+    async def store(model, embeddings):
+        for digest, vector in embeddings.items():
+            rows.setdefault((model, digest), vector)
+
+    with (
+        patch("langconnect.database.embedding_cache.lookup", lookup),
+        patch("langconnect.database.embedding_cache.store", store),
+    ):
+        yield rows
+
+
+def _cache(embeddings, memory_size: int = 100) -> EmbeddingCache:
+    return EmbeddingCache(EmbeddingScheduler(embeddings), memory_size=memory_size)
+
+
+def test_content_hash_normalizes_text():
+    """Whitespace runs and Unicode normalization do not change the hash."""
+    assert content_hash("hello  world\n") == content_hash(" hello world")
+    assert content_hash("café") == content_hash("café")
+    assert content_hash("hello world") != content_hash("hello world!")
+
+
+@pytest.mark.asyncio
+async def test_reingest_is_served_from_memory_then_db(fake_db):
+    """Texts seen before are not embedded again, even by a fresh process."""
+    embeddings = CountingEmbeddings(size=8, calls=[])
+    texts = ["alpha", "beta", "gamma"]
+
+    cache = _cache(embeddings)
+    first = await cache.embed(texts)
+    again = await cache.embed(texts)
+    # A new cache has an empty in-memory LRU but the same table.
+    restarted = _cache(embeddings)
+    from_db = await restarted.embed(texts + ["delta"])
+
+    assert embeddings.calls == [texts, ["delta"]]
+    # Cached vectors are stored as float32.
+    assert again == [pytest.approx(vector, rel=1e-6) for vector in first]
+    assert from_db[:3] == [pytest.approx(vector, rel=1e-6) for vector in first]
+    assert cache.stats()["memory_hits"] == 3
+    assert cache.stats()["hit_ratio"] == pytest.approx(0.5)
+    assert restarted.stats()["db_hits"] == 3
+    assert restarted.stats()["embedded"] == 1
+    assert len(fake_db) == 4
+
+
+@pytest.mark.asyncio
+async def test_duplicates_within_one_upsert_are_embedded_once(fake_db):
+    """Chunks with the same normalized text share one embedding, in order."""
+    embeddings = CountingEmbeddings(size=8, calls=[])
+    cache = _cache(embeddings, memory_size=0)
+
+    vectors = await cache.embed(["same text", "other", "same  text"])
+
+    assert embeddings.calls == [["same text", "other"]]
+    assert vectors[0] == vectors[2]
+    assert vectors[0] != vectors[1]
+
+
+@pytest.mark.asyncio
+async def test_entries_are_per_model(fake_db):
+    """Embeddings of another model are never reused."""
+    small = CountingEmbeddings(size=8, calls=[])
+    large = CountingEmbeddings(size=16, model="large", calls=[])
+
+    await _cache(small).embed(["text"])
+    vectors = await _cache(large).embed(["text"])
+
+    assert embedding_model_key(small) != embedding_model_key(large)
+    assert large.calls == [["text"]]
+    assert len(vectors[0]) == 16
+
+
+@pytest.mark.asyncio
+async def test_cache_errors_do_not_fail_upserts():
+    """If the cache table is unavailable, texts are simply embedded."""
+    embeddings = CountingEmbeddings(size=8, calls=[])
+
+    async def broken(*args):
+        raise ConnectionError("database unavailable")
+
+    with (
+        patch("langconnect.database.embedding_cache.lookup", broken),
+        patch("langconnect.database.embedding_cache.store", broken),
+    ):
+        vectors = await _cache(embeddings).embed(["text"])
+
+    assert embeddings.calls == [["text"]]
+    assert len(vectors) == 1
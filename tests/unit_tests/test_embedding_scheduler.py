@@ -0,0 +1,189 @@
+"""Tests for the embedding scheduler against a local fake embeddings API."""
+
+import asyncio
+import base64
+import json
+import struct
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from langchain_openai import OpenAIEmbeddings
+
+from langconnect.embeddings import (
+    EmbeddingScheduler,
+    TokenBucket,
+    batch_texts,
+    estimate_tokens,
+)
+
+
+class FakeEmbeddingsAPI(ThreadingHTTPServer):
+    """An OpenAI-compatible ``/v1/embeddings`` endpoint.
+
+    The embedding of a text is ``[len(text), 1.0]``. The first ``rate_limit``
+    requests are answered with 429 and a ``Retry-After`` header.
+    """
+
+    def __init__(self, rate_limit: int = 0, delay: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.rate_limit = rate_limit
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.batches: list[list[str]] = []
+        self.status_codes: list[int] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeEmbeddingsAPI
+
+    def log_message(self, format, *args) -> None:  # noqa: A002
+        pass
+
+    def do_POST(self) -> None:  # noqa: N802
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        api = self.server
+        with api.lock:
+            api.in_flight += 1
+            api.peak_in_flight = max(api.peak_in_flight, api.in_flight)
+            limited = len(api.status_codes) < api.rate_limit
+            api.status_codes.append(429 if limited else 200)
+        try:
+            time.sleep(api.delay)
+            if limited:
+                self._send(429, {"error": {"message": "Rate limit reached"}})
+                return
+            texts = body["input"]
+            with api.lock:
+                api.batches.append(texts)
+            data = []
+            for index, text in enumerate(texts):
+                vector = [float(len(text)), 1.0]
+                if body.get("encoding_format") == "base64":
+                    vector = base64.b64encode(struct.pack("<2f", *vector)).decode()
+                data.append({"object": "embedding", "index": index, "embedding": vector})
+            self._send(
+                200,
+                {
+                    "object": "list",
+                    "data": data,
+                    "model": body["model"],
+                    "usage": {"prompt_tokens": 1, "total_tokens": 1},
+                },
+            )
+        finally:
+            with api.lock:
+                api.in_flight -= 1
+
+    def _send(self, status: int, payload: dict) -> None:
+        content = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        if status == 429:
+            self.send_header("Retry-After", "0.05")
+        self.end_headers()
+        self.wfile.write(content)
+
+
+@pytest.fixture
+def fake_api(request) -> Iterator[FakeEmbeddingsAPI]:
+    api = FakeEmbeddingsAPI(**getattr(request, "param", {}))
+    thread = threading.Thread(target=api.serve_forever, daemon=True)
+    thread.start()
+    yield api
+    api.shutdown()
+    api.server_close()
+
+
+def _scheduler(api: FakeEmbeddingsAPI, **kwargs) -> EmbeddingScheduler:
+    embeddings = OpenAIEmbeddings(
+        model="text-embedding-3-small",
+        api_key="test",
+        base_url=api.base_url,
+        max_retries=0,
+        check_embedding_ctx_length=False,
+    )
+    return EmbeddingScheduler(embeddings, backoff_base=0.01, **kwargs)
+
+
+def test_batches_respect_token_and_size_budgets():
+    """Batches stay within both budgets; oversized texts get their own batch."""
+    texts = ["a" * 30, "b" * 30, "c" * 300, "d" * 3, "e" * 3, "f" * 3, "g" * 3]
+    batches = batch_texts(texts, max_tokens=20, max_size=3)
+
+    assert batches == [[0], [1], [2], [3, 4, 5], [6]]
+    for batch in batches:
+        tokens = sum(estimate_tokens(texts[i]) for i in batch)
+        assert len(batch) == 1 or tokens <= 20
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fake_api", [{"delay": 0.05}], indirect=True)
+async def test_embeds_concurrent_batches_in_order(fake_api):
+    """Batches run concurrently, up to the limit, and results keep input order."""
+    texts = [f"text number {n}" * (n % 5 + 1) for n in range(40)]
+    scheduler = _scheduler(fake_api, max_batch_size=4, concurrency=3)
+
+    vectors = await scheduler.embed(texts)
+
+    assert [vector[0] for vector in vectors] == [float(len(t)) for t in texts]
+    assert len(fake_api.batches) == 10
+    assert all(len(batch) <= 4 for batch in fake_api.batches)
+    assert fake_api.peak_in_flight == 3
+    stats = scheduler.stats()
+    assert stats["requests"] == 10
+    assert stats["texts"] == 40
+    assert stats["recent_texts_per_second"] > 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fake_api", [{"rate_limit": 2}], indirect=True)
+async def test_rate_limits_are_retried_with_reduced_concurrency(fake_api):
+    """429 responses pause for Retry-After, halve concurrency and are retried."""
+    scheduler = _scheduler(fake_api, max_batch_size=2, concurrency=4)
+    texts = [f"text {n}" for n in range(12)]
+
+    start = time.monotonic()
+    vectors = await scheduler.embed(texts)
+
+    assert time.monotonic() - start >= 0.05
+    assert [vector[0] for vector in vectors] == [float(len(t)) for t in texts]
+    assert fake_api.status_codes.count(429) == 2
+    stats = scheduler.stats()
+    assert stats["rate_limited"] == 2
+    assert stats["retries"] == 2
+    assert stats["concurrency"] < 4
+    assert stats["failures"] == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fake_api", [{"rate_limit": 100}], indirect=True)
+async def test_gives_up_after_max_retries(fake_api):
+    """A batch that keeps being rate limited fails the call."""
+    scheduler = _scheduler(fake_api, max_retries=2)
+
+    with pytest.raises(Exception, match="Rate limit"):
+        await scheduler.embed(["hello"])
+
+    assert fake_api.status_codes == [429, 429, 429]
+    assert scheduler.stats()["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_paces_to_rate():
+    """Reservations beyond the burst capacity wait for the bucket to refill."""
+    bucket = TokenBucket(rate=100, capacity=10)
+
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(5) == pytest.approx(0.05, abs=0.01)
+    await asyncio.sleep(0.1)
+    assert bucket.reserve(5) == 0.0
@@ -0,0 +1,93 @@
+"""Tests for searching several collections with one query."""
+
+import uuid
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from langconnect import config
+from tests.unit_tests.fixtures import get_async_test_client
+
+USER_1_HEADERS = {
+    "Authorization": "Bearer user1",
+}
+
+USER_2_HEADERS = {
+    "Authorization": "Bearer user2",
+}
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    monkeypatch.setattr(
+        config, "DEFAULT_EMBEDDINGS", DeterministicFakeEmbedding(size=1536)
+    )
+
+
+async def _create_collection(client, name: str, text: bytes, headers) -> str:
+    response = await client.post("/collections", json={"name": name}, headers=headers)
+    assert response.status_code == 201
+    collection_id = response.json()["uuid"]
+    response = await client.post(
+        f"/collections/{collection_id}/documents",
+        files=[("files", (f"{name}.txt", text, "text/plain"))],
+        data={"wait": "true"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    return collection_id
+
+
+async def test_federated_search(fake_embeddings) -> None:
+    async with get_async_test_client() as client:
+        cats = await _create_collection(
+            client, "cats", b"cats purr and sleep", USER_1_HEADERS
+        )
+        dogs = await _create_collection(
+            client, "dogs", b"dogs bark and fetch", USER_1_HEADERS
+        )
+        other = await _create_collection(
+            client, "other", b"dogs bark and fetch", USER_2_HEADERS
+        )
+
+        for search_type in ("semantic", "keyword", "hybrid"):
+            response = await client.post(
+                "/collections/search",
+                json={"query": "dogs bark", "search_type": search_type},
+                headers=USER_1_HEADERS,
+            )
+            assert response.status_code == 200
+            results = response.json()
+            # Only the user's collections are searched, ranked together.
+            assert {r["collection_id"] for r in results} <= {cats, dogs}
+            assert results[0]["collection_id"] == dogs
+            single = await client.post(
+                f"/collections/{dogs}/documents/search",
+                json={"query": "dogs bark", "search_type": search_type},
+                headers=USER_1_HEADERS,
+            )
+            assert results[0]["id"] == single.json()[0]["id"]
+            assert results[0]["score"] == pytest.approx(single.json()[0]["score"])
+
+        response = await client.post(
+            "/collections/search",
+            json={"query": "dogs bark", "collection_ids": [cats]},
+            headers=USER_1_HEADERS,
+        )
+        assert response.status_code == 200
+        assert {r["collection_id"] for r in response.json()} == {cats}
+
+        for collection_ids in ([cats, other], [str(uuid.uuid4())]):
+            response = await client.post(
+                "/collections/search",
+                json={"query": "dogs bark", "collection_ids": collection_ids},
+                headers=USER_1_HEADERS,
+            )
+            assert response.status_code == 404
+
+        response = await client.post(
+            "/collections/search",
+            json={"query": "dogs bark", "collection_ids": []},
+            headers=USER_1_HEADERS,
+        )
+        assert response.status_code == 422
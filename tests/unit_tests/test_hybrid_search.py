@@ -0,0 +1,174 @@
+"""Tests for fusing semantic and keyword rankings in hybrid search."""
+
+import json
+import math
+
+import pytest
+
+from langconnect import config
+from langconnect.database.bulk import insert_embeddings
+from langconnect.database.collections import Collection
+from langconnect.database.connection import get_db_connection
+from langconnect.database.filters import compile_metadata_filter
+from tests.unit_tests.fixtures import get_async_test_client
+
+USER_1_HEADERS = {
+    "Authorization": "Bearer user1",
+}
+
+QUERY = "zebra"
+
+# id: (cosine similarity to the query vector, document, kind). The semantic
+# ranking is A, B, Y, D, F1, F2, K and the keyword ranking B, Y, K. With a
+# limit of 2 or 3 the candidate pools hold 4 or 6 chunks, so K is only ever
+# found by the keyword side and A, D, F1 and F2 only by the semantic side.
+CHUNKS = {
+    "A": (1.0, "apple", "fruit"),
+    "B": (0.8, "zebra zebra zebra", "animal"),
+    "Y": (0.6, "zebra zebra", "animal"),
+    "D": (0.5, "apple", "fruit"),
+    "F1": (0.4, "apple pie", "fruit"),
+    "F2": (0.3, "apple tart", "fruit"),
+    "K": (-1.0, "zebra", "animal"),
+}
+
+
+def _vector(similarity: float) -> list[float]:
+    vector = [0.0] * config.EMBEDDING_DIMENSIONS
+    vector[0] = similarity
+    vector[1] = math.sqrt(1 - similarity**2)
+    return vector
+
+
+async def _search(collection_id: str, *, limit: int = 2, filter=None, **options):
+    options = {
+        "fusion": "weighted",
+        "semantic_weight": 1.0,
+        "keyword_weight": 1.0,
+        "rrf_k": 60,
+        **options,
+    }
+    async with get_db_connection() as conn:
+        results = await Collection._hybrid_search(
+            conn,
+            collection_id,
+            QUERY,
+            _vector(1.0),
+            limit,
+            compile_metadata_filter(filter),
+            **options,
+        )
+    return [(r["id"], r["score"]) for r in results]
+
+
+async def _create_collection(client) -> str:
+    response = await client.post(
+        "/collections", json={"name": "hybrid_col"}, headers=USER_1_HEADERS
+    )
+    collection_id = response.json()["uuid"]
+    async with get_db_connection() as conn:
+        await insert_embeddings(
+            conn,
+            [
+                (
+                    chunk_id,
+                    collection_id,
+                    _vector(similarity),
+                    document,
+                    json.dumps({"kind": kind}),
+                )
+                for chunk_id, (similarity, document, kind) in CHUNKS.items()
+            ],
+        )
+    return collection_id
+
+
+@pytest.mark.asyncio
+async def test_weights_change_the_ranking() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client)
+        semantic = await _search(collection_id, semantic_weight=1.0, keyword_weight=0.0)
+        assert [chunk_id for chunk_id, _ in semantic] == ["A", "B"]
+        assert semantic[0][1] == pytest.approx(1.0)
+        assert semantic[1][1] == pytest.approx(0.8)
+
+        mixed = await _search(collection_id, semantic_weight=1.0, keyword_weight=0.3)
+        assert [chunk_id for chunk_id, _ in mixed] == ["B", "A"]
+        # B has the best keyword rank, normalized to 1.
+        assert mixed[0][1] == pytest.approx(0.8 + 0.3)
+        # A is only found by the semantic side: its keyword score counts as 0.
+        assert mixed[1][1] == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_keyword_only_match_is_fused() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client)
+        results = await _search(
+            collection_id, limit=3, semantic_weight=0.0, keyword_weight=1.0
+        )
+
+        assert [chunk_id for chunk_id, _ in results] == ["B", "Y", "K"]
+        # K is outside the semantic pool; its semantic score counts as 0.
+        assert 0 < results[2][1] < results[1][1] < results[0][1] == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_rrf_ranks_by_position_and_rrf_k() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client)
+        # Semantic ranks A=1, B=2, Y=3; keyword ranks B=1, Y=2.
+        top_heavy = await _search(collection_id, fusion="rrf", rrf_k=0)
+        assert [chunk_id for chunk_id, _ in top_heavy] == ["B", "A"]
+        assert top_heavy[0][1] == pytest.approx(1 / 2 + 1 / 1)
+        assert top_heavy[1][1] == pytest.approx(1 / 1)
+
+        # A large k flattens the ranks, so agreement of both sides wins.
+        flat = await _search(collection_id, fusion="rrf", rrf_k=60)
+        assert [chunk_id for chunk_id, _ in flat] == ["B", "Y"]
+        assert flat[1][1] == pytest.approx(1 / 63 + 1 / 62)
+
+        # A lower semantic weight lets Y overtake A.
+        keyword_heavy = await _search(
+            collection_id, fusion="rrf", rrf_k=0, semantic_weight=0.2
+        )
+        assert [chunk_id for chunk_id, _ in keyword_heavy] == ["B", "Y"]
+
+
+@pytest.mark.asyncio
+async def test_weighted_and_rrf_rank_differently() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client)
+        # Weighted fusion rewards Y's keyword score, close to B's. rrf with a
+        # small k favours A's first semantic place over Y's third and second.
+        weighted = await _search(collection_id, fusion="weighted")
+        rrf = await _search(collection_id, fusion="rrf", rrf_k=0)
+
+        assert [chunk_id for chunk_id, _ in weighted] == ["B", "Y"]
+        assert [chunk_id for chunk_id, _ in rrf] == ["B", "A"]
+
+
+@pytest.mark.asyncio
+async def test_filter_applies_to_both_rankings() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client)
+        # Without the filter, A tops the semantic ranking.
+        animals = await _search(
+            collection_id,
+            limit=3,
+            filter={"kind": "animal"},
+            semantic_weight=1.0,
+            keyword_weight=0.0,
+        )
+        assert [chunk_id for chunk_id, _ in animals] == ["B", "Y", "K"]
+
+        # Without the filter, B tops the keyword ranking.
+        fruit = await _search(
+            collection_id,
+            limit=3,
+            filter={"kind": "fruit"},
+            semantic_weight=0.0,
+            keyword_weight=1.0,
+        )
+        assert {chunk_id for chunk_id, _ in fruit} <= {"A", "D", "F1", "F2"}
+        assert all(score == 0 for _, score in fruit)
@@ -0,0 +1,299 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.documents import Document
+
+from langconnect.database import jobs
+from langconnect.database.collections import Collection
+from langconnect.database.connection import get_db_connection
+from langconnect.services.ingestion import run_ingest_job, worker_pool
+from tests.unit_tests.fixtures import get_async_test_client
+
+USER_1_HEADERS = {
+    "Authorization": "Bearer user1",
+}
+
+USER_2_HEADERS = {
+    "Authorization": "Bearer user2",
+}
+
+
+async def _create_collection(client, name: str) -> str:
+    response = await client.post(
+        "/collections", json={"name": name, "metadata": {}}, headers=USER_1_HEADERS
+    )
+    assert response.status_code == 201
+    return response.json()["uuid"]
+
+
+async def _queue_upload(client, collection_id: str) -> dict:
+    files = [
+        ("files", ("a.txt", b"first file content", "text/plain")),
+        ("files", ("b.txt", b"second file content", "text/plain")),
+    ]
+    response = await client.post(
+        f"/collections/{collection_id}/documents",
+        files=files,
+        headers=USER_1_HEADERS,
+    )
+    assert response.status_code == 202
+    return response.json()
+
+
+async def test_upload_is_queued_and_processed_by_worker() -> None:
+    """An upload returns a job right away; a worker then ingests its files."""
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client, "jobs_collection")
+        data = await _queue_upload(client, collection_id)
+        assert data["status"] == "queued"
+        job_id = data["job_id"]
+        assert data["status_url"] == f"/collections/{collection_id}/jobs/{job_id}"
+
+        response = await client.get(data["status_url"], headers=USER_1_HEADERS)
+        assert response.status_code == 200
+        job = response.json()
+        assert job["status"] == "queued"
+        assert job["files_total"] == 2
+        assert job["progress"] == 0.0
+
+        assert await worker_pool.run_once() is True
+        assert await worker_pool.run_once() is False
+
+        job = (await client.get(data["status_url"], headers=USER_1_HEADERS)).json()
+        assert job["status"] == "succeeded"
+        assert job["files_done"] == 2
+        assert job["chunks_added"] >= 2
+        assert job["progress"] == 1.0
+
+        documents = await client.get(
+            f"/collections/{collection_id}/documents", headers=USER_1_HEADERS
+        )
+        assert len(documents.json()) == job["chunks_added"]
+
+        jobs = await client.get(
+            f"/collections/{collection_id}/jobs", headers=USER_1_HEADERS
+        )
+        assert [j["id"] for j in jobs.json()] == [job_id]
+
+
+async def test_jobs_are_scoped_to_owner() -> None:
+    """Another user can neither see nor cancel a job."""
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client, "jobs_owner")
+        data = await _queue_upload(client, collection_id)
+
+        response = await client.get(data["status_url"], headers=USER_2_HEADERS)
+        assert response.status_code == 404
+        response = await client.post(
+            f"{data['status_url']}/cancel", headers=USER_2_HEADERS
+        )
+        assert response.status_code == 404
+
+
+async def test_cancel_queued_job() -> None:
+    """A queued job is cancelled immediately and never picked up."""
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client, "jobs_cancel")
+        data = await _queue_upload(client, collection_id)
+
+        response = await client.post(
+            f"{data['status_url']}/cancel", headers=USER_1_HEADERS
+        )
+        assert response.status_code == 202
+        assert response.json()["status"] == "cancelled"
+
+        response = await client.post(
+            f"{data['status_url']}/cancel", headers=USER_1_HEADERS
+        )
+        assert response.status_code == 409
+
+        assert await worker_pool.run_once() is False
+
+
+async def test_failed_job_can_be_retried() -> None:
+    """A job whose attempts ran out can be queued again and completes."""
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client, "jobs_retry")
+        with patch("langconnect.config.INGEST_MAX_ATTEMPTS", 1):
+            data = await _queue_upload(client, collection_id)
+
+        with patch.object(
+            Collection, "upsert", side_effect=RuntimeError("embeddings down")
+        ):
+            assert await worker_pool.run_once() is True
+
+        job = (await client.get(data["status_url"], headers=USER_1_HEADERS)).json()
+        assert job["status"] == "failed"
+        assert "embeddings down" in job["error"]
+
+        response = await client.post(
+            f"{data['status_url']}/retry", headers=USER_1_HEADERS
+        )
+        assert response.status_code == 202
+        assert response.json()["status"] == "queued"
+
+        assert await worker_pool.run_once() is True
+        job = (await client.get(data["status_url"], headers=USER_1_HEADERS)).json()
+        assert job["status"] == "succeeded"
+        assert job["files_done"] == 2
+
+        response = await client.post(
+            f"{data['status_url']}/retry", headers=USER_1_HEADERS
+        )
+        assert response.status_code == 409
+
+
+async def test_worker_that_lost_its_job_records_nothing() -> None:
+    """A worker whose job was taken over stops without touching the job."""
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client, "jobs_lease")
+        data = await _queue_upload(client, collection_id)
+        upsert = Collection.upsert
+
+        async def upsert_after_takeover(self, documents):
+            async with get_db_connection() as conn:
+                await conn.execute(
+                    "UPDATE langconnect_ingest_jobs SET locked_by = 'other' "
+                    "WHERE id = $1",
+                    data["job_id"],
+                )
+            return await upsert(self, documents)
+
+        with patch.object(Collection, "upsert", upsert_after_takeover):
+            assert await worker_pool.run_once() is True
+
+        job = (await client.get(data["status_url"], headers=USER_1_HEADERS)).json()
+        assert job["status"] == "running"
+        assert job["files_done"] == 0
+        assert job["chunks_added"] == 0
+        documents = await client.get(
+            f"/collections/{collection_id}/documents", headers=USER_1_HEADERS
+        )
+        assert documents.json() == []
+
+
+async def _store_without_completing(exception: BaseException):
+    """Run a job whose files are stored but cannot be recorded as done."""
+    complete_job_file = jobs.complete_job_file
+
+    async def store_then_fail(job_id, worker_id, position, chunk_ids):
+        if position == 0:
+            raise exception
+        return await complete_job_file(job_id, worker_id, position, chunk_ids)
+
+    with patch.object(jobs, "complete_job_file", store_then_fail):
+        await worker_pool.run_once()
+
+
+async def _assert_stored_once(client, status_url: str) -> None:
+    job = (await client.get(status_url, headers=USER_1_HEADERS)).json()
+    assert job["status"] == "succeeded"
+    assert job["files_done"] == 2
+    collection_url = status_url.split("/jobs/")[0]
+    documents = (
+        await client.get(f"{collection_url}/documents", headers=USER_1_HEADERS)
+    ).json()
+    assert len(documents) == job["chunks_added"]
+    assert len({d["metadata"]["file_id"] for d in documents}) == 2
+
+
+async def test_file_stored_before_release_is_not_duplicated() -> None:
+    """A released job replaces the chunks its interrupted attempt stored."""
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client, "jobs_release")
+        data = await _queue_upload(client, collection_id)
+
+        with pytest.raises(asyncio.CancelledError):
+            await _store_without_completing(asyncio.CancelledError())
+        job = (await client.get(data["status_url"], headers=USER_1_HEADERS)).json()
+        assert job["status"] == "queued"
+
+        assert await worker_pool.run_once() is True
+        await _assert_stored_once(client, data["status_url"])
+
+
+async def test_file_stored_before_retry_is_not_duplicated() -> None:
+    """A retried job replaces the chunks its failed attempt stored."""
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection(client, "jobs_restore")
+        with patch("langconnect.config.INGEST_MAX_ATTEMPTS", 1):
+            data = await _queue_upload(client, collection_id)
+
+        await _store_without_completing(RuntimeError("database down"))
+        job = (await client.get(data["status_url"], headers=USER_1_HEADERS)).json()
+        assert job["status"] == "failed"
+
+        response = await client.post(
+            f"{data['status_url']}/retry", headers=USER_1_HEADERS
+        )
+        assert response.status_code == 202
+        assert await worker_pool.run_once() is True
+        await _assert_stored_once(client, data["status_url"])
+
+
+async def test_files_in_flight_are_bounded(monkeypatch) -> None:
+    """A job downloads a file only once fewer than the limit are in flight."""
+    monkeypatch.setattr("langconnect.config.INGEST_FILES_IN_FLIGHT", 2)
+    job = {
+        "id": "job-1",
+        "collection_id": "collection-1",
+        "owner_id": "user1",
+        "attempts": 1,
+        "cancel_requested": False,
+        "params": {"chunk_size": 100, "chunk_overlap": 0, "enable_chunking": True},
+    }
+    in_flight = 0
+    most_in_flight = 0
+
+    async def get_job_file(job_id, position):
+        return {
+            "position": position,
+            "filename": f"{position}.txt",
+            "content_type": "text/plain",
+            "metadata": None,
+            "file_id": f"file-{position}",
+        }
+
+    async def download(job_id, position, target):
+        nonlocal in_flight, most_in_flight
+        in_flight += 1
+        most_in_flight = max(most_in_flight, in_flight)
+        target.write(b"text")
+
+    async def process(path, **kwargs):
+        await asyncio.sleep(0.01)
+        return [Document(page_content="text")]
+
+    async def upsert(documents):
+        nonlocal in_flight
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return ["chunk"]
+
+    with (
+        patch("langconnect.services.ingestion.jobs") as mock_jobs,
+        patch("langconnect.services.ingestion.Collection") as MockCollection,
+        patch("langconnect.services.ingestion.parser_pool") as mock_parser_pool,
+    ):
+        mock_jobs.LeaseLostError = jobs.LeaseLostError
+        mock_jobs.pending_file_positions = AsyncMock(return_value=list(range(6)))
+        mock_jobs.heartbeat = AsyncMock(return_value=False)
+        mock_jobs.get_job_file = get_job_file
+        mock_jobs.download_job_file = download
+        mock_jobs.complete_job_file = AsyncMock()
+        mock_jobs.finish_job = AsyncMock()
+        mock_jobs.IngestJobsManager.return_value.get = AsyncMock(
+            return_value={"chunks_added": 6}
+        )
+        collection = MagicMock()
+        collection.upsert = upsert
+        collection.delete_many = AsyncMock()
+        MockCollection.return_value = collection
+        mock_parser_pool.process = process
+
+        assert await run_ingest_job(job, "worker-1") == "succeeded"
+
+    assert mock_jobs.complete_job_file.await_count == 6
+    # The file being stored, plus the limit of files downloaded or parsed.
+    assert most_in_flight == 3
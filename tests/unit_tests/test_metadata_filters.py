@@ -0,0 +1,96 @@
+"""Unit tests for compiling metadata filters into SQL."""
+
+import json
+
+import pytest
+
+from langconnect.database.filters import InvalidFilterError, compile_metadata_filter
+
+
+def test_empty_filter_matches_everything():
+    compiled = compile_metadata_filter(None)
+
+    assert compiled.render(1) == "TRUE"
+    assert compiled.params == []
+
+
+def test_equality_conditions_use_single_containment():
+    compiled = compile_metadata_filter({"source": "a.pdf", "verified": True})
+
+    assert compiled.render(4) == "e.cmetadata @> $4::jsonb"
+    assert json.loads(compiled.params[0]) == {"source": "a.pdf", "verified": True}
+
+
+def test_list_equality_is_exact():
+    compiled = compile_metadata_filter({"source": "a.pdf", "tags": ["a", "b"]})
+
+    assert compiled.render(1) == (
+        "e.cmetadata @> $3::jsonb AND (e.cmetadata -> $1::text) = $2::jsonb"
+    )
+    assert compiled.params[:2] == ["tags", '["a", "b"]']
+    assert json.loads(compiled.params[2]) == {"source": "a.pdf"}
+
+
+def test_object_equality_is_exact():
+    compiled = compile_metadata_filter({"author": {"name": "Ada"}})
+
+    assert compiled.render(1) == "(e.cmetadata -> $1::text) = $2::jsonb"
+    assert compiled.params == ["author", '{"name": "Ada"}']
+
+
+def test_operators_are_parameterized():
+    compiled = compile_metadata_filter(
+        {"page": {"$gte": 3}, "tag": {"$in": ["a", "b"]}, "note": {"$exists": False}}
+    )
+    sql = compiled.render(1)
+
+    assert "(e.cmetadata -> $1::text) >= $2::jsonb" in sql
+    assert "jsonb_typeof(e.cmetadata -> $1::text) = jsonb_typeof($2::jsonb)" in sql
+    assert "(e.cmetadata -> $3::text) = ANY($4::jsonb[])" in sql
+    assert "NOT (e.cmetadata ? $5::text)" in sql
+    assert compiled.params == ["page", "3", "tag", ['"a"', '"b"'], "note"]
+
+
+def test_every_parameter_is_referenced():
+    compiled = compile_metadata_filter(
+        {"a": 1, "b": {"$exists": True, "$ne": 2}, "$or": [{"c": {"$nin": [1]}}]}
+    )
+    sql = compiled.render(1)
+
+    for i in range(1, len(compiled.params) + 1):
+        assert f"${i}:" in sql
+
+
+def test_logical_operators_nest():
+    compiled = compile_metadata_filter(
+        {"$or": [{"source": "a.pdf"}, {"page": {"$lt": 2}}], "verified": True}
+    )
+    sql = compiled.render(10)
+
+    assert sql.startswith("e.cmetadata @> $13::jsonb AND ((")
+    assert " OR " in sql
+    assert json.loads(compiled.params[-1]) == {"verified": True}
+    assert len(compiled.params) == 4
+
+
+def test_keys_are_never_interpolated():
+    compiled = compile_metadata_filter({"x'; DROP TABLE t; --": {"$exists": True}})
+
+    assert "DROP" not in compiled.render(1)
+
+
+@pytest.mark.parametrize(
+    "bad_filter",
+    [
+        {"$where": "1=1"},
+        {"page": {"$regex": ".*"}},
+        {"page": {"$gt": [1]}},
+        {"page": {"$in": "a"}},
+        {"page": {"$exists": "yes"}},
+        {"$or": []},
+        {"$and": [{}]},
+    ],
+)
+def test_invalid_filters_are_rejected(bad_filter):
+    with pytest.raises(InvalidFilterError):
+        compile_metadata_filter(bad_filter)
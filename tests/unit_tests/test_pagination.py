@@ -0,0 +1,143 @@
+"""Tests for keyset (cursor) pagination of documents and document groups."""
+
+import datetime
+import json
+
+import pytest
+from fastapi.exceptions import HTTPException
+
+from langconnect.database.connection import get_db_connection
+from langconnect.database.pagination import decode_cursor, encode_cursor
+from tests.unit_tests.fixtures import get_async_test_client
+
+USER_1_HEADERS = {
+    "Authorization": "Bearer user1",
+}
+
+
+def test_cursor_round_trip() -> None:
+    created_at = datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc)
+    cursor = encode_cursor("document_groups", [created_at, "file-1"])
+
+    assert "=" not in cursor
+    assert decode_cursor("document_groups", cursor) == [
+        "2024-01-02T00:00:00+00:00",
+        "file-1",
+    ]
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "e30", ""])
+def test_malformed_cursor_is_rejected(cursor: str) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor("documents", cursor)
+    assert exc_info.value.status_code == 400
+
+
+def test_cursor_of_another_listing_is_rejected() -> None:
+    cursor = encode_cursor("documents", ["file-1", "chunk-1"])
+    with pytest.raises(HTTPException):
+        decode_cursor("document_groups", cursor)
+
+
+async def _create_collection_with_chunks(client) -> str:
+    """Nine chunks over three files, and two chunks without a file_id."""
+    response = await client.post(
+        "/collections",
+        json={"name": "pages_col", "metadata": {}},
+        headers=USER_1_HEADERS,
+    )
+    assert response.status_code == 201
+    collection_id = response.json()["uuid"]
+
+    rows = [
+        (
+            f"chunk-{i}",
+            collection_id,
+            f"chunk {i}",
+            json.dumps(
+                {
+                    "file_id": f"file-{i % 3}",
+                    "created_at": f"2024-01-0{i % 3 + 1}T00:00:00+00:00",
+                }
+            ),
+        )
+        for i in range(9)
+    ]
+    rows += [(f"loose-{i}", collection_id, f"loose {i}", "{}") for i in range(2)]
+    async with get_db_connection() as conn:
+        await conn.executemany(
+            """
+            INSERT INTO langchain_pg_embedding
+                   (id, collection_id, document, cmetadata)
+            VALUES ($1, $2, $3, $4::jsonb)
+            """,
+            rows,
+        )
+    return collection_id
+
+
+async def _walk(client, url: str, limit: int) -> list[list[dict]]:
+    pages = []
+    cursor = ""
+    while cursor is not None:
+        response = await client.get(
+            url, params={"limit": limit, "cursor": cursor}, headers=USER_1_HEADERS
+        )
+        assert response.status_code == 200
+        page = response.json()
+        pages.append(page["items"])
+        cursor = page["next_cursor"]
+    return pages
+
+
+async def test_document_pages_match_offset_listing() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection_with_chunks(client)
+        url = f"/collections/{collection_id}/documents"
+
+        pages = await _walk(client, url, limit=4)
+        legacy = await client.get(
+            url, params={"limit": 100}, headers=USER_1_HEADERS
+        )
+
+    assert [len(page) for page in pages] == [4, 4, 3]
+    ids = [doc["id"] for page in pages for doc in page]
+    assert ids == [doc["id"] for doc in legacy.json()]
+    # Chunks without a file_id come last.
+    assert ids[-2:] == ["loose-0", "loose-1"]
+
+
+async def test_document_pages_inside_loose_chunks() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection_with_chunks(client)
+        pages = await _walk(
+            client, f"/collections/{collection_id}/documents", limit=10
+        )
+
+    assert [len(page) for page in pages] == [10, 1]
+    assert pages[1][0]["id"] == "loose-1"
+
+
+async def test_document_group_pages() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection_with_chunks(client)
+        pages = await _walk(
+            client, f"/collections/{collection_id}/document-groups", limit=2
+        )
+
+    assert [[g["file_id"] for g in page] for page in pages] == [
+        ["file-2", "file-1"],
+        ["file-0"],
+    ]
+    assert all(g["chunk_count"] == 3 for page in pages for g in page)
+
+
+async def test_invalid_cursor_returns_400() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection_with_chunks(client)
+        response = await client.get(
+            f"/collections/{collection_id}/documents",
+            params={"cursor": "garbage"},
+            headers=USER_1_HEADERS,
+        )
+    assert response.status_code == 400
@@ -0,0 +1,152 @@
+"""Tests for parsing documents in the parser pool."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from langchain_core.documents import Document
+
+from langconnect.services.parser_pool import ParserPool
+
+
+def _write(path, contents: bytes) -> str:
+    path.write_bytes(contents)
+    return str(path)
+
+
+def _make_pdf(pages: list[str]) -> bytes:
+    """A minimal PDF with one line of text per page."""
+    font = 3 + 2 * len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{3 + 2 * n} 0 R" for n in range(len(pages))), len(pages)
+        ),
+    ]
+    for n, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Contents {4 + 2 * n} 0 R /Resources << /Font << /F1 {font} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = "%PDF-1.4\n"
+    offsets = []
+    for num, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n{obj}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+    out += f"startxref\n{xref}\n%%EOF\n"
+    return out.encode()
+
+
+@pytest.mark.asyncio
+async def test_parse_in_worker_process(tmp_path):
+    """Files are parsed in a worker process and returned as documents."""
+    path = _write(tmp_path / "a.txt", b"hello from a worker")
+    pool = ParserPool(processes=1)
+    try:
+        docs = await pool.parse(path, filename="a.txt", content_type="text/plain")
+    finally:
+        pool.shutdown()
+
+    assert [doc.page_content for doc in docs] == ["hello from a worker"]
+
+
+@pytest.mark.asyncio
+async def test_parse_errors_are_raised(tmp_path):
+    """Unsupported files raise in the caller, and the pool stays usable."""
+    binary = _write(tmp_path / "a.bin", b"\x00")
+    text = _write(tmp_path / "b.txt", b"still works")
+    pool = ParserPool(processes=1)
+    try:
+        with pytest.raises(Exception):
+            await pool.parse(binary, filename="a.bin", content_type="image/png")
+        docs = await pool.parse(text, content_type="text/plain")
+    finally:
+        pool.shutdown()
+
+    assert docs[0].page_content == "still works"
+
+
+@pytest.mark.asyncio
+async def test_mimetype_limits(tmp_path):
+    """At most the configured number of files of a mime type parse at once."""
+    running: dict[str, int] = {"application/pdf": 0, "text/plain": 0}
+    peak = dict(running)
+    lock = threading.Lock()
+
+    def slow_parse(path, *, filename=None, content_type=None):
+        with lock:
+            running[content_type] += 1
+            peak[content_type] = max(peak[content_type], running[content_type])
+        time.sleep(0.05)
+        with lock:
+            running[content_type] -= 1
+        return [Document(page_content=path)]
+
+    # Without processes the pool parses in threads, where the parser can be
+    # replaced by a test double.
+    pool = ParserPool(
+        processes=0, mimetype_limits={"application/pdf": 1, "text/plain": 3}
+    )
+    path = str(tmp_path / "unused")
+    with patch("langconnect.services.parser_pool.parse_file", slow_parse):
+        await asyncio.gather(
+            *[pool.parse(path, content_type="application/pdf") for _ in range(4)],
+            *[pool.parse(path, content_type="text/plain") for _ in range(6)],
+        )
+
+    assert peak["application/pdf"] == 1
+    assert peak["text/plain"] == 3
+
+
+@pytest.mark.asyncio
+async def test_pdf_pages_are_chunked_with_page_numbers(tmp_path):
+    """PDF slices extracted by several workers come back in page order."""
+    pages = [f"Text of page {n}" for n in range(7)]
+    path = _write(tmp_path / "doc.pdf", _make_pdf(pages))
+    pool = ParserPool(processes=2, pages_per_task=2)
+    try:
+        chunks = await pool.process(
+            path,
+            filename="doc.pdf",
+            content_type="application/pdf",
+            metadata={"source": "doc.pdf"},
+            chunk_size=100,
+            chunk_overlap=0,
+            file_id="file-1",
+        )
+    finally:
+        pool.shutdown()
+
+    assert [chunk.page_content for chunk in chunks] == pages
+    assert [chunk.metadata["page"] for chunk in chunks] == list(range(7))
+    for chunk in chunks:
+        assert chunk.metadata["total_pages"] == 7
+        assert chunk.metadata["file_id"] == "file-1"
+        assert chunk.metadata["source"] == "doc.pdf"
+        assert chunk.metadata["chunk_type"] == "chunked"
+
+
+@pytest.mark.asyncio
+async def test_pdf_without_chunking_is_one_document(tmp_path):
+    """With chunking disabled a PDF is still stored as a single chunk."""
+    path = _write(tmp_path / "doc.pdf", _make_pdf(["first", "second"]))
+    pool = ParserPool(processes=0)
+    chunks = await pool.process(
+        path,
+        content_type="application/pdf",
+        enable_chunking=False,
+    )
+
+    assert len(chunks) == 1
+    assert "first" in chunks[0].page_content
+    assert "second" in chunks[0].page_content
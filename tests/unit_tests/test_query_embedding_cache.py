@@ -0,0 +1,180 @@
+"""Tests for the cache of search query embeddings."""
+
+import asyncio
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from langconnect.embeddings import QueryEmbeddingCache
+
+
+class SlowQueryEmbeddings(DeterministicFakeEmbedding):
+    """Deterministic query embeddings that take a while and count calls."""
+
+    calls: list[str] = []
+    batches: list[list[str]] = []
+    delay: float = 0.05
+    error: str = ""
+
+    async def aembed_query(self, text: str) -> list[float]:
+        self.calls.append(text)
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise RuntimeError(self.error)
+        return self.embed_query(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(texts)
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise RuntimeError(self.error)
+        return self.embed_documents(texts)
+
+
+@pytest.mark.asyncio
+async def test_repeated_queries_are_embedded_once():
+    """Repeated (and whitespace-normalized) queries are served from the cache."""
+    embeddings = SlowQueryEmbeddings(size=8, calls=[])
+    cache = QueryEmbeddingCache(embeddings)
+
+    first = await cache.embed("what is pgvector")
+    second = await cache.embed("what is  pgvector ")
+    other = await cache.embed("what is hnsw")
+
+    assert embeddings.calls == ["what is pgvector", "what is hnsw"]
+    assert second == pytest.approx(first, rel=1e-6)
+    assert other != first
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["embedded"] == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_queries_share_one_request():
+    """N simultaneous searches for one query trigger one embedding call."""
+    embeddings = SlowQueryEmbeddings(size=8, calls=[])
+    cache = QueryEmbeddingCache(embeddings)
+
+    vectors = await asyncio.gather(*[cache.embed("same query") for _ in range(10)])
+
+    assert embeddings.calls == ["same query"]
+    assert all(vector == vectors[0] for vector in vectors)
+    assert cache.stats()["coalesced"] == 9
+    assert cache.stats()["embedded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_expire():
+    """Embeddings are not reused after the TTL."""
+    embeddings = SlowQueryEmbeddings(size=8, calls=[], delay=0)
+    cache = QueryEmbeddingCache(embeddings, ttl=0.05)
+
+    await cache.embed("query")
+    await asyncio.sleep(0.1)
+    await cache.embed("query")
+
+    assert embeddings.calls == ["query", "query"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_search_does_not_cancel_others():
+    """A waiter that goes away leaves the shared request running."""
+    embeddings = SlowQueryEmbeddings(size=8, calls=[])
+    cache = QueryEmbeddingCache(embeddings)
+
+    cancelled = asyncio.create_task(cache.embed("query"))
+    waiting = asyncio.create_task(cache.embed("query"))
+    await asyncio.sleep(0.01)
+    cancelled.cancel()
+
+    assert len(await waiting) == 8
+    assert embeddings.calls == ["query"]
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter_and_are_not_cached():
+    """A failed request fails the coalesced searches, and the next one retries."""
+    embeddings = SlowQueryEmbeddings(size=8, calls=[], error="embeddings down")
+    cache = QueryEmbeddingCache(embeddings)
+
+    results = await asyncio.gather(
+        cache.embed("query"), cache.embed("query"), return_exceptions=True
+    )
+    embeddings.error = ""
+    vector = await cache.embed("query")
+
+    assert [str(result) for result in results] == ["embeddings down"] * 2
+    assert len(vector) == 8
+    assert embeddings.calls == ["query", "query"]
+
+
+@pytest.mark.asyncio
+async def test_embed_many_sends_misses_in_one_request():
+    """Only queries neither cached nor in flight are embedded, together."""
+    embeddings = SlowQueryEmbeddings(size=8, calls=[], batches=[])
+    cache = QueryEmbeddingCache(embeddings)
+    [cached] = await cache.embed_many(["cached"])
+
+    in_flight = asyncio.create_task(cache.embed_many(["in flight"]))
+    await asyncio.sleep(0)
+    vectors = await cache.embed_many(["a", "cached", "b", "a", "in flight"])
+
+    assert embeddings.batches == [["cached"], ["in flight"], ["a", "b"]]
+    assert vectors[1] == pytest.approx(cached, rel=1e-6)
+    assert vectors[0] == vectors[3]
+    assert [vectors[4]] == await in_flight
+    assert vectors[0] == pytest.approx(embeddings.embed_documents(["a"])[0], rel=1e-6)
+    # The batch filled the cache.
+    again = await cache.embed_many(["b", "a"])
+    assert again[0] == pytest.approx(vectors[2], rel=1e-6)
+    assert again[1] == pytest.approx(vectors[0], rel=1e-6)
+    assert len(embeddings.batches) == 3
+
+
+@pytest.mark.asyncio
+async def test_query_and_document_embeddings_are_cached_apart():
+    """A vector from aembed_documents never answers embed, nor the reverse."""
+    embeddings = SlowQueryEmbeddings(size=8, calls=[], batches=[])
+    cache = QueryEmbeddingCache(embeddings)
+
+    await cache.embed("query")
+    await cache.embed_many(["query"])
+    await cache.embed("query")
+    await cache.embed_many(["query"])
+
+    assert embeddings.calls == ["query"]
+    assert embeddings.batches == [["query"]]
+
+
+@pytest.mark.asyncio
+async def test_embed_many_fails_on_missing_vectors():
+    """A batch answered with too few vectors fails every query of it."""
+
+    class ShortBatchEmbeddings(SlowQueryEmbeddings):
+        async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+            return self.embed_documents(texts[:1])
+
+    cache = QueryEmbeddingCache(ShortBatchEmbeddings(size=8))
+    results = await asyncio.gather(
+        cache.embed_many(["a", "b"]),
+        cache.embed_many(["b"]),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert cache.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_embed_many_errors_are_not_cached():
+    """A failed batch fails the call, and the next call retries."""
+    embeddings = SlowQueryEmbeddings(
+        size=8, calls=[], batches=[], error="embeddings down"
+    )
+    cache = QueryEmbeddingCache(embeddings)
+
+    with pytest.raises(RuntimeError, match="embeddings down"):
+        await cache.embed_many(["a", "b"])
+    embeddings.error = ""
+
+    assert len(await cache.embed_many(["a", "b"])) == 2
+    assert embeddings.batches == [["a", "b"], ["a", "b"]]
@@ -0,0 +1,274 @@
+"""Check that hot queries are served by the indexes added in the migrations."""
+
+import json
+
+from langconnect.database.connection import get_db_connection
+from langconnect.database import migrations
+from langconnect.database.migrations import MIGRATIONS, MIGRATIONS_TABLE
+from tests.unit_tests.fixtures import get_async_test_client
+
+USER_1_HEADERS = {
+    "Authorization": "Bearer user1",
+}
+
+
+async def _explain(conn, sql: str, *args) -> str:
+    """Return the JSON plan of ``sql`` with sequential scans discouraged.
+
+    The test tables are tiny, so the planner would otherwise always pick a
+    sequential scan regardless of the available indexes.
+    """
+    async with conn.transaction():
+        await conn.execute("SET LOCAL enable_seqscan = off")
+        plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {sql}", *args)
+    return plan if isinstance(plan, str) else json.dumps(plan)
+
+
+async def _create_collection_with_chunks(client) -> str:
+    response = await client.post(
+        "/collections",
+        json={"name": "plans_col", "metadata": {}},
+        headers=USER_1_HEADERS,
+    )
+    assert response.status_code == 201
+    collection_id = response.json()["uuid"]
+
+    async with get_db_connection() as conn:
+        await conn.executemany(
+            """
+            INSERT INTO langchain_pg_embedding
+                   (id, collection_id, document, cmetadata)
+            VALUES ($1, $2, $3, $4::jsonb)
+            """,
+            [
+                (
+                    f"chunk-{i}",
+                    collection_id,
+                    f"chunk {i}",
+                    json.dumps(
+                        {
+                            "file_id": f"file-{i % 3}",
+                            "created_at": f"2024-01-0{i % 3 + 1}T00:00:00+00:00",
+                        }
+                    ),
+                )
+                for i in range(9)
+            ],
+        )
+    return collection_id
+
+
+async def test_migrations_are_recorded_once() -> None:
+    async with get_async_test_client():
+        async with get_db_connection() as conn:
+            versions = await conn.fetch(
+                f"SELECT version FROM {MIGRATIONS_TABLE} ORDER BY version"
+            )
+    assert [r["version"] for r in versions] == [m.version for m in MIGRATIONS]
+
+
+async def test_indexed_columns_follow_metadata() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection_with_chunks(client)
+        async with get_db_connection() as conn:
+            owner_id = await conn.fetchval(
+                "SELECT owner_id FROM langchain_pg_collection WHERE uuid = $1",
+                collection_id,
+            )
+            row = await conn.fetchrow(
+                """
+                SELECT file_id, created_at
+                  FROM langchain_pg_embedding
+                 WHERE id = 'chunk-4'
+                """
+            )
+            file_id = await conn.fetchval(
+                """
+                UPDATE langchain_pg_embedding
+                   SET cmetadata = cmetadata || '{"file_id": "file-9"}'
+                 WHERE id = 'chunk-5'
+                RETURNING file_id
+                """
+            )
+    assert owner_id == "user1"
+    assert row["file_id"] == "file-1"
+    assert row["created_at"].isoformat() == "2024-01-02T00:00:00+00:00"
+    assert file_id == "file-9"
+
+
+async def test_indexed_columns_are_backfilled() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection_with_chunks(client)
+        async with get_db_connection() as conn:
+            # Rows written before the migration have none of the columns set.
+            await conn.execute(
+                "UPDATE langchain_pg_collection SET owner_id = NULL WHERE uuid = $1",
+                collection_id,
+            )
+            await conn.execute(
+                """
+                UPDATE langchain_pg_embedding
+                   SET file_id = NULL, created_at = now()
+                 WHERE id = 'chunk-4'
+                """
+            )
+            for statement in MIGRATIONS[1].backfills:
+                await migrations._backfill(conn, statement)
+            owner_id = await conn.fetchval(
+                "SELECT owner_id FROM langchain_pg_collection WHERE uuid = $1",
+                collection_id,
+            )
+            row = await conn.fetchrow(
+                """
+                SELECT file_id, created_at
+                  FROM langchain_pg_embedding
+                 WHERE id = 'chunk-4'
+                """
+            )
+    assert owner_id == "user1"
+    assert row["file_id"] == "file-1"
+    assert row["created_at"].isoformat() == "2024-01-02T00:00:00+00:00"
+
+
+async def test_invalid_created_at_falls_back_to_insert_time() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection_with_chunks(client)
+        async with get_db_connection() as conn:
+            created_at = await conn.fetchval(
+                """
+                INSERT INTO langchain_pg_embedding (id, collection_id, cmetadata)
+                VALUES ('bad-date', $1, '{"created_at": "yesterday-ish"}')
+                RETURNING created_at
+                """,
+                collection_id,
+            )
+    assert created_at is not None
+
+
+async def test_owner_lookup_uses_owner_index() -> None:
+    async with get_async_test_client() as client:
+        await _create_collection_with_chunks(client)
+        async with get_db_connection() as conn:
+            plan = await _explain(
+                conn,
+                "SELECT uuid FROM langchain_pg_collection WHERE owner_id = $1",
+                "user1",
+            )
+    assert "ix_langchain_pg_collection_owner_id" in plan
+
+
+async def test_file_delete_uses_file_index() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection_with_chunks(client)
+        async with get_db_connection() as conn:
+            plan = await _explain(
+                conn,
+                """
+                DELETE FROM langchain_pg_embedding
+                 WHERE collection_id = $1
+                   AND file_id = ANY($2::text[])
+                """,
+                collection_id,
+                ["file-1"],
+            )
+    assert "ix_langchain_pg_embedding_collection_file" in plan
+
+
+async def test_document_listing_is_index_ordered() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection_with_chunks(client)
+        async with get_db_connection() as conn:
+            plan = await _explain(
+                conn,
+                """
+                SELECT id FROM langchain_pg_embedding
+                 WHERE collection_id = $1
+                 ORDER BY file_id, id
+                 LIMIT 5
+                """,
+                collection_id,
+            )
+    assert "ix_langchain_pg_embedding_collection_file" in plan
+    assert '"Node Type": "Sort"' not in plan
+
+
+async def test_document_groups_are_ordered_by_created_at() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection_with_chunks(client)
+        response = await client.get(
+            f"/collections/{collection_id}/document-groups",
+            headers=USER_1_HEADERS,
+        )
+    assert response.status_code == 200
+    groups = response.json()
+    assert [g["file_id"] for g in groups] == ["file-2", "file-1", "file-0"]
+    assert [g["chunk_count"] for g in groups] == [3, 3, 3]
+
+
+async def test_document_page_seek_uses_file_index() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection_with_chunks(client)
+        async with get_db_connection() as conn:
+            plan = await _explain(
+                conn,
+                """
+                SELECT id FROM langchain_pg_embedding
+                 WHERE collection_id = $1
+                   AND (file_id, id) > ($2, $3)
+                 ORDER BY file_id, id
+                 LIMIT 5
+                """,
+                collection_id,
+                "file-1",
+                "chunk-4",
+            )
+    assert "ix_langchain_pg_embedding_collection_file" in plan
+    assert '"Node Type": "Sort"' not in plan
+
+
+async def test_document_groups_page_is_index_ordered() -> None:
+    async with get_async_test_client() as client:
+        collection_id = await _create_collection_with_chunks(client)
+        async with get_db_connection() as conn:
+            plan = await _explain(
+                conn,
+                """
+                SELECT file_id FROM langconnect_document_groups
+                 WHERE collection_id = $1
+                   AND (last_created_at, file_id) < (now(), 'file-9')
+                 ORDER BY last_created_at DESC, file_id DESC
+                 LIMIT 5
+                """,
+                collection_id,
+            )
+    assert "ix_langconnect_document_groups_recent" in plan
+    assert '"Node Type": "Sort"' not in plan
+
+
+async def test_document_tsv_follows_document_and_is_backfilled() -> None:
+    async with get_async_test_client() as client:
+        await _create_collection_with_chunks(client)
+        async with get_db_connection() as conn:
+            await conn.execute(
+                "UPDATE langchain_pg_embedding SET document = 'zebra' "
+                "WHERE id = 'chunk-1'"
+            )
+            # Rows written before the migration have no tsvector yet.
+            await conn.execute(
+                "UPDATE langchain_pg_embedding SET document_tsv = NULL "
+                "WHERE id = 'chunk-2'"
+            )
+            await migrations._backfill(conn, MIGRATIONS[0].backfills[0])
+            matches = {
+                query: await conn.fetchval(
+                    """
+                    SELECT array_agg(id ORDER BY id)
+                      FROM langchain_pg_embedding
+                     WHERE id IN ('chunk-1', 'chunk-2')
+                       AND document_tsv @@ plainto_tsquery('english', $1)
+                    """,
+                    query,
+                )
+                for query in ("zebra", "chunk")
+            }
+    assert matches == {"zebra": ["chunk-1"], "chunk": ["chunk-2"]}
@@ -0,0 +1,139 @@
+"""Tests for the search result cache and its write-driven invalidation."""
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from langconnect import config
+from langconnect.cache import TTLCache
+from langconnect.database.search_cache import SearchResultCache, search_result_cache
+from tests.unit_tests.fixtures import get_async_test_client
+
+USER_1_HEADERS = {
+    "Authorization": "Bearer user1",
+}
+
+PARAMS = {"query": "cats", "limit": 4, "search_type": "semantic", "filter": None}
+
+
+class FakeBackend:
+    """Dict-backed stand-in for a shared cache backend."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ttl):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+def test_key_covers_generation_and_parameters() -> None:
+    key = SearchResultCache.key("col", 1, PARAMS)
+
+    assert key == SearchResultCache.key("col", 1, dict(reversed(PARAMS.items())))
+    assert key != SearchResultCache.key("col", 2, PARAMS)
+    assert key != SearchResultCache.key("other", 1, PARAMS)
+    assert key != SearchResultCache.key("col", 1, {**PARAMS, "filter": {"a": 1}})
+
+
+@pytest.mark.asyncio
+async def test_results_are_shared_between_workers() -> None:
+    backend = FakeBackend()
+    results = [{"id": "a", "page_content": "cats", "metadata": {}, "score": 0.1}]
+    key = SearchResultCache.key("col", 1, PARAMS)
+    await SearchResultCache(TTLCache(10, 60), backend).set(key, results)
+
+    other_worker = SearchResultCache(TTLCache(10, 60), backend)
+    assert await other_worker.get(key) == results
+    assert await other_worker.get(key) == results
+    assert await other_worker.get(SearchResultCache.key("col", 2, PARAMS)) is None
+
+    stats = other_worker.stats()
+    assert stats["shared_hits"] == 1
+    assert stats["hits"] == 1
+    assert stats["hit_ratio"] == pytest.approx(2 / 3)
+
+
+@pytest.mark.asyncio
+async def test_cached_results_are_not_shared() -> None:
+    cache = SearchResultCache(TTLCache(10, 60))
+    results = [{"id": "a", "page_content": "cats", "metadata": {}, "score": 0.1}]
+    key = SearchResultCache.key("col", 1, PARAMS)
+    await cache.set(key, results)
+    results[0]["metadata"]["changed"] = True
+
+    hit = await cache.get(key)
+    hit.append({"id": "b"})
+
+    assert await cache.get(key) == [
+        {"id": "a", "page_content": "cats", "metadata": {}, "score": 0.1}
+    ]
+
+
+def test_cache_is_disabled_without_capacity() -> None:
+    assert not SearchResultCache(TTLCache(0, 60)).enabled
+    assert not SearchResultCache(TTLCache(10, 0)).enabled
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_cached_results(monkeypatch) -> None:
+    monkeypatch.setattr(
+        config, "DEFAULT_EMBEDDINGS", DeterministicFakeEmbedding(size=1536)
+    )
+    search_result_cache.clear()
+    async with get_async_test_client() as client:
+        response = await client.post(
+            "/collections", json={"name": "cached_col"}, headers=USER_1_HEADERS
+        )
+        collection_id = response.json()["uuid"]
+        url = f"/collections/{collection_id}/documents"
+
+        async def search() -> list[str]:
+            response = await client.post(
+                f"{url}/search",
+                json={"query": "cats purr", "search_type": "keyword"},
+                headers=USER_1_HEADERS,
+            )
+            assert response.status_code == 200
+            return [r["page_content"] for r in response.json()]
+
+        assert await search() == []
+        assert await search() == []
+        assert search_result_cache.stats()["hits"] == 1
+
+        response = await client.post(
+            url,
+            files=[("files", ("cats.txt", b"cats purr and sleep", "text/plain"))],
+            data={"wait": "true"},
+            headers=USER_1_HEADERS,
+        )
+        assert response.status_code == 200
+        assert await search() == ["cats purr and sleep"]
+
+        listed = await client.get(url, headers=USER_1_HEADERS)
+        document = listed.json()[0]
+        response = await client.patch(
+            url,
+            json={"document_ids": [document["id"]], "patch": {"topic": "pets"}},
+            headers=USER_1_HEADERS,
+        )
+        assert response.status_code == 200
+        response = await client.post(
+            f"{url}/search",
+            json={"query": "cats purr", "search_type": "keyword"},
+            headers=USER_1_HEADERS,
+        )
+        assert response.json()[0]["metadata"]["topic"] == "pets"
+
+        response = await client.request(
+            "DELETE",
+            url,
+            json={"document_ids": [document["id"]]},
+            headers=USER_1_HEADERS,
+        )
+        assert response.status_code == 200
+        assert await search() == []
@@ -0,0 +1,94 @@
+"""Tests for the streaming upload limits."""
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from httpx import ASGITransport, AsyncClient
+
+from langconnect.uploads import UploadSizeLimitMiddleware, upload_size
+
+
+def _app(max_size: int) -> tuple[FastAPI, list[int]]:
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_size=max_size)
+    sizes: list[int] = []
+
+    @app.post("/upload")
+    async def upload(files: list[UploadFile] = File(...)):
+        sizes.extend(upload_size(file) for file in files)
+        return {"files": len(files)}
+
+    @app.post("/json")
+    async def json_body(body: dict):
+        return body
+
+    return app, sizes
+
+
+async def _client(app: FastAPI) -> AsyncClient:
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_upload_within_limit():
+    """Uploads under the limit reach the endpoint with their sizes known."""
+    app, sizes = _app(max_size=10_000)
+    async with await _client(app) as client:
+        response = await client.post(
+            "/upload",
+            files=[
+                ("files", ("a.txt", b"a" * 3000, "text/plain")),
+                ("files", ("b.txt", b"b" * 2000, "text/plain")),
+            ],
+        )
+    assert response.status_code == 200
+    assert sizes == [3000, 2000]
+
+
+@pytest.mark.asyncio
+async def test_upload_over_limit_is_rejected_while_streaming():
+    """A body crossing the limit is rejected before it is fully received."""
+    app, sizes = _app(max_size=10_000)
+    chunks_sent = 0
+
+    async def body():
+        nonlocal chunks_sent
+        yield (
+            b"--boundary\r\n"
+            b'Content-Disposition: form-data; name="files"; filename="big.txt"\r\n'
+            b"Content-Type: text/plain\r\n\r\n"
+        )
+        for _ in range(100):
+            chunks_sent += 1
+            yield b"x" * 1000
+        yield b"\r\n--boundary--\r\n"
+
+    async with await _client(app) as client:
+        response = await client.post(
+            "/upload",
+            content=body(),
+            headers={"Content-Type": "multipart/form-data; boundary=boundary"},
+        )
+    assert response.status_code == 413
+    assert sizes == []
+    assert chunks_sent < 100
+
+
+@pytest.mark.asyncio
+async def test_content_length_over_limit_is_rejected_upfront():
+    """A declared Content-Length over the limit is rejected without reading."""
+    app, _ = _app(max_size=1000)
+    async with await _client(app) as client:
+        response = await client.post(
+            "/upload", files=[("files", ("a.txt", b"a" * 5000, "text/plain"))]
+        )
+    assert response.status_code == 413
+    assert "maximum request size" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_other_requests_are_not_limited():
+    """Only multipart uploads are subject to the limit."""
+    app, _ = _app(max_size=10)
+    async with await _client(app) as client:
+        response = await client.post("/json", json={"key": "a long enough value"})
+    assert response.status_code == 200
@@ -0,0 +1,262 @@
+"""Tests for ANN index management."""
+
+import json
+import uuid
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from langconnect import config
+from langconnect.database.collections import Collection, CollectionsManager
+from langconnect.database.connection import get_db_connection
+from langconnect.database.indexes import (
+    AnnIndexParams,
+    ann_index_name,
+    build_ann_index,
+    create_index_sql,
+    drop_ann_index,
+    get_ann_index_status,
+    vector_distance_sql,
+)
+from tests.unit_tests.fixtures import get_async_test_client
+
+USER_1_HEADERS = {
+    "Authorization": "Bearer user1",
+}
+
+COLLECTION_ID = "5f0c3c1e-8f5e-4a8b-9a55-5b7c1c1d2e3f"
+
+
+def test_partial_index_sql() -> None:
+    sql = create_index_sql(
+        ann_index_name(COLLECTION_ID),
+        COLLECTION_ID,
+        AnnIndexParams(m=24, ef_construction=128),
+    )
+
+    assert sql == (
+        "CREATE INDEX CONCURRENTLY ix_langconnect_ann_5f0c3c1e8f5e4a8b9a555b7c1c1d2e3f "
+        "ON langchain_pg_embedding USING hnsw ((embedding::vector(1536)) "
+        "vector_cosine_ops) WITH (m = 24, ef_construction = 128) "
+        "WHERE collection_id = '5f0c3c1e-8f5e-4a8b-9a55-5b7c1c1d2e3f'::uuid"
+    )
+
+
+def test_global_ivfflat_index_sql() -> None:
+    sql = create_index_sql(
+        ann_index_name(), None, AnnIndexParams(method="ivfflat", lists=50)
+    )
+
+    assert "USING ivfflat" in sql
+    assert "WITH (lists = 50)" in sql
+    assert "WHERE" not in sql
+
+
+def test_search_distance_matches_index_expression() -> None:
+    assert vector_distance_sql("e.embedding", "$1") == (
+        "(e.embedding::vector(1536)) <=> $1::vector(1536)"
+    )
+
+
+def test_search_distance_of_another_dimension_is_not_cast() -> None:
+    assert vector_distance_sql("e.embedding", "$1", 1536) == (
+        "(e.embedding::vector(1536)) <=> $1::vector(1536)"
+    )
+    assert vector_distance_sql("e.embedding", "$1", 8) == (
+        "e.embedding <=> $1::vector"
+    )
+
+
+def test_collection_id_must_be_a_uuid() -> None:
+    with pytest.raises(ValueError):
+        ann_index_name("x'; DROP TABLE langchain_pg_embedding; --")
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"m": 1},
+        {"m": 40, "ef_construction": 64},
+        {"method": "ivfflat", "lists": 0},
+        {"method": "diskann"},
+    ],
+)
+def test_invalid_params_are_rejected(params) -> None:
+    with pytest.raises(ValueError):
+        AnnIndexParams(**params)
+
+
+async def _insert_random_vectors(collection_id: str, rows: int) -> None:
+    async with get_db_connection() as conn:
+        await conn.execute(
+            """
+            INSERT INTO langchain_pg_embedding
+                   (id, collection_id, embedding, document, cmetadata)
+            SELECT gen_random_uuid()::text,
+                   $1,
+                   (SELECT array_agg(random())::real[]
+                      FROM generate_series(1, 1536) d
+                     WHERE d > g - g)::vector,
+                   'chunk ' || g,
+                   $2::jsonb
+              FROM generate_series(1, $3) g
+            """,
+            collection_id,
+            json.dumps({"file_id": "file-1"}),
+            rows,
+        )
+
+
+async def test_build_rebuild_and_drop_partial_index() -> None:
+    async with get_async_test_client() as client:
+        response = await client.post(
+            "/collections",
+            json={"name": "ann_col", "metadata": {}},
+            headers=USER_1_HEADERS,
+        )
+        collection_id = response.json()["uuid"]
+        await _insert_random_vectors(collection_id, 200)
+
+        assert (await get_ann_index_status(collection_id))["state"] == "missing"
+
+        await build_ann_index(collection_id, AnnIndexParams(m=8, ef_construction=32))
+        status = await get_ann_index_status(collection_id)
+        assert status["state"] == "ready"
+        assert status["method"] == "hnsw"
+        assert status["parameters"] == {"m": 8, "ef_construction": 32}
+
+        async with get_db_connection() as conn, conn.transaction():
+            await conn.execute("SET LOCAL enable_seqscan = off")
+            plan = await conn.fetchval(
+                f"""
+                EXPLAIN (FORMAT JSON)
+                SELECT id FROM langchain_pg_embedding e
+                 WHERE e.collection_id = '{uuid.UUID(collection_id)}'
+                 ORDER BY {vector_distance_sql("e.embedding", "$1")}
+                 LIMIT 5
+                """,
+                "[" + ",".join(["0.5"] * 1536) + "]",
+            )
+        assert ann_index_name(collection_id) in str(plan)
+
+        await build_ann_index(collection_id, AnnIndexParams(method="ivfflat", lists=4))
+        status = await get_ann_index_status(collection_id)
+        assert status["method"] == "ivfflat"
+        assert status["parameters"] == {"lists": 4}
+
+        response = await client.post(
+            f"/collections/{collection_id}/documents/search",
+            json={"query": "chunk", "limit": 3, "probes": 2},
+            headers=USER_1_HEADERS,
+        )
+        assert response.status_code == 200
+
+        assert await drop_ann_index(collection_id) is True
+        assert (await get_ann_index_status(collection_id))["state"] == "missing"
+
+
+async def test_index_api() -> None:
+    async with get_async_test_client() as client:
+        response = await client.post(
+            "/collections",
+            json={"name": "ann_api_col", "metadata": {}},
+            headers=USER_1_HEADERS,
+        )
+        collection_id = response.json()["uuid"]
+        await _insert_random_vectors(collection_id, 50)
+
+        response = await client.put(
+            f"/collections/{collection_id}/index",
+            json={"method": "hnsw", "m": 40, "ef_construction": 64},
+            headers=USER_1_HEADERS,
+        )
+        assert response.status_code == 400
+
+        response = await client.put(
+            f"/collections/{collection_id}/index",
+            json={"method": "hnsw"},
+            headers=USER_1_HEADERS,
+        )
+        assert response.status_code == 202
+        assert response.json()["state"] == "building"
+
+        response = await client.put(
+            f"/collections/{collection_id}/index",
+            json={"method": "hnsw"},
+            headers=USER_1_HEADERS,
+        )
+        assert response.status_code == 409
+
+        response = await client.get(
+            f"/collections/{collection_id}/index",
+            headers={"Authorization": "Bearer user2"},
+        )
+        assert response.status_code == 404
+
+        response = await client.delete(
+            f"/collections/{collection_id}", headers=USER_1_HEADERS
+        )
+        assert response.status_code == 204
+        async with get_db_connection() as conn:
+            assert await conn.fetchval(
+                "SELECT to_regclass($1)", ann_index_name(collection_id)
+            ) is None
+
+
+async def test_filtered_index_search_returns_up_to_its_limit() -> None:
+    async with get_async_test_client() as client:
+        response = await client.post(
+            "/collections",
+            json={"name": "ann_filtered", "metadata": {}},
+            headers=USER_1_HEADERS,
+        )
+        collection_id = response.json()["uuid"]
+        await _insert_random_vectors(collection_id, 400)
+        # One chunk in 40 passes the filter.
+        async with get_db_connection() as conn:
+            await conn.execute(
+                """
+                UPDATE langchain_pg_embedding
+                   SET cmetadata = cmetadata || '{"rare": true}'
+                 WHERE collection_id = $1
+                   AND split_part(document, ' ', 2)::int % 40 = 0
+                """,
+                collection_id,
+            )
+        await build_ann_index(collection_id, AnnIndexParams(m=8, ef_construction=32))
+
+        response = await client.post(
+            f"/collections/{collection_id}/documents/search",
+            json={
+                "query": "chunk",
+                "limit": 5,
+                "ef_search": 10,
+                "filter": {"rare": True},
+            },
+            headers=USER_1_HEADERS,
+        )
+        assert response.status_code == 200
+        results = response.json()
+        assert len(results) == 5
+        scores = [result["score"] for result in results]
+        assert scores == sorted(scores)
+
+
+async def test_search_collection_of_another_dimension(monkeypatch) -> None:
+    """Collections embedded with another model are searched exactly."""
+    monkeypatch.setattr(
+        config, "DEFAULT_EMBEDDINGS", DeterministicFakeEmbedding(size=8)
+    )
+    async with get_async_test_client():
+        details = await CollectionsManager("user1").create("small_vectors")
+        collection = Collection(details["uuid"], "user1")
+        await collection.upsert(
+            [Document(page_content=f"chunk {n}") for n in range(3)]
+        )
+
+        for search_type in ("semantic", "hybrid"):
+            results = await collection.search(
+                "chunk 1", limit=2, search_type=search_type
+            )
+            assert len(results) == 2
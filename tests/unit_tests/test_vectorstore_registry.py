@@ -0,0 +1,64 @@
+"""Unit tests for the process-wide PGVector registry."""
+
+import pytest
+
+from langconnect import config
+from langconnect.database import connection
+
+
+@pytest.fixture
+def fake_builder(monkeypatch):
+    """Replace PGVector construction with a counting stub."""
+    built: list[str] = []
+
+    def _build(collection_name, embeddings, engine, collection_metadata):
+        built.append(collection_name)
+        return object()
+
+    monkeypatch.setattr(connection, "_build_vectorstore", _build)
+    monkeypatch.setattr(connection, "get_shared_vectorstore_engine", lambda: None)
+    connection.clear_vectorstores()
+    yield built
+    connection.clear_vectorstores()
+
+
+def test_get_vectorstore_reuses_instance(fake_builder):
+    """Repeated lookups for a table id share one store."""
+    first = connection.get_vectorstore("tbl_a")
+    second = connection.get_vectorstore("tbl_a")
+
+    assert first is second
+    assert fake_builder == ["tbl_a"]
+
+
+def test_get_vectorstore_evicts_least_recently_used(fake_builder, monkeypatch):
+    """The registry is bounded and evicts the least recently used store."""
+    monkeypatch.setattr(config, "VECTORSTORE_CACHE_SIZE", 2)
+
+    connection.get_vectorstore("tbl_a")
+    connection.get_vectorstore("tbl_b")
+    connection.get_vectorstore("tbl_a")  # tbl_a is now most recently used
+    connection.get_vectorstore("tbl_c")  # evicts tbl_b
+    connection.get_vectorstore("tbl_a")
+    connection.get_vectorstore("tbl_b")
+
+    assert fake_builder == ["tbl_a", "tbl_b", "tbl_c", "tbl_b"]
+
+
+def test_invalidate_vectorstore_forces_rebuild(fake_builder):
+    """Invalidated stores are rebuilt on the next lookup."""
+    first = connection.get_vectorstore("tbl_a")
+    connection.invalidate_vectorstore("tbl_a")
+    second = connection.get_vectorstore("tbl_a")
+
+    assert first is not second
+    assert fake_builder == ["tbl_a", "tbl_a"]
+
+
+def test_custom_embeddings_bypass_registry(fake_builder):
+    """Stores with non-default embeddings are never cached."""
+    custom = object()
+    connection.get_vectorstore("tbl_a", embeddings=custom)
+    connection.get_vectorstore("tbl_a", embeddings=custom)
+
+    assert fake_builder == ["tbl_a", "tbl_a"]